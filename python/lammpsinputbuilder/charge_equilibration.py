@@ -0,0 +1,320 @@
+"""Module implementing the settings of the charge equilibration fix of the ReaxFF forcefield."""
+
+import logging
+import re
+from enum import IntEnum
+
+from lammpsinputbuilder.quantities import LengthQuantity, LammpsUnitSystem
+from lammpsinputbuilder.types import ElectrostaticMethod
+
+logger = logging.getLogger(__name__)
+
+# Defaults of the charge equilibration used when the workflow runs dynamics
+DEFAULT_QEQ_NEVERY = 1
+DEFAULT_QEQ_CUTOFF = 10.0
+DEFAULT_QEQ_TOLERANCE = 1e-8
+DEFAULT_QEQ_MAXITER = 200
+
+# Tolerance used by the AUTO policy when the workflow only minimizes or evaluates
+# configurations. The charges don't have to be conserved over a trajectory and the
+# energy is converged well below the usual minimization tolerances.
+STATIC_QEQ_TOLERANCE = 1e-6
+
+
+class ChargeEquilibrationPolicy(IntEnum):
+    """
+    Enumeration for the tuning of the charge equilibration settings left to None.
+    FIXED, the default, always uses the defaults for dynamics. AUTO loosens the tolerance
+    when the workflow doesn't run any dynamics, i.e only minimizations and single point
+    evaluations. The forces of a minimization depend on the charges, only opt in to AUTO
+    if the looser charges are acceptable for the minimized structures.
+    """
+    FIXED = 1
+    AUTO = 2
+
+
+def format_tolerance(tolerance: float) -> str:
+    """
+    Format a tolerance of the charge equilibration as written in the Lammps documentation,
+    i.e without the leading zeros of the exponent: 1e-8 and not 1e-08.
+
+    Args:
+        tolerance (float): The tolerance
+
+    Returns:
+        str: The formatted tolerance
+    """
+    return re.sub(r"e([+-])0*(\d)", r"e\1\2", f"{tolerance:g}").replace("e+", "e")
+
+
+def get_electrostatic_fix_style(electrostatic_method: ElectrostaticMethod) -> str:
+    """
+    Get the Lammps fix style implementing an electrostatic method.
+
+    Args:
+        electrostatic_method (ElectrostaticMethod): The electrostatic method
+
+    Returns:
+        str: The fix style
+
+    Raises:
+        NotImplementedError: If the electrostatic method is not supported
+    """
+    if electrostatic_method == ElectrostaticMethod.QEQ:
+        return "qeq/reaxff"
+    if electrostatic_method == ElectrostaticMethod.QEQ_SHIELDED:
+        return "qeq/shielded"
+    if electrostatic_method == ElectrostaticMethod.ACKS2:
+        return "acks2/reaxff"
+    raise NotImplementedError(f"Electrostatic method {electrostatic_method} not supported.")
+
+
+def validate_charge_equilibration_settings(
+        nevery: int,
+        cutoff: LengthQuantity,
+        tolerance: float,
+        maxiter: int):
+    """
+    Check the charge equilibration settings given by the user. A None value is tuned
+    and not checked.
+
+    Args:
+        nevery (int): The number of timesteps between two equilibrations
+        cutoff (LengthQuantity): The cutoff of the Coulomb interactions
+        tolerance (float): The convergence tolerance of the solver
+        maxiter (int): The maximum number of iterations of the solver
+
+    Raises:
+        ValueError: If nevery or maxiter is lower than 1
+        ValueError: If the cutoff or the tolerance is not positive
+    """
+    if nevery is not None and nevery < 1:
+        raise ValueError(f"Invalid nevery {nevery}, must be at least 1.")
+    if cutoff is not None and cutoff.get_magnitude() <= 0:
+        raise ValueError(f"Invalid cutoff {cutoff.get_magnitude()}, must be positive.")
+    if tolerance is not None and tolerance <= 0:
+        raise ValueError(f"Invalid tolerance {tolerance}, must be positive.")
+    if maxiter is not None and maxiter < 1:
+        raise ValueError(f"Invalid maxiter {maxiter}, must be at least 1.")
+
+
+class ChargeEquilibrationSettings:
+    """
+    Settings of the charge equilibration fix declared with the ReaxFF forcefield
+    (qeq/reaxff, qeq/shielded, or acks2/reaxff). Each setting left to None is chosen
+    when generating the input script:
+    - With the FIXED policy, or if the workflow runs dynamics, the charges are
+      equilibrated every timestep to a tolerance of 1e-8.
+    - With the AUTO policy, a workflow made only of minimizations and single point
+      evaluations (run 0, rerun) uses a tolerance of 1e-6.
+
+    The dual keyword solves the two linear systems of qeq/reaxff at the same time.
+    It is only available with the OPENMP accelerator package.
+
+    Lammps documentation: https://docs.lammps.org/fix_qeq_reaxff.html,
+    https://docs.lammps.org/fix_qeq.html, https://docs.lammps.org/fix_acks2_reaxff.html
+    """
+
+    def __init__(
+            self,
+            nevery: int = None,
+            cutoff: LengthQuantity = None,
+            tolerance: float = None,
+            maxiter: int = None,
+            dual: bool = False,
+            policy: ChargeEquilibrationPolicy = ChargeEquilibrationPolicy.FIXED) -> None:
+        """
+        Constructor
+
+        Args:
+            nevery (int): The number of timesteps between two equilibrations. 1 if None
+            cutoff (LengthQuantity): The cutoff of the Coulomb interactions. 10 Angstrom if None
+            tolerance (float): The convergence tolerance of the solver. 1e-8, or tuned
+                               with the AUTO policy, if None
+            maxiter (int): The maximum number of iterations of the solver. 200 if None
+            dual (bool): If True, solve the two linear systems of qeq/reaxff at the same time
+            policy (ChargeEquilibrationPolicy): The tuning of the tolerance
+
+        Raises:
+            ValueError: If the settings are invalid, see validate_charge_equilibration_settings()
+        """
+        validate_charge_equilibration_settings(nevery, cutoff, tolerance, maxiter)
+        self.nevery = nevery
+        self.cutoff = cutoff
+        self.tolerance = tolerance
+        self.maxiter = maxiter
+        self.dual = dual
+        self.policy = policy
+
+    def get_nevery(self) -> int:
+        """
+        Get the number of timesteps between two equilibrations set by the user
+
+        Returns:
+            int: The number of timesteps, or None if tuned
+        """
+        return self.nevery
+
+    def get_cutoff(self) -> LengthQuantity:
+        """
+        Get the cutoff of the Coulomb interactions set by the user
+
+        Returns:
+            LengthQuantity: The cutoff, or None if the default is used
+        """
+        return self.cutoff
+
+    def get_tolerance(self) -> float:
+        """
+        Get the convergence tolerance of the solver set by the user
+
+        Returns:
+            float: The tolerance, or None if tuned
+        """
+        return self.tolerance
+
+    def get_maxiter(self) -> int:
+        """
+        Get the maximum number of iterations of the solver set by the user
+
+        Returns:
+            int: The maximum number of iterations, or None if the default is used
+        """
+        return self.maxiter
+
+    def get_dual(self) -> bool:
+        """
+        Check if the two linear systems of qeq/reaxff are solved at the same time
+
+        Returns:
+            bool: The dual setting
+        """
+        return self.dual
+
+    def get_policy(self) -> ChargeEquilibrationPolicy:
+        """
+        Get the tuning policy of the settings left to None
+
+        Returns:
+            ChargeEquilibrationPolicy: The policy
+        """
+        return self.policy
+
+    def to_dict(self) -> dict:
+        """
+        Get the dictionary representation of the settings. The settings
+        tuned at generation time are not included.
+
+        Returns:
+            dict: The dictionary representation
+        """
+        result = {}
+        result["class_name"] = self.__class__.__name__
+        if self.cutoff is not None:
+            result["cutoff"] = self.cutoff.to_dict()
+        for key in ["nevery", "tolerance", "maxiter"]:
+            if getattr(self, key) is not None:
+                result[key] = getattr(self, key)
+        result["dual"] = self.dual
+        result["policy"] = self.policy.value
+        return result
+
+    def from_dict(self, d: dict, version: int):
+        """
+        Set the settings from a dictionary
+
+        Args:
+            d (dict): The dictionary representation
+            version (int): The version of the dictionary representation
+
+        Raises:
+            ValueError: If the class_name doesn't match the class name
+            ValueError: If the settings are invalid, see validate_charge_equilibration_settings()
+        """
+        class_name = d.get("class_name", "")
+        if class_name != self.__class__.__name__:
+            raise ValueError(
+                f"Expected class {self.__class__.__name__}, got {class_name}.")
+        self.cutoff = None
+        if d.get("cutoff") is not None:
+            self.cutoff = LengthQuantity()
+            self.cutoff.from_dict(d["cutoff"], version)
+        self.nevery = d.get("nevery")
+        self.tolerance = d.get("tolerance")
+        self.maxiter = d.get("maxiter")
+        validate_charge_equilibration_settings(
+            self.nevery, self.cutoff, self.tolerance, self.maxiter)
+        self.dual = d.get("dual", False)
+        self.policy = ChargeEquilibrationPolicy(
+            d.get("policy", ChargeEquilibrationPolicy.FIXED.value))
+
+    def tune(self, static_workflow: bool) -> dict:
+        """
+        Compute the charge equilibration settings. The settings given by the user
+        are kept as is.
+
+        Args:
+            static_workflow (bool): True if the workflow only minimizes or
+                                    evaluates configurations
+
+        Returns:
+            dict: The settings with the keys nevery, cutoff (in Angstrom), tolerance, and maxiter
+        """
+        tolerance = self.tolerance
+        if tolerance is None:
+            tolerance = DEFAULT_QEQ_TOLERANCE
+            if self.policy == ChargeEquilibrationPolicy.AUTO and static_workflow:
+                tolerance = STATIC_QEQ_TOLERANCE
+        return {
+            "nevery": self.nevery if self.nevery is not None else DEFAULT_QEQ_NEVERY,
+            "cutoff": self.get_cutoff_angstrom(),
+            "tolerance": tolerance,
+            "maxiter": self.maxiter if self.maxiter is not None else DEFAULT_QEQ_MAXITER
+        }
+
+    def get_cutoff_angstrom(self) -> float:
+        """
+        Get the cutoff of the Coulomb interactions in Angstrom
+
+        Returns:
+            float: The cutoff in Angstrom
+        """
+        if self.cutoff is None:
+            return DEFAULT_QEQ_CUTOFF
+        return self.cutoff.convert_to(LammpsUnitSystem.REAL)
+
+    def get_fix_arguments(
+            self,
+            electrostatic_method: ElectrostaticMethod,
+            static_workflow: bool,
+            dual_available: bool) -> str:
+        """
+        Get the style and arguments of the charge equilibration fix.
+
+        Args:
+            electrostatic_method (ElectrostaticMethod): The electrostatic method
+            static_workflow (bool): True if the workflow only minimizes or
+                                    evaluates configurations
+            dual_available (bool): True if the fix style accepts the dual keyword
+
+        Returns:
+            str: The fix style followed by its arguments
+        """
+        fix_style = get_electrostatic_fix_style(electrostatic_method)
+        settings = self.tune(static_workflow)
+        nevery, cutoff = settings["nevery"], settings["cutoff"]
+        tolerance, maxiter = settings["tolerance"], settings["maxiter"]
+        if electrostatic_method == ElectrostaticMethod.QEQ_SHIELDED:
+            result = f"{fix_style} {nevery} {cutoff} {format_tolerance(tolerance)} {maxiter} reaxff"
+        else:
+            result = f"{fix_style} {nevery} 0.0 {cutoff} {format_tolerance(tolerance)} reaxff"
+            # The maxiter keyword is only written if it differs from the Lammps default
+            if maxiter != DEFAULT_QEQ_MAXITER:
+                result += f" maxiter {maxiter}"
+        if self.dual:
+            if electrostatic_method == ElectrostaticMethod.QEQ and dual_available:
+                result += " dual"
+            else:
+                logger.warning("The dual keyword is only available for qeq/reaxff with the "
+                               "OPENMP accelerator package, ignored for %s.", fix_style)
+        return result
@@ -0,0 +1,145 @@
+"""Module implementing the settings of the Lammps data file written for the molecular system."""
+
+from lammpsinputbuilder.types import CompressionStyle, AtomOrdering
+
+# Number of timesteps between two sorts of the atoms by Lammps when the atoms
+# are written along a space-filling curve, same as the Lammps default
+DEFAULT_ATOM_SORT_FREQUENCY = 1000
+
+
+def validate_data_file_settings(nb_workers: int, sort_frequency: int):
+    """
+    Check the data file settings given by the user.
+
+    Args:
+        nb_workers (int): The number of processes formatting the Atoms section
+        sort_frequency (int): The number of timesteps between two sorts of the atoms
+
+    Raises:
+        ValueError: If the number of processes is lower than 1
+        ValueError: If the sort frequency is negative
+    """
+    if nb_workers < 1:
+        raise ValueError(f"Invalid number of workers {nb_workers}, must be at least 1.")
+    if sort_frequency < 0:
+        raise ValueError(f"Invalid sort frequency {sort_frequency}, must be positive.")
+
+
+class DataFileSettings:
+    """
+    Settings of the Lammps data file written for the molecular system:
+    - The Atoms section can be formatted by several processes. The data file
+      produced is identical regardless of the number of processes.
+    - The data file can be compressed, Lammps reads compressed data files natively.
+      The name of the data file then carries the extension of the compression style.
+    - With MORTON or HILBERT, the atoms are written along a space-filling curve over
+      the box so that atoms close in space are close in memory from the first timestep.
+      The Lammps ids then differ from the indices of the model: the IndicesGroup declared
+      with the indices of the model are converted to the Lammps ids automatically.
+      Lammps keeps sorting the atoms every sort_frequency timesteps as they move,
+      0 disables the sort.
+
+    Lammps documentation: https://docs.lammps.org/read_data.html,
+    https://docs.lammps.org/atom_modify.html
+    """
+
+    def __init__(
+            self,
+            nb_workers: int = 1,
+            compression: CompressionStyle = CompressionStyle.NONE,
+            atom_ordering: AtomOrdering = AtomOrdering.NONE,
+            sort_frequency: int = DEFAULT_ATOM_SORT_FREQUENCY) -> None:
+        """
+        Constructor
+
+        Args:
+            nb_workers (int): The number of processes formatting the Atoms section
+            compression (CompressionStyle): The compression style of the data file
+            atom_ordering (AtomOrdering): The order of the atoms in the data file
+            sort_frequency (int): The number of timesteps between two sorts of the
+                                  atoms by Lammps when the atoms are ordered
+
+        Raises:
+            ValueError: If the settings are invalid, see validate_data_file_settings()
+        """
+        validate_data_file_settings(nb_workers, sort_frequency)
+        self.nb_workers = nb_workers
+        self.compression = compression
+        self.atom_ordering = atom_ordering
+        self.sort_frequency = sort_frequency
+
+    def get_nb_workers(self) -> int:
+        """
+        Get the number of processes formatting the Atoms section of the data file
+
+        Returns:
+            int: The number of processes
+        """
+        return self.nb_workers
+
+    def get_compression(self) -> CompressionStyle:
+        """
+        Get the compression style of the data file
+
+        Returns:
+            CompressionStyle: The compression style
+        """
+        return self.compression
+
+    def get_atom_ordering(self) -> AtomOrdering:
+        """
+        Get the order of the atoms in the data file
+
+        Returns:
+            AtomOrdering: The atom ordering
+        """
+        return self.atom_ordering
+
+    def get_sort_frequency(self) -> int:
+        """
+        Get the number of timesteps between two sorts of the atoms by Lammps
+
+        Returns:
+            int: The sort frequency
+        """
+        return self.sort_frequency
+
+    def to_dict(self) -> dict:
+        """
+        Get the dictionary representation of the settings
+
+        Returns:
+            dict: The dictionary representation
+        """
+        result = {}
+        result["class_name"] = self.__class__.__name__
+        result["nb_workers"] = self.nb_workers
+        result["compression"] = self.compression.value
+        result["atom_ordering"] = self.atom_ordering.value
+        result["sort_frequency"] = self.sort_frequency
+        return result
+
+    def from_dict(self, d: dict, version: int):
+        """
+        Set the settings from a dictionary
+
+        Args:
+            d (dict): The dictionary representation
+            version (int): The version of the dictionary representation
+
+        Raises:
+            ValueError: If the class_name doesn't match the class name
+            ValueError: If the settings are invalid, see validate_data_file_settings()
+        """
+        class_name = d.get("class_name", "")
+        if class_name != self.__class__.__name__:
+            raise ValueError(
+                f"Expected class {self.__class__.__name__}, got {class_name}.")
+        del version  # unused
+        nb_workers = d.get("nb_workers", 1)
+        sort_frequency = d.get("sort_frequency", DEFAULT_ATOM_SORT_FREQUENCY)
+        validate_data_file_settings(nb_workers, sort_frequency)
+        self.nb_workers = nb_workers
+        self.compression = CompressionStyle(d.get("compression", CompressionStyle.NONE.value))
+        self.atom_ordering = AtomOrdering(d.get("atom_ordering", AtomOrdering.NONE.value))
+        self.sort_frequency = sort_frequency
@@ -0,0 +1,253 @@
+"""Module implementing the domain decomposition and load balancing settings of a workflow."""
+
+from enum import IntEnum
+from typing import List, Tuple
+
+import numpy as np
+
+from lammpsinputbuilder.types import GlobalInformation
+
+# Minimum length considered for a dimension of the system when computing the
+# processors grid. Avoids degenerated grids for flat or linear molecules.
+MIN_DECOMPOSITION_LENGTH = 1.0
+
+
+class BalanceStyle(IntEnum):
+    """
+    Enumeration for the load balancing methods of Lammps.
+    SHIFT adjusts the cutting planes of the processors grid, RCB uses a recursive
+    coordinate bisection and requires the tiled communication style.
+    """
+    SHIFT = 1
+    RCB = 2
+
+
+def validate_balance_settings(
+        threshold: float,
+        balance_style: BalanceStyle,
+        shift_dims: str,
+        nb_iterations: int,
+        stop_threshold: float):
+    """
+    Check the settings of a balance command.
+
+    Args:
+        threshold (float): The imbalance threshold triggering a rebalance
+        balance_style (BalanceStyle): The balancing method
+        shift_dims (str): The dimensions adjusted by the shift method, ex: "xyz"
+        nb_iterations (int): The maximum number of iterations of the shift method
+        stop_threshold (float): The imbalance at which the shift method stops iterating
+
+    Raises:
+        ValueError: If a threshold is lower than 1.0
+        ValueError: If the dimensions are not a combination of x, y, and z
+        ValueError: If the number of iterations is lower than 1
+    """
+    if threshold < 1.0:
+        raise ValueError(f"Invalid balance threshold {threshold}, must be at least 1.0.")
+    if balance_style == BalanceStyle.SHIFT:
+        if len(shift_dims) == 0 or not set(shift_dims) <= set("xyz") or \
+                len(set(shift_dims)) != len(shift_dims):
+            raise ValueError(
+                f"Invalid shift dimensions '{shift_dims}', expected a combination of x, y, and z.")
+        if nb_iterations < 1:
+            raise ValueError(
+                f"Invalid number of iterations {nb_iterations}, must be at least 1.")
+        if stop_threshold < 1.0:
+            raise ValueError(
+                f"Invalid stop threshold {stop_threshold}, must be at least 1.0.")
+
+
+def get_balance_arguments(
+        threshold: float,
+        balance_style: BalanceStyle,
+        shift_dims: str,
+        nb_iterations: int,
+        stop_threshold: float) -> str:
+    """
+    Get the arguments shared by the balance command and the fix balance.
+
+    Args:
+        threshold (float): The imbalance threshold triggering a rebalance
+        balance_style (BalanceStyle): The balancing method
+        shift_dims (str): The dimensions adjusted by the shift method, ex: "xyz"
+        nb_iterations (int): The maximum number of iterations of the shift method
+        stop_threshold (float): The imbalance at which the shift method stops iterating
+
+    Returns:
+        str: The arguments, ex: "1.1 shift xyz 10 1.1"
+    """
+    if balance_style == BalanceStyle.RCB:
+        return f"{threshold} rcb"
+    return f"{threshold} shift {shift_dims} {nb_iterations} {stop_threshold}"
+
+
+def compute_processors_grid(nb_procs: int, lengths: List[float]) -> Tuple[int, int, int]:
+    """
+    Compute the processors grid minimizing the surface of the subdomains, i.e the
+    volume of ghost atoms exchanged between the processes.
+
+    Args:
+        nb_procs (int): The number of MPI processes
+        lengths (List[float]): The length of the system along each dimension
+
+    Returns:
+        Tuple[int, int, int]: The number of processes along x, y, and z
+    """
+    lengths = np.maximum(np.asarray(lengths, dtype=float), MIN_DECOMPOSITION_LENGTH)
+    best_grid = (nb_procs, 1, 1)
+    best_surface = np.inf
+    for px in range(1, nb_procs + 1):
+        if nb_procs % px != 0:
+            continue
+        for py in range(1, nb_procs // px + 1):
+            if (nb_procs // px) % py != 0:
+                continue
+            pz = nb_procs // px // py
+            sx, sy, sz = lengths / (px, py, pz)
+            surface = sx * sy + sy * sz + sx * sz
+            if surface < best_surface:
+                best_grid = (px, py, pz)
+                best_surface = surface
+    return best_grid
+
+
+class DomainDecomposition:
+    """
+    Settings of the spatial decomposition of the simulation box between the MPI processes.
+    The commands are written in the header of the input script: the processors grid and
+    the communication style are declared before reading the data file, and the box can
+    be balanced once right after reading the data file.
+
+    The processors grid is computed from the space occupied by the atoms rather than the
+    whole bounding box. For inhomogeneous systems like a slab, the dimensions with little
+    to no atoms are not split. The balance command then moves the cutting planes to give
+    each process a similar number of atoms.
+
+    Lammps documentation: https://docs.lammps.org/processors.html,
+    https://docs.lammps.org/comm_style.html, https://docs.lammps.org/balance.html
+    """
+
+    def __init__(
+            self,
+            nb_procs: int = None,
+            tiled: bool = False,
+            balance_style: BalanceStyle = None,
+            threshold: float = 1.1,
+            shift_dims: str = "xyz",
+            nb_iterations: int = 10,
+            stop_threshold: float = 1.1) -> None:
+        """
+        Constructor
+
+        Args:
+            nb_procs (int): The number of MPI processes used to run Lammps. If None,
+                            the processors grid is left to Lammps
+            tiled (bool): If True, use the tiled communication style
+            balance_style (BalanceStyle): The method used to balance the box after reading
+                                          the data file. If None, the box is not balanced
+            threshold (float): The imbalance threshold triggering the balance
+            shift_dims (str): The dimensions adjusted by the shift method, ex: "xyz"
+            nb_iterations (int): The maximum number of iterations of the shift method
+            stop_threshold (float): The imbalance at which the shift method stops iterating
+
+        Raises:
+            ValueError: If the number of processes is lower than 1
+            ValueError: If the rcb method is used without the tiled communication style
+            ValueError: If the balance settings are invalid, see validate_balance_settings()
+        """
+        if nb_procs is not None and nb_procs < 1:
+            raise ValueError(f"Invalid number of processes {nb_procs}, must be at least 1.")
+        if balance_style == BalanceStyle.RCB and not tiled:
+            raise ValueError("The rcb balance method requires the tiled communication style.")
+        if balance_style is not None:
+            validate_balance_settings(
+                threshold, balance_style, shift_dims, nb_iterations, stop_threshold)
+        self.nb_procs = nb_procs
+        self.tiled = tiled
+        self.balance_style = balance_style
+        self.threshold = threshold
+        self.shift_dims = shift_dims
+        self.nb_iterations = nb_iterations
+        self.stop_threshold = stop_threshold
+
+    def get_nb_procs(self) -> int:
+        """
+        Get the number of MPI processes
+
+        Returns:
+            int: The number of processes, or None if the processors grid is left to Lammps
+        """
+        return self.nb_procs
+
+    def is_tiled(self) -> bool:
+        """
+        Check if the tiled communication style is used
+
+        Returns:
+            bool: True if the communication style is tiled
+        """
+        return self.tiled
+
+    def get_balance_style(self) -> BalanceStyle:
+        """
+        Get the method used to balance the box after reading the data file
+
+        Returns:
+            BalanceStyle: The balancing method, or None if the box is not balanced
+        """
+        return self.balance_style
+
+    def get_processors_grid(self, global_information: GlobalInformation) -> Tuple[int, int, int]:
+        """
+        Compute the processors grid from the extent of the atoms, or from the
+        bounding box if the atoms are not available.
+
+        Args:
+            global_information (GlobalInformation): Data handler containing information
+                                                    related to the entire workflow
+
+        Returns:
+            Tuple[int, int, int]: The number of processes along x, y, and z,
+                                  or None if the number of processes is not set
+        """
+        if self.nb_procs is None:
+            return None
+        atoms = global_information.get_atoms()
+        if atoms is not None and len(atoms) > 0:
+            lengths = np.ptp(atoms.get_positions(), axis=0)
+        else:
+            lengths = global_information.get_bbox_dims()
+        return compute_processors_grid(self.nb_procs, lengths)
+
+    def add_setup_commands(self, global_information: GlobalInformation) -> str:
+        """
+        Get the Lammps commands to write before the simulation box is declared.
+
+        Args:
+            global_information (GlobalInformation): Data handler containing information
+                                                    related to the entire workflow
+
+        Returns:
+            str: Lammps command(s)
+        """
+        result = ""
+        grid = self.get_processors_grid(global_information)
+        if grid is not None:
+            result += f"processors     {grid[0]} {grid[1]} {grid[2]}\n"
+        if self.tiled:
+            result += "comm_style     tiled\n"
+        return result
+
+    def add_balance_commands(self) -> str:
+        """
+        Get the Lammps commands to balance the box after reading the data file.
+
+        Returns:
+            str: Lammps command(s)
+        """
+        if self.balance_style is None:
+            return ""
+        return "balance        " + get_balance_arguments(
+            self.threshold, self.balance_style, self.shift_dims,
+            self.nb_iterations, self.stop_threshold) + "\n"
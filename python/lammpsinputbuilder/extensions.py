@@ -6,6 +6,8 @@ from lammpsinputbuilder.quantities import TemperatureQuantity, TimeQuantity, \
 from lammpsinputbuilder.types import GlobalInformation
 from lammpsinputbuilder.instructions import Instruction
 from lammpsinputbuilder.base import BaseObject
+from lammpsinputbuilder.decomposition import BalanceStyle, validate_balance_settings, \
+    get_balance_arguments
 
 
 class Extension(BaseObject):
@@ -429,6 +431,143 @@ class MoveExtension(Extension):
         return f"unfix {self.get_extension_name()}\n"
 
 
+class BalanceExtension(Extension):
+    """
+    Periodically balance the number of atoms between the MPI processes by
+    adjusting the subdomains until the extension is removed. The rcb method
+    requires the tiled communication style, see DomainDecomposition.
+
+    Lammps documentation: https://docs.lammps.org/fix_balance.html
+    """
+    def __init__(
+            self,
+            extension_name: str = "defaultBalanceExtension",
+            nevery: int = 1000,
+            threshold: float = 1.1,
+            balance_style: BalanceStyle = BalanceStyle.SHIFT,
+            shift_dims: str = "xyz",
+            nb_iterations: int = 10,
+            stop_threshold: float = 1.1) -> None:
+        """
+        Constructor
+        Args:
+            extension_name (str): The name of the extension. The name must be alpha numeric
+                                and start with a letter
+            nevery (int): The number of timesteps between two balance attempts
+            threshold (float): The imbalance threshold triggering a rebalance
+            balance_style (BalanceStyle): The balancing method
+            shift_dims (str): The dimensions adjusted by the shift method, ex: "xyz"
+            nb_iterations (int): The maximum number of iterations of the shift method
+            stop_threshold (float): The imbalance at which the shift method stops iterating
+        Raise:
+            ValueError: If nevery is lower than 1
+            ValueError: If the balance settings are invalid, see validate_balance_settings()
+        """
+        super().__init__(extension_name=extension_name)
+        if nevery < 1:
+            raise ValueError(f"Invalid nevery {nevery}, must be at least 1.")
+        validate_balance_settings(
+            threshold, balance_style, shift_dims, nb_iterations, stop_threshold)
+        self.nevery = nevery
+        self.threshold = threshold
+        self.balance_style = balance_style
+        self.shift_dims = shift_dims
+        self.nb_iterations = nb_iterations
+        self.stop_threshold = stop_threshold
+
+    def get_balance_style(self) -> BalanceStyle:
+        """
+        Get the balancing method
+
+        Returns:
+            BalanceStyle: The balancing method
+        """
+        return self.balance_style
+
+    def to_dict(self) -> dict:
+        """
+        Generate a dictionary representation of the extension.
+
+        Returns:
+            dict: The dictionary representation of the extension.
+        """
+        result = super().to_dict()
+        result["class_name"] = self.__class__.__name__
+        result["nevery"] = self.nevery
+        result["threshold"] = self.threshold
+        result["balance_style"] = self.balance_style.value
+        result["shift_dims"] = self.shift_dims
+        result["nb_iterations"] = self.nb_iterations
+        result["stop_threshold"] = self.stop_threshold
+        return result
+
+    def from_dict(self, d: dict, version: int):
+        """
+        Parse the dictionary representation of the workflow and load it into
+        the current object.
+
+        Args:
+            d (dict): The dictionary representation of the workflow.
+            version (int): The version of the dictionary representation.
+
+        Returns:
+            None
+
+        Raise:
+            ValueError: If the class_name key is not found or doesn't match the class name
+            ValueError: If the balance settings are invalid
+        """
+        class_name = d.get("class_name", "")
+        if class_name != self.__class__.__name__:
+            raise ValueError(
+                f"Expected class {self.__class__.__name__}, got {class_name}.")
+        super().from_dict(d, version)
+        self.nevery = d.get("nevery", 1000)
+        if self.nevery < 1:
+            raise ValueError(f"Invalid nevery {self.nevery}, must be at least 1.")
+        self.threshold = d.get("threshold", 1.1)
+        self.balance_style = BalanceStyle(d.get("balance_style", BalanceStyle.SHIFT.value))
+        self.shift_dims = d.get("shift_dims", "xyz")
+        self.nb_iterations = d.get("nb_iterations", 10)
+        self.stop_threshold = d.get("stop_threshold", 1.1)
+        validate_balance_settings(
+            self.threshold, self.balance_style, self.shift_dims,
+            self.nb_iterations, self.stop_threshold)
+
+    def add_do_commands(self, global_information: GlobalInformation) -> str:
+        """
+        Get the Lammps commands to declare the extension.
+
+        Args:
+            global_information (GlobalInformation): Data handler containing information
+                                                    related to the entire workflow
+
+        Returns:
+            str: Lammps command(s)
+
+        Raise:
+            ValueError: If the rcb method is used without the tiled communication style
+        """
+        if self.balance_style == BalanceStyle.RCB:
+            domain_decomposition = global_information.get_workflow_context().domain_decomposition
+            if domain_decomposition is None or not domain_decomposition.is_tiled():
+                raise ValueError(
+                    f"The extension {self.get_extension_name()} uses the rcb method which "
+                    "requires the tiled communication style, see DomainDecomposition.")
+        return (f"fix {self.get_extension_name()} all balance {self.nevery} "
+                + get_balance_arguments(self.threshold, self.balance_style, self.shift_dims,
+                                        self.nb_iterations, self.stop_threshold) + "\n")
+
+    def add_undo_commands(self) -> str:
+        """
+        Get the Lammps commands to remove the extension.
+
+        Returns:
+            str: Lammps command(s)
+        """
+        return f"unfix {self.get_extension_name()}\n"
+
+
 class InstructionExtension(Extension):
     """
     Adapter to use an Instruction as an Extension. This class should be used for 
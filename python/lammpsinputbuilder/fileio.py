@@ -100,14 +100,34 @@ class FileIO(BaseObject):
 class DumpStyle(IntEnum):
     CUSTOM = 1
     XYZ = 2
+    CUSTOM_GZ = 3
+    CUSTOM_ZSTD = 4
 
 
 class DumpTrajectoryFileIO(FileIO):
     """
-    Writes trajectory files in custom or xyz styles. For other styles or 
+    Writes trajectory files in custom or xyz styles. The custom style can be
+    compressed on the fly with gzip (custom/gz) or zstd (custom/zstd), which
+    requires Lammps to be built with the COMPRESS package. For other styles or
     file formats, please refer to the ManualFileIO class instead.
     Lammps documentation: https://docs.lammps.org/dump.html
     """
+
+    dumpStyleToStr = {
+        DumpStyle.CUSTOM: "custom",
+        DumpStyle.XYZ: "xyz",
+        DumpStyle.CUSTOM_GZ: "custom/gz",
+        DumpStyle.CUSTOM_ZSTD: "custom/zstd"
+    }
+
+    dumpStyleToExtension = {
+        DumpStyle.CUSTOM: ".lammpstrj",
+        DumpStyle.XYZ: ".xyz",
+        DumpStyle.CUSTOM_GZ: ".lammpstrj.gz",
+        DumpStyle.CUSTOM_ZSTD: ".lammpstrj.zst"
+    }
+
+    customStyles = [DumpStyle.CUSTOM, DumpStyle.CUSTOM_GZ, DumpStyle.CUSTOM_ZSTD]
     def __init__(
             self,
             fileio_name: str = "defaultDumpTrajectoryFileIO",
@@ -123,9 +143,9 @@ class DumpTrajectoryFileIO(FileIO):
                                 and start with a letter
             style (DumpStyle): The style of the dump trajectory file
             user_fields (List[str]): The list of fields to include in the dump trajectory file. 
-                                     Settings only used if the dump style is set to custom
+                                     Settings only used if the dump style is a custom style
             add_default_fields (bool): Add the default fields to the dump trajectory file. 
-                                       Settings only used if the dump style is set to custom
+                                       Settings only used if the dump style is a custom style
             interval (int): The trajectory file will be written every n time steps
             group (Group): Writting the trajectory file for the atoms in this group
 
@@ -244,8 +264,9 @@ class DumpTrajectoryFileIO(FileIO):
                            but the element table from the GlobalInformation is empty.
         """
         result = ""
-        if self.style == DumpStyle.CUSTOM:
-            result += (f"dump {self.get_fileio_name()} {self.group_name} custom "
+        if self.style in DumpTrajectoryFileIO.customStyles:
+            result += (f"dump {self.get_fileio_name()} {self.group_name} "
+                    f"{DumpTrajectoryFileIO.dumpStyleToStr[self.style]} "
                     f"{self.interval} {self.get_associated_file_path()}")
             fields = []
             if self.add_default_fields:
@@ -298,10 +319,9 @@ class DumpTrajectoryFileIO(FileIO):
         Returns:
             Path: The name to the associated file
         """
-        if self.style == DumpStyle.CUSTOM:
-            return Path("dump." + self.get_fileio_name() + ".lammpstrj")
-        if self.style == DumpStyle.XYZ:
-            return Path("dump." + self.get_fileio_name() + ".xyz")
+        if self.style in DumpTrajectoryFileIO.dumpStyleToExtension:
+            return Path("dump." + self.get_fileio_name() +
+                        DumpTrajectoryFileIO.dumpStyleToExtension[self.style])
 
         raise ValueError(f"Invalid dump style {self.style}.")
 
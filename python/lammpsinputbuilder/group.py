@@ -1,9 +1,132 @@
 """Module implementing the Group class and its subclasses."""
 
-from typing import List
+from typing import List, Union
 from enum import IntEnum
+
+import numpy as np
+
 from lammpsinputbuilder.base import BaseObject
 
+# Maximum number of ids or id ranges written on a single group command.
+# Longer selections are split into several commands adding atoms to the same group.
+MAX_INDICES_TOKENS_PER_COMMAND = 1000
+
+# Minimum length of a run of consecutive indices stored as a [first, last] pair
+# in the dictionary representation of an IndicesGroup.
+MIN_SERIALIZED_RUN_LENGTH = 3
+
+
+def encode_index_ranges(indices: List[int]) -> List[str]:
+    """
+    Encode a list of atom indices into the Lammps id range syntax. The indices are
+    sorted and duplicates removed, then each run of at least 3 consecutive indices
+    is written as a range "a:b", the other indices being written individually.
+
+    Args:
+        indices (List[int]): The list of indices
+
+    Returns:
+        List[str]: The ids and id ranges, e.g. ["1:10", "15", "20:30"]
+    """
+    values = np.unique(np.asarray(indices, dtype=np.int64))
+    if len(values) == 0:
+        return []
+
+    # Positions where a new run of consecutive indices starts
+    breaks = np.flatnonzero(np.diff(values) != 1) + 1
+    starts = values[np.concatenate(([0], breaks))]
+    ends = values[np.concatenate((breaks - 1, [len(values) - 1]))]
+
+    tokens = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if end - start >= 2:
+            tokens.append(f"{start}:{end}")
+        else:
+            tokens.extend(str(index) for index in range(start, end + 1))
+    return tokens
+
+
+def compress_index_runs(indices: np.ndarray) -> List[Union[int, List[int]]]:
+    """
+    Compress an array of indices for serialization. Each run of at least
+    MIN_SERIALIZED_RUN_LENGTH indices increasing by 1 is replaced by the pair
+    [first, last]. The order of the indices and duplicates are preserved.
+
+    Args:
+        indices (np.ndarray): The array of indices
+
+    Returns:
+        List[Union[int, List[int]]]: The compressed indices, e.g. [[1, 10], 15, 12, [20, 30]]
+    """
+    values = np.asarray(indices, dtype=np.int64)
+    if len(values) == 0:
+        return []
+
+    breaks = np.flatnonzero(np.diff(values) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(values)]))
+
+    result = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if end - start >= MIN_SERIALIZED_RUN_LENGTH:
+            result.append([int(values[start]), int(values[end - 1])])
+        else:
+            result.extend(values[start:end].tolist())
+    return result
+
+
+def expand_index_runs(entries: List[Union[int, List[int]]]) -> np.ndarray:
+    """
+    Expand indices compressed with compress_index_runs().
+
+    Args:
+        entries (List[Union[int, List[int]]]): The compressed indices
+
+    Returns:
+        np.ndarray: The array of indices
+
+    Raise:
+        ValueError: If a run is not a [first, last] pair with first <= last
+    """
+    if all(isinstance(entry, (int, np.integer)) for entry in entries):
+        return np.asarray(entries, dtype=np.int64)
+
+    chunks = []
+    for entry in entries:
+        if isinstance(entry, (int, np.integer)):
+            chunks.append(np.asarray([entry], dtype=np.int64))
+            continue
+        if len(entry) != 2 or entry[0] > entry[1]:
+            raise ValueError(
+                f"Invalid run of indices {entry}, expected a pair [first, last] with first <= last.")
+        chunks.append(np.arange(entry[0], entry[1] + 1, dtype=np.int64))
+    return np.concatenate(chunks)
+
+
+def get_indices_do_commands(group_name: str, indices: Union[List[int], np.ndarray]) -> str:
+    """
+    Generate the commands declaring a group from a list of atom indices. Consecutive
+    indices are declared as id ranges, and large selections are split over several
+    commands adding atoms to the same group.
+
+    Args:
+        group_name (str): The name of the group
+        indices (Union[List[int], np.ndarray]): The indices of the atoms
+
+    Returns:
+        str: Lammps command(s)
+    """
+    if len(indices) == 0:
+        return f"group {group_name} empty\n"
+
+    # Declaring an existing group again adds the atoms to the group
+    tokens = encode_index_ranges(indices)
+    commands = ""
+    for start in range(0, len(tokens), MAX_INDICES_TOKENS_PER_COMMAND):
+        commands += (f"group {group_name} id "
+                     f"{' '.join(tokens[start:start + MAX_INDICES_TOKENS_PER_COMMAND])}\n")
+    return commands
+
 
 class Group(BaseObject):
     """
@@ -86,18 +209,22 @@ class Group(BaseObject):
 class IndicesGroup(Group):
     """
     Select a list of atoms by their atom indices. Indices start at 1.
+    Consecutive indices are declared as id ranges, and large selections are
+    declared over several group commands.
     Lammps documentation: https://docs.lammps.org/group.html
     """
     def __init__(
             self,
             group_name: str = "defaultIndiceGroupName",
-            indices: List[int] = None) -> None:
+            indices: Union[List[int], np.ndarray] = None,
+            sort_unique: bool = False) -> None:
         """
         Constructor
         Args:
             group_name (str): The name of the group. The name must be alpha numeric
                             and start with a letter
-            indices (List[int]): The indices of the atoms
+            indices (Union[List[int], np.ndarray]): The indices of the atoms
+            sort_unique (bool): If True, the indices are sorted and duplicates are removed
 
         Returns:
             None
@@ -108,12 +235,8 @@ class IndicesGroup(Group):
         """
         super().__init__(group_name)
 
-        if indices is None:
-            self.indices = []
-        else:
-            self.indices = indices
-
-        self.validate_indices()
+        self.indices = np.empty(0, dtype=np.int32)
+        self.set_indices([] if indices is None else indices, sort_unique=sort_unique)
 
     def validate_indices(self):
         """
@@ -126,11 +249,11 @@ class IndicesGroup(Group):
             ValueError: If an indices is inferior to 1
         """
         # Check that all the indices are positive
-        for index in self.indices:
-            if index <= 0:
-                raise ValueError(
-                    (f"Indices {index} declared in group {self.group_name}. "
-                     "Indices must be greater than 0 when creating an IndicesGroup."))
+        invalid = np.flatnonzero(self.indices <= 0)
+        if len(invalid) > 0:
+            raise ValueError(
+                (f"Indices {self.indices[invalid[0]]} declared in group {self.get_group_name()}. "
+                 "Indices must be greater than 0 when creating an IndicesGroup."))
 
     def get_indices(self) -> List[int]:
         """
@@ -139,34 +262,76 @@ class IndicesGroup(Group):
         Returns:
             List[int]: The list of indices
         """
+        return self.indices.tolist()
+
+    def get_indices_array(self) -> np.ndarray:
+        """
+        Get the indices as a numpy array. The array is not copied and
+        must not be modified.
+
+        Returns:
+            np.ndarray: The array of indices
+        """
         return self.indices
 
-    def set_indices(self, indices: List[int]):
+    def set_indices(self, indices: Union[List[int], np.ndarray], sort_unique: bool = False):
         """
         Set the list of indices
 
         Args:
-            indices (List[int]): The list of indices
+            indices (Union[List[int], np.ndarray]): The indices of the atoms
+            sort_unique (bool): If True, the indices are sorted and duplicates are removed
 
         Returns:
             None
 
         Raise:
+            ValueError: If the indices are not a 1D sequence
             ValueError: If an indices is inferior to 1
         """
-        self.indices = indices
+        values = np.asarray(indices, dtype=np.int64)
+        if values.ndim != 1:
+            raise ValueError(
+                f"Indices of group {self.get_group_name()} must be a 1D sequence, got shape {values.shape}.")
+        if sort_unique:
+            values = np.unique(values)
+
+        # Lammps atom ids are stored on 32 bits unless Lammps is built with bigbig ids
+        if len(values) > 0 and values.max() > np.iinfo(np.int32).max:
+            self.indices = values
+        else:
+            self.indices = values.astype(np.int32)
         self.validate_indices()
 
+    def sort_unique_indices(self):
+        """
+        Sort the indices and remove the duplicates.
+
+        Returns:
+            None
+        """
+        self.indices = np.unique(self.indices)
+
+    def get_nb_indices(self) -> int:
+        """
+        Get the number of indices
+
+        Returns:
+            int: The number of indices
+        """
+        return len(self.indices)
+
     def to_dict(self) -> dict:
         """
-        Generate a dictionary representation of the group.
+        Generate a dictionary representation of the group. Runs of consecutive
+        indices are stored as [first, last] pairs.
 
         Returns:
             dict: The dictionary representation of the group.
         """
         result = super().to_dict()
         result["class_name"] = self.__class__.__name__
-        result["indices"] = self.indices
+        result["indices"] = compress_index_runs(self.indices)
         return result
 
     def from_dict(self, d: dict, version: int):
@@ -182,14 +347,14 @@ class IndicesGroup(Group):
 
         Raise:
             ValueError: If the class name is not found or doesn't match the class name
+            ValueError: If an indices is inferior to 1
         """
         # Make sure that we are reading the right class
         if d["class_name"] != self.__class__.__name__:
             raise ValueError(
                 f"Expected class {self.__class__.__name__}, got {d['class_name']}.")
         super().from_dict(d, version=version)
-        self.indices = d.get("indices", [])
-        self.validate_indices()
+        self.set_indices(expand_index_runs(d.get("indices", [])))
 
     def add_do_commands(self) -> str:
         """
@@ -198,14 +363,7 @@ class IndicesGroup(Group):
         Returns:
             str: Lammps command(s)
         """
-        if len(self.indices) == 0:
-            return f"group {self.get_group_name()} empty\n"
-
-        commands = f"group {self.get_group_name()} id"
-        for index in self.indices:
-            commands += f" {index}"
-        commands += "\n"
-        return commands
+        return get_indices_do_commands(self.get_group_name(), self.indices)
 
     def add_undo_commands(self) -> str:
         """
@@ -0,0 +1,595 @@
+"""Module implementing the evaluation of the groups of a workflow in Python."""
+
+import logging
+import re
+from typing import Dict, List, Set
+
+import numpy as np
+
+from lammpsinputbuilder.group import Group, IndicesGroup, OperationGroup, OperationGroupEnum, \
+    AllGroup, EmptyGroup, ReferenceGroup, get_indices_do_commands
+from lammpsinputbuilder.types import GlobalInformation
+
+logger = logging.getLogger(__name__)
+
+# Groups whose dictionary representation declares a group rather than referencing one
+GROUP_DECLARATION_CLASSES = frozenset(
+    ["IndicesGroup", "OperationGroup", "AllGroup", "EmptyGroup"])
+
+# Any identifier in a string may be a group name, for instance in a manual command
+GROUP_NAME_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Maximum number of groups which can exist at the same time in Lammps, including "all"
+MAX_LAMMPS_GROUPS = 32
+
+# Number of group slots kept free by the GroupResolver for the groups declared on demand
+RESERVED_GROUP_SLOTS = 4
+
+
+class GroupSlotTracker:
+    """
+    Track the groups declared to Lammps along the do/undo stack of the sections
+    to measure the group pressure of a workflow, i.e the maximum number of
+    groups existing at the same time. Lammps cannot hold more than MAX_LAMMPS_GROUPS
+    groups at the same time, including the default group "all".
+
+    Declaring a group with an existing name doesn't use a new slot since Lammps
+    adds the atoms to the existing group.
+    """
+
+    def __init__(self, max_groups: int = MAX_LAMMPS_GROUPS) -> None:
+        """
+        Constructor
+
+        Args:
+            max_groups (int): The maximum number of groups supported by Lammps
+        """
+        self.max_groups = max_groups
+        self.live_groups: Dict[str, int] = {}
+        self.peak = self.get_nb_live_groups()
+        self.peak_groups: List[str] = []
+
+    def get_max_groups(self) -> int:
+        """
+        Get the maximum number of groups supported by Lammps
+
+        Returns:
+            int: The maximum number of groups
+        """
+        return self.max_groups
+
+    def get_nb_live_groups(self) -> int:
+        """
+        Get the number of groups currently declared, including the group "all"
+
+        Returns:
+            int: The number of groups
+        """
+        return len(self.live_groups) + 1
+
+    def get_peak(self) -> int:
+        """
+        Get the maximum number of groups declared at the same time so far,
+        including the group "all"
+
+        Returns:
+            int: The peak number of groups
+        """
+        return self.peak
+
+    def get_peak_groups(self) -> List[str]:
+        """
+        Get the names of the groups declared when the peak was reached
+
+        Returns:
+            List[str]: The group names
+        """
+        return self.peak_groups
+
+    def is_over_limit(self) -> bool:
+        """
+        Check if the peak exceeded the number of groups supported by Lammps
+
+        Returns:
+            bool: True if Lammps will fail to declare some of the groups
+        """
+        return self.peak > self.max_groups
+
+    def declare(self, group_name: str) -> None:
+        """
+        Record the declaration of a group
+
+        Args:
+            group_name (str): The name of the group
+        """
+        self.live_groups[group_name] = self.live_groups.get(group_name, 0) + 1
+        if self.get_nb_live_groups() > self.peak:
+            self.peak = self.get_nb_live_groups()
+            self.peak_groups = list(self.live_groups)
+
+    def remove(self, group_name: str) -> None:
+        """
+        Record the deletion of a group
+
+        Args:
+            group_name (str): The name of the group
+        """
+        # The first deletion removes the group from Lammps
+        self.live_groups.pop(group_name, None)
+
+
+class GroupResolver:
+    """
+    Evaluate the IndicesGroup, OperationGroup, AllGroup, EmptyGroup, and ReferenceGroup
+    objects of a workflow in Python with boolean masks over the atoms of the model.
+
+    The GroupResolver is called by the sections in place of the add_do_commands() and
+    add_undo_commands() functions of the groups, and follows their scopes. Each group
+    is then declared to Lammps with a single compact list of atom ids instead of being
+    evaluated by Lammps. Groups which are never referenced by the workflow, typically the
+    intermediate groups of an operation, are not declared at all, which saves Lammps
+    group slots. The size of every group is known at generation time and empty groups
+    are reported as errors.
+
+    Groups which cannot be evaluated in Python (ManualGroup, unknown group names) are
+    declared to Lammps as is. If they depend on an elided group, that group is declared
+    to Lammps first.
+
+    The resolver also keeps the number of groups existing at the same time in Lammps under
+    the limit. When declaring a group would leave less than reserved_group_slots free slots,
+    the declaration is deferred: the group is only declared at the start of the sections
+    referencing it, and deleted at their end. Workflows with many nested groups can then
+    run in a single Lammps process as long as each section references a few of them.
+    """
+
+    def __init__(self, nb_atoms: int, used_group_names: Set[str] = None,
+                 allow_empty_groups: bool = False, slot_tracker: GroupSlotTracker = None,
+                 reserved_group_slots: int = RESERVED_GROUP_SLOTS,
+                 atom_id_map: np.ndarray = None) -> None:
+        """
+        Constructor
+
+        Args:
+            nb_atoms (int): The number of atoms of the model
+            used_group_names (Set[str]): The names of the groups referenced by the workflow.
+                                         If None, all the groups are declared to Lammps.
+            allow_empty_groups (bool): If False, declaring a group without any atom raises an error
+            slot_tracker (GroupSlotTracker): The tracker of the groups declared to Lammps
+            reserved_group_slots (int): The number of group slots kept free for the deferred groups
+            atom_id_map (np.ndarray): The Lammps id of each atom of the model, or None if
+                                      the atoms are written in the order of the model
+        """
+        self.nb_atoms = nb_atoms
+        self.used_group_names = used_group_names
+        self.allow_empty_groups = allow_empty_groups
+        self.slot_tracker = slot_tracker if slot_tracker is not None else GroupSlotTracker()
+        self.reserved_group_slots = reserved_group_slots
+        self.atom_id_map = atom_id_map
+        # Groups declared on demand for the objects of each section currently emitted
+        self.reference_frames: List[List[str]] = []
+        self.nb_deferred_groups = 0
+
+        # Stack of [mask, declared] for each group name currently in scope.
+        # The mask is None if the group couldn't be evaluated in Python.
+        self.scopes: Dict[str, List[list]] = {}
+        self.group_sizes: Dict[str, int] = {}
+
+    def get_nb_atoms(self) -> int:
+        """
+        Get the number of atoms of the model
+
+        Returns:
+            int: The number of atoms
+        """
+        return self.nb_atoms
+
+    def is_used(self, group_name: str) -> bool:
+        """
+        Check if a group is referenced by the workflow.
+
+        Args:
+            group_name (str): The name of the group
+
+        Returns:
+            bool: True if the group must be declared to Lammps
+        """
+        return self.used_group_names is None or group_name in self.used_group_names
+
+    def get_mask(self, group_name: str) -> np.ndarray:
+        """
+        Get the boolean mask of a group currently in scope.
+
+        Args:
+            group_name (str): The name of the group
+
+        Returns:
+            np.ndarray: The mask of the group, or None if the group is unknown or
+                        couldn't be evaluated in Python
+        """
+        if group_name == AllGroup().get_group_name():
+            return np.ones(self.nb_atoms, dtype=bool)
+        if group_name == EmptyGroup().get_group_name():
+            return np.zeros(self.nb_atoms, dtype=bool)
+        if group_name not in self.scopes or len(self.scopes[group_name]) == 0:
+            return None
+        return self.scopes[group_name][-1][0]
+
+    def get_slot_tracker(self) -> GroupSlotTracker:
+        """
+        Get the tracker of the groups declared to Lammps
+
+        Returns:
+            GroupSlotTracker: The group slot tracker
+        """
+        return self.slot_tracker
+
+    def get_nb_deferred_groups(self) -> int:
+        """
+        Get the number of group declarations deferred to the sections referencing them
+
+        Returns:
+            int: The number of deferred declarations
+        """
+        return self.nb_deferred_groups
+
+    def has_free_slot(self) -> bool:
+        """
+        Check if a group can be declared while keeping the reserved slots free.
+
+        Returns:
+            bool: True if the group can be declared
+        """
+        return (self.slot_tracker.get_nb_live_groups() <
+                self.slot_tracker.get_max_groups() - self.reserved_group_slots)
+
+    def get_group_sizes(self) -> Dict[str, int]:
+        """
+        Get the number of atoms of every group evaluated so far. If a group
+        name is declared several times, the size of the last declaration is kept.
+
+        Returns:
+            Dict[str, int]: The number of atoms for each group name
+        """
+        return self.group_sizes
+
+    def add_do_commands(self, group: Group) -> str:
+        """
+        Evaluate a group entering its scope and generate the commands declaring it.
+
+        Args:
+            group (Group): The group
+
+        Returns:
+            str: Lammps command(s)
+
+        Raise:
+            ValueError: If an index of an IndicesGroup is greater than the number of atoms
+            ValueError: If the group doesn't contain any atom and empty groups are not allowed
+        """
+        if isinstance(group, (AllGroup, EmptyGroup, ReferenceGroup)):
+            return group.add_do_commands()
+
+        group_name = group.get_group_name()
+        commands = ""
+        mask = None
+        if isinstance(group, IndicesGroup):
+            indices = group.get_indices_array()
+            if len(indices) > 0 and indices.max() > self.nb_atoms:
+                raise ValueError(
+                    f"Index {indices.max()} declared in group {group_name} is greater than "
+                    f"the number of atoms ({self.nb_atoms}).")
+            # The masks follow the Lammps ids
+            if self.atom_id_map is not None:
+                indices = self.atom_id_map[indices - 1]
+            mask = np.zeros(self.nb_atoms, dtype=bool)
+            mask[indices - 1] = True
+            if self.is_used(group_name):
+                commands = self.declare_or_defer(group_name, lambda: get_indices_do_commands(
+                    group_name, np.flatnonzero(mask) + 1))
+        elif isinstance(group, OperationGroup):
+            masks = [self.get_mask(name) for name in group.get_other_groups()]
+            if any(m is None for m in masks):
+                logger.debug("Group %s cannot be evaluated in Python, declaring it to Lammps.",
+                             group_name)
+                for name in group.get_other_groups():
+                    commands += self.materialize(name)
+                commands += group.add_do_commands()
+            else:
+                mask = evaluate_operation(group.get_operation(), masks)
+                if self.is_used(group_name):
+                    commands = self.declare_or_defer(group_name, lambda: get_indices_do_commands(
+                        group_name, np.flatnonzero(mask) + 1))
+        else:
+            commands = group.add_do_commands()
+
+        if mask is None:
+            self.slot_tracker.declare(group_name)
+
+        if mask is not None:
+            size = int(np.count_nonzero(mask))
+            if size == 0 and not self.allow_empty_groups:
+                raise ValueError(f"Group {group_name} doesn't contain any atom.")
+            self.group_sizes[group_name] = size
+            logger.debug("Group %s contains %d atoms.", group_name, size)
+
+        # Groups which couldn't be evaluated are always declared to Lammps
+        self.scopes.setdefault(group_name, []).append([mask, mask is None or commands != ""])
+        return commands
+
+    def add_undo_commands(self, group: Group) -> str:
+        """
+        Generate the commands removing a group leaving its scope.
+
+        Args:
+            group (Group): The group
+
+        Returns:
+            str: Lammps command(s)
+        """
+        if isinstance(group, (AllGroup, EmptyGroup, ReferenceGroup)):
+            return group.add_undo_commands()
+
+        group_name = group.get_group_name()
+        if group_name not in self.scopes or len(self.scopes[group_name]) == 0:
+            return group.add_undo_commands()
+        _, declared = self.scopes[group_name].pop()
+        if declared:
+            self.slot_tracker.remove(group_name)
+            return group.add_undo_commands()
+        return ""
+
+    def declare_or_defer(self, group_name: str, generate_commands) -> str:
+        """
+        Generate the commands declaring a group if a slot is available.
+
+        Args:
+            group_name (str): The name of the group
+            generate_commands (Callable[[], str]): Function generating the declaration commands
+
+        Returns:
+            str: Lammps command(s), empty if the declaration is deferred
+        """
+        if not self.has_free_slot():
+            logger.debug("Declaration of group %s deferred to the sections referencing it.",
+                         group_name)
+            self.nb_deferred_groups += 1
+            return ""
+        self.slot_tracker.declare(group_name)
+        return generate_commands()
+
+    def add_reference_commands(self, objects: list) -> str:
+        """
+        Declare the groups referenced by objects of a section which are in scope but
+        were not declared to Lammps, typically because their declaration was deferred.
+        Each call opens a frame which must be closed with remove_reference_commands().
+
+        Args:
+            objects (list): The objects of the section (Integrator, Extension, FileIO, etc)
+
+        Returns:
+            str: Lammps command(s)
+        """
+        names = set()
+        for obj in objects:
+            collect_group_references(obj.to_dict(), names)
+
+        commands = ""
+        frame = []
+        for group_name in sorted(names):
+            group_commands = self.materialize(group_name)
+            if group_commands != "":
+                commands += group_commands
+                frame.append(group_name)
+        self.reference_frames.append(frame)
+        return commands
+
+    def remove_reference_commands(self) -> str:
+        """
+        Delete the groups declared by the last call to add_reference_commands().
+
+        Returns:
+            str: Lammps command(s)
+        """
+        commands = ""
+        for group_name in reversed(self.reference_frames.pop()):
+            self.scopes[group_name][-1][1] = False
+            self.slot_tracker.remove(group_name)
+            commands += f"group {group_name} delete\n"
+        return commands
+
+    def materialize(self, group_name: str) -> str:
+        """
+        Declare to Lammps a group in scope which was evaluated but not declared yet.
+
+        Args:
+            group_name (str): The name of the group
+
+        Returns:
+            str: Lammps command(s)
+        """
+        if group_name not in self.scopes or len(self.scopes[group_name]) == 0:
+            return ""
+        entry = self.scopes[group_name][-1]
+        if entry[1] or entry[0] is None:
+            return ""
+        entry[1] = True
+        self.slot_tracker.declare(group_name)
+        return get_indices_do_commands(group_name, np.flatnonzero(entry[0]) + 1)
+
+
+def evaluate_operation(op: OperationGroupEnum, masks: List[np.ndarray]) -> np.ndarray:
+    """
+    Evaluate the operation of an OperationGroup on the masks of its operands.
+
+    Args:
+        op (OperationGroupEnum): The operation
+        masks (List[np.ndarray]): The masks of the operands
+
+    Returns:
+        np.ndarray: The mask of the result
+    """
+    if op == OperationGroupEnum.UNION:
+        return np.logical_or.reduce(masks)
+    if op == OperationGroupEnum.INTERSECT:
+        return np.logical_and.reduce(masks)
+    if op == OperationGroupEnum.SUBTRACT:
+        return masks[0] & ~np.logical_or.reduce(masks[1:])
+    raise NotImplementedError(f"Operation {op} not supported.")
+
+
+def collect_group_references(d, names: Set[str]) -> None:
+    """
+    Collect the names possibly referencing a group in the dictionary representation
+    of an object. The dictionary of the objects declaring a group are skipped.
+
+    Args:
+        d (Union[dict, list, str]): The dictionary representation, or one of its values
+        names (Set[str]): The set receiving the names
+    """
+    if isinstance(d, dict):
+        if d.get("class_name") in GROUP_DECLARATION_CLASSES:
+            return
+        for key, value in d.items():
+            if key != "class_name":
+                collect_group_references(value, names)
+    elif isinstance(d, list):
+        for value in d:
+            collect_group_references(value, names)
+    elif isinstance(d, str):
+        names.update(GROUP_NAME_PATTERN.findall(d))
+
+
+def collect_used_group_names(sections: list) -> Set[str]:
+    """
+    Collect the names of the groups referenced in a list of sections
+    and their child sections.
+
+    Args:
+        sections (List[Section]): The sections
+
+    Returns:
+        Set[str]: The group names, or None if a section cannot be inspected
+    """
+    names = set()
+    stack = list(sections)
+    while len(stack) > 0:
+        section = stack.pop()
+        d = section.to_dict()
+        # Child sections are inspected as objects to reach the generated sections of templates
+        d.pop("sections", None)
+        collect_group_references(d, names)
+
+        if hasattr(section, "generate_sections"):
+            try:
+                stack.extend(section.generate_sections())
+            except NotImplementedError:
+                return None
+        elif hasattr(section, "get_sections"):
+            stack.extend(section.get_sections())
+    return names
+
+
+def get_group_do_commands(group: Group, global_information: GlobalInformation) -> str:
+    """
+    Generate the commands declaring a group, through the group resolver of the
+    workflow if there is one. The indices of an IndicesGroup are converted to
+    Lammps ids if the atoms are not written in the order of the model.
+
+    Args:
+        group (Group): The group
+        global_information (GlobalInformation): The global information
+
+    Returns:
+        str: Lammps command(s)
+    """
+    if global_information is None:
+        return group.add_do_commands()
+    group_resolver = global_information.get_workflow_context().group_resolver
+    if group_resolver is not None:
+        return group_resolver.add_do_commands(group)
+
+    if isinstance(group, IndicesGroup) and global_information.get_atom_id_map() is not None:
+        commands = get_indices_do_commands(
+            group.get_group_name(), global_information.get_lammps_ids(group.get_indices_array()))
+    else:
+        commands = group.add_do_commands()
+    slot_tracker = global_information.get_workflow_context().group_slot_tracker
+    if slot_tracker is not None and declares_group(group):
+        slot_tracker.declare(group.get_group_name())
+    return commands
+
+
+def get_group_undo_commands(group: Group, global_information: GlobalInformation) -> str:
+    """
+    Generate the commands removing a group, through the group resolver of the
+    workflow if there is one.
+
+    Args:
+        group (Group): The group
+        global_information (GlobalInformation): The global information
+
+    Returns:
+        str: Lammps command(s)
+    """
+    if global_information is None:
+        return group.add_undo_commands()
+    group_resolver = global_information.get_workflow_context().group_resolver
+    if group_resolver is not None:
+        return group_resolver.add_undo_commands(group)
+
+    slot_tracker = global_information.get_workflow_context().group_slot_tracker
+    if slot_tracker is not None and declares_group(group):
+        slot_tracker.remove(group.get_group_name())
+    return group.add_undo_commands()
+
+
+def declares_group(group: Group) -> bool:
+    """
+    Check if a group object declares a new group in Lammps.
+
+    Args:
+        group (Group): The group
+
+    Returns:
+        bool: False for the default groups and the references to other groups
+    """
+    return not isinstance(group, (AllGroup, EmptyGroup, ReferenceGroup))
+
+
+def get_references_do_commands(objects: list, global_information: GlobalInformation) -> str:
+    """
+    Generate the commands declaring the deferred groups referenced by the
+    objects of a section. See GroupResolver.add_reference_commands().
+
+    Args:
+        objects (list): The objects of the section
+        global_information (GlobalInformation): The global information
+
+    Returns:
+        str: Lammps command(s)
+    """
+    if global_information is None:
+        return ""
+    group_resolver = global_information.get_workflow_context().group_resolver
+    if group_resolver is None:
+        return ""
+    return group_resolver.add_reference_commands(objects)
+
+
+def get_references_undo_commands(global_information: GlobalInformation) -> str:
+    """
+    Generate the commands deleting the groups declared by the matching
+    call to get_references_do_commands().
+
+    Args:
+        global_information (GlobalInformation): The global information
+
+    Returns:
+        str: Lammps command(s)
+    """
+    if global_information is None:
+        return ""
+    group_resolver = global_information.get_workflow_context().group_resolver
+    if group_resolver is None:
+        return ""
+    return group_resolver.remove_reference_commands()
@@ -1,8 +1,12 @@
 """Module for the integrator class."""
 
 from enum import IntEnum
+from typing import List
+
+import numpy as np
 
 from lammpsinputbuilder.group import Group, AllGroup
+from lammpsinputbuilder.quantities import LengthQuantity
 from lammpsinputbuilder.types import GlobalInformation
 from lammpsinputbuilder.base import BaseObject
 
@@ -83,6 +87,200 @@ class Integrator(BaseObject):
         """
         return ""
 
+    def supports_run_options(self) -> bool:
+        """
+        Check if the integrator advances the step counter with a run command
+        accepting RunOptions. Such integrators accept the skip_setup argument
+        in add_run_commands().
+        Returns:
+            bool: True if the integrator supports the run options
+        """
+        return False
+
+
+class RunOptions():
+    """
+    Optional keywords of the Lammps run command.
+
+    The pre and post keywords control the setup performed before the run and the statistics
+    printed after the run. The setup can only be skipped if nothing changed since the previous
+    run: no fix, compute, or group declared or removed, and no atom modified. The start and
+    stop keywords set the range of steps used by fixes varying a quantity over a run, which
+    allows splitting a long run into several consecutive runs. The every keyword splits the run
+    into segments and executes the given commands between the segments.
+
+    Lammps documentation: https://docs.lammps.org/run.html
+    """
+    def __init__(self, pre: bool = True, post: bool = True, start: int = None, stop: int = None,
+                 every: int = None, every_commands: List[str] = None) -> None:
+        """
+        Constructor
+        Args:
+            pre (bool, optional): If False, skip the setup before the run. Defaults to True.
+            post (bool, optional): If False, only print a brief summary after the run.
+                                   Defaults to True.
+            start (int, optional): The first step of the range of steps. Defaults to None.
+            stop (int, optional): The last step of the range of steps. Defaults to None.
+            every (int, optional): The number of steps of each segment of the run.
+                                   Defaults to None.
+            every_commands (List[str], optional): The commands executed after each segment.
+                                                  Defaults to None.
+
+        Returns:
+            None
+
+        Raise:
+            ValueError: If every is not positive, or if commands are given without every
+        """
+        self.pre = pre
+        self.post = post
+        self.start = start
+        self.stop = stop
+        self.every = every
+        self.every_commands = every_commands if every_commands is not None else []
+        self.validate()
+
+    def validate(self):
+        """
+        Check the consistency of the options
+        Raise:
+            ValueError: If every is not positive, or if commands are given without every
+        """
+        if self.every is not None and self.every <= 0:
+            raise ValueError(f"Invalid every value {self.every}, must be positive.")
+        if self.every is None and len(self.every_commands) > 0:
+            raise ValueError("The every commands require the every option to be set.")
+
+    def get_pre(self) -> bool:
+        """
+        Get the pre option
+        Returns:
+            bool: False if the setup before the run is skipped
+        """
+        return self.pre
+
+    def get_post(self) -> bool:
+        """
+        Get the post option
+        Returns:
+            bool: False if only a brief summary is printed after the run
+        """
+        return self.post
+
+    def get_start(self) -> int:
+        """
+        Get the first step of the range of steps
+        Returns:
+            int: The first step, or None if not set
+        """
+        return self.start
+
+    def get_stop(self) -> int:
+        """
+        Get the last step of the range of steps
+        Returns:
+            int: The last step, or None if not set
+        """
+        return self.stop
+
+    def get_every(self) -> int:
+        """
+        Get the number of steps of each segment of the run
+        Returns:
+            int: The number of steps, or None if not set
+        """
+        return self.every
+
+    def get_every_commands(self) -> List[str]:
+        """
+        Get the commands executed after each segment of the run
+        Returns:
+            List[str]: The commands
+        """
+        return self.every_commands
+
+    def is_default(self) -> bool:
+        """
+        Check if the options leave the run command unchanged
+        Returns:
+            bool: True if no option is set
+        """
+        return self.pre and self.post and self.start is None and self.stop is None \
+            and self.every is None
+
+    def to_dict(self) -> dict:
+        """
+        Generate a dictionary representation of the options.
+        Returns:
+            dict: The dictionary representation of the options.
+        """
+        result = {}
+        result["class_name"] = self.__class__.__name__
+        result["pre"] = self.pre
+        result["post"] = self.post
+        if self.start is not None:
+            result["start"] = self.start
+        if self.stop is not None:
+            result["stop"] = self.stop
+        if self.every is not None:
+            result["every"] = self.every
+            result["every_commands"] = self.every_commands
+        return result
+
+    def from_dict(self, d: dict, version: int):
+        """
+        Parse the dictionary representation of the options and load it into
+        the current object.
+        Args:
+            d (dict): The dictionary representation of the options.
+            version (int): The version of the dictionary representation.
+
+        Returns:
+            None
+
+        Raise:
+            ValueError: If the class name in the dictionary is not the same as the current class
+        """
+        del version  # unused
+        if d.get("class_name", "") != self.__class__.__name__:
+            raise ValueError(
+                f"Expected class {self.__class__.__name__}, got {d.get('class_name', '')}.")
+        self.pre = d.get("pre", True)
+        self.post = d.get("post", True)
+        self.start = d.get("start", None)
+        self.stop = d.get("stop", None)
+        self.every = d.get("every", None)
+        self.every_commands = d.get("every_commands", [])
+        self.validate()
+
+    def get_run_arguments(self, skip_setup: bool = False) -> str:
+        """
+        Generate the keywords to append to a run command
+        Args:
+            skip_setup (bool, optional): If True, skip the setup and the statistics
+                                         regardless of the pre and post options.
+                                         Defaults to False.
+        Returns:
+            str: The keywords, starting with a space if not empty
+        """
+        result = ""
+        if self.start is not None:
+            result += f" start {self.start}"
+        if self.stop is not None:
+            result += f" stop {self.stop}"
+        if skip_setup or not self.pre:
+            result += " pre no"
+        if skip_setup or not self.post:
+            result += " post no"
+        # The every keyword must be the last one since it consumes the rest of the line
+        if self.every is not None:
+            result += f" every {self.every}"
+            if len(self.every_commands) == 0:
+                result += " NULL"
+            for cmd in self.every_commands:
+                result += f" \"{cmd}\""
+        return result
+
 
 class RunZeroIntegrator(Integrator):
     """
@@ -92,16 +290,26 @@ class RunZeroIntegrator(Integrator):
     This integrator can be used to trigger file outputs, obtain thermo outputs, etc.
     The step counter is not advanced as a result of this integrator.
     """
-    def __init__(self, integrator_name: str = "RunZero") -> None:
+    def __init__(self, integrator_name: str = "RunZero", run_options: RunOptions = None) -> None:
         """
         Constructor
         Args:
             integrator_name (str, optional): The name of the integrator. Defaults to "RunZero".
+            run_options (RunOptions, optional): The options of the run command. Defaults to None.
 
         Returns:
             None
         """
         super().__init__(integrator_name=integrator_name)
+        self.run_options = run_options if run_options is not None else RunOptions()
+
+    def get_run_options(self) -> RunOptions:
+        """
+        Get the options of the run command
+        Returns:
+            RunOptions: The options of the run command
+        """
+        return self.run_options
 
     def to_dict(self) -> dict:
         """
@@ -111,6 +319,8 @@ class RunZeroIntegrator(Integrator):
         """
         result = super().to_dict()
         result["class_name"] = self.__class__.__name__
+        if not self.run_options.is_default():
+            result["run_options"] = self.run_options.to_dict()
         return result
 
     def from_dict(self, d: dict, version: int):
@@ -131,14 +341,28 @@ class RunZeroIntegrator(Integrator):
             raise ValueError(
                 f"Expected class {self.__class__.__name__}, got {d['class_name']}.")
         super().from_dict(d, version=version)
+        self.run_options = RunOptions()
+        if d.get("run_options", None) is not None:
+            self.run_options.from_dict(d["run_options"], version=version)
 
-    def add_run_commands(self) -> str:
+    def add_run_commands(self, skip_setup: bool = False) -> str:
         """
         Generate the commands to advance the step counter
+        Args:
+            skip_setup (bool, optional): If True, the setup is skipped because nothing
+                                         changed since the previous run. Defaults to False.
         Returns:
             str: The commands to advance the step counter
         """
-        return "run 0\n"
+        return f"run 0{self.run_options.get_run_arguments(skip_setup)}\n"
+
+    def supports_run_options(self) -> bool:
+        """
+        Check if the integrator supports the run options
+        Returns:
+            bool: Always True
+        """
+        return True
 
 
 class NVEIntegrator(Integrator):
@@ -156,13 +380,15 @@ class NVEIntegrator(Integrator):
             self,
             integrator_name: str = "NVEID",
             group: Group = AllGroup(),
-            nb_steps: int = 5000) -> None:
+            nb_steps: int = 5000,
+            run_options: RunOptions = None) -> None:
         """
         Constructor
         Args:
             integrator_name (str, optional): The name of the integrator. Defaults to "NVEID".
             group (Group, optional): The group to apply the integrator to. Defaults to AllGroup().
             nb_steps (int, optional): The number of steps to perform. Defaults to 5000.
+            run_options (RunOptions, optional): The options of the run command. Defaults to None.
 
         Returns:
             None
@@ -173,6 +399,7 @@ class NVEIntegrator(Integrator):
         super().__init__(integrator_name=integrator_name)
         self.group = group.get_group_name()
         self.nb_steps = nb_steps
+        self.run_options = run_options if run_options is not None else RunOptions()
 
     def get_group_name(self) -> str:
         """
@@ -190,6 +417,14 @@ class NVEIntegrator(Integrator):
         """
         return self.nb_steps
 
+    def get_run_options(self) -> RunOptions:
+        """
+        Get the options of the run command
+        Returns:
+            RunOptions: The options of the run command
+        """
+        return self.run_options
+
     def to_dict(self) -> dict:
         """
         Generate a dictionary representation of the integrator.
@@ -200,6 +435,8 @@ class NVEIntegrator(Integrator):
         result["class_name"] = self.__class__.__name__
         result["group_name"] = self.group
         result["nb_steps"] = self.nb_steps
+        if not self.run_options.is_default():
+            result["run_options"] = self.run_options.to_dict()
         return result
 
     def from_dict(self, d: dict, version: int):
@@ -222,6 +459,9 @@ class NVEIntegrator(Integrator):
         super().from_dict(d, version=version)
         self.group = d["group_name"]
         self.nb_steps = d.get("nb_steps", 5000)
+        self.run_options = RunOptions()
+        if d.get("run_options", None) is not None:
+            self.run_options.from_dict(d["run_options"], version=version)
 
     def add_do_commands(self, global_information: GlobalInformation) -> str:
         """
@@ -244,13 +484,24 @@ class NVEIntegrator(Integrator):
         """
         return f"unfix {self.get_integrator_name()}\n"
 
-    def add_run_commands(self) -> str:
+    def add_run_commands(self, skip_setup: bool = False) -> str:
         """
         Generate the commands to advance the step counter
+        Args:
+            skip_setup (bool, optional): If True, the setup is skipped because nothing
+                                         changed since the previous run. Defaults to False.
         Returns:
             str: The commands to advance the step counter
         """
-        return f"run {self.nb_steps}\n"
+        return f"run {self.nb_steps}{self.run_options.get_run_arguments(skip_setup)}\n"
+
+    def supports_run_options(self) -> bool:
+        """
+        Check if the integrator supports the run options
+        Returns:
+            bool: Always True
+        """
+        return True
 
 
 class MinimizeStyle(IntEnum):
@@ -651,3 +902,204 @@ class ManualIntegrator(Integrator):
         if self.cmd_run.endswith("\n"):
             return self.cmd_run
         return self.cmd_run + "\n"
+
+
+class RerunIntegrator(Integrator):
+    """
+    Class for the Rerun integrator. The Rerun integrator computes the energy and forces
+    of a series of configurations in a single Lammps command. Each configuration is obtained
+    by displacing the atoms of a group from their current position in the simulation. This
+    integrator is typically used to compute energy maps, for example when scanning a surface
+    with a tip: Lammps performs the setup once, followed by one force evaluation per
+    configuration, instead of one full setup per configuration with a RunZeroIntegrator.
+
+    The configurations are generated by Lammps from the current positions, so the integrator
+    can follow a minimization or any dynamics. A script written in the job folder displaces
+    the group with displace_atoms and writes each configuration in a dump file with
+    write_dump, before the dump file is evaluated with rerun. Only the atoms of the displaced
+    group are written, the other atoms keep their current positions. After the rerun, the
+    displaced atoms are restored to their positions before the rerun, and so is the step counter.
+
+    The outputs are produced by the FileIO objects of the section, on the frames matching
+    their interval. The frames are numbered from 0 to the number of displacements - 1.
+
+    Lammps documentation: https://docs.lammps.org/rerun.html
+    """
+    def __init__(
+            self,
+            integrator_name: str = "Rerun",
+            group: Group = AllGroup(),
+            displacements: LengthQuantity = LengthQuantity(np.zeros((1, 3)), "lmp_real_length")
+            ) -> None:
+        """
+        Constructor
+        Args:
+            integrator_name (str, optional): The name of the integrator. Defaults to "Rerun".
+            group (Group, optional): The group to displace. Defaults to AllGroup().
+            displacements (LengthQuantity, optional): The displacement of the group for each
+                                                      configuration, as an array of shape (N, 3).
+                                                      Defaults to a single null displacement.
+
+        Returns:
+            None
+
+        Raise:
+            ValueError: If the integrator_name is not alpha numeric or doesn't start with a non letter
+            ValueError: If the displacements are not an array of shape (N, 3) with N > 0
+        """
+        super().__init__(integrator_name=integrator_name)
+        self.group = group.get_group_name()
+        self.displacements = displacements
+        self.validate_displacements()
+
+    def validate_displacements(self):
+        """
+        Check the shape of the displacements
+        Raise:
+            ValueError: If the displacements are not an array of shape (N, 3) with N > 0
+        """
+        shape = np.shape(self.displacements.get_magnitude())
+        if len(shape) != 2 or shape[0] == 0 or shape[1] != 3:
+            raise ValueError(f"Invalid displacements of shape {shape} for the integrator "
+                             f"{self.get_integrator_name()}, expected (N, 3) with N > 0.")
+
+    def get_group_name(self) -> str:
+        """
+        Get the name of the displaced group
+        Returns:
+            str: The name of the displaced group
+        """
+        return self.group
+
+    def get_displacements(self) -> LengthQuantity:
+        """
+        Get the displacements of the group
+        Returns:
+            LengthQuantity: The displacements of the group, one row per configuration
+        """
+        return self.displacements
+
+    def get_nb_frames(self) -> int:
+        """
+        Get the number of configurations evaluated by the rerun
+        Returns:
+            int: The number of configurations
+        """
+        return len(self.displacements.get_magnitude())
+
+    def get_associated_file_path(self) -> str:
+        """
+        Get the name of the dump file containing the configurations
+        Returns:
+            str: The name of the dump file, relative to the job folder
+        """
+        return f"rerun.{self.get_integrator_name()}.lammpstrj"
+
+    def get_frames_script_path(self) -> str:
+        """
+        Get the name of the Lammps script writing the configurations in the dump file
+        Returns:
+            str: The name of the script, relative to the job folder
+        """
+        return f"rerun.{self.get_integrator_name()}.lmp"
+
+    def to_dict(self) -> dict:
+        """
+        Generate a dictionary representation of the integrator.
+        Returns:
+            dict: The dictionary representation of the integrator.
+        """
+        result = super().to_dict()
+        result["class_name"] = self.__class__.__name__
+        result["group_name"] = self.group
+        result["displacements"] = np.asarray(self.displacements.get_magnitude()).tolist()
+        result["units"] = self.displacements.get_units()
+        return result
+
+    def from_dict(self, d: dict, version: int):
+        """
+        Parse the dictionary representation of the workflow and load it into
+        the current object.
+        Args:
+            d (dict): The dictionary representation of the workflow.
+            version (int): The version of the dictionary representation.
+
+        Returns:
+            None
+
+        Raise:
+            ValueError: If the class name in the dictionary is not the same as the current class
+        """
+        if d["class_name"] != self.__class__.__name__:
+            raise ValueError(
+                f"Expected class {self.__class__.__name__}, got {d['class_name']}.")
+        super().from_dict(d, version=version)
+        self.group = d.get("group_name", "all")
+        self.displacements = LengthQuantity(np.asarray(d["displacements"], dtype=float),
+                                            d.get("units", "lmp_real_length"))
+        self.validate_displacements()
+
+    def write_frames_script(self, file_path, global_information: GlobalInformation):
+        """
+        Write the Lammps script displacing the group and writing the displaced
+        configurations followed by the current configuration in the dump file.
+        Args:
+            file_path (Path): The path of the script
+            global_information (GlobalInformation): The global information for the workflow
+        """
+        offsets = np.asarray(
+            self.displacements.convert_to(global_information.get_unit_style()), dtype=float)
+        # Each frame moves the group from the previous configuration, the extra
+        # last frame moves it back to its current positions
+        moves = np.diff(np.vstack([np.zeros((1, 3)), offsets, np.zeros((1, 3))]), axis=0)
+
+        dump_path = self.get_associated_file_path()
+        commands = []
+        for step, move in enumerate(moves):
+            commands.append(f"reset_timestep {step}\n")
+            if np.any(move != 0.0):
+                commands.append(f"displace_atoms {self.group} move "
+                                f"{move[0]:.10f} {move[1]:.10f} {move[2]:.10f} units box\n")
+            append = " append yes" if step > 0 else ""
+            commands.append(f"write_dump {self.group} custom {dump_path} id x y z "
+                            f"modify sort id format float %20.15g{append}\n")
+
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("".join(commands))
+
+    def add_do_commands(self, global_information: GlobalInformation) -> str:
+        """
+        Write the script generating the configurations to evaluate
+        Args:
+            global_information (GlobalInformation): Data handler containing information
+                                                    related to the entire workflow
+
+        Returns:
+            str: Lammps command(s)
+
+        Raise:
+            ValueError: If the inputs are not generated in a job folder
+        """
+        job_folder = global_information.get_workflow_context().job_folder
+        if job_folder is None:
+            raise ValueError(f"The integrator {self.get_integrator_name()} requires a job folder "
+                             "to write its configurations.")
+        self.write_frames_script(job_folder / self.get_frames_script_path(), global_information)
+        return ""
+
+    def add_run_commands(self) -> str:
+        """
+        Generate the commands to evaluate the configurations
+        Returns:
+            str: The commands to evaluate the configurations
+        """
+        step_variable = f"{self.get_integrator_name()}Step"
+        file_path = self.get_associated_file_path()
+        nb_frames = self.get_nb_frames()
+        result = f"variable {step_variable} equal $(step)\n"
+        result += f"include {self.get_frames_script_path()}\n"
+        result += f"rerun {file_path} last {nb_frames - 1} dump x y z box no\n"
+        result += f"read_dump {file_path} {nb_frames} x y z box no\n"
+        result += f"reset_timestep ${{{step_variable}}}\n"
+        result += f"variable {step_variable} delete\n"
+        return result
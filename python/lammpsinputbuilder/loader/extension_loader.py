@@ -4,7 +4,7 @@ import copy
 from lammpsinputbuilder.extensions import \
     SetForceExtension, LangevinExtension, \
     MoveExtension, ManualExtension, \
-    InstructionExtension
+    InstructionExtension, BalanceExtension
 
 
 class ExtensionLoader():
@@ -18,6 +18,7 @@ class ExtensionLoader():
         extension_table[MoveExtension.__name__] = MoveExtension()
         extension_table[ManualExtension.__name__] = ManualExtension()
         extension_table[InstructionExtension.__name__] = InstructionExtension()
+        extension_table[BalanceExtension.__name__] = BalanceExtension()
 
         if "class_name" not in d:
             raise RuntimeError(f"Missing 'class_name' key in {d}.")
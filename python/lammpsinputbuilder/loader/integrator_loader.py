@@ -3,7 +3,7 @@
 import copy
 
 from lammpsinputbuilder.integrator import NVEIntegrator, RunZeroIntegrator, \
-    MinimizeIntegrator, MultipassMinimizeIntegrator, ManualIntegrator
+    MinimizeIntegrator, MultipassMinimizeIntegrator, ManualIntegrator, RerunIntegrator
 
 
 class IntegratorLoader():
@@ -17,6 +17,7 @@ class IntegratorLoader():
         integrator_table[MinimizeIntegrator.__name__] = MinimizeIntegrator()
         integrator_table[MultipassMinimizeIntegrator.__name__] = MultipassMinimizeIntegrator()
         integrator_table[ManualIntegrator.__name__] = ManualIntegrator()
+        integrator_table[RerunIntegrator.__name__] = RerunIntegrator()
 
         if "class_name" not in d:
             raise RuntimeError(f"Missing 'class_name' key in {d}.")
@@ -2,7 +2,8 @@
 
 import copy
 
-from lammpsinputbuilder.section import IntegratorSection, RecursiveSection, InstructionsSection
+from lammpsinputbuilder.section import IntegratorSection, RecursiveSection, InstructionsSection, \
+    LoopSection
 from lammpsinputbuilder.templates.template_section import TemplateSection
 from lammpsinputbuilder.templates.minimize_template import MinimizeTemplate
 
@@ -16,6 +17,7 @@ class SectionLoader():
         section_table[IntegratorSection.__name__] = IntegratorSection()
         section_table[RecursiveSection.__name__] = RecursiveSection()
         section_table[InstructionsSection.__name__] = InstructionsSection()
+        section_table[LoopSection.__name__] = LoopSection()
         section_table[TemplateSection.__name__] = TemplateSection()
         section_table[MinimizeTemplate.__name__] = MinimizeTemplate()
 
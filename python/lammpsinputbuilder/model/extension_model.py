@@ -5,6 +5,7 @@ from lammpsinputbuilder.model.base_model import BaseObjectModel
 from lammpsinputbuilder.model.quantity_model import TemperatureQuantityModel, ForceQuantityModel, \
     VelocityQuantityModel
 from lammpsinputbuilder.model.instruction_model import InstructionUnion
+from lammpsinputbuilder.decomposition import BalanceStyle
 
 class ExtensionModel(BaseObjectModel):
     pass
@@ -88,6 +89,35 @@ class MoveExtensionModel(ExtensionModel):
                             "Lammps documentation: https://docs.lammps.org/fix_move.html")
         }
 
+class BalanceExtensionModel(ExtensionModel):
+    class_name: Literal["BalanceExtension"]
+    nevery: PositiveInt = Field(
+        description="Number of timesteps between two balance attempts.",
+        default=1000)
+    threshold: float = Field(
+        description=("Imbalance threshold triggering a rebalance, i.e the ratio between the "
+                     "maximum and average number of atoms per process. Must be at least 1.0."),
+        default=1.1)
+    balance_style: BalanceStyle = Field(
+        description=("Balancing method. The rcb method requires the tiled communication style."),
+        default=BalanceStyle.SHIFT)
+    shift_dims: str = Field(
+        description="Dimensions adjusted by the shift method, ex: \"xyz\".",
+        default="xyz")
+    nb_iterations: PositiveInt = Field(
+        description="Maximum number of iterations of the shift method.",
+        default=10)
+    stop_threshold: float = Field(
+        description="Imbalance at which the shift method stops iterating.",
+        default=1.1)
+
+    class Config:
+        title = "BalanceExtension"
+        json_schema_extra = {
+            "description": ("Periodically balance the number of atoms between the MPI processes. "
+                            "Lammps documentation: https://docs.lammps.org/fix_balance.html")
+        }
+
 class InstructionExtensionModel(ExtensionModel):
     class_name: Literal["InstructionExtension"]
     instruction: InstructionUnion = Field(
@@ -128,6 +158,7 @@ ExtensionUnion = Annotated[Union[
     LangevinExtensionModel,
     SetForceExtensionModel,
     MoveExtensionModel,
+    BalanceExtensionModel,
     InstructionExtensionModel,
     ManualExtensionModel],
     Field(discriminator="class_name")]
@@ -28,7 +28,8 @@ class DumpTrajectoryModel(FileIOModel):
     )
     style: DumpStyle = Field(
         description=("The style of the dump trajectory file. "
-                     "This method only supports \"custom\" and \"xyz\" style. "
+                     "This method only supports \"custom\", \"custom/gz\", "
+                     "\"custom/zstd\", and \"xyz\" style. "
                      "For non supported styles, use the ManualFileIOModel. "
                      "Lammps documentation: https://docs.lammps.org/dump.html"),
     )
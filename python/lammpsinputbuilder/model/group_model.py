@@ -1,4 +1,4 @@
-from typing import List, Union, Annotated, Literal
+from typing import List, Tuple, Union, Annotated, Literal
 from pydantic import Field
 from lammpsinputbuilder.model.base_model import BaseObjectModel
 from lammpsinputbuilder.group import OperationGroupEnum
@@ -8,8 +8,9 @@ class GroupModel(BaseObjectModel):
 
 class IndicesGroupModel(GroupModel):
     class_name: Literal["IndicesGroup"]
-    indices:List[int] = Field(
-        description=("List of 1-based atom IDs belonging to the group.")
+    indices:List[Union[int, Tuple[int, int]]] = Field(
+        description=("List of 1-based atom IDs belonging to the group. "
+                     "A pair [first, last] represents all the IDs from first to last included.")
     )
 
     class Config:
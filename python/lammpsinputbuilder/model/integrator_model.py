@@ -1,13 +1,51 @@
-from typing import Union, Annotated, Literal
-from pydantic import Field
+from typing import List, Union, Annotated, Literal, Optional, Tuple
+from pydantic import BaseModel, Field
 from lammpsinputbuilder.model.base_model import BaseObjectModel
 from lammpsinputbuilder.integrator import MinimizeStyle
 
 class IntegratorModel(BaseObjectModel):
     pass
 
+class RunOptionsModel(BaseModel):
+    class_name: Literal["RunOptions"]
+    pre: bool = Field(
+        description=("If False, the setup before the run is skipped."),
+        default=True
+    )
+    post: bool = Field(
+        description=("If False, only a brief summary is printed after the run."),
+        default=True
+    )
+    start: Optional[int] = Field(
+        description=("First step of the range of steps used by fixes varying a quantity."),
+        default=None
+    )
+    stop: Optional[int] = Field(
+        description=("Last step of the range of steps used by fixes varying a quantity."),
+        default=None
+    )
+    every: Optional[int] = Field(
+        description=("Number of steps of each segment of the run."),
+        default=None
+    )
+    every_commands: List[str] = Field(
+        description=("Commands executed after each segment of the run."),
+        default=[]
+    )
+
+    class Config:
+        title = "RunOptions"
+        json_schema_extra = {
+            "description": ("Optional keywords of the run command. "
+                            "Lammps documentation: https://docs.lammps.org/run.html")
+        }
+
 class RunZeroIntegratorModel(IntegratorModel):
     class_name: Literal["RunZeroIntegrator"]
+    run_options: Optional[RunOptionsModel] = Field(
+        description=("Options of the run command."),
+        default=None
+    )
 
     class Config:
         title = "RunZeroIntegrator"
@@ -26,6 +64,10 @@ class NVEIntegratorModel(IntegratorModel):
     nb_steps:int = Field(
         description=("The number of time steps to run.")
     )
+    run_options: Optional[RunOptionsModel] = Field(
+        description=("Options of the run command."),
+        default=None
+    )
 
     class Config:
         title = "NVEIntegrator"
@@ -92,10 +134,35 @@ class ManualIntegratorModel(IntegratorModel):
                             "Multiple commands can be provided separated by newlines. ")
         }
 
+class RerunIntegratorModel(IntegratorModel):
+    class_name: Literal["RerunIntegrator"]
+    group_name:str = Field(
+        description=("Name of the group to displace."),
+        default="all"
+    )
+    displacements: List[Tuple[float, float, float]] = Field(
+        description=("Displacement [dx, dy, dz] of the group for each configuration.")
+    )
+    units: str = Field(
+        description=("Units of the displacements."),
+        default="lmp_real_length"
+    )
+
+    class Config:
+        title = "RerunIntegrator"
+        json_schema_extra = {
+            "description": ("Compute the energy and forces of a series of configurations "
+                            "obtained by displacing a group of atoms from its current positions. "
+                            "The configurations are written in a dump file by Lammps and "
+                            "evaluated with a single rerun command. "
+                            "Lammps documentation: https://docs.lammps.org/rerun.html")
+        }
+
 IntegratorUnion = Annotated[Union [
     RunZeroIntegratorModel,
     NVEIntegratorModel,
     MinimizeIntegratorModel,
     MultiPassMinimizeIntegratorModel,
-    ManualIntegratorModel
+    ManualIntegratorModel,
+    RerunIntegratorModel
     ], Field(discriminator="class_name")]
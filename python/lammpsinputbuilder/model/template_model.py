@@ -1,6 +1,6 @@
 from __future__ import annotations
-from typing import List, Union, Literal, Annotated
-from pydantic import Field
+from typing import List, Union, Literal, Annotated, Optional
+from pydantic import BaseModel, Field
 from lammpsinputbuilder.model.section_model import SectionModel, \
     IntegratorSectionModel, InstructionsSectionModel
 from lammpsinputbuilder.model.fileio_model import FileIOUnion
@@ -8,6 +8,7 @@ from lammpsinputbuilder.model.group_model import GroupUnion
 from lammpsinputbuilder.model.extension_model import ExtensionUnion
 from lammpsinputbuilder.model.instruction_model import InstructionUnion
 from lammpsinputbuilder.integrator import MinimizeStyle
+from lammpsinputbuilder.section import LoopVariableStyle
 
 class TemplateSectionModel(SectionModel):
     class_name: Literal["TemplateSection"]
@@ -102,9 +103,53 @@ class RecursiveSectionModel(SectionModel):
                             "execuion of a list of sub sections.")
         }
 
+class LoopVariableModel(BaseModel):
+    variable_name: str = Field(
+        description=("Name of the Lammps variable.")
+    )
+    values: List[Union[int, float, str]] = Field(
+        description=("Values of the variable, one per iteration.")
+    )
+    quantity_class: Optional[str] = Field(
+        default=None,
+        description=("Class of the quantity if the values have units.")
+    )
+    units: Optional[str] = Field(
+        default=None,
+        description=("Units of the values if the values are a quantity.")
+    )
+
+class LoopSectionModel(SectionModel):
+    class_name: Literal["LoopSection"]
+    nb_iterations: int = Field(
+        default=1,
+        description=("Number of iterations of the loop.")
+    )
+    style: LoopVariableStyle = Field(
+        default=LoopVariableStyle.INDEX,
+        description=("Style of the Lammps variables holding the values of the loop variables.")
+    )
+    sections: List[TemplateUnion] = Field(
+        default=[],
+        description=("List of sections executed at each iteration.")
+    )
+    loop_variables: List[LoopVariableModel] = Field(
+        default=[],
+        description=("List of variables taking a different value at each iteration.")
+    )
+
+    class Config:
+        title = "LoopSection"
+        json_schema_extra = {
+            "description": ("A LoopSection executes a list of sub sections once per iteration "
+                            "with a Lammps loop. Lammps documentation: "
+                            "https://docs.lammps.org/jump.html")
+        }
+
 TemplateUnion = Annotated[ Union[
     MinimizeTemplateModel,
     RecursiveSectionModel,
+    LoopSectionModel,
     IntegratorSectionModel,
     InstructionsSectionModel],
     Field(discriminator="class_name")]
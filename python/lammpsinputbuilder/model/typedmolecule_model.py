@@ -1,6 +1,141 @@
-from typing import Union, Literal, Annotated, Final
-from pydantic import BaseModel, Field
-from lammpsinputbuilder.types import Forcefield, BoundingBoxStyle, ElectrostaticMethod, MoleculeFileFormat
+from typing import Union, Literal, Annotated, Final, Optional
+from pydantic import BaseModel, Field, PositiveInt, NonNegativeInt
+from lammpsinputbuilder.types import Forcefield, BoundingBoxStyle, ElectrostaticMethod, \
+    MoleculeFileFormat, CompressionStyle, AccelerationStyle, AtomOrdering
+from lammpsinputbuilder.charge_equilibration import ChargeEquilibrationPolicy
+from lammpsinputbuilder.model.quantity_model import LengthQuantityModel, TimeQuantityModel, \
+    TemperatureQuantityModel
+
+class NeighborSettingsModel(BaseModel):
+    class_name: Literal["NeighborSettings"]
+    skin: Optional[LengthQuantityModel] = Field(
+        default=None,
+        description="Skin distance added to the pair cutoff. Tuned from the model if not set."
+    )
+    every: Optional[PositiveInt] = Field(
+        default=None,
+        description="Number of timesteps between two checks of the lists. Tuned if not set."
+    )
+    delay: Optional[NonNegativeInt] = Field(
+        default=None,
+        description="Number of timesteps before the lists can be rebuilt. Tuned if not set."
+    )
+    check: bool = Field(
+        default=True,
+        description="Rebuild the lists only when an atom moved more than half of the skin."
+    )
+    one: Optional[PositiveInt] = Field(
+        default=None,
+        description="Maximum number of neighbors of an atom. Tuned if not set."
+    )
+    page: Optional[PositiveInt] = Field(
+        default=None,
+        description="Number of neighbors stored in a page. Tuned if not set."
+    )
+    timestep: TimeQuantityModel = Field(
+        description="Integration timestep used by the workflow, used to tune the lists."
+    )
+    temperature: TemperatureQuantityModel = Field(
+        description="Highest temperature expected in the workflow, used to tune the lists."
+    )
+
+    class Config:
+        title = "NeighborSettings"
+        json_schema_extra = {
+            "description": ("Settings of the Lammps neighbor lists. "
+                            "Lammps documentation: https://docs.lammps.org/neigh_modify.html")
+        }
+
+class ReaxFFMemorySettingsModel(BaseModel):
+    class_name: Literal["ReaxFFMemorySettings"]
+    mincap: Optional[PositiveInt] = Field(
+        default=None,
+        description="Minimum number of atoms allocated per process. Tuned if not set."
+    )
+    safezone: Optional[float] = Field(
+        default=None,
+        ge=1.0,
+        description="Factor applied to the sizes of the lists. Tuned if not set."
+    )
+    minhbonds: Optional[PositiveInt] = Field(
+        default=None,
+        description="Minimum number of hydrogen bonds allocated per atom. Tuned if not set."
+    )
+
+    class Config:
+        title = "ReaxFFMemorySettings"
+        json_schema_extra = {
+            "description": ("Settings of the memory allocated by the reaxff pair style. "
+                            "Lammps documentation: https://docs.lammps.org/pair_reaxff.html")
+        }
+
+class ChargeEquilibrationSettingsModel(BaseModel):
+    class_name: Literal["ChargeEquilibrationSettings"]
+    nevery: Optional[PositiveInt] = Field(
+        default=None,
+        description="Number of timesteps between two equilibrations. 1 if not set."
+    )
+    cutoff: Optional[LengthQuantityModel] = Field(
+        default=None,
+        description="Cutoff of the Coulomb interactions. 10 Angstrom if not set."
+    )
+    tolerance: Optional[float] = Field(
+        default=None,
+        gt=0.0,
+        description=("Convergence tolerance of the solver. If not set, 1e-8 or tuned from the "
+                     "workflow with the auto policy.")
+    )
+    maxiter: Optional[PositiveInt] = Field(
+        default=None,
+        description="Maximum number of iterations of the solver. 200 if not set."
+    )
+    dual: bool = Field(
+        default=False,
+        description=("Solve the two linear systems of qeq/reaxff at the same time. "
+                     "Only available with the openmp accelerator package.")
+    )
+    policy: ChargeEquilibrationPolicy = Field(
+        default=ChargeEquilibrationPolicy.FIXED,
+        description=("Tuning of the settings left unset. Support fixed, and auto which "
+                     "loosens the tolerance for workflows without dynamics.")
+    )
+
+    class Config:
+        title = "ChargeEquilibrationSettings"
+        json_schema_extra = {
+            "description": ("Settings of the charge equilibration fix of the ReaxFF forcefield. "
+                            "Lammps documentation: https://docs.lammps.org/fix_qeq_reaxff.html")
+        }
+
+class DataFileSettingsModel(BaseModel):
+    class_name: Literal["DataFileSettings"]
+    nb_workers: PositiveInt = Field(
+        default=1,
+        description=("Number of processes formatting the Atoms section of the data file. "
+                     "The data file is identical regardless of the number of processes.")
+    )
+    compression: CompressionStyle = Field(
+        default=CompressionStyle.NONE,
+        description=("Compression applied to the Lammps data file. "
+                     "Support none, gzip, and zstd.")
+    )
+    atom_ordering: AtomOrdering = Field(
+        default=AtomOrdering.NONE,
+        description=("Order of the atoms in the Lammps data file. "
+                     "Support none, morton, and hilbert.")
+    )
+    sort_frequency: NonNegativeInt = Field(
+        default=1000,
+        description=("Number of timesteps between two sorts of the atoms by Lammps when "
+                     "the atoms are ordered along a space-filling curve. 0 disables the sort.")
+    )
+
+    class Config:
+        title = "DataFileSettings"
+        json_schema_extra = {
+            "description": ("Settings of the Lammps data file written for the molecular system. "
+                            "Lammps documentation: https://docs.lammps.org/read_data.html")
+        }
 
 class TypedMolecularSystemModel(BaseModel):
     forcefield: Forcefield = Field(
@@ -10,12 +145,49 @@ class TypedMolecularSystemModel(BaseModel):
         description=("Type of bounding box used for the system. "
                      "Support periodic and shrink bounding boxes.")
     )
+    bbox_padding: Optional[LengthQuantityModel] = Field(
+        default=None,
+        description=("Padding added around the atoms along the dimensions without a "
+                     "periodic cell. If not set, 50 Angstrom for a periodic bounding box "
+                     "and 1 Angstrom for a shrink bounding box.")
+    )
+    data_file_settings: Optional[DataFileSettingsModel] = Field(
+        default=None,
+        description=("Settings of the Lammps data file. If not set, the data file is written "
+                     "by a single process, uncompressed, in the order of the model.")
+    )
+    acceleration_style: AccelerationStyle = Field(
+        default=AccelerationStyle.NONE,
+        description=("Lammps accelerator package used by the input script. "
+                     "Support none, openmp, opt, and intel. The pair style of the "
+                     "forcefield must have a variant in the package.")
+    )
+    acceleration_threads: int = Field(
+        default=1,
+        description="Number of OpenMP threads per MPI process used by the accelerator package."
+    )
+    neighbor_settings: Optional[NeighborSettingsModel] = Field(
+        default=None,
+        description=("Settings of the neighbor lists. If not set, the lists use a skin of "
+                     "2.5 Angstrom and are checked every timestep.")
+    )
 
 class ReaxTypedMolecularSystemModel(TypedMolecularSystemModel):
     class_name: Literal["ReaxTypedMolecularSystem"]
     electrostatic_method: ElectrostaticMethod = Field(
         description=("Type of electrostatic method used for the system. "
-                     "Support ACKS2 and QEQ.")
+                     "Support ACKS2, QEQ, and QEQ_SHIELDED.")
+    )
+    memory_settings: Optional[ReaxFFMemorySettingsModel] = Field(
+        default=None,
+        description=("Settings of the memory allocated by the reaxff pair style. If not set, "
+                     "the default, the pair style uses a mincap of 1000 and the Lammps "
+                     "defaults. If set, the settings left unset are tuned from the model.")
+    )
+    charge_equilibration: Optional[ChargeEquilibrationSettingsModel] = Field(
+        default=None,
+        description=("Settings of the charge equilibration fix. If not set, the settings "
+                     "are tuned from the workflow.")
     )
     forcefield_name: str = Field(
         description="Name of the file containing the forcefield parameters."
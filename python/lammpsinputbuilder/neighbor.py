@@ -0,0 +1,384 @@
+"""Module implementing the tuning of the Lammps neighbor lists from the molecular system."""
+
+import math
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from lammpsinputbuilder.quantities import LengthQuantity, TimeQuantity, TemperatureQuantity, \
+    LammpsUnitSystem, ureg
+from lammpsinputbuilder.types import GlobalInformation
+
+# Multiple of the thermal speed of the lightest atom used as the maximum speed of an atom.
+# The probability for an atom to go faster is below 1e-6.
+DISPLACEMENT_SAFETY_FACTOR = 3.0
+
+# Number of timesteps targeted between two neighbor list builds
+TARGET_REBUILD_INTERVAL = 10
+
+# Bounds of the skin computed from the displacement of the atoms, in Angstrom
+MIN_SKIN = 0.5
+MAX_SKIN = 2.5
+
+# Maximum number of timesteps between two checks of the neighbor lists
+MAX_EVERY = 20
+
+# Number of atoms sampled to estimate the number of neighbors per atom
+NEIGHBOR_SAMPLE_SIZE = 20000
+
+# Margin applied to the largest number of neighbors per atom found in the model
+NEIGHBOR_COUNT_SAFETY_FACTOR = 1.5
+
+# Smallest value used for the neigh_modify one keyword
+MIN_NEIGHBORS_ONE = 100
+
+# Ratio between the page and one keywords of neigh_modify, same as the Lammps defaults
+PAGE_TO_ONE_RATIO = 50
+
+
+def estimate_displacement_per_step(
+        masses: np.ndarray,
+        temperature: TemperatureQuantity,
+        timestep: TimeQuantity) -> float:
+    """
+    Estimate the largest distance traveled by an atom during one timestep
+    from the thermal speed of the lightest atom at a given temperature.
+
+    Args:
+        masses (np.ndarray): The masses of the atoms in g/mol
+        temperature (TemperatureQuantity): The highest temperature expected during the simulation
+        timestep (TimeQuantity): The integration timestep
+
+    Returns:
+        float: The displacement per timestep in Angstrom
+    """
+    lightest_mass = float(np.min(masses)) * ureg("grams / mole")
+    kelvins = temperature.convert_to(LammpsUnitSystem.REAL) * ureg.kelvin
+    thermal_speed = np.sqrt(3 * ureg.boltzmann_constant * ureg.avogadro_constant
+                            * kelvins / lightest_mass)
+    timestep_fs = timestep.convert_to(LammpsUnitSystem.REAL)
+    return DISPLACEMENT_SAFETY_FACTOR * \
+        thermal_speed.to(ureg.lmp_real_velocity).magnitude * timestep_fs
+
+
+def sample_neighbor_counts(
+        positions: np.ndarray,
+        cutoff: float,
+        neighbor_positions: np.ndarray = None) -> np.ndarray:
+    """
+    Count the neighbors of the atoms within a cutoff distance with a KD-tree.
+    For large models, the count is done on a regular sample of the atoms.
+
+    Args:
+        positions (np.ndarray): The positions of the atoms, shape (N, 3)
+        cutoff (float): The cutoff distance
+        neighbor_positions (np.ndarray): The positions of the candidate neighbors, shape (M, 3).
+                                         If None, the neighbors are searched among the atoms
+                                         themselves, excluding each atom from its own count
+
+    Returns:
+        np.ndarray: The number of neighbors of each sampled atom
+    """
+    if len(positions) == 0:
+        return np.zeros(0, dtype=np.int64)
+    stride = max(1, len(positions) // NEIGHBOR_SAMPLE_SIZE)
+    if neighbor_positions is None:
+        tree = cKDTree(positions)
+        return tree.query_ball_point(positions[::stride], r=cutoff, return_length=True) - 1
+    if len(neighbor_positions) == 0:
+        return np.zeros(len(positions[::stride]), dtype=np.int64)
+    tree = cKDTree(neighbor_positions)
+    return tree.query_ball_point(positions[::stride], r=cutoff, return_length=True)
+
+
+def estimate_max_neighbors(positions: np.ndarray, cutoff: float) -> int:
+    """
+    Estimate the largest number of neighbors of an atom within a cutoff distance.
+    For large models, the count is done on a regular sample of the atoms.
+
+    Args:
+        positions (np.ndarray): The positions of the atoms, shape (N, 3)
+        cutoff (float): The cutoff distance
+
+    Returns:
+        int: The largest number of neighbors found, excluding the atom itself
+    """
+    if len(positions) == 0:
+        return 0
+    return int(np.max(sample_neighbor_counts(positions, cutoff)))
+
+
+def validate_neighbor_settings(every: int, delay: int, one: int, page: int):
+    """
+    Check the neighbor settings given by the user. A None value is tuned and not checked.
+
+    Args:
+        every (int): The number of timesteps between two checks of the lists
+        delay (int): The number of timesteps before the lists can be rebuilt
+        one (int): The maximum number of neighbors of an atom
+        page (int): The number of neighbors stored in a page
+
+    Raises:
+        ValueError: If every or one is lower than 1, or delay is negative
+        ValueError: If page is lower than 10 times one
+    """
+    if every is not None and every < 1:
+        raise ValueError(f"Invalid every {every}, must be at least 1.")
+    if delay is not None and delay < 0:
+        raise ValueError(f"Invalid delay {delay}, must be positive.")
+    if one is not None and one < 1:
+        raise ValueError(f"Invalid one {one}, must be at least 1.")
+    if one is not None and page is not None and page < 10 * one:
+        raise ValueError(f"Invalid page {page}, must be at least 10 times one ({one}).")
+
+
+class NeighborSettings:
+    """
+    Settings of the Lammps neighbor lists. Each setting left to None is tuned when
+    generating the input script from the molecular system:
+    - The skin is sized so that the fastest atoms need about TARGET_REBUILD_INTERVAL
+      timesteps to travel half of it. The speed of the atoms is estimated from the
+      thermal speed of the lightest atom at the given temperature.
+    - The lists are checked every time the fastest atoms could have traveled half
+      of the skin, without delay.
+    - The maximum number of neighbors per atom (one) is estimated by counting the
+      neighbors of the atoms within the pair cutoff plus the skin with a KD-tree.
+      The page size follows the ratio of the Lammps defaults.
+
+    Lammps documentation: https://docs.lammps.org/neighbor.html,
+    https://docs.lammps.org/neigh_modify.html
+    """
+
+    def __init__(
+            self,
+            skin: LengthQuantity = None,
+            every: int = None,
+            delay: int = None,
+            check: bool = True,
+            one: int = None,
+            page: int = None,
+            timestep: TimeQuantity = TimeQuantity(1.0, "fs"),
+            temperature: TemperatureQuantity = TemperatureQuantity(300.0, "K")) -> None:
+        """
+        Constructor
+
+        Args:
+            skin (LengthQuantity): The skin distance added to the pair cutoff. Tuned if None
+            every (int): The number of timesteps between two checks of the lists. Tuned if None
+            delay (int): The number of timesteps before the lists can be rebuilt. Tuned if None
+            check (bool): If True, the lists are only rebuilt when an atom moved more than
+                          half of the skin
+            one (int): The maximum number of neighbors of an atom. Tuned if None
+            page (int): The number of neighbors stored in a page. Tuned if None
+            timestep (TimeQuantity): The integration timestep used by the workflow
+            temperature (TemperatureQuantity): The highest temperature expected in the workflow
+
+        Raises:
+            ValueError: If the settings are invalid, see validate_neighbor_settings()
+        """
+        validate_neighbor_settings(every, delay, one, page)
+        self.skin = skin
+        self.every = every
+        self.delay = delay
+        self.check = check
+        self.one = one
+        self.page = page
+        self.timestep = timestep
+        self.temperature = temperature
+
+    def get_skin(self) -> LengthQuantity:
+        """
+        Get the skin distance set by the user
+
+        Returns:
+            LengthQuantity: The skin distance, or None if tuned
+        """
+        return self.skin
+
+    def get_every(self) -> int:
+        """
+        Get the number of timesteps between two checks set by the user
+
+        Returns:
+            int: The number of timesteps, or None if tuned
+        """
+        return self.every
+
+    def get_delay(self) -> int:
+        """
+        Get the number of timesteps before a rebuild set by the user
+
+        Returns:
+            int: The number of timesteps, or None if tuned
+        """
+        return self.delay
+
+    def get_check(self) -> bool:
+        """
+        Check if the lists are only rebuilt when an atom moved more than half of the skin
+
+        Returns:
+            bool: The check setting
+        """
+        return self.check
+
+    def get_one(self) -> int:
+        """
+        Get the maximum number of neighbors of an atom set by the user
+
+        Returns:
+            int: The maximum number of neighbors, or None if tuned
+        """
+        return self.one
+
+    def get_page(self) -> int:
+        """
+        Get the number of neighbors stored in a page set by the user
+
+        Returns:
+            int: The page size, or None if tuned
+        """
+        return self.page
+
+    def get_timestep(self) -> TimeQuantity:
+        """
+        Get the integration timestep used to tune the lists
+
+        Returns:
+            TimeQuantity: The timestep
+        """
+        return self.timestep
+
+    def get_temperature(self) -> TemperatureQuantity:
+        """
+        Get the highest temperature used to tune the lists
+
+        Returns:
+            TemperatureQuantity: The temperature
+        """
+        return self.temperature
+
+    def to_dict(self) -> dict:
+        """
+        Get the dictionary representation of the settings. The settings
+        tuned at generation time are not included.
+
+        Returns:
+            dict: The dictionary representation
+        """
+        result = {}
+        result["class_name"] = self.__class__.__name__
+        if self.skin is not None:
+            result["skin"] = self.skin.to_dict()
+        for key in ["every", "delay", "one", "page"]:
+            if getattr(self, key) is not None:
+                result[key] = getattr(self, key)
+        result["check"] = self.check
+        result["timestep"] = self.timestep.to_dict()
+        result["temperature"] = self.temperature.to_dict()
+        return result
+
+    def from_dict(self, d: dict, version: int):
+        """
+        Set the settings from a dictionary
+
+        Args:
+            d (dict): The dictionary representation
+            version (int): The version of the dictionary representation
+
+        Raises:
+            ValueError: If the class_name doesn't match the class name
+            ValueError: If the settings are invalid, see validate_neighbor_settings()
+        """
+        class_name = d.get("class_name", "")
+        if class_name != self.__class__.__name__:
+            raise ValueError(
+                f"Expected class {self.__class__.__name__}, got {class_name}.")
+        self.skin = None
+        if d.get("skin") is not None:
+            self.skin = LengthQuantity()
+            self.skin.from_dict(d["skin"], version)
+        self.every = d.get("every")
+        self.delay = d.get("delay")
+        self.check = d.get("check", True)
+        self.one = d.get("one")
+        self.page = d.get("page")
+        validate_neighbor_settings(self.every, self.delay, self.one, self.page)
+        self.timestep = TimeQuantity()
+        self.timestep.from_dict(d["timestep"], version)
+        self.temperature = TemperatureQuantity()
+        self.temperature.from_dict(d["temperature"], version)
+
+    def tune(self, global_information: GlobalInformation, pair_cutoff: float) -> dict:
+        """
+        Compute the neighbor settings for the molecular system. The settings
+        given by the user are kept as is.
+
+        Args:
+            global_information (GlobalInformation): Data handler containing information
+                                                    related to the entire workflow
+            pair_cutoff (float): The largest cutoff of the pair style and fixes in Angstrom
+
+        Returns:
+            dict: The settings with the keys skin (in Angstrom), every, delay,
+                  check, one, and page
+
+        Raises:
+            ValueError: If the page size given by the user is lower than 10 times
+                        the tuned maximum number of neighbors
+        """
+        atoms = global_information.get_atoms()
+        displacement = estimate_displacement_per_step(
+            atoms.get_masses(), self.temperature, self.timestep)
+
+        if self.skin is not None:
+            skin = self.skin.convert_to(LammpsUnitSystem.REAL)
+        else:
+            skin = min(MAX_SKIN, max(MIN_SKIN, 2 * displacement * TARGET_REBUILD_INTERVAL))
+            # The skin can't exceed half of the periodic dimensions of the box
+            skin = min(skin, global_information.get_min_periodic_dim() / 2)
+
+        every = self.every
+        if every is None:
+            every = int(min(MAX_EVERY, max(1, math.floor(skin / 2 / displacement))))
+        delay = self.delay if self.delay is not None else 0
+
+        one = self.one
+        if one is None:
+            nb_neighbors = estimate_max_neighbors(atoms.get_positions(), pair_cutoff + skin)
+            one = max(MIN_NEIGHBORS_ONE, math.ceil(nb_neighbors * NEIGHBOR_COUNT_SAFETY_FACTOR))
+        page = self.page if self.page is not None else PAGE_TO_ONE_RATIO * one
+        if page < 10 * one:
+            raise ValueError(
+                f"The page size {page} must be at least 10 times the maximum number "
+                f"of neighbors per atom ({one}).")
+
+        return {
+            "skin": skin,
+            "every": every,
+            "delay": delay,
+            "check": self.check,
+            "one": one,
+            "page": page
+        }
+
+    def get_neighbor_commands(
+            self,
+            global_information: GlobalInformation,
+            pair_cutoff: float) -> str:
+        """
+        Get the Lammps commands declaring the neighbor lists.
+
+        Args:
+            global_information (GlobalInformation): Data handler containing information
+                                                    related to the entire workflow
+            pair_cutoff (float): The largest cutoff of the pair style and fixes in Angstrom
+
+        Returns:
+            str: Lammps command(s)
+        """
+        settings = self.tune(global_information, pair_cutoff)
+        check = "yes" if settings["check"] else "no"
+        return (f"neighbor       {settings['skin']:.4g} bin\n"
+                f"neigh_modify   every {settings['every']} delay {settings['delay']} "
+                f"check {check} one {settings['one']} page {settings['page']}\n")
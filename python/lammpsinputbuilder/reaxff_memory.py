@@ -0,0 +1,316 @@
+"""Module implementing the sizing of the memory of the ReaxFF pair style from the molecular system."""
+
+import logging
+import math
+from typing import Tuple
+
+import numpy as np
+
+from lammpsinputbuilder.neighbor import sample_neighbor_counts
+from lammpsinputbuilder.types import GlobalInformation
+
+logger = logging.getLogger(__name__)
+
+# Default cutoffs of the reaxff pair style for the hydrogen bonds and the bond orders
+REAXFF_HBOND_CUTOFF = 7.5
+REAXFF_BOND_CUTOFF = 5.0
+
+# Defaults of the reaxff pair style keywords
+DEFAULT_MINCAP = 50
+DEFAULT_SAFEZONE = 1.2
+DEFAULT_MINHBONDS = 25
+
+# Mincap used when the number of MPI processes is unknown, i.e the default of the reaxff pair style
+UNKNOWN_GRID_MINCAP = 1000
+
+# Percentile of the number of atoms within the bond cutoff compared to the average
+# to compute the safezone. A few atoms on a surface or next to a vacancy must not
+# drive the factor of the whole system.
+SAFEZONE_PERCENTILE = 95
+
+# Largest safezone computed from the model. Beyond this value, the model is
+# too inhomogeneous for a single factor and the user should set the keywords.
+MAX_SAFEZONE = 2.0
+
+# Margin applied to the largest number of hydrogen bonds per atom found in the model
+HBOND_COUNT_SAFETY_FACTOR = 1.5
+
+# Elements able to accept a hydrogen bond in the usual ReaxFF parameterizations
+REAXFF_HBOND_ACCEPTORS = ("N", "O", "F", "S", "Cl")
+
+# Minimum number of far neighbors and bonds reserved per atom by the reaxff pair style
+REAXFF_MIN_NBRS = 100
+REAXFF_MIN_BONDS = 25
+
+# Approximate size in bytes of the structures allocated by the reaxff pair style
+# for each atom, far neighbor, bond, and hydrogen bond
+REAXFF_ATOM_BYTES = 200
+REAXFF_FAR_NEIGHBOR_BYTES = 48
+REAXFF_BOND_BYTES = 300
+REAXFF_HBOND_BYTES = 16
+
+
+def validate_reaxff_memory_settings(mincap: int, safezone: float, minhbonds: int):
+    """
+    Check the memory settings given by the user. A None value is tuned and not checked.
+
+    Args:
+        mincap (int): The minimum number of atoms allocated per process
+        safezone (float): The factor applied to the sizes of the lists
+        minhbonds (int): The minimum number of hydrogen bonds allocated per atom
+
+    Raises:
+        ValueError: If mincap or minhbonds is lower than 1
+        ValueError: If safezone is lower than 1.0
+    """
+    if mincap is not None and mincap < 1:
+        raise ValueError(f"Invalid mincap {mincap}, must be at least 1.")
+    if safezone is not None and safezone < 1.0:
+        raise ValueError(f"Invalid safezone {safezone}, must be at least 1.0.")
+    if minhbonds is not None and minhbonds < 1:
+        raise ValueError(f"Invalid minhbonds {minhbonds}, must be at least 1.")
+
+
+def estimate_ghost_factor(
+        global_information: GlobalInformation,
+        grid: Tuple[int, int, int],
+        cutoff: float) -> float:
+    """
+    Estimate the ratio between the number of atoms owned by a process, ghost atoms
+    included, and its number of local atoms. The atoms are assumed to be uniformly
+    distributed in the space they occupy. A dimension only brings ghost atoms if it
+    is split between several processes or if the atoms span its periodic cell.
+    In the first case, a process can't see more atoms than the whole system holds.
+
+    Args:
+        global_information (GlobalInformation): Data handler containing information
+                                                related to the entire workflow
+        grid (Tuple[int, int, int]): The number of processes along x, y, and z
+        cutoff (float): The communication cutoff in Angstrom
+
+    Returns:
+        float: The ratio between the local and ghost atoms, and the local atoms
+    """
+    extent = np.ptp(global_information.get_atoms().get_positions(), axis=0)
+    bbox_dims = global_information.get_bbox_dims()
+    boundary = global_information.get_boundary()
+    factor = 1.0
+    for dim in range(3):
+        spans_cell = boundary[dim] == "p" and bbox_dims is not None and \
+            bbox_dims[dim] - extent[dim] < cutoff
+        length = max(extent[dim] / grid[dim], 1.0)
+        if spans_cell:
+            factor *= (length + 2 * cutoff) / length
+        elif grid[dim] > 1:
+            # Without periodic images, the ghost atoms come from the other processes only
+            factor *= min(length + 2 * cutoff, max(extent[dim], 1.0)) / length
+    return factor
+
+
+class ReaxFFMemorySettings:
+    """
+    Settings of the memory allocated by the reaxff pair style. Each setting left to None
+    is tuned when generating the input script from the molecular system:
+    - The safezone grows with the ratio between the 95th percentile and the average number
+      of atoms within the bond cutoff. Atoms of inhomogeneous systems can move to denser
+      regions and need more room in the lists than the average atom.
+    - The mincap is the number of local atoms per MPI process, increased by the safezone,
+      if the number of processes is set by the DomainDecomposition of the workflow.
+      Otherwise, the mincap is 1000 as a single process can't hold the whole system
+      when it runs on several processes.
+    - The minhbonds is the largest number of acceptors found around a hydrogen atom
+      within the hydrogen bond cutoff, with a margin.
+
+    The memory used by the lists of the pair style for each process is estimated
+    from the same counts and written in the input script.
+
+    Lammps documentation: https://docs.lammps.org/pair_reaxff.html
+    """
+
+    def __init__(
+            self,
+            mincap: int = None,
+            safezone: float = None,
+            minhbonds: int = None) -> None:
+        """
+        Constructor
+
+        Args:
+            mincap (int): The minimum number of atoms allocated per process. Tuned if None
+            safezone (float): The factor applied to the sizes of the lists. Tuned if None
+            minhbonds (int): The minimum number of hydrogen bonds allocated per atom.
+                             Tuned if None
+
+        Raises:
+            ValueError: If the settings are invalid, see validate_reaxff_memory_settings()
+        """
+        validate_reaxff_memory_settings(mincap, safezone, minhbonds)
+        self.mincap = mincap
+        self.safezone = safezone
+        self.minhbonds = minhbonds
+
+    def get_mincap(self) -> int:
+        """
+        Get the minimum number of atoms allocated per process set by the user
+
+        Returns:
+            int: The mincap, or None if tuned
+        """
+        return self.mincap
+
+    def get_safezone(self) -> float:
+        """
+        Get the factor applied to the sizes of the lists set by the user
+
+        Returns:
+            float: The safezone, or None if tuned
+        """
+        return self.safezone
+
+    def get_minhbonds(self) -> int:
+        """
+        Get the minimum number of hydrogen bonds allocated per atom set by the user
+
+        Returns:
+            int: The minhbonds, or None if tuned
+        """
+        return self.minhbonds
+
+    def to_dict(self) -> dict:
+        """
+        Get the dictionary representation of the settings. The settings
+        tuned at generation time are not included.
+
+        Returns:
+            dict: The dictionary representation
+        """
+        result = {}
+        result["class_name"] = self.__class__.__name__
+        for key in ["mincap", "safezone", "minhbonds"]:
+            if getattr(self, key) is not None:
+                result[key] = getattr(self, key)
+        return result
+
+    def from_dict(self, d: dict, version: int):
+        """
+        Set the settings from a dictionary
+
+        Args:
+            d (dict): The dictionary representation
+            version (int): The version of the dictionary representation
+
+        Raises:
+            ValueError: If the class_name doesn't match the class name
+            ValueError: If the settings are invalid, see validate_reaxff_memory_settings()
+        """
+        class_name = d.get("class_name", "")
+        if class_name != self.__class__.__name__:
+            raise ValueError(
+                f"Expected class {self.__class__.__name__}, got {class_name}.")
+        del version  # unused
+        self.mincap = d.get("mincap")
+        self.safezone = d.get("safezone")
+        self.minhbonds = d.get("minhbonds")
+        validate_reaxff_memory_settings(self.mincap, self.safezone, self.minhbonds)
+
+    def tune(self, global_information: GlobalInformation, nonbonded_cutoff: float) -> dict:
+        """
+        Compute the memory settings for the molecular system. The settings
+        given by the user are kept as is.
+
+        Args:
+            global_information (GlobalInformation): Data handler containing information
+                                                    related to the entire workflow
+            nonbonded_cutoff (float): The cutoff of the non bonded interactions in Angstrom
+
+        Returns:
+            dict: The settings with the keys mincap, safezone, minhbonds, and
+                  memory (the estimated memory of the lists per process in bytes,
+                  for a single process if the number of processes is not set)
+        """
+        atoms = global_information.get_atoms()
+        positions = atoms.get_positions()
+        symbols = np.asarray(atoms.get_chemical_symbols())
+
+        domain_decomposition = global_information.get_workflow_context().domain_decomposition
+        grid = None
+        if domain_decomposition is not None:
+            grid = domain_decomposition.get_processors_grid(global_information)
+        grid_known = grid is not None
+        if not grid_known:
+            grid = (1, 1, 1)
+        local_atoms = math.ceil(len(atoms) / (grid[0] * grid[1] * grid[2]))
+
+        bond_counts = sample_neighbor_counts(positions, REAXFF_BOND_CUTOFF)
+        mean_bonds = float(np.mean(bond_counts)) if len(bond_counts) > 0 else 0.0
+
+        safezone = self.safezone
+        if safezone is None:
+            safezone = DEFAULT_SAFEZONE
+            if mean_bonds > 0:
+                dense_bonds = float(np.percentile(bond_counts, SAFEZONE_PERCENTILE))
+                safezone = min(MAX_SAFEZONE, max(
+                    DEFAULT_SAFEZONE, DEFAULT_SAFEZONE * dense_bonds / mean_bonds))
+            safezone = round(safezone, 2)
+
+        mincap = self.mincap
+        if mincap is None:
+            mincap = UNKNOWN_GRID_MINCAP
+            if grid_known:
+                mincap = max(DEFAULT_MINCAP, math.ceil(local_atoms * safezone))
+
+        hydrogens = symbols == "H"
+        hbond_counts = sample_neighbor_counts(
+            positions[hydrogens], REAXFF_HBOND_CUTOFF,
+            neighbor_positions=positions[np.isin(symbols, REAXFF_HBOND_ACCEPTORS)])
+        minhbonds = self.minhbonds
+        if minhbonds is None:
+            max_hbonds = int(np.max(hbond_counts)) if len(hbond_counts) > 0 else 0
+            minhbonds = max(DEFAULT_MINHBONDS, math.ceil(max_hbonds * HBOND_COUNT_SAFETY_FACTOR))
+
+        # The far neighbors are stored in a half list including the ghost atoms
+        total_atoms = local_atoms * estimate_ghost_factor(
+            global_information, grid, nonbonded_cutoff)
+        far_neighbors = sample_neighbor_counts(positions, nonbonded_cutoff)
+        mean_far_neighbors = float(np.mean(far_neighbors)) / 2 if len(far_neighbors) > 0 else 0.0
+        hydrogen_ratio = float(np.count_nonzero(hydrogens)) / max(1, len(atoms))
+        mean_hbonds = float(np.mean(hbond_counts)) if len(hbond_counts) > 0 else 0.0
+        capacity = max(total_atoms * safezone, mincap)
+        memory = capacity * REAXFF_ATOM_BYTES
+        memory += max(capacity * mean_far_neighbors, mincap * REAXFF_MIN_NBRS) \
+            * REAXFF_FAR_NEIGHBOR_BYTES
+        memory += max(capacity * 2 * mean_bonds, mincap * REAXFF_MIN_BONDS) * REAXFF_BOND_BYTES
+        memory += capacity * hydrogen_ratio * max(mean_hbonds * safezone, minhbonds) \
+            * REAXFF_HBOND_BYTES
+
+        return {
+            "mincap": mincap,
+            "safezone": safezone,
+            "minhbonds": minhbonds,
+            "memory": int(memory)
+        }
+
+    def get_pair_style_commands(
+            self,
+            global_information: GlobalInformation,
+            nonbonded_cutoff: float) -> str:
+        """
+        Get the Lammps commands declaring the reaxff pair style with the memory settings,
+        preceded by a comment giving the estimated memory of the lists per process.
+
+        Args:
+            global_information (GlobalInformation): Data handler containing information
+                                                    related to the entire workflow
+            nonbonded_cutoff (float): The cutoff of the non bonded interactions in Angstrom
+
+        Returns:
+            str: Lammps command(s)
+        """
+        settings = self.tune(global_information, nonbonded_cutoff)
+        memory_mb = settings["memory"] / 1024 ** 2
+        logger.info("Estimated memory of the ReaxFF lists per process: %.1f MB "
+                    "(mincap %d, safezone %g, minhbonds %d).", memory_mb,
+                    settings["mincap"], settings["safezone"], settings["minhbonds"])
+        return (f"# Estimated memory of the ReaxFF lists per process: {memory_mb:.1f} MB\n"
+                f"pair_style     reaxff NULL mincap {settings['mincap']} "
+                f"safezone {settings['safezone']} minhbonds {settings['minhbonds']}\n")
@@ -1,15 +1,75 @@
 """Module implementing the Section class and its subclasses."""
 
-from typing import List
+from io import StringIO
+from enum import IntEnum
+from typing import List, TextIO, Union
+
+import numpy as np
 
 from lammpsinputbuilder.integrator import Integrator, RunZeroIntegrator
 from lammpsinputbuilder.fileio import FileIO
 from lammpsinputbuilder.instructions import Instruction
 from lammpsinputbuilder.extensions import Extension
 from lammpsinputbuilder.group import Group
+from lammpsinputbuilder.group_resolver import get_group_do_commands, get_group_undo_commands, \
+    get_references_do_commands, get_references_undo_commands
 from lammpsinputbuilder.types import GlobalInformation
+from lammpsinputbuilder.quantities import LIBQuantity, LengthQuantity, VelocityQuantity, \
+    TimeQuantity, ForceQuantity, EnergyQuantity, TemperatureQuantity, TorqueQuantity
 from lammpsinputbuilder.base import BaseObject
-from lammpsinputbuilder.utility.string_utils import write_fixed_length_comment
+from lammpsinputbuilder.utility.string_utils import write_fixed_length_comment, contains_commands
+
+
+class SetupTrackingWriter():
+    """
+    Writer forwarding the commands of the sections to another writer while tracking
+    whether Lammps needs to perform a setup before the next run. Any command written
+    after a run, for example a fix, a group, or an instruction modifying the atoms,
+    requires a new setup. Comments do not.
+
+    When the sections are emitted with this writer, an IntegratorSection which doesn't
+    declare anything directly after the previous run skips the setup of its run with
+    the "pre no post no" keywords, if its integrator supports it. In practice, this only
+    applies to the sections with a RunZeroIntegrator and no group, extension, or fileio.
+    An NVEIntegrator declares a new fix in every section, and a new fix is only
+    initialized by the setup, so its run always keeps the setup.
+    """
+    def __init__(self, writer: TextIO) -> None:
+        """
+        Constructor
+        Args:
+            writer (TextIO): The object receiving the commands
+        """
+        self.writer = writer
+        self.setup_required = True
+
+    def write(self, text: str) -> int:
+        """
+        Write a part of the script
+        Args:
+            text (str): The part of the script
+        Returns:
+            int: The number of characters written
+        """
+        if contains_commands(text):
+            self.setup_required = True
+        return self.writer.write(text)
+
+    def is_setup_required(self) -> bool:
+        """
+        Check if a setup is required before the next run
+        Returns:
+            bool: True if a command was written since the last run without setup requirement
+        """
+        return self.setup_required
+
+    def set_setup_required(self, setup_required: bool):
+        """
+        Set if a setup is required before the next run
+        Args:
+            setup_required (bool): True if a setup is required
+        """
+        self.setup_required = setup_required
 
 
 class Section(BaseObject):
@@ -82,10 +142,28 @@ class Section(BaseObject):
         Returns:
             str: The string representation of the section
         """
-        result = ""
-        result += self.add_do_commands(global_information=global_information)
-        result += self.add_undo_commands()
-        return result
+        writer = StringIO()
+        self.emit(writer, global_information=global_information)
+        return writer.getvalue()
+
+    def emit(self, writer: TextIO, global_information: GlobalInformation) -> None:
+        """
+        Write all the commands of the section to a writer as they are produced.
+        This is the streaming counterpart of add_all_commands() and avoids holding
+        the whole script in memory. Subclasses should override this function rather
+        than add_all_commands().
+        Args:
+            writer (TextIO): The object receiving the commands, typically an open file
+            global_information (GlobalInformation): The global information
+        Returns:
+            None
+        """
+        # Sections overriding only add_all_commands() are still supported
+        if type(self).add_all_commands is not Section.add_all_commands:
+            writer.write(self.add_all_commands(global_information=global_information))
+            return
+        writer.write(self.add_do_commands(global_information=global_information))
+        writer.write(self.add_undo_commands())
 
     def add_do_commands(self, global_information: GlobalInformation) -> str:
         """
@@ -301,57 +379,60 @@ class RecursiveSection(Section):
             for instruction in instructions:
                 self.instructions.append(loader.dict_to_instruction(instruction))
 
-    def add_all_commands(self, global_information: GlobalInformation) -> str:
+    def emit(self, writer: TextIO, global_information: GlobalInformation) -> None:
         """
-        Add all the commands of the section
+        Write all the commands of the section, including the commands of the
+        child sections, to the writer.
         Args:
+            writer (TextIO): The object receiving the commands
             global_information (GlobalInformation): The global information
 
         Returns:
-            str: Lammps command(s)
+            None
         """
 
         # Declare all the objects which are going to live during the entire
         # duractions of the sections
-        result = write_fixed_length_comment(f"START Section {self.get_section_name()}")
-        result += write_fixed_length_comment("START Groups DECLARATION")
+        writer.write(write_fixed_length_comment(f"START Section {self.get_section_name()}"))
+        writer.write(write_fixed_length_comment("START Groups DECLARATION"))
         for grp in self.groups:
-            result += grp.add_do_commands()
-        result += write_fixed_length_comment("END Groups DECLARATION")
+            writer.write(get_group_do_commands(grp, global_information))
+        writer.write(write_fixed_length_comment("END Groups DECLARATION"))
+        writer.write(get_references_do_commands(self.extensions + self.ios, global_information))
 
-        result += write_fixed_length_comment("START Extensions DECLARATION")
+        writer.write(write_fixed_length_comment("START Extensions DECLARATION"))
         for ext in self.extensions:
-            result += ext.add_do_commands(global_information=global_information)
-        result += write_fixed_length_comment("END Extensions DECLARATION")
+            writer.write(ext.add_do_commands(global_information=global_information))
+        writer.write(write_fixed_length_comment("END Extensions DECLARATION"))
 
-        result += write_fixed_length_comment("START IOs DECLARATION")
+        writer.write(write_fixed_length_comment("START IOs DECLARATION"))
         for io in self.ios:
-            result += io.add_do_commands(global_information=global_information)
-        result += write_fixed_length_comment("END IOs DECLARATION")
+            writer.write(io.add_do_commands(global_information=global_information))
+        writer.write(write_fixed_length_comment("END IOs DECLARATION"))
 
         # Everything is declared, now we can execute the differente sections
         for section in self.sections:
-            result += section.add_all_commands(
+            section.emit(
+                writer,
                 global_information=global_information)
 
         # Everything is executed, now we can undo the differente sections
-        result += write_fixed_length_comment("START IO REMOVAL")
+        writer.write(write_fixed_length_comment("START IO REMOVAL"))
         for io in reversed(self.ios):
-            result += io.add_undo_commands()
-        result += write_fixed_length_comment("END IOs DECLARATION")
+            writer.write(io.add_undo_commands())
+        writer.write(write_fixed_length_comment("END IOs DECLARATION"))
 
-        result += write_fixed_length_comment("START Extensions REMOVAL")
+        writer.write(write_fixed_length_comment("START Extensions REMOVAL"))
         for ext in reversed(self.extensions):
-            result += ext.add_undo_commands()
-        result += write_fixed_length_comment("END Extensions DECLARATION")
+            writer.write(ext.add_undo_commands())
+        writer.write(write_fixed_length_comment("END Extensions DECLARATION"))
 
-        result += write_fixed_length_comment("START Groups REMOVAL")
+        writer.write(get_references_undo_commands(global_information))
+        writer.write(write_fixed_length_comment("START Groups REMOVAL"))
         for grp in reversed(self.groups):
-            result += grp.add_undo_commands()
-        result += write_fixed_length_comment("END Groups DECLARATION")
-        result += write_fixed_length_comment(f"END Section {self.get_section_name()}")
-
-        return result
+            writer.write(get_group_undo_commands(grp, global_information))
+        writer.write(write_fixed_length_comment("END Groups DECLARATION"))
+        writer.write(write_fixed_length_comment(f"END Section {self.get_section_name()}"))
 
 
 class IntegratorSection(Section):
@@ -599,23 +680,35 @@ class IntegratorSection(Section):
                 self.instructions.append(
                     instruction_loader.dict_to_instruction(instruction))
 
-    def add_all_commands(self, global_information: GlobalInformation) -> str:
+    def emit(self, writer: TextIO, global_information: GlobalInformation) -> None:
         """
-        Add all the commands from the section.
+        Write all the commands from the section to the writer.
         Args:
+            writer (TextIO): The object receiving the commands
             global_information (GlobalInformation): The global information
 
         Returns:
-            str: Lammps command(s)
+            None
         """
-        result = write_fixed_length_comment(f"START SECTION {self.get_section_name()}")
-        result += self.add_do_commands(global_information=global_information)
-        result += write_fixed_length_comment(f"START RUN INTEGRATOR FOR SECTION {self.get_section_name()}")
-        result += self.integrator.add_run_commands()
-        result += write_fixed_length_comment(f"END RUN INTEGRATOR FOR SECTION {self.get_section_name()}")
-        result += self.add_undo_commands()
-        result += write_fixed_length_comment(f"END SECTION {self.get_section_name()}")
-        return result
+        do_commands = self.add_do_commands(global_information=global_information)
+        tracks_setup = isinstance(writer, SetupTrackingWriter) \
+            and self.integrator.supports_run_options()
+
+        writer.write(write_fixed_length_comment(f"START SECTION {self.get_section_name()}"))
+        writer.write(do_commands)
+        writer.write(write_fixed_length_comment(f"START RUN INTEGRATOR FOR SECTION {self.get_section_name()}"))
+        if tracks_setup:
+            # The setup can be skipped only if nothing was declared since the previous run
+            skip_setup = not writer.is_setup_required() and not contains_commands(do_commands)
+            writer.write(self.integrator.add_run_commands(skip_setup=skip_setup))
+        else:
+            writer.write(self.integrator.add_run_commands())
+        writer.write(write_fixed_length_comment(f"END RUN INTEGRATOR FOR SECTION {self.get_section_name()}"))
+        undo_commands = self.add_undo_commands(global_information=global_information)
+        writer.write(undo_commands)
+        if tracks_setup:
+            writer.set_setup_required(contains_commands(undo_commands))
+        writer.write(write_fixed_length_comment(f"END SECTION {self.get_section_name()}"))
 
     def add_do_commands(self, global_information: GlobalInformation) -> str:
         """
@@ -629,8 +722,11 @@ class IntegratorSection(Section):
         result = ""
         result += write_fixed_length_comment("START Groups DECLARATION")
         for grp in self.groups:
-            result += grp.add_do_commands()
+            result += get_group_do_commands(grp, global_information)
         result += write_fixed_length_comment("END Groups DECLARATION")
+        result += get_references_do_commands(
+            [self.integrator] + self.extensions + self.post_extensions + self.fileios,
+            global_information)
 
         result += write_fixed_length_comment("START Extensions DECLARATION")
         for ext in self.extensions:
@@ -654,9 +750,11 @@ class IntegratorSection(Section):
 
         return result
 
-    def add_undo_commands(self) -> str:
+    def add_undo_commands(self, global_information: GlobalInformation = None) -> str:
         """
         Add the undo commands from the section.
+        Args:
+            global_information (GlobalInformation): The global information
 
         Returns:
             str: Lammps command(s)
@@ -683,9 +781,10 @@ class IntegratorSection(Section):
             result += ext.add_undo_commands()
         result += write_fixed_length_comment("END Extensions DECLARATION")
 
+        result += get_references_undo_commands(global_information)
         result += write_fixed_length_comment("START Groups REMOVAL")
         for grp in reversed(self.groups):
-            result += grp.add_undo_commands()
+            result += get_group_undo_commands(grp, global_information)
         result += write_fixed_length_comment("END Groups DECLARATION")
 
         return result
@@ -773,19 +872,333 @@ class InstructionsSection(Section):
                 instruction_loader.dict_to_instruction(
                     c, version) for c in instructions_dict]
 
-    def add_all_commands(self, global_information: GlobalInformation) -> str:
+    def emit(self, writer: TextIO, global_information: GlobalInformation) -> None:
         """
-        Add the commands for the section.
+        Write the commands for the section to the writer.
 
         Args:
+            writer (TextIO): The object receiving the commands
             global_information (GlobalInformation): The global information of the simulation
 
         Returns:
-            str: Lammps command(s)
+            None
         """
-        result = write_fixed_length_comment(f"START SECTION {self.get_section_name()}")
+        writer.write(write_fixed_length_comment(f"START SECTION {self.get_section_name()}"))
+        writer.write(get_references_do_commands(self.instructions, global_information))
         for instruction in self.instructions:
-            result += instruction.write_instruction(
-                global_information=global_information)
-        result += write_fixed_length_comment(f"END SECTION {self.get_section_name()}")
+            writer.write(instruction.write_instruction(
+                global_information=global_information))
+        writer.write(get_references_undo_commands(global_information))
+        writer.write(write_fixed_length_comment(f"END SECTION {self.get_section_name()}"))
+
+
+class LoopVariableStyle(IntEnum):
+    INDEX = 1
+    FILE = 2
+
+
+class LoopSection(Section):
+    """
+    The LoopSection executes its list of sections once per iteration with a native Lammps loop
+    instead of unrolling one copy of the sections per iteration. The size of the generated
+    script is therefore independent of the number of iterations.
+
+    Each loop variable holds one value per iteration. The sections of the loop can access the
+    value of the current iteration with ${name} or v_name, for example with a ManualInstruction
+    or a VariableInstruction. The counter variable returned by get_counter_variable_name()
+    holds the current iteration, starting at 1.
+
+    With the INDEX style, the values are written directly in the script. With the FILE style,
+    the values are written in a file per variable in the job folder, which keeps the script
+    small for large loops.
+
+    The LoopSection generate Lammps commands as follow:
+    * Declare the counter variable and the loop variables
+    * label at the start of the loop
+    * All Sections
+    * next on the loop variables and the counter variable
+    * jump back to the label
+
+    Note: the jump command requires Lammps to read the script from a file with the -in option.
+
+    Lammps documentation: https://docs.lammps.org/jump.html and https://docs.lammps.org/next.html
+    """
+    loopVariableStyleToStr = {
+        LoopVariableStyle.INDEX: "index",
+        LoopVariableStyle.FILE: "file"
+    }
+
+    quantityClasses = {
+        c.__name__: c for c in [LengthQuantity, VelocityQuantity, TimeQuantity, ForceQuantity,
+                                EnergyQuantity, TemperatureQuantity, TorqueQuantity]
+    }
+
+    def __init__(self, section_name: str = "defaultSection", nb_iterations: int = 1,
+                 style: LoopVariableStyle = LoopVariableStyle.INDEX) -> None:
+        """
+        Constructor
+
+        Args:
+            section_name (str, optional): The name of the section. Defaults to "defaultSection".
+            nb_iterations (int, optional): The number of iterations of the loop. Defaults to 1.
+            style (LoopVariableStyle, optional): How the values of the loop variables are
+                                                 provided to Lammps. Defaults to INDEX.
+        Returns:
+            None
+
+        Raise:
+            ValueError: If the name of the section is not alphanumeric or the number of
+                        iterations is not positive
+        """
+        super().__init__(section_name=section_name)
+        if nb_iterations < 1:
+            raise ValueError(f"Invalid number of iterations {nb_iterations}, must be positive.")
+        self.nb_iterations = nb_iterations
+        self.style = style
+        self.sections: List[Section] = []
+        self.loop_variables: List[dict] = []
+
+    def get_nb_iterations(self) -> int:
+        """
+        Get the number of iterations of the loop
+
+        Returns:
+            int: The number of iterations
+        """
+        return self.nb_iterations
+
+    def get_style(self) -> LoopVariableStyle:
+        """
+        Get the style of the loop variables
+
+        Returns:
+            LoopVariableStyle: The style of the loop variables
+        """
+        return self.style
+
+    def get_counter_variable_name(self) -> str:
+        """
+        Get the name of the Lammps variable counting the iterations
+
+        Returns:
+            str: The name of the counter variable
+        """
+        return f"{self.get_section_name()}Iter"
+
+    def add_section(self, section: Section):
+        """
+        Add a section to the body of the loop
+
+        Args:
+            section (Section): The section to add
+        """
+        self.sections.append(section)
+
+    def get_sections(self) -> List[Section]:
+        """
+        Returns the list of sections of the body of the loop
+
+        Returns:
+            List[Section]: The list of sections
+        """
+        return self.sections
+
+    def add_loop_variable(self, variable_name: str,
+                          values: Union[List[Union[float, int, str]], np.ndarray, LIBQuantity]):
+        """
+        Add a variable taking a different value at each iteration
+
+        Args:
+            variable_name (str): The name of the Lammps variable
+            values (Union[List[Union[float, int, str]], np.ndarray, LIBQuantity]): The values of
+                the variable, one per iteration. A quantity holding an array of values is
+                converted to the unit system of the simulation.
+
+        Returns:
+            None
+
+        Raise:
+            ValueError: If the number of values doesn't match the number of iterations, the
+                        name is already used, or a string value contains a whitespace
+        """
+        if not variable_name.isidentifier():
+            raise ValueError(f"Invalid loop variable name {variable_name}.")
+        if variable_name == self.get_counter_variable_name() or \
+                variable_name in [v["variable_name"] for v in self.loop_variables]:
+            raise ValueError(f"Loop variable {variable_name} already declared in the section "
+                             f"{self.get_section_name()}.")
+
+        quantity = values if isinstance(values, LIBQuantity) else None
+        raw_values = np.atleast_1d(np.asarray(
+            quantity.get_magnitude() if quantity is not None else values))
+        if raw_values.ndim != 1 or len(raw_values) != self.nb_iterations:
+            raise ValueError(f"Loop variable {variable_name} has {raw_values.size} values, "
+                             f"expected {self.nb_iterations}.")
+        if raw_values.dtype.kind in "US" and any(len(str(v).split()) != 1 for v in raw_values):
+            raise ValueError(f"The values of the loop variable {variable_name} must not be "
+                             "empty or contain whitespaces.")
+
+        self.loop_variables.append({
+            "variable_name": variable_name,
+            "values": raw_values,
+            "quantity": quantity
+        })
+
+    def get_loop_variables(self) -> List[str]:
+        """
+        Get the names of the loop variables
+
+        Returns:
+            List[str]: The names of the loop variables
+        """
+        return [v["variable_name"] for v in self.loop_variables]
+
+    def to_dict(self) -> dict:
+        """
+        Convert the section to a dictionary representation
+
+        Returns:
+            dict: The dictionary representation of the section
+        """
+        result = super().to_dict()
+        result["class_name"] = self.__class__.__name__
+        result["nb_iterations"] = self.nb_iterations
+        result["style"] = self.style.value
+        result["sections"] = [s.to_dict() for s in self.sections]
+        result["loop_variables"] = []
+        for variable in self.loop_variables:
+            variable_dict = {
+                "variable_name": variable["variable_name"],
+                "values": variable["values"].tolist()
+            }
+            if variable["quantity"] is not None:
+                variable_dict["quantity_class"] = variable["quantity"].__class__.__name__
+                variable_dict["units"] = variable["quantity"].get_units()
+            result["loop_variables"].append(variable_dict)
         return result
+
+    def from_dict(self, d: dict, version: int):
+        """
+        Load the section from a dictionary representation
+
+        Args:
+            d (dict): The dictionary representation of the section
+            version (int): The version of the section
+        Returns:
+            None
+        Raise:
+            ValueError: If the class name in the dictionary does not match the class name of the object
+            ValueError: If a loop variable uses an unknown quantity class
+        """
+        super().from_dict(d, version=version)
+        self.nb_iterations = d.get("nb_iterations", 1)
+        self.style = LoopVariableStyle(d.get("style", LoopVariableStyle.INDEX.value))
+
+        self.sections = []
+        if "sections" in d.keys() and len(d["sections"]) > 0:
+            from lammpsinputbuilder.loader.section_loader import SectionLoader
+            loader = SectionLoader()
+
+            for section in d["sections"]:
+                self.sections.append(loader.dict_to_section(section, version))
+
+        self.loop_variables = []
+        for variable in d.get("loop_variables", []):
+            values = variable["values"]
+            if variable.get("quantity_class", None) is not None:
+                if variable["quantity_class"] not in self.quantityClasses:
+                    raise ValueError(f"Unknown quantity class {variable['quantity_class']}.")
+                values = self.quantityClasses[variable["quantity_class"]](
+                    np.asarray(values), variable["units"])
+            self.add_loop_variable(variable["variable_name"], values)
+
+    def get_loop_values(self, variable: dict, global_information: GlobalInformation) -> List[str]:
+        """
+        Get the values of a loop variable as written in the Lammps inputs
+
+        Args:
+            variable (dict): The loop variable
+            global_information (GlobalInformation): The global information of the simulation
+
+        Returns:
+            List[str]: The values of the variable, one per iteration
+        """
+        values = variable["values"]
+        if variable["quantity"] is not None:
+            values = np.asarray(variable["quantity"].convert_to(global_information.get_unit_style()))
+        if values.dtype.kind == "f":
+            return [f"{v:.17g}" for v in values.tolist()]
+        return [str(v) for v in values.tolist()]
+
+    def emit(self, writer: TextIO, global_information: GlobalInformation) -> None:
+        """
+        Write the commands of the loop, including the commands of the sections
+        of the body, to the writer. The body is written only once.
+
+        Args:
+            writer (TextIO): The object receiving the commands
+            global_information (GlobalInformation): The global information of the simulation
+
+        Returns:
+            None
+
+        Raise:
+            ValueError: If the FILE style is used without a job folder
+        """
+        section_name = self.get_section_name()
+        counter_name = self.get_counter_variable_name()
+        style = self.loopVariableStyleToStr[self.style]
+
+        writer.write(write_fixed_length_comment(f"START LOOP {section_name}"))
+        writer.write(f"variable {counter_name} loop {self.nb_iterations}\n")
+        for variable in self.loop_variables:
+            variable_name = variable["variable_name"]
+            values = self.get_loop_values(variable, global_information)
+            if self.style == LoopVariableStyle.INDEX:
+                writer.write(f"variable {variable_name} {style} {' '.join(values)}\n")
+            else:
+                job_folder = global_information.get_workflow_context().job_folder
+                if job_folder is None:
+                    raise ValueError(f"The LoopSection {section_name} requires a job folder "
+                                     "to write the values of its variables.")
+                file_name = f"loop.{section_name}.{variable_name}.txt"
+                with open(job_folder / file_name, "w", encoding="utf-8") as f:
+                    f.write("\n".join(values))
+                    f.write("\n")
+                writer.write(f"variable {variable_name} {style} {file_name}\n")
+
+        writer.write(f"label {section_name}Start\n")
+        for section in self.sections:
+            section.emit(writer, global_information=global_information)
+
+        # All the variables of a next command must share the same style, the counter
+        # is advanced separately. The jump is skipped once the variables are exhausted.
+        if len(self.loop_variables) > 0:
+            writer.write(f"next {' '.join(self.get_loop_variables())}\n")
+        writer.write(f"next {counter_name}\n")
+        writer.write(f"jump SELF {section_name}Start\n")
+        writer.write(write_fixed_length_comment(f"END LOOP {section_name}"))
+
+
+def iterate_sections(sections: List[Section]):
+    """
+    Iterate over a list of sections and their child sections, parents first.
+    The sections generated by the templates are visited after the template itself.
+
+    Args:
+        sections (List[Section]): The sections
+
+    Yields:
+        Section: Each section of the tree
+
+    Raise:
+        NotImplementedError: If a template cannot generate its sections
+    """
+    stack = list(reversed(sections))
+    while len(stack) > 0:
+        section = stack.pop()
+        yield section
+        if hasattr(section, "generate_sections"):
+            stack.extend(reversed(section.generate_sections()))
+        elif hasattr(section, "get_sections"):
+            stack.extend(reversed(section.get_sections()))
@@ -0,0 +1,365 @@
+"""Module implementing the geometric atom selections used to build groups."""
+
+from typing import List, Union
+from enum import IntEnum
+
+import numpy as np
+from ase import Atoms
+from scipy.spatial import cKDTree
+
+from lammpsinputbuilder.group import IndicesGroup
+
+
+class PlaneSide(IntEnum):
+    """
+    Enumeration for the side of a plane selected by a PlaneSelection.
+    ABOVE selects the atoms on the side pointed by the normal of the plane.
+    """
+    ABOVE = 1
+    BELOW = 2
+
+
+def get_atoms_from_model(model) -> Atoms:
+    """
+    Get the ASE atoms object to evaluate a selection on.
+
+    Args:
+        model (Union[Atoms, TypedMolecularSystem]): An ASE atoms object, or a
+                                                    molecular system with a loaded model
+
+    Returns:
+        Atoms: The ASE atoms object
+
+    Raises:
+        ValueError: If the molecular system doesn't have a model loaded
+    """
+    if isinstance(model, Atoms):
+        return model
+    atoms = model.get_ase_model()
+    if atoms is None:
+        raise ValueError("The molecular system must have a model loaded to evaluate a selection.")
+    return atoms
+
+
+class Selection:
+    """
+    Base class for all the atom selections. A Selection evaluates a condition
+    on the species and positions of the atoms of a model and produces a boolean
+    mask over the atoms. Selections can be combined with the operators &
+    (intersection), | (union), - (difference), and ~ (complement).
+
+    The positions are expressed in the units of the ASE model, i.e in Angstrom.
+
+    This class should never be instantiated directly. Instead, the subclasses
+    should implement the `evaluate()` method.
+    """
+
+    def evaluate(self, atoms: Atoms) -> np.ndarray:
+        """
+        Evaluate the selection on a model.
+
+        Args:
+            atoms (Atoms): The ASE atoms object
+
+        Returns:
+            np.ndarray: The boolean mask of the selected atoms, one value per atom
+        """
+        raise NotImplementedError(f"Selection {self.__class__.__name__} must implement evaluate().")
+
+    def get_indices(self, model) -> np.ndarray:
+        """
+        Get the Lammps indices of the selected atoms.
+
+        Args:
+            model (Union[Atoms, TypedMolecularSystem]): An ASE atoms object, or a
+                                                        molecular system with a loaded model
+
+        Returns:
+            np.ndarray: The sorted 1-based indices of the selected atoms
+        """
+        return np.flatnonzero(self.evaluate(get_atoms_from_model(model))) + 1
+
+    def to_group(self, group_name: str, model) -> IndicesGroup:
+        """
+        Create an IndicesGroup containing the selected atoms.
+
+        Args:
+            group_name (str): The name of the group
+            model (Union[Atoms, TypedMolecularSystem]): An ASE atoms object, or a
+                                                        molecular system with a loaded model
+
+        Returns:
+            IndicesGroup: The group of the selected atoms
+        """
+        return IndicesGroup(group_name=group_name, indices=self.get_indices(model))
+
+    def __and__(self, other: "Selection") -> "Selection":
+        return AndSelection([self, other])
+
+    def __or__(self, other: "Selection") -> "Selection":
+        return OrSelection([self, other])
+
+    def __sub__(self, other: "Selection") -> "Selection":
+        return AndSelection([self, NotSelection(other)])
+
+    def __invert__(self) -> "Selection":
+        return NotSelection(self)
+
+
+class AllSelection(Selection):
+    """
+    Select all the atoms of the model.
+    """
+
+    def evaluate(self, atoms: Atoms) -> np.ndarray:
+        return np.ones(len(atoms), dtype=bool)
+
+
+class IndicesSelection(Selection):
+    """
+    Select a list of atoms by their atom indices. Indices start at 1.
+    """
+
+    def __init__(self, indices: Union[List[int], np.ndarray]) -> None:
+        """
+        Constructor
+
+        Args:
+            indices (Union[List[int], np.ndarray]): The indices of the atoms
+
+        Raises:
+            ValueError: If an indices is inferior to 1
+        """
+        self.indices = np.asarray(indices, dtype=np.int64)
+        if np.any(self.indices <= 0):
+            raise ValueError("Indices must be greater than 0 when creating an IndicesSelection.")
+
+    def evaluate(self, atoms: Atoms) -> np.ndarray:
+        if len(self.indices) > 0 and self.indices.max() > len(atoms):
+            raise ValueError(
+                f"Index {self.indices.max()} is out of range for a model with {len(atoms)} atoms.")
+        mask = np.zeros(len(atoms), dtype=bool)
+        mask[self.indices - 1] = True
+        return mask
+
+
+class ElementSelection(Selection):
+    """
+    Select the atoms by their chemical element.
+    """
+
+    def __init__(self, elements: Union[str, List[str]]) -> None:
+        """
+        Constructor
+
+        Args:
+            elements (Union[str, List[str]]): The element symbol(s) to select
+        """
+        if isinstance(elements, str):
+            elements = [elements]
+        self.elements = list(elements)
+
+    def evaluate(self, atoms: Atoms) -> np.ndarray:
+        return np.isin(np.asarray(atoms.get_chemical_symbols()), self.elements)
+
+
+class BoxSelection(Selection):
+    """
+    Select the atoms inside an axis-aligned box. The bounds are included.
+    A bound set to None leaves the box open in that direction, which allows
+    selecting slabs along one or two axis.
+    """
+
+    def __init__(self, min_coords: List[float] = None, max_coords: List[float] = None) -> None:
+        """
+        Constructor
+
+        Args:
+            min_coords (List[float]): The lower corner [xmin, ymin, zmin] of the box
+            max_coords (List[float]): The upper corner [xmax, ymax, zmax] of the box
+
+        Raises:
+            ValueError: If a corner doesn't have 3 coordinates
+        """
+        self.min_coords = self._to_bounds(min_coords, -np.inf)
+        self.max_coords = self._to_bounds(max_coords, np.inf)
+
+    @staticmethod
+    def _to_bounds(coords: List[float], default: float) -> np.ndarray:
+        if coords is None:
+            return np.full(3, default)
+        if len(coords) != 3:
+            raise ValueError(f"Expected 3 coordinates for a box corner, got {len(coords)}.")
+        return np.array([default if c is None else c for c in coords], dtype=float)
+
+    def evaluate(self, atoms: Atoms) -> np.ndarray:
+        positions = atoms.get_positions()
+        return np.all((positions >= self.min_coords) & (positions <= self.max_coords), axis=1)
+
+
+class SphereSelection(Selection):
+    """
+    Select the atoms inside a sphere. Atoms on the surface of the sphere are included.
+    """
+
+    def __init__(self, center: List[float], radius: float) -> None:
+        """
+        Constructor
+
+        Args:
+            center (List[float]): The center [x, y, z] of the sphere
+            radius (float): The radius of the sphere
+
+        Raises:
+            ValueError: If the radius is negative
+        """
+        if radius < 0:
+            raise ValueError(f"Invalid radius {radius}, must be positive.")
+        self.center = np.asarray(center, dtype=float)
+        self.radius = radius
+
+    def evaluate(self, atoms: Atoms) -> np.ndarray:
+        offsets = atoms.get_positions() - self.center
+        return np.einsum("ij,ij->i", offsets, offsets) <= self.radius * self.radius
+
+
+class PlaneSelection(Selection):
+    """
+    Select the atoms above or below a plane. Atoms on the plane are included.
+    """
+
+    def __init__(self, point: List[float], normal: List[float],
+                 side: PlaneSide = PlaneSide.ABOVE) -> None:
+        """
+        Constructor
+
+        Args:
+            point (List[float]): A point [x, y, z] of the plane
+            normal (List[float]): The normal [nx, ny, nz] of the plane
+            side (PlaneSide): The side of the plane to select
+
+        Raises:
+            ValueError: If the normal is null
+        """
+        self.point = np.asarray(point, dtype=float)
+        self.normal = np.asarray(normal, dtype=float)
+        if not np.any(self.normal):
+            raise ValueError("The normal of a PlaneSelection must not be null.")
+        self.side = side
+
+    def evaluate(self, atoms: Atoms) -> np.ndarray:
+        signed_distances = (atoms.get_positions() - self.point) @ self.normal
+        if self.side == PlaneSide.ABOVE:
+            return signed_distances >= 0
+        return signed_distances <= 0
+
+
+class DistanceSelection(Selection):
+    """
+    Select the atoms within a cutoff distance of the atoms of another selection.
+    Periodic images are not considered.
+    """
+
+    def __init__(self, reference: Selection, cutoff: float, include_reference: bool = True) -> None:
+        """
+        Constructor
+
+        Args:
+            reference (Selection): The selection of the reference atoms
+            cutoff (float): The maximum distance to a reference atom
+            include_reference (bool): If False, the reference atoms are excluded from the selection
+
+        Raises:
+            ValueError: If the cutoff is negative
+        """
+        if cutoff < 0:
+            raise ValueError(f"Invalid cutoff {cutoff}, must be positive.")
+        self.reference = reference
+        self.cutoff = cutoff
+        self.include_reference = include_reference
+
+    def evaluate(self, atoms: Atoms) -> np.ndarray:
+        reference_mask = self.reference.evaluate(atoms)
+        if not np.any(reference_mask):
+            return np.zeros(len(atoms), dtype=bool)
+
+        positions = atoms.get_positions()
+        tree = cKDTree(positions[reference_mask])
+        # Atoms without a reference atom within the cutoff get an infinite distance.
+        # The upper bound of the query is exclusive, so it's moved just past the cutoff.
+        distances, _ = tree.query(positions, k=1,
+                                  distance_upper_bound=np.nextafter(self.cutoff, np.inf))
+        mask = distances <= self.cutoff
+        if not self.include_reference:
+            mask &= ~reference_mask
+        return mask
+
+
+class AndSelection(Selection):
+    """
+    Select the atoms present in all the given selections.
+    """
+
+    def __init__(self, selections: List[Selection]) -> None:
+        """
+        Constructor
+
+        Args:
+            selections (List[Selection]): The selections to intersect
+
+        Raises:
+            ValueError: If no selection is given
+        """
+        if len(selections) == 0:
+            raise ValueError("AndSelection requires at least one selection.")
+        self.selections = selections
+
+    def evaluate(self, atoms: Atoms) -> np.ndarray:
+        mask = self.selections[0].evaluate(atoms)
+        for selection in self.selections[1:]:
+            mask &= selection.evaluate(atoms)
+        return mask
+
+
+class OrSelection(Selection):
+    """
+    Select the atoms present in at least one of the given selections.
+    """
+
+    def __init__(self, selections: List[Selection]) -> None:
+        """
+        Constructor
+
+        Args:
+            selections (List[Selection]): The selections to unite
+
+        Raises:
+            ValueError: If no selection is given
+        """
+        if len(selections) == 0:
+            raise ValueError("OrSelection requires at least one selection.")
+        self.selections = selections
+
+    def evaluate(self, atoms: Atoms) -> np.ndarray:
+        mask = self.selections[0].evaluate(atoms)
+        for selection in self.selections[1:]:
+            mask |= selection.evaluate(atoms)
+        return mask
+
+
+class NotSelection(Selection):
+    """
+    Select the atoms which are not in the given selection.
+    """
+
+    def __init__(self, selection: Selection) -> None:
+        """
+        Constructor
+
+        Args:
+            selection (Selection): The selection to complement
+        """
+        self.selection = selection
+
+    def evaluate(self, atoms: Atoms) -> np.ndarray:
+        return ~self.selection.evaluate(atoms)
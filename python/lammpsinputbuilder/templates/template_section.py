@@ -2,10 +2,12 @@
 Module implementing a template for sections.
 """
 
-from typing import List
+from typing import List, TextIO
 
 from lammpsinputbuilder.fileio import FileIO
 from lammpsinputbuilder.group import Group
+from lammpsinputbuilder.group_resolver import get_group_do_commands, get_group_undo_commands, \
+    get_references_do_commands, get_references_undo_commands
 from lammpsinputbuilder.section import Section
 from lammpsinputbuilder.extensions import Extension
 from lammpsinputbuilder.instructions import Instruction
@@ -95,52 +97,53 @@ class TemplateSection(Section):
                 self.instructions.append(loader.dict_to_instruction(
                     instruction, version))
 
-    def add_all_commands(self, global_information: GlobalInformation) -> str:
+    def emit(self, writer: TextIO, global_information: GlobalInformation) -> None:
         # Declare all the objects which are going to live during the entire
         # duractions of the sections
-        result = write_fixed_length_comment(f"START Section {self.get_section_name()}")
-        result += write_fixed_length_comment("START Groups DECLARATION")
+        writer.write(write_fixed_length_comment(f"START Section {self.get_section_name()}"))
+        writer.write(write_fixed_length_comment("START Groups DECLARATION"))
         for grp in self.groups:
-            result += grp.add_do_commands()
-        result += write_fixed_length_comment("END Groups DECLARATION")
+            writer.write(get_group_do_commands(grp, global_information))
+        writer.write(write_fixed_length_comment("END Groups DECLARATION"))
+        writer.write(get_references_do_commands(self.extensions + self.ios, global_information))
 
-        result += write_fixed_length_comment("START Extensions DECLARATION")
+        writer.write(write_fixed_length_comment("START Extensions DECLARATION"))
         for ext in self.extensions:
-            result += ext.add_do_commands(global_information=global_information)
-        result += write_fixed_length_comment("END Extensions DECLARATION")
+            writer.write(ext.add_do_commands(global_information=global_information))
+        writer.write(write_fixed_length_comment("END Extensions DECLARATION"))
 
-        result += write_fixed_length_comment("START IOs DECLARATION")
+        writer.write(write_fixed_length_comment("START IOs DECLARATION"))
         for io in self.ios:
-            result += io.add_do_commands(global_information=global_information)
-        result += write_fixed_length_comment("END IOs DECLARATION")
+            writer.write(io.add_do_commands(global_information=global_information))
+        writer.write(write_fixed_length_comment("END IOs DECLARATION"))
 
         # Everything is declared, now we can execute the differente sections
         sections = self.generate_sections()
         for section in sections:
-            result += section.add_all_commands(
+            section.emit(
+                writer,
                 global_information=global_information)
 
         # Everything is executed, now we can undo the differente sections
-        result += write_fixed_length_comment("START IO REMOVAL")
+        writer.write(write_fixed_length_comment("START IO REMOVAL"))
         for io in reversed(self.ios):
-            result += io.add_undo_commands()
-        result += write_fixed_length_comment("END IOs DECLARATION")
+            writer.write(io.add_undo_commands())
+        writer.write(write_fixed_length_comment("END IOs DECLARATION"))
 
-        result += write_fixed_length_comment("START Extensions REMOVAL")
+        writer.write(write_fixed_length_comment("START Extensions REMOVAL"))
         for ext in reversed(self.extensions):
-            result += ext.add_undo_commands()
-        result += write_fixed_length_comment("END Extensions DECLARATION")
+            writer.write(ext.add_undo_commands())
+        writer.write(write_fixed_length_comment("END Extensions DECLARATION"))
 
-        result += write_fixed_length_comment("START Groups REMOVAL")
+        writer.write(get_references_undo_commands(global_information))
+        writer.write(write_fixed_length_comment("START Groups REMOVAL"))
         for grp in reversed(self.groups):
-            result += grp.add_undo_commands()
-        result += write_fixed_length_comment("END Groups DECLARATION")
-        result += write_fixed_length_comment(f"END Section {self.get_section_name()}")
-
-        return result
+            writer.write(get_group_undo_commands(grp, global_information))
+        writer.write(write_fixed_length_comment("END Groups DECLARATION"))
+        writer.write(write_fixed_length_comment(f"END Section {self.get_section_name()}"))
 
     def generate_sections(self) -> List[Section]:
         raise NotImplementedError(
             "The class {self.__class__.__name__} cannot be used directly. \
             Please use a subclass and implement the function generate_sections() \
-            or override the function add_all_commands().")
+            or override the function emit().")
@@ -2,19 +2,22 @@
 
 from typing import List
 from pathlib import Path
-import shutil
-import tempfile
 
 from ase import Atoms
-from ase.io import read as ase_read
-from ase.io.lammpsrun import read_lammps_dump_text as ase_read_lammps_dump_text
 
 from lammpsinputbuilder.types import Forcefield, BoundingBoxStyle, MoleculeFileFormat, \
-    GlobalInformation, ElectrostaticMethod, get_molecule_file_format_from_extension, \
-    get_extension_from_molecule_file_format, get_forcefield_from_extension
+    GlobalInformation, ElectrostaticMethod, AccelerationStyle, AtomOrdering, \
+    get_molecule_file_format_from_extension, get_extension_from_molecule_file_format, \
+    get_forcefield_from_extension, get_extension_from_compression_style
 from lammpsinputbuilder.utility.model_to_data import molecule_to_lammps_data_pbc, \
-    molecule_to_lammps_input
-from lammpsinputbuilder.quantities import LammpsUnitSystem
+    molecule_to_lammps_input, validate_acceleration_style
+from lammpsinputbuilder.utility.molecule_reader import read_molecule_from_string, \
+    read_lammps_dump_frame_from_file
+from lammpsinputbuilder.quantities import LammpsUnitSystem, LengthQuantity
+from lammpsinputbuilder.data_file import DataFileSettings
+from lammpsinputbuilder.neighbor import NeighborSettings
+from lammpsinputbuilder.reaxff_memory import ReaxFFMemorySettings
+from lammpsinputbuilder.charge_equilibration import ChargeEquilibrationSettings
 
 
 class TypedMolecularSystem:
@@ -40,6 +43,11 @@ class TypedMolecularSystem:
         """
         self.ff_type = forcefield
         self.bbox_style = bbox_style
+        self.data_file_settings = DataFileSettings()
+        self.acceleration_style = AccelerationStyle.NONE
+        self.acceleration_threads = 1
+        self.neighbor_settings = None
+        self.bbox_padding = None
 
     def get_forcefield_type(self) -> Forcefield:
         """
@@ -77,6 +85,122 @@ class TypedMolecularSystem:
         """
         self.ff_type = ff_type
 
+    def get_data_file_settings(self) -> DataFileSettings:
+        """
+        Returns the settings of the data file
+
+        Returns:
+            DataFileSettings: data file settings
+        """
+        return self.data_file_settings
+
+    def set_data_file_settings(self, data_file_settings: DataFileSettings):
+        """
+        Sets the settings of the data file, see DataFileSettings.
+
+        Args:
+            data_file_settings: data file settings
+        """
+        self.data_file_settings = data_file_settings
+
+    def get_acceleration_style(self) -> AccelerationStyle:
+        """
+        Returns the accelerator package used by the input script
+
+        Returns:
+            AccelerationStyle: accelerator package
+        """
+        return self.acceleration_style
+
+    def get_acceleration_threads(self) -> int:
+        """
+        Returns the number of OpenMP threads per MPI process used by the accelerator package
+
+        Returns:
+            int: number of threads
+        """
+        return self.acceleration_threads
+
+    def set_acceleration(self, acceleration_style: AccelerationStyle, nb_threads: int = 1):
+        """
+        Sets the accelerator package used by the input script. The pair style of the
+        forcefield must have a variant in the package. The other styles without a variant
+        are declared with the suffix of the package disabled. If the forcefield is not
+        loaded yet, the package is checked when the input script is generated.
+
+        Args:
+            acceleration_style: accelerator package
+            nb_threads: number of OpenMP threads per MPI process
+
+        Raises:
+            ValueError: If the number of threads is lower than 1
+            ValueError: If the pair style of the forcefield has no variant in the package
+        """
+        if nb_threads < 1:
+            raise ValueError(f"Invalid number of threads {nb_threads}, must be at least 1.")
+        if self.get_forcefield_type() is not None:
+            validate_acceleration_style(self.get_forcefield_type(), acceleration_style)
+        self.acceleration_style = acceleration_style
+        self.acceleration_threads = nb_threads
+
+    def get_bbox_padding(self) -> LengthQuantity:
+        """
+        Returns the padding added around the atoms along the dimensions without a periodic cell
+
+        Returns:
+            LengthQuantity: padding, or None if the default padding of the bounding box style is used
+        """
+        return self.bbox_padding
+
+    def set_bbox_padding(self, padding: LengthQuantity):
+        """
+        Sets the padding added around the atoms along the dimensions without a periodic
+        cell. With a periodic bounding box style, the padding must leave enough vacuum
+        to avoid interactions between the atoms and their periodic images.
+        Set to None to use the default padding of the bounding box style.
+
+        Args:
+            padding: padding
+
+        Raises:
+            ValueError: If the padding is negative
+        """
+        if padding is not None and padding.get_magnitude() < 0:
+            raise ValueError(f"Invalid padding {padding.get_magnitude()}, must be positive.")
+        self.bbox_padding = padding
+
+    def _get_bbox_padding_angstrom(self) -> float:
+        """
+        Returns the padding added around the atoms in Angstrom, the unit of the ASE model
+
+        Returns:
+            float: padding in Angstrom, or None if the default padding is used
+        """
+        if self.bbox_padding is None:
+            return None
+        return self.bbox_padding.convert_to(LammpsUnitSystem.REAL)
+
+    def get_neighbor_settings(self) -> NeighborSettings:
+        """
+        Returns the settings of the neighbor lists
+
+        Returns:
+            NeighborSettings: neighbor settings, or None if the default settings are used
+        """
+        return self.neighbor_settings
+
+    def set_neighbor_settings(self, neighbor_settings: NeighborSettings):
+        """
+        Sets the settings of the neighbor lists. The settings left to None are tuned
+        from the model when generating the input script, see NeighborSettings.
+        If None, the neighbor lists use a skin of 2.5 Angstrom, or half of the box
+        if smaller, and are checked every timestep.
+
+        Args:
+            neighbor_settings: neighbor settings
+        """
+        self.neighbor_settings = neighbor_settings
+
     def get_unit_system(self) -> LammpsUnitSystem:
         """
         Returns the unit system
@@ -103,6 +227,13 @@ class TypedMolecularSystem:
         result["class_name"] = self.__class__.__name__
         result["forcefield"] = self.get_forcefield_type().value
         result["bbox_style"] = self.get_boundingbox_style().value
+        result["data_file_settings"] = self.data_file_settings.to_dict()
+        result["acceleration_style"] = self.get_acceleration_style().value
+        result["acceleration_threads"] = self.get_acceleration_threads()
+        if self.neighbor_settings is not None:
+            result["neighbor_settings"] = self.neighbor_settings.to_dict()
+        if self.bbox_padding is not None:
+            result["bbox_padding"] = self.bbox_padding.to_dict()
         return result
 
     def from_dict(self, d: dict, version: int):
@@ -115,9 +246,22 @@ class TypedMolecularSystem:
         """
         # We're not checking the class name here, it's up to the inheriting
         # class
-        del version  # unused
         self.set_forcefield_type(Forcefield(d["forcefield"]))
         self.set_boundingbox_style(BoundingBoxStyle(d["bbox_style"]))
+        self.data_file_settings = DataFileSettings()
+        if d.get("data_file_settings") is not None:
+            self.data_file_settings.from_dict(d["data_file_settings"], version)
+        self.set_acceleration(
+            AccelerationStyle(d.get("acceleration_style", AccelerationStyle.NONE.value)),
+            d.get("acceleration_threads", 1))
+        self.neighbor_settings = None
+        if d.get("neighbor_settings") is not None:
+            self.neighbor_settings = NeighborSettings()
+            self.neighbor_settings.from_dict(d["neighbor_settings"], version)
+        self.bbox_padding = None
+        if d.get("bbox_padding") is not None:
+            self.bbox_padding = LengthQuantity()
+            self.bbox_padding.from_dict(d["bbox_padding"], version)
 
     def get_default_thermo_variables(self) -> List[str]:
         """
@@ -160,13 +304,14 @@ class TypedMolecularSystem:
 
     def get_lammps_data_filename(self) -> str:
         """
-        Returns the name of the LAMMPS data file
+        Returns the name of the LAMMPS data file as written in the LAMMPS input file.
+        The name carries the extension of the compression style of the data file.
 
         Returns:
             str: name of the LAMMPS data file
         """
-        raise NotImplementedError(
-            f"Method not implemented by class {__class__}")
+        return "model.data" + get_extension_from_compression_style(
+            self.data_file_settings.get_compression())
 
 
 class ReaxTypedMolecularSystem(TypedMolecularSystem):
@@ -176,7 +321,7 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
     system as well as the corresponding start of the input file.
 
     Note:
-    - Only qeq and acks2 are currently supported for as electrostatic method. 
+    - Only qeq, qeq/shielded, and acks2 are currently supported for as electrostatic method.
     If another method is needed, please submit a ticket on Github.
 
     Lammps documentation: https://docs.lammps.org/pair_reaxff.html
@@ -195,6 +340,8 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
         """
         super().__init__(Forcefield.REAX, bbox_style)
         self.electrostatic_method = electrostatic_method
+        self.memory_settings = None
+        self.charge_equilibration = ChargeEquilibrationSettings()
 
         self.model_loaded = False
         self.molecule_content = ""
@@ -204,20 +351,12 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
         self.molecule_format = None
         self.atoms = None
 
-    def get_unit_system(self) -> LammpsUnitSystem:
-        """
-        Returns the Lammps unit system which for reax potential is always REAL
-
-        Returns:
-            LammpsUnitSystem: lammps unit system
-        """
-        return LammpsUnitSystem.REAL
-
     def load_from_file(
             self,
             molecule_path: Path,
             forcefield_path: Path,
-            format_hint: MoleculeFileFormat = None):
+            format_hint: MoleculeFileFormat = None,
+            frame: int = None):
         """
         Loads the molecule and potential files. For the molecule file, the function tries to 
         guess the format from the file extension or the format hint if provided by the user.
@@ -226,17 +365,21 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
         the job folder when producing the LAMMPS input files.
 
         Note:
-        - Only mol2, xyz, and lammpstrj are currently supported via the reader from ASE. 
+        - Only mol2, xyz, and lammpstrj are currently supported.
         If another format is needed, please submit a ticket on Github.
 
         Args:
             molecule_path: path to the molecule file
             forcefield_path: path to the forcefield file
             format_hint: hint for the molecule format
+            frame: index of the frame to load for multi-frame lammpstrj files.
+                   Negative values are counted from the end of the file (-1 is the last frame).
+                   Only the selected frame is read and kept. If None, the whole file is kept.
 
         Raises:
             FileNotFoundError: If the molecule or forcefield file is not found
             ValueError: If the forcefield file is not a rebo forcefield
+            ValueError: If a frame is requested for a format other than lammpstrj or doesn't exist
             NotImplementedError: If the molecule format is not supported
         """
         # Check for file exist
@@ -261,30 +404,35 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
         self.forcefield_name = Path(forcefield_path.name)
 
         # Read molecule
-        with open(molecule_path, "r", encoding="utf-8") as f:
-            self.molecule_content = f.read()
-            if format_hint is not None:
-                self.molecule_format = format_hint
-            elif self.molecule_name.suffix.lower() == ".xyz":
-                self.molecule_format = MoleculeFileFormat.XYZ
-            elif self.molecule_name.suffix.lower() == ".mol2":
-                self.molecule_format = MoleculeFileFormat.MOL2
-            elif self.molecule_name.suffix.lower() == ".lammpstrj":
-                self.molecule_format = MoleculeFileFormat.LAMMPS_DUMP_TEXT
-            else:  # Should never happen with after the format check above
-                raise NotImplementedError(
-                    f"Molecule format {self.molecule_name.suffix} not supported.")
+        if format_hint is not None:
+            self.molecule_format = format_hint
+        elif self.molecule_name.suffix.lower() == ".xyz":
+            self.molecule_format = MoleculeFileFormat.XYZ
+        elif self.molecule_name.suffix.lower() == ".mol2":
+            self.molecule_format = MoleculeFileFormat.MOL2
+        elif self.molecule_name.suffix.lower() == ".lammpstrj":
+            self.molecule_format = MoleculeFileFormat.LAMMPS_DUMP_TEXT
+        else:  # Should never happen with after the format check above
+            raise NotImplementedError(
+                f"Molecule format {self.molecule_name.suffix} not supported.")
+
+        if frame is not None:
+            if self.molecule_format != MoleculeFileFormat.LAMMPS_DUMP_TEXT:
+                raise ValueError(
+                    f"Frame selection is only supported for lammpstrj files, "
+                    f"got {self.molecule_format.name}.")
+            # Only the selected frame is kept as molecule content
+            self.molecule_content = read_lammps_dump_frame_from_file(molecule_path, frame)
+        else:
+            with open(molecule_path, "r", encoding="utf-8") as f:
+                self.molecule_content = f.read()
 
         # Read forcefield
         with open(forcefield_path, "r", encoding="utf-8") as f:
             self.forcefield_content = f.read()
 
-        # Load the ASE Atom object
-        if self.molecule_format == MoleculeFileFormat.LAMMPS_DUMP_TEXT:
-            with open(molecule_path, "r", encoding="utf-8") as f:
-                self.atoms = ase_read_lammps_dump_text(f)
-        else:
-            self.atoms = ase_read(molecule_path)
+        # The ASE Atom object is parsed on first access, see get_ase_model()
+        self.atoms = None
 
         self.model_loaded = True
 
@@ -304,7 +452,7 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
         the job folder when producing the LAMMPS input files.
 
         Note:
-        - Only mol2, xyz, and lammpstrj are currently supported via the reader from ASE. 
+        - Only mol2, xyz, and lammpstrj are currently supported.
         If another format is needed, please submit a ticket on Github.
 
         Args:
@@ -331,19 +479,8 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
         self.forcefield_content = forcefield_content
         self.forcefield_name = Path(forcefield_file_name)
 
-        # Create a temporary file to be read by ase
-        # This is wasteflul, but I haven't found a way to load a molecule into ASE from a string
-        job_folder = Path(tempfile.mkdtemp())
-        model_path = job_folder / \
-            Path("model." + get_extension_from_molecule_file_format(molecule_format))
-
-        with open(model_path, "w", encoding="utf-8") as f:
-            f.write(molecule_content)
-
-        self.atoms = ase_read(model_path)
-
-        # Remove temporary folder
-        shutil.rmtree(job_folder)
+        # The ASE Atom object is parsed on first access, see get_ase_model()
+        self.atoms = None
 
         self.model_loaded = True
 
@@ -358,11 +495,15 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
 
     def get_ase_model(self) -> Atoms:
         """
-        Returns the ASE atoms object. If a model is not currently loaded, then returns None
+        Returns the ASE atoms object. If a model is not currently loaded, then returns None.
+        The molecule content is parsed on the first call and the result is cached until
+        a new model is loaded. The returned object is shared and should not be modified.
 
         Returns:
             Atoms: ASE atoms object
         """
+        if self.atoms is None and self.model_loaded:
+            self.atoms = read_molecule_from_string(self.molecule_content, self.molecule_format)
         return self.atoms
 
     def get_molecule_content(self) -> str:
@@ -431,6 +572,54 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
         """
         self.electrostatic_method = electrostatic_method
 
+    def get_memory_settings(self) -> ReaxFFMemorySettings:
+        """
+        Returns the settings of the memory allocated by the reaxff pair style.
+
+        Returns:
+            ReaxFFMemorySettings: The memory settings, or None if the pair style
+                                  uses a mincap of 1000
+        """
+        return self.memory_settings
+
+    def set_memory_settings(self, memory_settings: ReaxFFMemorySettings):
+        """
+        Sets the settings of the memory allocated by the reaxff pair style. The settings
+        left to None are tuned from the model when generating the input script, see
+        ReaxFFMemorySettings. If None, the default, the pair style is declared with a
+        mincap of 1000 and the Lammps defaults for the other keywords.
+
+        Args:
+            memory_settings (ReaxFFMemorySettings): The memory settings
+
+        Returns:
+            None
+        """
+        self.memory_settings = memory_settings
+
+    def get_charge_equilibration(self) -> ChargeEquilibrationSettings:
+        """
+        Returns the settings of the charge equilibration fix.
+
+        Returns:
+            ChargeEquilibrationSettings: The charge equilibration settings
+        """
+        return self.charge_equilibration
+
+    def set_charge_equilibration(self, charge_equilibration: ChargeEquilibrationSettings):
+        """
+        Sets the settings of the charge equilibration fix. The settings left to None
+        are chosen from the workflow when generating the input script, see
+        ChargeEquilibrationSettings.
+
+        Args:
+            charge_equilibration (ChargeEquilibrationSettings): The charge equilibration settings
+
+        Returns:
+            None
+        """
+        self.charge_equilibration = charge_equilibration
+
     def to_dict(self) -> dict:
         """
         Returns the dictionary representation of the typed molecule
@@ -441,6 +630,9 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
         result = super().to_dict()
         result["class_name"] = self.__class__.__name__
         result["electrostatic_method"] = self.electrostatic_method.value
+        if self.memory_settings is not None:
+            result["memory_settings"] = self.memory_settings.to_dict()
+        result["charge_equilibration"] = self.charge_equilibration.to_dict()
         result["is_model_loaded"] = self.model_loaded
         if self.model_loaded:
             result["forcefield_name"] = str(self.forcefield_name)
@@ -472,6 +664,13 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
         super().from_dict(d, version=version)
         self.electrostatic_method = ElectrostaticMethod(
             d["electrostatic_method"])
+        self.memory_settings = None
+        if d.get("memory_settings") is not None:
+            self.memory_settings = ReaxFFMemorySettings()
+            self.memory_settings.from_dict(d["memory_settings"], version)
+        self.charge_equilibration = ChargeEquilibrationSettings()
+        if d.get("charge_equilibration") is not None:
+            self.charge_equilibration.from_dict(d["charge_equilibration"], version)
         self.model_loaded = d.get("is_model_loaded", False)
         if not self.model_loaded:
             print("Model not loaded when loading from json.")
@@ -504,12 +703,17 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
         Returns:
             GlobalInformation: The global information
         """
-        # TODO: Adjust code to handle the different bbox styles
         global_info = molecule_to_lammps_data_pbc(
             self.molecule_content,
             self.molecule_format,
             job_folder,
-            self.get_lammps_data_filename())
+            self.get_lammps_data_filename(),
+            atoms=self.get_ase_model(),
+            nb_workers=self.data_file_settings.get_nb_workers(),
+            compression=self.data_file_settings.get_compression(),
+            bbox_style=self.get_boundingbox_style(),
+            padding=self._get_bbox_padding_angstrom(),
+            atom_ordering=self.data_file_settings.get_atom_ordering())
 
         # Copy the forcefield to the job folder
         forcefield_path = job_folder / self.forcefield_name
@@ -543,16 +747,14 @@ class ReaxTypedMolecularSystem(TypedMolecularSystem):
             Forcefield.REAX,
             self.forcefield_name,
             global_information,
-            electrostatic_method=self.electrostatic_method)
-
-    def get_lammps_data_filename(self) -> str:
-        """
-        Returns the name of the lammps data file as written in the lammps input file.
-
-        Returns:
-            str: The name of the lammps data file
-        """
-        return "model.data"
+            electrostatic_method=self.electrostatic_method,
+            reaxff_memory_settings=self.get_memory_settings(),
+            charge_equilibration=self.get_charge_equilibration(),
+            acceleration_style=self.get_acceleration_style(),
+            acceleration_threads=self.get_acceleration_threads(),
+            neighbor_settings=self.get_neighbor_settings(),
+            atom_sort_frequency=self.data_file_settings.get_sort_frequency()
+            if self.data_file_settings.get_atom_ordering() != AtomOrdering.NONE else None)
 
     def get_default_thermo_variables(self) -> List[str]:
         """
@@ -632,7 +834,8 @@ class AireboTypedMolecularSystem(TypedMolecularSystem):
             self,
             molecule_path: Path,
             forcefield_path: Path,
-            format_hint: MoleculeFileFormat = None):
+            format_hint: MoleculeFileFormat = None,
+            frame: int = None):
         """
         Loads the molecule from a file. 
 
@@ -640,10 +843,15 @@ class AireboTypedMolecularSystem(TypedMolecularSystem):
             molecule_path (Path): The path to the molecule file
             forcefield_path (Path): The path to the forcefield file
             format_hint (MoleculeFileFormat, optional): The molecule format hint. Defaults to None.
+            frame (int, optional): The index of the frame to load for multi-frame lammpstrj files.
+                                   Negative values are counted from the end of the file
+                                   (-1 is the last frame). Only the selected frame is read and kept.
+                                   Defaults to None, keeping the whole file.
 
         Raises:
             FileNotFoundError: If the molecule or forcefield file is not found
             ValueError: If the forcefield file is not a rebo forcefield
+            ValueError: If a frame is requested for a format other than lammpstrj or doesn't exist
             NotImplementedError: If the molecule format is not supported
         """
         # Check for file exist
@@ -669,30 +877,35 @@ class AireboTypedMolecularSystem(TypedMolecularSystem):
         self.forcefield_name = Path(forcefield_path.name)
 
         # Read molecule
-        with open(molecule_path, "r", encoding="utf-8") as f:
-            self.molecule_content = f.read()
-            if format_hint is not None:
-                self.molecule_format = format_hint
-            elif self.molecule_name.suffix.lower() == ".xyz":
-                self.molecule_format = MoleculeFileFormat.XYZ
-            elif self.molecule_name.suffix.lower() == ".mol2":
-                self.molecule_format = MoleculeFileFormat.MOL2
-            elif self.molecule_name.suffix.lower() == ".lammpstrj":
-                self.molecule_format = MoleculeFileFormat.LAMMPS_DUMP_TEXT
-            else:  # Should never happen with after the format check above
-                raise NotImplementedError(
-                    f"Molecule format {self.molecule_name.suffix} not supported.")
+        if format_hint is not None:
+            self.molecule_format = format_hint
+        elif self.molecule_name.suffix.lower() == ".xyz":
+            self.molecule_format = MoleculeFileFormat.XYZ
+        elif self.molecule_name.suffix.lower() == ".mol2":
+            self.molecule_format = MoleculeFileFormat.MOL2
+        elif self.molecule_name.suffix.lower() == ".lammpstrj":
+            self.molecule_format = MoleculeFileFormat.LAMMPS_DUMP_TEXT
+        else:  # Should never happen with after the format check above
+            raise NotImplementedError(
+                f"Molecule format {self.molecule_name.suffix} not supported.")
+
+        if frame is not None:
+            if self.molecule_format != MoleculeFileFormat.LAMMPS_DUMP_TEXT:
+                raise ValueError(
+                    f"Frame selection is only supported for lammpstrj files, "
+                    f"got {self.molecule_format.name}.")
+            # Only the selected frame is kept as molecule content
+            self.molecule_content = read_lammps_dump_frame_from_file(molecule_path, frame)
+        else:
+            with open(molecule_path, "r", encoding="utf-8") as f:
+                self.molecule_content = f.read()
 
         # Read forcefield
         with open(forcefield_path, "r", encoding="utf-8") as f:
             self.forcefield_content = f.read()
 
-        # Load the ASE Atom object
-        if self.molecule_format == MoleculeFileFormat.LAMMPS_DUMP_TEXT:
-            with open(molecule_path, "r", encoding="utf-8") as f:
-                self.atoms = ase_read_lammps_dump_text(f)
-        else:
-            self.atoms = ase_read(molecule_path)
+        # The ASE Atom object is parsed on first access, see get_ase_model()
+        self.atoms = None
 
         self.model_loaded = True
 
@@ -733,18 +946,8 @@ class AireboTypedMolecularSystem(TypedMolecularSystem):
         self.forcefield_content = forcefield_content
         self.forcefield_name = Path(forcefield_file_name)
 
-        # Create a temporary file to be read by ase
-        job_folder = Path(tempfile.mkdtemp())
-        model_path = job_folder / \
-            Path("model." + get_extension_from_molecule_file_format(molecule_format))
-
-        with open(model_path, "w", encoding="utf-8") as f:
-            f.write(molecule_content)
-
-        self.atoms = ase_read(model_path)
-
-        # Remove temporary folder
-        shutil.rmtree(job_folder)
+        # The ASE Atom object is parsed on first access, see get_ase_model()
+        self.atoms = None
 
         self.model_loaded = True
 
@@ -759,11 +962,15 @@ class AireboTypedMolecularSystem(TypedMolecularSystem):
 
     def get_ase_model(self) -> Atoms:
         """
-        Returns the ASE atoms object. If the model is not loaded, return None
+        Returns the ASE atoms object. If the model is not loaded, return None.
+        The molecule content is parsed on the first call and the result is cached until
+        a new model is loaded. The returned object is shared and should not be modified.
 
         Returns:
             Atoms: The ASE atoms object
         """
+        if self.atoms is None and self.model_loaded:
+            self.atoms = read_molecule_from_string(self.molecule_content, self.molecule_format)
         return self.atoms
 
     def get_molecule_content(self) -> str:
@@ -895,12 +1102,17 @@ class AireboTypedMolecularSystem(TypedMolecularSystem):
         Returns:
             GlobalInformation: The global information
         """
-        # TODO: Adjust code to handle the different bbox styles
         global_info = molecule_to_lammps_data_pbc(
             self.molecule_content,
             self.molecule_format,
             job_folder,
-            self.get_lammps_data_filename())
+            self.get_lammps_data_filename(),
+            atoms=self.get_ase_model(),
+            nb_workers=self.data_file_settings.get_nb_workers(),
+            compression=self.data_file_settings.get_compression(),
+            bbox_style=self.get_boundingbox_style(),
+            padding=self._get_bbox_padding_angstrom(),
+            atom_ordering=self.data_file_settings.get_atom_ordering())
 
         # Copy the forcefield to the job folder
         forcefield_path = job_folder / self.forcefield_name
@@ -934,16 +1146,12 @@ class AireboTypedMolecularSystem(TypedMolecularSystem):
             self.ff_type,
             self.forcefield_name,
             global_information,
-            electrostatic_method=self.electrostatic_method)
-
-    def get_lammps_data_filename(self) -> str:
-        """
-        Returns the name of the lammps data file as written in the lammps input file.
-
-        Returns:
-            str: The name of the lammps data file
-        """
-        return "model.data"
+            electrostatic_method=self.electrostatic_method,
+            acceleration_style=self.get_acceleration_style(),
+            acceleration_threads=self.get_acceleration_threads(),
+            neighbor_settings=self.get_neighbor_settings(),
+            atom_sort_frequency=self.data_file_settings.get_sort_frequency()
+            if self.data_file_settings.get_atom_ordering() != AtomOrdering.NONE else None)
 
     def get_default_thermo_variables(self) -> List[str]:
         """
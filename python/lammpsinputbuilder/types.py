@@ -1,7 +1,8 @@
 """Module containing types for lammpsinputbuilder."""
 
 from enum import IntEnum
-from typing import List
+from typing import List, Union, Callable
+import numpy as np
 from ase import Atoms
 from lammpsinputbuilder.quantities import LammpsUnitSystem
 
@@ -133,12 +134,96 @@ def get_extension_from_molecule_file_format(
     raise NotImplementedError(f"Molecule format {molecule_file_format} not supported.")
 
 
+class CompressionStyle(IntEnum):
+    """
+    Enumeration for the supported compression styles of the Lammps data file
+    """
+    NONE = 1
+    GZIP = 2
+    ZSTD = 3
+
+
+def get_extension_from_compression_style(compression_style: CompressionStyle) -> str:
+    """
+    Get the file extension appended to a compressed file from a compression style enum.
+    The extension is empty if the file is not compressed.
+
+    Args:
+        compression_style (CompressionStyle): The compression style enum
+
+    Returns:
+        str: The file extension
+
+    Raises:
+        NotImplementedError: If the compression style is not supported
+    """
+    if compression_style == CompressionStyle.NONE:
+        return ""
+    if compression_style == CompressionStyle.GZIP:
+        return ".gz"
+    if compression_style == CompressionStyle.ZSTD:
+        return ".zst"
+
+    raise NotImplementedError(f"Compression style {compression_style} not supported.")
+
+
 class ElectrostaticMethod(IntEnum):
     """
     Enumeration for the supported electrostatic methods
     """
     ACKS2 = 1
     QEQ = 2
+    QEQ_SHIELDED = 3
+
+
+class AccelerationStyle(IntEnum):
+    """
+    Enumeration for the supported Lammps accelerator packages
+    """
+    NONE = 1
+    OPENMP = 2
+    OPT = 3
+    INTEL = 4
+
+
+class AtomOrdering(IntEnum):
+    """
+    Enumeration for the orders in which the atoms are written in the Lammps data file.
+    NONE keeps the order of the model, MORTON and HILBERT sort the atoms along
+    a space-filling curve over the simulation box.
+    """
+    NONE = 1
+    MORTON = 2
+    HILBERT = 3
+
+
+class WorkflowContext:
+    """
+    Container for the state of the workflow being converted into Lammps commands.
+    The state is filled by the WorkflowBuilder before the conversion starts and is
+    read by the LIB objects through the GlobalInformation object.
+
+    Attributes:
+        job_folder (Path): The job folder receiving the generated files,
+                           or None if the inputs are not generated in a job folder
+        domain_decomposition (DomainDecomposition): The domain decomposition settings,
+                                                    or None if not set
+        group_resolver (GroupResolver): The resolver evaluating the groups in Python,
+                                        or None to let Lammps evaluate the groups
+        group_slot_tracker (GroupSlotTracker): The tracker counting the groups declared
+                                               to Lammps, or None if not tracked
+        static_workflow (bool): True if the workflow only minimizes or evaluates configurations,
+                                without running any dynamics
+        energy_decomposition_required (bool): True if the variables decomposing the energy of
+                                              the forcefield are read by the workflow
+    """
+    def __init__(self) -> None:
+        self.job_folder = None
+        self.domain_decomposition = None
+        self.group_resolver = None
+        self.group_slot_tracker = None
+        self.static_workflow = False
+        self.energy_decomposition_required = True
 
 
 class GlobalInformation:
@@ -155,12 +240,17 @@ class GlobalInformation:
         self.atoms = None
         self.bbox_coords = None
         self.bbox_dims = None
+        self.workflow_context = WorkflowContext()
+        self.boundary = ["p", "p", "p"]
+        self.atom_id_map = None
+        self.model_indices = None
 
-    def set_atoms(self, atoms: Atoms):
+    def set_atoms(self, atoms: Union[Atoms, Callable[[], Atoms]]):
         """
-        Set the atoms object from loading a ASE model.
+        Set the atoms object from loading a ASE model. A callable producing the atoms
+        object can be given instead, it is only called the first time the atoms are read.
         Args:
-            atoms (Atoms): The atoms object
+            atoms (Union[Atoms, Callable[[], Atoms]]): The atoms object, or a callable returning it
         """
         self.atoms = atoms
 
@@ -170,6 +260,8 @@ class GlobalInformation:
         Returns:
             Atoms: The atoms object
         """
+        if callable(self.atoms):
+            self.atoms = self.atoms()
         return self.atoms
 
     def set_bbox_coords(self, bbox_coords: List[float]):
@@ -245,3 +337,106 @@ class GlobalInformation:
             dict: The element table
         """
         return self.element_table
+
+    def set_boundary(self, boundary: List[str]):
+        """
+        Set the Lammps boundary of each dimension of the simulation box, ex: ["p", "p", "s"].
+
+        Args:
+            boundary (List[str]): The boundary styles along x, y, and z
+
+        Raises:
+            ValueError: If the boundary doesn't have 3 valid styles
+        """
+        if len(boundary) != 3 or any(b not in ["p", "s", "f", "m"] for b in boundary):
+            raise ValueError(f"Invalid boundary {boundary}, expected 3 styles among p, s, f, m.")
+        self.boundary = list(boundary)
+
+    def get_boundary(self) -> List[str]:
+        """
+        Get the Lammps boundary of each dimension of the simulation box.
+        Returns:
+            List[str]: The boundary styles along x, y, and z
+        """
+        return self.boundary
+
+    def get_min_periodic_dim(self) -> float:
+        """
+        Get the smallest dimension of the simulation box among the periodic dimensions.
+        Returns:
+            float: The smallest periodic dimension, or infinity if no dimension is periodic
+        """
+        periodic_dims = [dim for dim, b in zip(self.bbox_dims, self.boundary) if b == "p"]
+        return min(periodic_dims) if periodic_dims else float("inf")
+
+    def set_atom_id_map(self, atom_id_map: np.ndarray):
+        """
+        Set the Lammps id of each atom of the model when the atoms are not written
+        in the order of the model in the data file. The map must have the form
+        atom_id_map[i - 1] = Lammps id of the atom i of the model.
+        Args:
+            atom_id_map (np.ndarray): The Lammps ids, or None if the atoms are
+                                      written in the order of the model
+
+        Raises:
+            ValueError: If the map is not a permutation of the ids 1 to N
+        """
+        if atom_id_map is None:
+            self.atom_id_map = None
+            self.model_indices = None
+            return
+        atom_id_map = np.asarray(atom_id_map, dtype=np.int64)
+        model_indices = np.zeros(len(atom_id_map), dtype=np.int64)
+        if len(atom_id_map) > 0 and (atom_id_map.min() < 1 or atom_id_map.max() > len(atom_id_map)):
+            raise ValueError("Invalid atom id map, expected a permutation of the ids "
+                             f"1 to {len(atom_id_map)}.")
+        model_indices[atom_id_map - 1] = np.arange(1, len(atom_id_map) + 1)
+        if np.any(model_indices == 0):
+            raise ValueError("Invalid atom id map, expected a permutation of the ids "
+                             f"1 to {len(atom_id_map)}.")
+        self.atom_id_map = atom_id_map
+        self.model_indices = model_indices
+
+    def get_atom_id_map(self) -> np.ndarray:
+        """
+        Get the Lammps id of each atom of the model.
+        Returns:
+            np.ndarray: The Lammps ids, or None if the atoms are written in the order of the model
+        """
+        return self.atom_id_map
+
+    def get_lammps_ids(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Convert 1-based indices of atoms of the model into Lammps ids.
+        Args:
+            indices (np.ndarray): The 1-based indices of the atoms in the model
+
+        Returns:
+            np.ndarray: The Lammps ids of the atoms
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if self.atom_id_map is None:
+            return indices
+        return self.atom_id_map[indices - 1]
+
+    def get_model_indices(self, lammps_ids: np.ndarray) -> np.ndarray:
+        """
+        Convert Lammps ids into 1-based indices of atoms of the model.
+        Args:
+            lammps_ids (np.ndarray): The Lammps ids of the atoms
+
+        Returns:
+            np.ndarray: The 1-based indices of the atoms in the model
+        """
+        lammps_ids = np.asarray(lammps_ids, dtype=np.int64)
+        if self.model_indices is None:
+            return lammps_ids
+        return self.model_indices[lammps_ids - 1]
+
+    def get_workflow_context(self) -> WorkflowContext:
+        """
+        Get the state of the workflow being converted into Lammps commands.
+        Returns:
+            WorkflowContext: The workflow context
+        """
+        return self.workflow_context
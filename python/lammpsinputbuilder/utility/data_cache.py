@@ -0,0 +1,315 @@
+"""
+Module containing a content-addressed cache for the files generated by a TypedMolecularSystem.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Tuple, Optional
+
+from lammpsinputbuilder.types import GlobalInformation
+from lammpsinputbuilder.quantities import LammpsUnitSystem
+from lammpsinputbuilder.utility.model_to_data import DATA_FILE_WRITER_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Name of the file storing the GlobalInformation of a cache entry.
+# The modification time of this file is used as the last access time of the entry.
+CACHE_ENTRY_INFO_FILENAME = "global_information.json"
+CACHE_ENTRY_FILES_DIRNAME = "files"
+
+# Settings of the serialized molecular system used to generate the data file and
+# the copies of the model and the forcefield. The other settings only change the
+# input script and don't invalidate a cache entry.
+DATA_FILE_SETTINGS = (
+    "class_name",
+    "forcefield",
+    "molecule_name",
+    "molecule_format",
+    "molecule_content",
+    "forcefield_name",
+    "forcefield_content",
+    "bbox_style",
+    "bbox_padding"
+)
+
+# Settings of the serialized DataFileSettings changing the data file. The number of
+# processes formatting the file and the sort frequency don't change its content.
+DATA_FILE_WRITER_SETTINGS = (
+    "compression",
+    "atom_ordering"
+)
+
+
+class DataFileCache:
+    """
+    Content-addressed cache of the files produced by TypedMolecularSystem.generate_lammps_data_file().
+    Each entry is keyed by a hash of the settings of the molecular system used to generate the
+    data file (molecule content and format, forcefield content, bounding box style and padding,
+    atom ordering, and compression) and of the version of the data file writer.
+
+    On a hit, the cached files are hardlinked into the new job folder, or copied if the
+    cache and the job folder are on different filesystems, and the GlobalInformation
+    (element table, bounding box, unit style, atom id map) is restored without parsing the model again.
+    Since the files are hardlinked, they must not be modified in place in the job folder.
+
+    The cache is bounded in size. When the total size of the entries exceeds the limit,
+    the least recently used entries are removed.
+    """
+
+    def __init__(self, cache_dir: Path, max_size_bytes: int = 10 * 1024 ** 3) -> None:
+        """
+        Constructor
+
+        Args:
+            cache_dir (Path): The folder containing the cache entries. Created if it doesn't exist.
+            max_size_bytes (int): The maximum size of the cache in bytes
+
+        Raises:
+            ValueError: If the maximum size is not positive
+        """
+        if max_size_bytes <= 0:
+            raise ValueError(f"Invalid cache size {max_size_bytes}, must be positive.")
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get_cache_dir(self) -> Path:
+        """
+        Get the folder containing the cache entries.
+
+        Returns:
+            Path: The cache folder
+        """
+        return self.cache_dir
+
+    def get_max_size_bytes(self) -> int:
+        """
+        Get the maximum size of the cache in bytes.
+
+        Returns:
+            int: The maximum size of the cache
+        """
+        return self.max_size_bytes
+
+    def compute_key(self, molecule) -> str:
+        """
+        Compute the key of a molecular system. The key covers the settings used to
+        generate the data file, see DATA_FILE_SETTINGS and DATA_FILE_WRITER_SETTINGS, as
+        well as the version of the data file writer. The settings only affecting the input
+        script are ignored.
+
+        Args:
+            molecule (TypedMolecularSystem): The molecular system
+
+        Returns:
+            str: The key of the molecular system
+        """
+        hasher = hashlib.sha256()
+        hasher.update(f"writer_version={DATA_FILE_WRITER_VERSION}\n".encode("utf-8"))
+        molecule_dict = molecule.to_dict()
+        data_file_dict = molecule_dict.get("data_file_settings", {})
+        settings = [(key, molecule_dict.get(key)) for key in DATA_FILE_SETTINGS]
+        settings += [(f"data_file_{key}", data_file_dict.get(key))
+                     for key in DATA_FILE_WRITER_SETTINGS]
+        # Hash the values one by one to avoid building a copy of the
+        # molecule content in a single json string.
+        for key, value in settings:
+            hasher.update(f"{key}=".encode("utf-8"))
+            if isinstance(value, str):
+                hasher.update(f"{len(value)}:".encode("utf-8"))
+                hasher.update(value.encode("utf-8"))
+            else:
+                hasher.update(json.dumps(value, sort_keys=True).encode("utf-8"))
+            hasher.update(b"\n")
+        return hasher.hexdigest()
+
+    def get_entry_path(self, key: str) -> Path:
+        """
+        Get the folder of a cache entry.
+
+        Args:
+            key (str): The key of the entry
+
+        Returns:
+            Path: The folder of the entry
+        """
+        return self.cache_dir / key
+
+    def restore(self, key: str, job_folder: Path) -> Optional[GlobalInformation]:
+        """
+        Restore a cache entry into a job folder.
+
+        Args:
+            key (str): The key of the entry
+            job_folder (Path): The job folder receiving the files of the entry
+
+        Returns:
+            Optional[GlobalInformation]: A new global information restored from the entry,
+                                         or None if the entry doesn't exist
+        """
+        entry_path = self.get_entry_path(key)
+        info_path = entry_path / CACHE_ENTRY_INFO_FILENAME
+        if not info_path.is_file():
+            return None
+
+        try:
+            with open(info_path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            files_path = entry_path / CACHE_ENTRY_FILES_DIRNAME
+            for cached_file in files_path.iterdir():
+                link_or_copy(cached_file, job_folder / cached_file.name)
+        except OSError as e:
+            # The entry may have been evicted by another process in the meantime
+            logger.warning("Unable to restore the cache entry %s: %s", key, e)
+            return None
+
+        # Mark the entry as the most recently used
+        os.utime(info_path)
+
+        logger.debug("DataFileCache restored the entry %s into %s", key, job_folder)
+        return dict_to_global_information(info)
+
+    def store(self, key: str, job_folder: Path, global_information: GlobalInformation) -> None:
+        """
+        Store the files of a job folder as a new cache entry. All the files currently
+        present at the root of the job folder are added to the entry. If the entry
+        already exists, the cache is left unchanged.
+
+        Args:
+            key (str): The key of the entry
+            job_folder (Path): The job folder containing the generated files
+            global_information (GlobalInformation): The global information produced with the files
+        """
+        entry_path = self.get_entry_path(key)
+        if entry_path.is_dir():
+            return
+
+        # Build the entry in a temporary folder first so that a partially
+        # written entry is never visible to other processes.
+        temp_path = Path(tempfile.mkdtemp(prefix=".tmp", dir=self.cache_dir))
+        try:
+            files_path = temp_path / CACHE_ENTRY_FILES_DIRNAME
+            files_path.mkdir()
+            for job_file in Path(job_folder).iterdir():
+                if job_file.is_file():
+                    link_or_copy(job_file, files_path / job_file.name)
+            with open(temp_path / CACHE_ENTRY_INFO_FILENAME, "w", encoding="utf-8") as f:
+                json.dump(global_information_to_dict(global_information), f)
+            os.rename(temp_path, entry_path)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(temp_path, ignore_errors=True)
+            return
+
+        logger.debug("DataFileCache stored the entry %s", key)
+        self.evict(keep=[key])
+
+    def get_entries(self) -> List[Tuple[str, float, int]]:
+        """
+        Get the list of entries currently in the cache.
+
+        Returns:
+            List[Tuple[str, float, int]]: The key, last access time, and size in bytes of
+                                          each entry, from the least to the most recently used
+        """
+        entries = []
+        for entry_path in self.cache_dir.iterdir():
+            info_path = entry_path / CACHE_ENTRY_INFO_FILENAME
+            if entry_path.name.startswith(".") or not info_path.is_file():
+                continue
+            try:
+                last_access = info_path.stat().st_mtime
+                size = sum(f.stat().st_size for f in entry_path.rglob("*") if f.is_file())
+            except OSError:
+                continue
+            entries.append((entry_path.name, last_access, size))
+        entries.sort(key=lambda entry: entry[1])
+        return entries
+
+    def evict(self, keep: List[str] = None) -> None:
+        """
+        Remove the least recently used entries until the cache fits in its maximum size.
+
+        Args:
+            keep (List[str]): Keys of entries which must not be removed
+        """
+        if keep is None:
+            keep = []
+        entries = self.get_entries()
+        total_size = sum(entry[2] for entry in entries)
+        for key, _, size in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            if key in keep:
+                continue
+            shutil.rmtree(self.get_entry_path(key), ignore_errors=True)
+            total_size -= size
+            logger.debug("DataFileCache evicted the entry %s", key)
+
+
+def link_or_copy(source: Path, destination: Path) -> None:
+    """
+    Hardlink a file, or copy it if a hardlink cannot be created
+    (different filesystems, unsupported by the filesystem, etc).
+
+    Args:
+        source (Path): The file to link
+        destination (Path): The path of the new file
+    """
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def global_information_to_dict(global_information: GlobalInformation) -> dict:
+    """
+    Generate a dictionary representation of the part of a GlobalInformation
+    produced when generating the data file.
+
+    Args:
+        global_information (GlobalInformation): The global information
+
+    Returns:
+        dict: The dictionary representation
+    """
+    result = {}
+    unit_style = global_information.get_unit_style()
+    result["unit_style"] = unit_style.value if unit_style is not None else None
+    result["element_table"] = {
+        str(k): v for k, v in global_information.get_element_table().items()}
+    bbox_coords = global_information.get_bbox_coords()
+    result["bbox_coords"] = [float(c) for c in bbox_coords] if bbox_coords is not None else None
+    result["boundary"] = global_information.get_boundary()
+    atom_id_map = global_information.get_atom_id_map()
+    result["atom_id_map"] = atom_id_map.tolist() if atom_id_map is not None else None
+    return result
+
+
+def dict_to_global_information(d: dict) -> GlobalInformation:
+    """
+    Create a GlobalInformation from its dictionary representation.
+
+    Args:
+        d (dict): The dictionary representation
+
+    Returns:
+        GlobalInformation: The global information
+    """
+    global_information = GlobalInformation()
+    if d.get("unit_style") is not None:
+        global_information.set_unit_style(LammpsUnitSystem(d["unit_style"]))
+    global_information.set_element_table(
+        {int(k): v for k, v in d.get("element_table", {}).items()})
+    if d.get("bbox_coords") is not None:
+        global_information.set_bbox_coords(d["bbox_coords"])
+    if d.get("boundary") is not None:
+        global_information.set_boundary(d["boundary"])
+    if d.get("atom_id_map") is not None:
+        global_information.set_atom_id_map(d["atom_id_map"])
+    return global_information
@@ -2,16 +2,31 @@
 Module containing functions for converting models to LAMMPS data files.
 """
 
+import gzip
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
 from pathlib import Path
+from typing import Dict, List, Tuple, TextIO
 
-from ase.io import write, read
-from ase.io.lammpsrun import read_lammps_dump_text as ase_read_lammps_dump_text
+from ase import Atoms
 
 import numpy as np
 
 from lammpsinputbuilder.types import MoleculeFileFormat, Forcefield, \
-    ElectrostaticMethod, GlobalInformation
+    ElectrostaticMethod, GlobalInformation, CompressionStyle, AccelerationStyle, \
+    BoundingBoxStyle, AtomOrdering
 from lammpsinputbuilder.quantities import LammpsUnitSystem
+from lammpsinputbuilder.utility.molecule_reader import read_molecule_from_string
+from lammpsinputbuilder.utility.spatial_order import compute_atom_order, get_atom_id_map
+from lammpsinputbuilder.neighbor import NeighborSettings
+from lammpsinputbuilder.reaxff_memory import ReaxFFMemorySettings, REAXFF_HBOND_CUTOFF, \
+    REAXFF_BOND_CUTOFF
+from lammpsinputbuilder.charge_equilibration import ChargeEquilibrationSettings, \
+    ChargeEquilibrationPolicy, get_electrostatic_fix_style, DEFAULT_QEQ_CUTOFF
+
+logger = logging.getLogger(__name__)
 
 
 def extract_elements_from_data(data_path: str) -> str:
@@ -38,14 +53,299 @@ def extract_elements_from_data(data_path: str) -> str:
     return elements
 
 
+# Version of the data file writer. Must be increased whenever the content
+# of the generated data files changes for the same input so that cached
+# data files are invalidated.
+DATA_FILE_WRITER_VERSION = 1
+
+# Format of a line of the Atoms section for the atom_style full:
+# atom-ID molecule-ID atom-type q x y z
+# The layout matches the one produced by ase.io.write for lammps-data files.
+ATOMS_FULL_LINE_FORMAT = "%6d %3d %3d %5r %23.17g %23.17g %23.17g\n"
+
+# Number of atoms formatted at once when writing the Atoms section.
+# Bounds the size of the intermediate strings held in memory.
+ATOMS_CHUNK_SIZE = 100000
+
+# Number of chunks queued per worker when formatting the Atoms section
+# in parallel. Bounds the number of formatted chunks waiting to be written.
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# Compression level used for gzip data files. Favor speed over size since
+# the data files are written for every job.
+GZIP_COMPRESSION_LEVEL = 1
+
+
+def open_data_file(data_path: Path, compression: CompressionStyle) -> TextIO:
+    """
+    Open a data file in text mode for writting, compressing it on the fly if requested.
+    Lammps reads compressed data files natively based on their extension.
+
+    Args:
+        data_path (Path): The path of the data file to write
+        compression (CompressionStyle): The compression style
+
+    Returns:
+        TextIO: The file handle
+
+    Raises:
+        ImportError: If the zstd compression is requested but the zstandard package
+                     is not installed
+        NotImplementedError: If the compression style is not supported
+    """
+    if compression == CompressionStyle.NONE:
+        return open(data_path, 'w', encoding="utf-8")
+    if compression == CompressionStyle.GZIP:
+        return gzip.open(
+            data_path, 'wt', encoding="utf-8", compresslevel=GZIP_COMPRESSION_LEVEL)
+    if compression == CompressionStyle.ZSTD:
+        try:
+            import zstandard  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise ImportError(
+                "The zstandard package is required to write zstd compressed data files. "
+                "Install it with 'pip install zstandard'.") from e
+        return zstandard.open(data_path, 'wt', encoding="utf-8")
+
+    raise NotImplementedError(f"Compression style {compression} not supported.")
+
+
+def get_atom_types(atoms: Atoms) -> Tuple[np.ndarray, Dict[int, str], List[float]]:
+    """
+    Compute the Lammps atom types of a molecular system. Types are assigned
+    by sorting the chemical symbols alphabetically, starting from 1.
+
+    Args:
+        atoms (Atoms): The ASE model of the molecular system
+
+    Returns:
+        Tuple[np.ndarray, Dict[int, str], List[float]]: The type of each atom,
+        the element table {lammps_type: element_name}, and the mass of each type
+    """
+    symbols = np.asarray(atoms.get_chemical_symbols())
+    species, first_indices, inverse = np.unique(
+        symbols, return_index=True, return_inverse=True)
+    masses = atoms.get_masses()
+    element_table = {i + 1: str(symbol) for i, symbol in enumerate(species)}
+    masses_u = [float(masses[index]) for index in first_indices]
+    return inverse.reshape(-1) + 1, element_table, masses_u
+
+
+def format_atoms_full_lines(
+        first_id: int,
+        types: np.ndarray,
+        charges: np.ndarray,
+        positions: np.ndarray) -> str:
+    """
+    Format a contiguous block of atoms as lines of an Atoms section with the
+    atom_style full. All the atoms are assigned to the molecule 0.
+
+    Args:
+        first_id (int): The Lammps id of the first atom of the block
+        types (np.ndarray): The Lammps type of each atom of the block
+        charges (np.ndarray): The charge of each atom of the block
+        positions (np.ndarray): The positions of the atoms of the block, shape (n, 3)
+
+    Returns:
+        str: The formatted lines
+    """
+    nb_atoms = len(types)
+    if nb_atoms == 0:
+        return ""
+    # Interleave the columns as Python objects so that the whole block
+    # can be formatted with a single % operation.
+    xcoords, ycoords, zcoords = np.asarray(positions, dtype=np.float64).T.tolist()
+    values = tuple(chain.from_iterable(zip(
+        range(first_id, first_id + nb_atoms),
+        repeat(0, nb_atoms),
+        np.asarray(types, dtype=np.int64).tolist(),
+        np.asarray(charges, dtype=np.float64).tolist(),
+        xcoords, ycoords, zcoords)))
+    return (ATOMS_FULL_LINE_FORMAT * nb_atoms) % values
+
+
+def write_lammps_data_full(
+        data_path: Path,
+        positions: np.ndarray,
+        types: np.ndarray,
+        charges: np.ndarray,
+        element_table: Dict[int, str],
+        masses: List[float],
+        bbox_coords: List[float],
+        nb_workers: int = 1,
+        chunk_size: int = ATOMS_CHUNK_SIZE,
+        compression: CompressionStyle = CompressionStyle.NONE) -> None:
+    """
+    Write a Lammps data file with the atom_style full in a single pass.
+
+    The Atoms section is split into contiguous chunks of atoms. With more than one
+    worker, the chunks are formatted in a process pool and written back in order,
+    producing the same file as the serial path. At most a few chunks per worker
+    are held in memory at any time.
+
+    Args:
+        data_path (Path): The path of the data file to write
+        positions (np.ndarray): The positions of the atoms, shape (n, 3)
+        types (np.ndarray): The Lammps type of each atom
+        charges (np.ndarray): The charge of each atom
+        element_table (Dict[int, str]): The element table {lammps_type: element_name}
+        masses (List[float]): The mass of each Lammps type
+        bbox_coords (List[float]): The simulation box [x0, x1, y0, y1, z0, z1]
+        nb_workers (int): The number of processes used to format the Atoms section
+        chunk_size (int): The number of atoms formatted per chunk
+        compression (CompressionStyle): The compression applied to the data file
+
+    Raises:
+        ValueError: If the number of workers or the chunk size is lower than 1
+    """
+    if nb_workers < 1:
+        raise ValueError(f"Invalid number of workers {nb_workers}, must be at least 1.")
+    if chunk_size < 1:
+        raise ValueError(f"Invalid chunk size {chunk_size}, must be at least 1.")
+
+    nb_atoms = len(types)
+    with open_data_file(data_path, compression) as f:
+        f.write('# Generated by LammpsInputBuilder\n')
+        f.write(f"{nb_atoms} atoms\n")
+        f.write(f"{len(element_table)} atom types\n")
+        f.write('\n')
+        f.write(f"{bbox_coords[0]}\t{bbox_coords[1]} xlo xhi\n")
+        f.write(f"{bbox_coords[2]}\t{bbox_coords[3]} ylo yhi\n")
+        f.write(f"{bbox_coords[4]}\t{bbox_coords[5]} zlo zhi\n")
+
+        # Insert the masses in the data file so it doesn't have to be added
+        # separatly in the script file
+        f.write('\n')
+        f.write('Masses\n')
+        f.write('\n')
+        for i, mass in enumerate(masses):
+            f.write(f'{i + 1} {mass} # {element_table[i + 1]}\n')
+        f.write('\n')
+        f.write('Atoms # full\n')
+        f.write('\n')
+
+        chunks = ((start, min(start + chunk_size, nb_atoms))
+                  for start in range(0, nb_atoms, chunk_size))
+
+        if nb_workers == 1 or nb_atoms <= chunk_size:
+            for start, end in chunks:
+                f.write(format_atoms_full_lines(
+                    start + 1, types[start:end], charges[start:end], positions[start:end]))
+            return
+
+        # Keep a bounded window of chunks in the pool and write them in
+        # submission order so the output matches the serial path.
+        with ProcessPoolExecutor(max_workers=nb_workers) as executor:
+            pending = deque()
+            for start, end in chunks:
+                pending.append(executor.submit(
+                    format_atoms_full_lines,
+                    start + 1, types[start:end], charges[start:end], positions[start:end]))
+                if len(pending) >= nb_workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                    f.write(pending.popleft().result())
+            while pending:
+                f.write(pending.popleft().result())
+
+
+# Padding added around the atoms along the dimensions without a periodic cell, in
+# Angstrom. Periodic dimensions need enough vacuum to avoid the interaction of the
+# atoms with their periodic images. Shrink-wrapped dimensions are adjusted by Lammps
+# to the atoms, the padding only defines the initial box.
+DEFAULT_PERIODIC_PADDING = 50.0
+DEFAULT_SHRINK_PADDING = 1.0
+
+
+def compute_bounding_box(
+        atoms: Atoms,
+        bbox_style: BoundingBoxStyle = BoundingBoxStyle.PERIODIC,
+        padding: float = None) -> Tuple[List[float], List[str]]:
+    """
+    Compute the simulation box and the Lammps boundary of a model. The dimensions
+    along which the model carries a periodic orthogonal cell (extended xyz lattice,
+    lammpstrj box) keep the bounds of the cell and are periodic. The other dimensions
+    are fitted to the atoms with a padding, and are either periodic or shrink-wrapped
+    depending on the bounding box style.
+
+    Args:
+        atoms (Atoms): The ASE model
+        bbox_style (BoundingBoxStyle): The bounding box style
+        padding (float): The padding around the atoms in Angstrom. If None,
+                         DEFAULT_PERIODIC_PADDING or DEFAULT_SHRINK_PADDING is used
+
+    Returns:
+        Tuple[List[float], List[str]]: The box coordinates [x0, x1, y0, y1, z0, z1]
+                                       and the boundary of each dimension ("p" or "s")
+
+    Raises:
+        ValueError: If the model is empty or the padding is negative
+    """
+    positions = np.asarray(atoms.get_positions())
+    if len(positions) == 0:
+        raise ValueError("Cannot write a LAMMPS data file for an empty model.")
+    if padding is not None and padding < 0:
+        raise ValueError(f"Invalid padding {padding}, must be positive.")
+    if bbox_style == BoundingBoxStyle.SHRINK:
+        boundary_style = "s"
+        default_padding = DEFAULT_SHRINK_PADDING
+    else:
+        boundary_style = "p"
+        default_padding = DEFAULT_PERIODIC_PADDING
+    if padding is None:
+        padding = default_padding
+
+    # The bounding box is computed from the positions rather than the cell
+    # to handle cases where positions can be in the negative.
+    # Doing it now avoid the need to translate back the trajectory later on to
+    # match the user input.
+    coords_min = positions.min(axis=0)
+    coords_max = positions.max(axis=0)
+
+    cell = np.asarray(atoms.get_cell())
+    pbc = atoms.get_pbc()
+    origin = atoms.get_celldisp().reshape(-1)
+    is_orthogonal = np.allclose(cell - np.diag(np.diag(cell)), 0.0)
+    if np.any(pbc) and not is_orthogonal:
+        logger.warning("The cell of the model is not orthogonal, it is replaced "
+                       "by a box fitted to the atoms.")
+
+    bbox_coords = []
+    boundary = []
+    for dim in range(3):
+        if pbc[dim] and is_orthogonal and cell[dim, dim] > 0:
+            bbox_coords += [float(origin[dim]), float(origin[dim] + cell[dim, dim])]
+            boundary.append("p")
+        else:
+            bbox_coords += [float(coords_min[dim]) - padding, float(coords_max[dim]) + padding]
+            boundary.append(boundary_style)
+    return bbox_coords, boundary
+
+
 def molecule_to_lammps_data_pbc(
         molecule_content: str,
         molecule_file_format: MoleculeFileFormat,
         job_folder: Path,
-        data_filename: str) -> GlobalInformation:
+        data_filename: str,
+        atoms: Atoms = None,
+        nb_workers: int = 1,
+        compression: CompressionStyle = CompressionStyle.NONE,
+        bbox_style: BoundingBoxStyle = BoundingBoxStyle.PERIODIC,
+        padding: float = None,
+        atom_ordering: AtomOrdering = AtomOrdering.NONE) -> GlobalInformation:
     """
     Convert a molecule from XYZ or MOL2 format to a LAMMPS data file.
-    TODO: add support for PBC/Shrink
+    The data file is written directly from the positions, types and charges
+    of the model. The element table, bounding box and ASE model are returned
+    in the GlobalInformation object.
+    If the ASE model of the molecule is already available, it is used as is
+    instead of parsing the molecule content again. The model is not modified.
+    The Atoms section is formatted with nb_workers processes. The data file
+    is compressed according to the compression style, data_filename is expected
+    to carry the matching extension.
+    The simulation box and its boundary follow the bounding box style and the
+    cell of the model, see compute_bounding_box().
+    With an atom ordering other than NONE, the atoms are written along a space-filling
+    curve over the box. The ASE model keeps the order of the molecule and the Lammps id
+    of each atom of the model is stored in the atom id map of the GlobalInformation.
     """
 
     global_information = GlobalInformation()
@@ -63,129 +363,207 @@ def molecule_to_lammps_data_pbc(
     with open(molecule_path, 'w', encoding="utf-8") as f:
         f.write(molecule_content)
 
-    if molecule_file_format == MoleculeFileFormat.LAMMPS_DUMP_TEXT:
-        with open(molecule_path, "r", encoding="utf-8") as f:
-            atoms = ase_read_lammps_dump_text(f)
-    else:
-        atoms = read(molecule_path)
-
-    # Default cell, will be overwritten when rewritting the data file.
-    atoms.set_cell([500, 500, 500])
+    if atoms is None:
+        atoms = read_molecule_from_string(molecule_content, molecule_file_format)
 
     global_information.set_atoms(atoms)
 
-    # Write a temporary data file which doesn't contain mass information yet
-    temp_data_path = job_folder / (str(data_filename) + '.temp')
-    write(
-        filename=temp_data_path,
-        images=atoms,
-        format='lammps-data',
-        atom_style='full')
-
-    # ASE always write the bounding starting from 0,0,0
-    # We have to rewrite it manually to handle cases where positions can be in the negative
-    # Doing it now avoir the need to translate back the trajectory later on to
-    # match the user input.
-    positions = np.array(atoms.get_positions())
+    bbox_coords, boundary = compute_bounding_box(atoms, bbox_style, padding)
+    global_information.set_bbox_coords(bbox_coords)
+    global_information.set_boundary(boundary)
+    positions = np.asarray(atoms.get_positions())
+
+    types, element_table, masses = get_atom_types(atoms)
+    global_information.set_element_table(element_table)
+
+    charges = atoms.get_initial_charges()
+    if atom_ordering != AtomOrdering.NONE:
+        order = compute_atom_order(positions, bbox_coords, atom_ordering)
+        positions, types, charges = positions[order], types[order], charges[order]
+        global_information.set_atom_id_map(get_atom_id_map(order))
+
+    write_lammps_data_full(
+        data_path=job_folder / str(data_filename),
+        positions=positions,
+        types=types,
+        charges=charges,
+        element_table=element_table,
+        masses=masses,
+        bbox_coords=bbox_coords,
+        nb_workers=nb_workers,
+        compression=compression)
 
-    xcoords = positions[:, 0]
-    ycoords = positions[:, 1]
-    zcoords = positions[:, 2]
+    return global_information
 
-    xmin = xcoords.min()
-    ymin = ycoords.min()
-    zmin = zcoords.min()
 
-    xmax = xcoords.max()
-    ymax = ycoords.max()
-    zmax = zcoords.max()
+# Suffix appended by Lammps to the accelerated variant of a style
+ACCELERATION_SUFFIXES = {
+    AccelerationStyle.OPENMP: "omp",
+    AccelerationStyle.OPT: "opt",
+    AccelerationStyle.INTEL: "intel"
+}
+
+# Accelerator packages providing a variant for the styles declared in the
+# header of the input script. Styles without a variant for a package must
+# not be declared while the suffix of that package is active.
+ACCELERATED_STYLES = {
+    "reaxff": {AccelerationStyle.OPENMP},
+    "qeq/reaxff": {AccelerationStyle.OPENMP},
+    "qeq/shielded": set(),
+    "acks2/reaxff": set(),
+    "rebo": {AccelerationStyle.OPENMP, AccelerationStyle.INTEL},
+    "airebo": {AccelerationStyle.OPENMP, AccelerationStyle.INTEL},
+    "airebo/morse": {AccelerationStyle.OPENMP, AccelerationStyle.INTEL}
+}
+
+
+def get_pair_style_name(ff_type: Forcefield) -> str:
+    """
+    Get the name of the Lammps pair style used for a forcefield.
 
-    padding = 50.0  # Adding 50A for now
+    Args:
+        ff_type (Forcefield): The forcefield type
 
-    # TODO: check if writting the masses manually is necessary, ASE write has
-    # the masses option.
-    chemical_symbols = atoms.get_chemical_symbols()
-    masses = atoms.get_masses()
-    indexes = np.unique(chemical_symbols, return_index=True)[1]
-    masses_u = [masses[index] for index in indexes]
-    chemical_symbols_u = [chemical_symbols[index] for index in indexes]
+    Returns:
+        str: The name of the pair style
 
-    with open(temp_data_path, 'r', encoding="utf-8") as f:
-        lines = f.readlines()
+    Raises:
+        NotImplementedError: If the forcefield is not supported
+    """
+    if ff_type == Forcefield.REAX:
+        return "reaxff"
+    if ff_type == Forcefield.REBO:
+        return "rebo"
+    if ff_type == Forcefield.AIREBO:
+        return "airebo"
+    if ff_type == Forcefield.AIREBOM:
+        return "airebo/morse"
+    raise NotImplementedError(f"Forcefield {ff_type} not supported")
+
+
+def has_accelerated_variant(style_name: str, acceleration_style: AccelerationStyle) -> bool:
+    """
+    Check if a style has a variant in an accelerator package.
 
-    data_path = job_folder / str(data_filename)
-    with open(data_path, 'w', encoding="utf-8") as f:
-        f.write('# Generated by LammpsInputBuilder\n')
+    Args:
+        style_name (str): The name of the pair or fix style
+        acceleration_style (AccelerationStyle): The accelerator package
 
-        # Find the first line which start with a number
-        start_offset = 0
-        # for i in range(len(lines)):
-        for i, line in enumerate(lines):
-            # if len(lines[i].split()) > 0 and lines[i].split()[0].isdigit():
-            if len(line.split()) > 0 and line.split()[0].isdigit():
-                start_offset = i
-                break
-
-        if start_offset > len(lines) - 1:
-            raise RuntimeError(
-                "Could not find the first line in LAMMPS data file")
-
-        # Copy the lines until the line ending with zhi is found
-        offset = 0
-        bbox_coords = [
-            xmin - padding,
-            xmax + padding,
-            ymin - padding,
-            ymax + padding,
-            zmin - padding,
-            zmax + padding]
-        for i in range(start_offset, len(lines)):
-            # f.write(lines[i])
-            # if len(lines[i].split()) > 0 and lines[i].split()[-1] == 'zhi':
-            #    break
-            if len(lines[i].split()) > 0 and lines[i].split()[-1] == 'xhi':
-                f.write(f"{bbox_coords[0]}\t{bbox_coords[1]} xlo xhi\n")
-            elif len(lines[i].split()) > 0 and lines[i].split()[-1] == 'yhi':
-                f.write(f"{bbox_coords[2]}\t{bbox_coords[3]} ylo yhi\n")
-            elif len(lines[i].split()) > 0 and lines[i].split()[-1] == 'zhi':
-                f.write(f"{bbox_coords[4]}\t{bbox_coords[5]} zlo zhi\n")
-                break
-            else:
-                f.write(lines[i])
-                offset += 1
-        if offset > len(lines) - 1:
-            raise RuntimeError("Could not find zhi in LAMMPS data file")
-        global_information.set_bbox_coords(bbox_coords)
+    Returns:
+        bool: True if the accelerated variant of the style exists
+    """
+    return acceleration_style in ACCELERATED_STYLES.get(style_name, set())
 
-        # Insert the masses in the data file so it doesn't have to be added
-        # separatly in the script file
-        element_map = {}
-        f.write('\n')
-        f.write('Masses\n')
-        f.write('\n')
-        # for i in range(len(masses_u)):
-        for i, mass in enumerate(masses_u):
-            #f.write(f'{i + 1} {masses_u[i]} # {chemical_symbols_u[i]}\n')
-            f.write(f'{i + 1} {mass} # {chemical_symbols_u[i]}\n')
-            element_map[i + 1] = chemical_symbols_u[i]
-        f.write('\n')
-        f.write('Atoms # full\n')
-        f.write('\n')
-        global_information.set_element_table(element_map)
 
-        # Find the offset of the Atoms section
-        for i in range(offset, len(lines)):
-            if lines[i].startswith('Atoms'):
-                offset = i + 2
-                break
-        if offset > len(lines) - 1:
-            raise RuntimeError("Could not find Atoms in LAMMPS data file")
+def validate_acceleration_style(ff_type: Forcefield, acceleration_style: AccelerationStyle):
+    """
+    Check that the pair style of a forcefield has a variant in an accelerator package.
 
-        # Now that the masses are added, we can add the rest of the lines.
-        for i in range(offset, len(lines)):
-            f.write(lines[i])
+    Args:
+        ff_type (Forcefield): The forcefield type
+        acceleration_style (AccelerationStyle): The accelerator package
+
+    Raises:
+        ValueError: If the pair style has no variant in the accelerator package
+    """
+    if acceleration_style == AccelerationStyle.NONE:
+        return
+    pair_style = get_pair_style_name(ff_type)
+    if not has_accelerated_variant(pair_style, acceleration_style):
+        supported = sorted(style.name for style in ACCELERATED_STYLES.get(pair_style, set()))
+        raise ValueError(
+            f"The pair style {pair_style} has no {acceleration_style.name} variant, "
+            f"supported accelerator packages: {', '.join(supported) if supported else 'none'}.")
+
+
+def get_acceleration_commands(
+        ff_type: Forcefield,
+        acceleration_style: AccelerationStyle,
+        nb_threads: int) -> str:
+    """
+    Get the package and suffix commands enabling an accelerator package.
+
+    Args:
+        ff_type (Forcefield): The forcefield type
+        acceleration_style (AccelerationStyle): The accelerator package
+        nb_threads (int): The number of OpenMP threads per MPI process
+
+    Returns:
+        str: The Lammps commands, empty if no acceleration is used
+
+    Raises:
+        ValueError: If the pair style has no variant in the accelerator package
+    """
+    if acceleration_style == AccelerationStyle.NONE:
+        return ""
+    validate_acceleration_style(ff_type, acceleration_style)
+
+    result = ""
+    if acceleration_style == AccelerationStyle.OPENMP:
+        result += f"package        omp {nb_threads}\n"
+    elif acceleration_style == AccelerationStyle.INTEL:
+        result += f"package        intel 0 omp {nb_threads}\n"
+    result += f"suffix         {ACCELERATION_SUFFIXES[acceleration_style]}\n"
+    return result
 
-    return global_information
+
+# Upper taper radius used when it can't be read from the ReaxFF forcefield
+REAXFF_DEFAULT_NONBONDED_CUTOFF = 10.0
+
+# Cutoffs of the rebo and airebo pair styles for carbon, i.e 3 times the largest
+# rebo cutoff, and the LJ cutoff (3 sigma as declared in the input script) plus
+# twice the largest rebo cutoff
+REBO_CUTOFF = 6.0
+AIREBO_CUTOFF = 14.2
+
+
+def read_reaxff_nonbonded_cutoff(forcefield_path: Path) -> float:
+    """
+    Read the upper taper radius, i.e the cutoff of the non bonded interactions,
+    from the general parameters of a ReaxFF forcefield file.
+
+    Args:
+        forcefield_path (Path): The path to the ReaxFF forcefield file
+
+    Returns:
+        float: The cutoff, or REAXFF_DEFAULT_NONBONDED_CUTOFF if it can't be read
+    """
+    try:
+        with open(forcefield_path, "r", encoding="utf-8") as f:
+            lines = [f.readline() for _ in range(15)]
+        # Line 2 holds the number of general parameters, the upper taper radius is the 13th
+        return float(lines[14].split()[0])
+    except (OSError, ValueError, IndexError):
+        return REAXFF_DEFAULT_NONBONDED_CUTOFF
+
+
+def get_pair_cutoff(
+        ff_type: Forcefield,
+        forcefield_path: Path,
+        qeq_cutoff: float = DEFAULT_QEQ_CUTOFF) -> float:
+    """
+    Get the largest interaction cutoff of the pair style and fixes declared
+    in the input script for a forcefield.
+
+    Args:
+        ff_type (Forcefield): The forcefield type
+        forcefield_path (Path): The path to the forcefield file
+        qeq_cutoff (float): The cutoff of the charge equilibration fix of ReaxFF in Angstrom
+
+    Returns:
+        float: The cutoff in Angstrom
+
+    Raises:
+        NotImplementedError: If the forcefield is not supported
+    """
+    if ff_type == Forcefield.REAX:
+        return max(read_reaxff_nonbonded_cutoff(forcefield_path), REAXFF_HBOND_CUTOFF,
+                   REAXFF_BOND_CUTOFF, qeq_cutoff)
+    if ff_type == Forcefield.REBO:
+        return REBO_CUTOFF
+    if ff_type in [Forcefield.AIREBO, Forcefield.AIREBOM]:
+        return AIREBO_CUTOFF
+    raise NotImplementedError(f"Forcefield {ff_type} not supported")
 
 
 def molecule_to_lammps_input(
@@ -195,16 +573,33 @@ def molecule_to_lammps_input(
         ff_type: Forcefield,
         forcefield_name: str,
         global_information: GlobalInformation,
-        electrostatic_method: ElectrostaticMethod) -> Path:
+        electrostatic_method: ElectrostaticMethod,
+        acceleration_style: AccelerationStyle = AccelerationStyle.NONE,
+        acceleration_threads: int = 1,
+        neighbor_settings: NeighborSettings = None,
+        atom_sort_frequency: int = None,
+        reaxff_memory_settings: ReaxFFMemorySettings = None,
+        charge_equilibration: ChargeEquilibrationSettings = None) -> Path:
     lammps_script_file_path = job_folder / lammps_script_filename
     with open(lammps_script_file_path, "w", encoding="utf-8") as f:
 
-        # Extract the simulation box
-        cell_dims = global_information.get_bbox_dims()
-        min_cell_dim = min([cell_dims[0], cell_dims[1], cell_dims[2]])
-
-        # Get back the list of elements
-        elements = extract_elements_from_data(data_file_path)
+        if charge_equilibration is None:
+            charge_equilibration = ChargeEquilibrationSettings(
+                policy=ChargeEquilibrationPolicy.FIXED)
+
+        # Extract the simulation box. Only the periodic dimensions limit the skin
+        boundary = global_information.get_boundary()
+        min_cell_dim = global_information.get_min_periodic_dim()
+
+        # Get back the list of elements from the element table produced
+        # when writing the data file. Only parse the data file if the table
+        # is not available.
+        element_table = global_information.get_element_table()
+        if element_table:
+            elements = ''.join(
+                ' ' + element_table[lammps_type] for lammps_type in sorted(element_table))
+        else:
+            elements = extract_elements_from_data(data_file_path)
 
         script_content = "# -*- mode: lammps -*-\n"
         if ff_type == Forcefield.REAX:
@@ -217,25 +612,47 @@ def molecule_to_lammps_input(
             raise NotImplementedError(f"Forcefield {ff_type} not supported")
         script_content += 'atom_style     full\n'
         script_content += 'atom_modify    map hash\n'
+        if atom_sort_frequency is not None:
+            # A binsize of 0.0 lets Lammps use half of the neighbor cutoff
+            script_content += f'atom_modify    sort {atom_sort_frequency} 0.0\n'
         script_content += 'newton         on\n'
-        script_content += 'boundary       p p p\n'
+        script_content += f'boundary       {" ".join(boundary)}\n'
+        acceleration_commands = get_acceleration_commands(
+            ff_type, acceleration_style, acceleration_threads)
+        script_content += acceleration_commands
+        domain_decomposition = global_information.get_workflow_context().domain_decomposition
+        if domain_decomposition is not None:
+            script_content += domain_decomposition.add_setup_commands(global_information)
 
         script_content += f'read_data       {data_file_path.name}\n'
+        if domain_decomposition is not None:
+            script_content += domain_decomposition.add_balance_commands()
         # for i in range(len(indexes)):
         #    script_content += f'mass           {i + 1} {masses_u[i]}\n'
 
         if ff_type == Forcefield.REAX:
-            script_content += 'pair_style     reaxff NULL mincap 1000\n'
-            script_content += f'pair_coeff     * * {forcefield_name}{elements}\n'
-            if electrostatic_method == ElectrostaticMethod.ACKS2:
-                script_content += 'fix            \
-                    ReaxFFSpec all acks2/reaxff 1 0.0 10.0 1e-8 reaxff\n'
-            elif electrostatic_method == ElectrostaticMethod.QEQ:
-                script_content += 'fix            \
-                    ReaxFFSpec all qeq/reaxff 1 0.0 10.0 1e-8 reaxff\n'
+            if reaxff_memory_settings is not None:
+                script_content += reaxff_memory_settings.get_pair_style_commands(
+                    global_information,
+                    read_reaxff_nonbonded_cutoff(job_folder / str(forcefield_name)))
             else:
-                raise NotImplementedError(
-                    f"Electrostatic method {electrostatic_method} not supported.")
+                script_content += 'pair_style     reaxff NULL mincap 1000\n'
+            script_content += f'pair_coeff     * * {forcefield_name}{elements}\n'
+            fix_style = get_electrostatic_fix_style(electrostatic_method)
+            # The suffix is disabled while declaring a style without accelerated variant
+            suspend_suffix = acceleration_commands != "" and \
+                not has_accelerated_variant(fix_style, acceleration_style)
+            if suspend_suffix:
+                script_content += 'suffix         off\n'
+            fix_arguments = charge_equilibration.get_fix_arguments(
+                electrostatic_method,
+                global_information.get_workflow_context().static_workflow,
+                dual_available=acceleration_commands != "" and
+                acceleration_style == AccelerationStyle.OPENMP)
+            # The spacing of the previous versions is kept to leave the inputs unchanged
+            script_content += f'fix                                ReaxFFSpec all {fix_arguments}\n'
+            if suspend_suffix:
+                script_content += 'suffix         on\n'
         elif ff_type == Forcefield.REBO:
             script_content += 'pair_style     rebo\n'
             script_content += f'pair_coeff     * * {forcefield_name}{elements}\n'
@@ -246,39 +663,48 @@ def molecule_to_lammps_input(
         elif ff_type == Forcefield.AIREBOM:
             script_content += 'pair_style     airebo/morse 3 1 1\n'
             script_content += f'pair_coeff     * * {forcefield_name}{elements}\n'
-        # script_content += 'neighbor       2.5 bin\n'
-        # 2.5 is too large for small molecule like benzene. Trying to compute a
-        # reasonable cell skin based on the simulation box
-        script_content += f"neighbor       {min([2.5, min_cell_dim/2])} bin\n"
-        script_content += 'neigh_modify   every 1 delay 0 check yes\n'
-
-        if ff_type == Forcefield.REAX:
-            script_content += 'compute reax   all pair reaxff\n'
-            script_content += 'variable eb    equal c_reax[1]\n'
-            script_content += 'variable ea    equal c_reax[2]\n'
-            script_content += 'variable elp   equal c_reax[3]\n'
-            script_content += 'variable emol  equal c_reax[4]\n'
-            script_content += 'variable ev    equal c_reax[5]\n'
-            script_content += 'variable epen  equal c_reax[6]\n'
-            script_content += 'variable ecoa  equal c_reax[7]\n'
-            script_content += 'variable ehb   equal c_reax[8]\n'
-            script_content += 'variable et    equal c_reax[9]\n'
-            script_content += 'variable eco   equal c_reax[10]\n'
-            script_content += 'variable ew    equal c_reax[11]\n'
-            script_content += 'variable ep    equal c_reax[12]\n'
-            script_content += 'variable efi   equal c_reax[13]\n'
-            script_content += 'variable eqeq  equal c_reax[14]\n'
-            script_content += '\n'
-        elif ff_type in [Forcefield.AIREBO, Forcefield.REBO, Forcefield.AIREBOM]:
-            if ff_type == Forcefield.AIREBOM:
-                script_content += 'compute reboPair all pair airebo/morse\n'
-            elif ff_type == Forcefield.AIREBO:
-                script_content += 'compute reboPair all pair airebo\n'
-            else:
-                script_content += 'compute reboPair all pair rebo\n'
-            script_content += 'variable REBO     equal c_reboPair[1]\n'
-            script_content += 'variable LJ       equal c_reboPair[2]\n'
-            script_content += 'variable TORSION  equal c_reboPair[3]\n'
+        if neighbor_settings is not None:
+            script_content += neighbor_settings.get_neighbor_commands(
+                global_information,
+                get_pair_cutoff(ff_type, job_folder / str(forcefield_name),
+                                charge_equilibration.get_cutoff_angstrom()))
+        else:
+            # script_content += 'neighbor       2.5 bin\n'
+            # 2.5 is too large for small molecule like benzene. Trying to compute a
+            # reasonable cell skin based on the simulation box
+            script_content += f"neighbor       {min([2.5, min_cell_dim/2])} bin\n"
+            script_content += 'neigh_modify   every 1 delay 0 check yes\n'
+
+        # The pair compute is evaluated whenever its variables are printed,
+        # it is only declared if the workflow reads them
+        if global_information.get_workflow_context().energy_decomposition_required:
+            if ff_type == Forcefield.REAX:
+                script_content += 'compute reax   all pair reaxff\n'
+                script_content += 'variable eb    equal c_reax[1]\n'
+                script_content += 'variable ea    equal c_reax[2]\n'
+                script_content += 'variable elp   equal c_reax[3]\n'
+                script_content += 'variable emol  equal c_reax[4]\n'
+                script_content += 'variable ev    equal c_reax[5]\n'
+                script_content += 'variable epen  equal c_reax[6]\n'
+                script_content += 'variable ecoa  equal c_reax[7]\n'
+                script_content += 'variable ehb   equal c_reax[8]\n'
+                script_content += 'variable et    equal c_reax[9]\n'
+                script_content += 'variable eco   equal c_reax[10]\n'
+                script_content += 'variable ew    equal c_reax[11]\n'
+                script_content += 'variable ep    equal c_reax[12]\n'
+                script_content += 'variable efi   equal c_reax[13]\n'
+                script_content += 'variable eqeq  equal c_reax[14]\n'
+                script_content += '\n'
+            elif ff_type in [Forcefield.AIREBO, Forcefield.REBO, Forcefield.AIREBOM]:
+                if ff_type == Forcefield.AIREBOM:
+                    script_content += 'compute reboPair all pair airebo/morse\n'
+                elif ff_type == Forcefield.AIREBO:
+                    script_content += 'compute reboPair all pair airebo\n'
+                else:
+                    script_content += 'compute reboPair all pair rebo\n'
+                script_content += 'variable REBO     equal c_reboPair[1]\n'
+                script_content += 'variable LJ       equal c_reboPair[2]\n'
+                script_content += 'variable TORSION  equal c_reboPair[3]\n'
 
         f.write(script_content)
 
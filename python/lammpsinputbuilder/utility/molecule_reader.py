@@ -0,0 +1,417 @@
+"""
+Module containing functions to parse molecule files held in memory into ASE Atoms objects.
+The xyz and lammpstrj formats are parsed with vectorized readers producing the species and
+positions arrays directly. The readers from ASE are used for the cases not handled natively
+(extended xyz properties, multi-frame xyz, triclinic boxes, additional per-atom columns, etc).
+"""
+
+import os
+from io import StringIO
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from ase import Atoms
+from ase.data import chemical_symbols as ase_chemical_symbols, atomic_numbers
+from ase.io import read as ase_read
+from ase.io.lammpsrun import read_lammps_dump_text as ase_read_lammps_dump_text
+
+from lammpsinputbuilder.types import MoleculeFileFormat
+
+MOL2_SECTION_PREFIX = "@<TRIPOS>"
+
+LAMMPS_DUMP_TIMESTEP_ITEM = "ITEM: TIMESTEP"
+
+# Size of the blocks read when searching for the frames of a Lammps dump file
+LAMMPS_DUMP_SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Per-atom columns of a Lammps dump understood by the native reader.
+# Other columns (velocities, forces, computes, etc) are delegated to ASE.
+LAMMPS_DUMP_NATIVE_COLUMNS = {
+    "id", "type", "element", "mol", "q", "ix", "iy", "iz",
+    "x", "y", "z", "xs", "ys", "zs", "xu", "yu", "zu", "xsu", "ysu", "zsu"}
+
+LAMMPS_DUMP_POSITION_COLUMNS = [
+    (["x", "y", "z"], False),
+    (["xs", "ys", "zs"], True),
+    (["xu", "yu", "zu"], False),
+    (["xsu", "ysu", "zsu"], True)]
+
+
+def read_molecule_from_string(
+        molecule_content: str,
+        molecule_format: MoleculeFileFormat) -> Atoms:
+    """
+    Parse the content of a molecule file into an ASE Atoms object without
+    writing it on disk.
+
+    Args:
+        molecule_content (str): The content of the molecule file
+        molecule_format (MoleculeFileFormat): The format of the molecule file
+
+    Returns:
+        Atoms: The ASE model of the molecule
+
+    Raises:
+        NotImplementedError: If the molecule format is not supported
+    """
+    if molecule_format == MoleculeFileFormat.XYZ:
+        atoms = read_xyz_from_string(molecule_content)
+        if atoms is None:
+            atoms = ase_read(StringIO(molecule_content), format="extxyz")
+        return atoms
+    if molecule_format == MoleculeFileFormat.LAMMPS_DUMP_TEXT:
+        atoms = read_lammps_dump_text_from_string(molecule_content)
+        if atoms is None:
+            atoms = ase_read_lammps_dump_text(StringIO(molecule_content))
+        return atoms
+    if molecule_format == MoleculeFileFormat.MOL2:
+        return read_mol2_from_string(molecule_content)
+
+    raise NotImplementedError(f"Molecule format {molecule_format} not supported.")
+
+
+def split_columns(body: str, nb_rows: int, nb_columns: int) -> Optional[List[List[str]]]:
+    """
+    Split a block of whitespace separated values into columns.
+
+    Args:
+        body (str): The block of values, one row per line
+        nb_rows (int): The expected number of rows
+        nb_columns (int): The expected number of columns
+
+    Returns:
+        List[List[str]]: The values of each column, or None if the number of values
+                         doesn't match the expected shape
+    """
+    tokens = body.split()
+    if len(tokens) != nb_rows * nb_columns:
+        return None
+    return [tokens[i::nb_columns] for i in range(nb_columns)]
+
+
+def symbols_to_numbers(symbols: List[str]) -> Optional[np.ndarray]:
+    """
+    Convert a list of chemical symbols to atomic numbers.
+
+    Args:
+        symbols (List[str]): The chemical symbols
+
+    Returns:
+        np.ndarray: The atomic numbers, or None if a symbol is unknown
+    """
+    species, inverse = np.unique(np.asarray(symbols), return_inverse=True)
+    try:
+        species_numbers = np.array([atomic_numbers[str(symbol)] for symbol in species],
+                                   dtype=np.int64)
+    except KeyError:
+        return None
+    return species_numbers[inverse.reshape(-1)]
+
+
+def read_xyz_from_string(molecule_content: str) -> Optional[Atoms]:
+    """
+    Parse the content of a single frame xyz file with the columns "symbol x y z".
+
+    Args:
+        molecule_content (str): The content of the xyz file
+
+    Returns:
+        Atoms: The ASE model of the molecule, or None if the content must be parsed
+               by ASE (extended xyz, several frames, additional columns, etc)
+    """
+    parts = molecule_content.split("\n", 2)
+    if len(parts) < 3:
+        return None
+    try:
+        nb_atoms = int(parts[0])
+    except ValueError:
+        return None
+    # Extended xyz comment lines carry key=value pairs (Lattice, Properties, pbc, etc)
+    if "=" in parts[1]:
+        return None
+
+    columns = split_columns(parts[2], nb_atoms, 4)
+    if columns is None:
+        return None
+    numbers = symbols_to_numbers(columns[0])
+    if numbers is None:
+        return None
+    try:
+        positions = np.column_stack(
+            [np.array(column, dtype=np.float64) for column in columns[1:]])
+    except ValueError:
+        return None
+
+    return Atoms(numbers=numbers, positions=positions.reshape(-1, 3))
+
+
+def read_lammps_dump_text_from_string(molecule_content: str) -> Optional[Atoms]:
+    """
+    Parse the last frame of a Lammps text dump with an orthogonal box.
+    The atoms are sorted by id and the species are taken from the element column or,
+    if absent, from the type column interpreted as atomic numbers, as done by ASE.
+
+    Args:
+        molecule_content (str): The content of the Lammps dump
+
+    Returns:
+        Atoms: The ASE model of the molecule, or None if the content must be parsed
+               by ASE (triclinic box, unsupported columns, etc)
+    """
+    start = molecule_content.rfind(LAMMPS_DUMP_TIMESTEP_ITEM)
+    if start == -1:
+        return None
+    parts = molecule_content[start:].split("\n", 9)
+    if len(parts) < 10 \
+            or not parts[2].startswith("ITEM: NUMBER OF ATOMS") \
+            or not parts[4].startswith("ITEM: BOX BOUNDS") \
+            or not parts[8].startswith("ITEM: ATOMS"):
+        return None
+
+    try:
+        timestep = int(parts[1].split()[0])
+        nb_atoms = int(parts[3].split()[0])
+        bounds = np.array([line.split() for line in parts[5:8]], dtype=np.float64)
+    except (ValueError, IndexError):
+        return None
+    tilt_items = parts[4].split()[3:]
+    if bounds.shape != (3, 2) or "abc" in tilt_items:
+        return None
+    pbc_items = tilt_items[-3:] if len(tilt_items) >= 3 else ["f", "f", "f"]
+    pbc = ["p" in item.lower() for item in pbc_items]
+
+    colnames = parts[8].split()[2:]
+    if not set(colnames).issubset(LAMMPS_DUMP_NATIVE_COLUMNS):
+        return None
+    columns = split_columns(parts[9], nb_atoms, len(colnames))
+    if columns is None:
+        return None
+    data = dict(zip(colnames, columns))
+
+    try:
+        order = None
+        if "id" in data:
+            order = np.argsort(np.array(data["id"], dtype=np.int64))
+
+        def get_column(name: str, dtype) -> np.ndarray:
+            values = np.array(data[name], dtype=dtype)
+            return values if order is None else values[order]
+
+        types = get_column("type", np.int64) if "type" in data else None
+        if "element" in data:
+            numbers = symbols_to_numbers(get_column("element", str).tolist())
+            if numbers is None:
+                return None
+        elif types is not None:
+            numbers = types
+        else:
+            return None
+
+        for position_columns, scaled in LAMMPS_DUMP_POSITION_COLUMNS:
+            if position_columns[0] in data:
+                positions = np.column_stack(
+                    [get_column(name, np.float64) for name in position_columns])
+                break
+        else:
+            return None
+        charges = get_column("q", np.float64) if "q" in data else None
+    except (ValueError, KeyError):
+        return None
+
+    cell = np.diag(bounds[:, 1] - bounds[:, 0])
+    celldisp = bounds[:, 0]
+    if scaled:
+        atoms = Atoms(numbers=numbers, scaled_positions=positions,
+                      cell=cell, celldisp=celldisp, pbc=pbc)
+    else:
+        atoms = Atoms(numbers=numbers, positions=positions,
+                      cell=cell, celldisp=celldisp, pbc=pbc)
+    if charges is not None:
+        atoms.set_initial_charges(charges)
+    if types is not None:
+        atoms.new_array("type", types, dtype="int")
+    atoms.info["timestep"] = timestep
+    return atoms
+
+
+def find_lammps_dump_frame_offsets(
+        molecule_path: Path,
+        max_frames: int,
+        from_end: bool,
+        block_size: int = LAMMPS_DUMP_SCAN_BLOCK_SIZE) -> List[int]:
+    """
+    Find the byte offsets of the "ITEM: TIMESTEP" lines of a Lammps text dump file.
+    The file is scanned by blocks, either from the start or from the end of the file,
+    and the scan stops as soon as enough frames are found.
+
+    Args:
+        molecule_path (Path): The path to the Lammps dump file
+        max_frames (int): The number of frames to find
+        from_end (bool): Scan from the end of the file if True, from the start otherwise
+        block_size (int): The number of bytes read at once
+
+    Returns:
+        List[int]: The offsets found, in the order of the scan
+    """
+    marker = LAMMPS_DUMP_TIMESTEP_ITEM.encode("utf-8")
+    offsets = []
+
+    def is_line_start(f, offset: int) -> bool:
+        if offset == 0:
+            return True
+        position = f.tell()
+        f.seek(offset - 1)
+        result = f.read(1) == b"\n"
+        f.seek(position)
+        return result
+
+    with open(molecule_path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        # Keep the bytes at the boundary of the previous block so that
+        # a marker spanning two blocks is still found.
+        carry = b""
+        if from_end:
+            end = file_size
+            while end > 0 and len(offsets) < max_frames:
+                start = max(0, end - block_size)
+                f.seek(start)
+                block = f.read(end - start) + carry
+                index = block.rfind(marker)
+                while index != -1 and len(offsets) < max_frames:
+                    if is_line_start(f, start + index):
+                        offsets.append(start + index)
+                    index = block.rfind(marker, 0, index)
+                carry = block[:len(marker) - 1]
+                end = start
+        else:
+            start = 0
+            while start < file_size and len(offsets) < max_frames:
+                f.seek(start)
+                block = carry + f.read(block_size)
+                block_start = start - len(carry)
+                index = block.find(marker)
+                while index != -1 and len(offsets) < max_frames:
+                    if is_line_start(f, block_start + index):
+                        offsets.append(block_start + index)
+                    index = block.find(marker, index + 1)
+                carry = block[-(len(marker) - 1):]
+                start += block_size
+    return offsets
+
+
+def read_lammps_dump_frame_from_file(molecule_path: Path, frame: int) -> str:
+    """
+    Read a single frame of a Lammps text dump file without reading the rest of the file.
+    Positive frame indices are counted from the start of the file, negative indices from
+    the end of the file (-1 being the last frame).
+
+    Args:
+        molecule_path (Path): The path to the Lammps dump file
+        frame (int): The index of the frame to read
+
+    Returns:
+        str: The content of the frame
+
+    Raises:
+        ValueError: If the frame doesn't exist in the file
+    """
+    if frame >= 0:
+        # The start of the next frame delimits the end of the requested frame
+        offsets = find_lammps_dump_frame_offsets(molecule_path, frame + 2, from_end=False)
+        if len(offsets) <= frame:
+            raise ValueError(
+                f"Frame {frame} not found in {molecule_path}, only {len(offsets)} frames found.")
+        start = offsets[frame]
+        end = offsets[frame + 1] if len(offsets) > frame + 1 else None
+    else:
+        offsets = find_lammps_dump_frame_offsets(molecule_path, -frame, from_end=True)
+        if len(offsets) < -frame:
+            raise ValueError(
+                f"Frame {frame} not found in {molecule_path}, only {len(offsets)} frames found.")
+        start = offsets[-frame - 1]
+        end = offsets[-frame - 2] if frame < -1 else None
+
+    with open(molecule_path, "rb") as f:
+        f.seek(start)
+        content = f.read() if end is None else f.read(end - start)
+    return content.decode("utf-8")
+
+
+def get_element_from_mol2_atom(atom_type: str, atom_name: str) -> str:
+    """
+    Get the chemical symbol of a mol2 atom. The symbol is taken from the
+    Sybyl atom type (C.3 -> C) or from the atom name if the atom type doesn't
+    start with a chemical symbol (dummy atoms, lone pairs, etc).
+
+    Args:
+        atom_type (str): The Sybyl atom type
+        atom_name (str): The atom name
+
+    Returns:
+        str: The chemical symbol
+
+    Raises:
+        ValueError: If no chemical symbol can be found
+    """
+    for candidate in [atom_type.split(".")[0], atom_name.rstrip("0123456789")]:
+        symbol = candidate[:1].upper() + candidate[1:].lower()
+        if symbol in ase_chemical_symbols and symbol != "X":
+            return symbol
+        # Atom names may be longer than the symbol (CA, HB1, etc)
+        if symbol[:1] in ase_chemical_symbols:
+            return symbol[:1]
+    raise ValueError(
+        f"Unable to find the element of the mol2 atom {atom_name} with type {atom_type}.")
+
+
+def read_mol2_from_string(molecule_content: str) -> Atoms:
+    """
+    Parse the content of a Tripos mol2 file into an ASE Atoms object.
+    Only the first molecule and the ATOM section are read. The partial
+    charges, if present, are stored as initial charges.
+
+    Args:
+        molecule_content (str): The content of the mol2 file
+
+    Returns:
+        Atoms: The ASE model of the molecule
+
+    Raises:
+        ValueError: If the ATOM section is missing or malformed
+    """
+    symbols: List[str] = []
+    positions: List[List[float]] = []
+    charges: List[float] = []
+    in_atom_section = False
+    atom_section_found = False
+    for line in molecule_content.splitlines():
+        stripped = line.strip()
+        if stripped.startswith(MOL2_SECTION_PREFIX):
+            if atom_section_found and stripped == MOL2_SECTION_PREFIX + "MOLECULE":
+                # Only read the first molecule of the file
+                break
+            in_atom_section = stripped == MOL2_SECTION_PREFIX + "ATOM"
+            atom_section_found = atom_section_found or in_atom_section
+            continue
+        if not in_atom_section or stripped == "" or stripped.startswith("#"):
+            continue
+
+        fields = stripped.split()
+        if len(fields) < 6:
+            raise ValueError(f"Invalid mol2 atom line: {line}")
+        try:
+            positions.append([float(fields[2]), float(fields[3]), float(fields[4])])
+            if len(fields) >= 9:
+                charges.append(float(fields[8]))
+        except ValueError as e:
+            raise ValueError(f"Invalid mol2 atom line: {line}") from e
+        symbols.append(get_element_from_mol2_atom(fields[5], fields[1]))
+
+    if not atom_section_found:
+        raise ValueError("No ATOM section found in the mol2 content.")
+
+    atoms = Atoms(symbols=symbols, positions=np.array(positions).reshape(-1, 3))
+    if len(charges) == len(symbols):
+        atoms.set_initial_charges(charges)
+    return atoms
@@ -0,0 +1,165 @@
+"""
+Module containing functions to sort atoms along a space-filling curve.
+Atoms close in space get close indices, which improves the memory locality of the
+first timesteps in Lammps and the initial distribution of the atoms between the processes.
+"""
+
+from typing import List
+
+import numpy as np
+
+from lammpsinputbuilder.types import AtomOrdering
+
+# Number of bits used to discretize each dimension of the box. 3 * 21 bits fit in
+# the 64 bits keys, i.e. about 2 million cells per dimension.
+SPATIAL_ORDER_BITS = 21
+
+
+def discretize_positions(
+        positions: np.ndarray,
+        bbox_coords: List[float],
+        nb_bits: int = SPATIAL_ORDER_BITS) -> np.ndarray:
+    """
+    Map the positions of the atoms to the cells of a regular grid over the box.
+
+    Args:
+        positions (np.ndarray): The positions of the atoms, shape (N, 3)
+        bbox_coords (List[float]): The bounding box [x0, x1, y0, y1, z0, z1]
+        nb_bits (int): The number of bits per dimension of the grid
+
+    Returns:
+        np.ndarray: The cell coordinates of the atoms, shape (N, 3), as uint64
+    """
+    lows = np.asarray(bbox_coords[0::2], dtype=float)
+    dims = np.asarray(bbox_coords[1::2], dtype=float) - lows
+    dims[dims <= 0] = 1.0
+    max_cell = (1 << nb_bits) - 1
+    # Atoms slightly outside of the box are assigned to the cells on its border
+    cells = np.clip(np.floor((positions - lows) / dims * (max_cell + 1)), 0, max_cell)
+    return cells.astype(np.uint64)
+
+
+def interleave_bits(cells: np.ndarray, nb_bits: int) -> np.ndarray:
+    """
+    Interleave the bits of the cell coordinates, starting from the most significant
+    bit of the first dimension.
+
+    Args:
+        cells (np.ndarray): The cell coordinates, shape (N, 3), as uint64
+        nb_bits (int): The number of bits per dimension
+
+    Returns:
+        np.ndarray: The interleaved keys, shape (N,), as uint64
+    """
+    keys = np.zeros(len(cells), dtype=np.uint64)
+    one = np.uint64(1)
+    for bit in range(nb_bits - 1, -1, -1):
+        for dim in range(3):
+            keys = (keys << one) | ((cells[:, dim] >> np.uint64(bit)) & one)
+    return keys
+
+
+def compute_morton_keys(cells: np.ndarray, nb_bits: int = SPATIAL_ORDER_BITS) -> np.ndarray:
+    """
+    Compute the position of each cell along the Morton (Z-order) curve.
+
+    Args:
+        cells (np.ndarray): The cell coordinates, shape (N, 3), as uint64
+        nb_bits (int): The number of bits per dimension
+
+    Returns:
+        np.ndarray: The keys of the cells, shape (N,)
+    """
+    return interleave_bits(cells, nb_bits)
+
+
+def compute_hilbert_keys(cells: np.ndarray, nb_bits: int = SPATIAL_ORDER_BITS) -> np.ndarray:
+    """
+    Compute the position of each cell along the Hilbert curve with the algorithm of
+    J. Skilling, "Programming the Hilbert curve", AIP Conference Proceedings 707, 2004.
+    Unlike the Morton curve, two consecutive cells of the Hilbert curve are always adjacent.
+
+    Args:
+        cells (np.ndarray): The cell coordinates, shape (N, 3), as uint64
+        nb_bits (int): The number of bits per dimension
+
+    Returns:
+        np.ndarray: The keys of the cells, shape (N,)
+    """
+    x = [cells[:, dim].copy() for dim in range(3)]
+    zero = np.uint64(0)
+
+    # Inverse undo excess work
+    q = 1 << (nb_bits - 1)
+    while q > 1:
+        p = np.uint64(q - 1)
+        for dim in range(3):
+            is_set = (x[dim] & np.uint64(q)) != zero
+            # Invert the low bits of the first dimension
+            x[0] = np.where(is_set, x[0] ^ p, x[0])
+            # Exchange the low bits of the first dimension and this dimension
+            t = np.where(is_set, zero, (x[0] ^ x[dim]) & p)
+            x[0] ^= t
+            x[dim] ^= t
+        q >>= 1
+
+    # Gray encode
+    x[1] ^= x[0]
+    x[2] ^= x[1]
+    t = np.zeros(len(cells), dtype=np.uint64)
+    q = 1 << (nb_bits - 1)
+    while q > 1:
+        t = np.where((x[2] & np.uint64(q)) != zero, t ^ np.uint64(q - 1), t)
+        q >>= 1
+    for dim in range(3):
+        x[dim] ^= t
+
+    return interleave_bits(np.stack(x, axis=1), nb_bits)
+
+
+def compute_atom_order(
+        positions: np.ndarray,
+        bbox_coords: List[float],
+        ordering: AtomOrdering) -> np.ndarray:
+    """
+    Compute the order in which the atoms are written in the data file.
+
+    Args:
+        positions (np.ndarray): The positions of the atoms, shape (N, 3)
+        bbox_coords (List[float]): The bounding box [x0, x1, y0, y1, z0, z1]
+        ordering (AtomOrdering): The space-filling curve followed by the atoms
+
+    Returns:
+        np.ndarray: The 0-based indices of the atoms of the model in the order of the curve
+
+    Raises:
+        NotImplementedError: If the ordering is not supported
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    if ordering == AtomOrdering.NONE:
+        return np.arange(len(positions))
+
+    cells = discretize_positions(positions, bbox_coords)
+    if ordering == AtomOrdering.MORTON:
+        keys = compute_morton_keys(cells)
+    elif ordering == AtomOrdering.HILBERT:
+        keys = compute_hilbert_keys(cells)
+    else:
+        raise NotImplementedError(f"Atom ordering {ordering} not supported.")
+    # Atoms in the same cell keep the order of the model
+    return np.argsort(keys, kind="stable")
+
+
+def get_atom_id_map(order: np.ndarray) -> np.ndarray:
+    """
+    Get the Lammps id of each atom of the model from the order of the atoms in the data file.
+
+    Args:
+        order (np.ndarray): The 0-based indices of the atoms of the model in the data file order
+
+    Returns:
+        np.ndarray: The Lammps id of each atom of the model
+    """
+    atom_id_map = np.empty(len(order), dtype=np.int64)
+    atom_id_map[order] = np.arange(1, len(order) + 1)
+    return atom_id_map
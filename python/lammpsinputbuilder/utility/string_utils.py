@@ -13,3 +13,15 @@ def write_fixed_length_comment(text: str) -> str:
         str: The fixed length comment
     """
     return f"{COMMENT_LINE_START}{text} ".ljust(COMMENT_LINE_FIXED_LENGTH, "#") + "\n"
+
+def contains_commands(text: str) -> bool:
+    """
+    Check if a part of a Lammps script contains at least one command,
+    i.e. a line which is neither empty nor a comment.
+    Args:
+        text (str): The part of the script
+
+    Returns:
+        bool: True if the text contains a command
+    """
+    return any(line.strip() and not line.lstrip().startswith("#") for line in text.splitlines())
@@ -5,14 +5,101 @@ from uuid import uuid4
 import shutil
 import logging
 import tempfile
-from typing import List
+from typing import List, Set
+import re
 
 from lammpsinputbuilder.typedmolecule import TypedMolecularSystem
-from lammpsinputbuilder.section import Section
+from lammpsinputbuilder.section import Section, SetupTrackingWriter, iterate_sections
+from lammpsinputbuilder.integrator import MinimizeIntegrator, MultipassMinimizeIntegrator, \
+    RunZeroIntegrator, RerunIntegrator
 from lammpsinputbuilder.version import PackageVersion
+from lammpsinputbuilder.utility.data_cache import DataFileCache
+from lammpsinputbuilder.group_resolver import GroupResolver, GroupSlotTracker, \
+    collect_used_group_names
+from lammpsinputbuilder.decomposition import DomainDecomposition
 
 logger = logging.getLogger(__name__)
 
+# Integrators which don't advance the atoms in time
+STATIC_INTEGRATORS = (MinimizeIntegrator, MultipassMinimizeIntegrator,
+                      RunZeroIntegrator, RerunIntegrator)
+
+# Reference to a Lammps variable, either v_name or ${name}
+VARIABLE_REFERENCE_PATTERN = re.compile(r"(?:\bv_|\$\{)([A-Za-z0-9_]+)")
+
+
+def is_static_workflow(sections: List[Section]) -> bool:
+    """
+    Check if a list of sections only minimizes or evaluates configurations.
+
+    Args:
+        sections (List[Section]): The sections of the workflow
+
+    Returns:
+        bool: True if the sections declare at least one integrator and all of them are
+              static, False if a section runs dynamics or cannot be inspected
+    """
+    nb_integrators = 0
+    try:
+        for section in iterate_sections(sections):
+            if hasattr(section, "get_integrator"):
+                if not isinstance(section.get_integrator(), STATIC_INTEGRATORS):
+                    return False
+                nb_integrators += 1
+    except NotImplementedError:
+        return False
+    return nb_integrators > 0
+
+
+def collect_variable_references(d, names: Set[str]) -> None:
+    """
+    Collect the names of the Lammps variables read in the dictionary representation
+    of an object, either as v_name, including inside $() expressions, or as ${name}.
+
+    Args:
+        d (Union[dict, list, str]): The dictionary representation, or one of its values
+        names (Set[str]): The set receiving the variable names
+    """
+    if isinstance(d, dict):
+        for value in d.values():
+            collect_variable_references(value, names)
+    elif isinstance(d, list):
+        for value in d:
+            collect_variable_references(value, names)
+    elif isinstance(d, str):
+        names.update(VARIABLE_REFERENCE_PATTERN.findall(d))
+
+
+def uses_thermo_variables(sections: List[Section], thermo_variables: List[str]) -> bool:
+    """
+    Check if a list of sections reads some of the variables declared by the
+    molecular system, i.e the variables of get_default_thermo_variables().
+    The variables are looked up in the string values of the dictionary representation
+    of every section, which covers their instructions, extensions, and fileios.
+
+    Args:
+        sections (List[Section]): The sections of the workflow
+        thermo_variables (List[str]): The default thermo variables of the molecular system
+
+    Returns:
+        bool: True if a variable is read, or if a section cannot be inspected
+    """
+    variables = {name[2:] for name in thermo_variables if name.startswith("v_")}
+    if len(variables) == 0:
+        return False
+    names = set()
+    try:
+        for section in iterate_sections(sections):
+            d = section.to_dict()
+            # Child sections are inspected by iterate_sections()
+            d.pop("sections", None)
+            collect_variable_references(d, names)
+            if not variables.isdisjoint(names):
+                return True
+    except NotImplementedError:
+        return True
+    return False
+
 
 class WorkflowBuilder:
     """
@@ -28,6 +115,12 @@ class WorkflowBuilder:
         """
         self.molecule = None
         self.sections = []
+        self.data_cache = None
+        self.resolve_groups = False
+        self.allow_empty_groups = False
+        self.group_slot_tracker = None
+        self.setup_free_runs = False
+        self.domain_decomposition = None
 
     def set_typed_molecular_system(self, molecule: TypedMolecularSystem):
         """
@@ -57,6 +150,118 @@ class WorkflowBuilder:
         """
         return self.molecule
 
+    def set_data_cache(self, data_cache: DataFileCache):
+        """
+        Set a cache for the files generated for the molecular system. When set,
+        the data file, the molecule file, and the forcefield file are reused from
+        the cache across calls to generate_inputs() for identical molecular systems.
+        Set to None to disable the cache.
+
+        Args:
+            data_cache (DataFileCache): The cache to use.
+
+        Returns:
+            None
+        """
+        self.data_cache = data_cache
+
+    def get_data_cache(self) -> DataFileCache:
+        """
+        Get the cache for the files generated for the molecular system.
+        If no cache is set, then None is returned.
+
+        Returns:
+            DataFileCache: The cache currently used.
+        """
+        return self.data_cache
+
+    def set_group_resolution(self, resolve_groups: bool, allow_empty_groups: bool = False):
+        """
+        Enable or disable the evaluation of the groups in Python. When enabled, the
+        IndicesGroup, OperationGroup, AllGroup, and ReferenceGroup objects are evaluated
+        when generating the inputs. Each group referenced by the workflow is then declared
+        to Lammps with a single list of atom ids, and the groups which are never referenced
+        are not declared at all. See GroupResolver.
+
+        Args:
+            resolve_groups (bool): True to evaluate the groups in Python
+            allow_empty_groups (bool): If False, a group without any atom raises an error
+                                       when generating the inputs
+
+        Returns:
+            None
+        """
+        self.resolve_groups = resolve_groups
+        self.allow_empty_groups = allow_empty_groups
+
+    def get_group_resolution(self) -> bool:
+        """
+        Check if the groups are evaluated in Python when generating the inputs.
+
+        Returns:
+            bool: True if the groups are evaluated in Python
+        """
+        return self.resolve_groups
+
+    def set_setup_free_runs(self, setup_free_runs: bool):
+        """
+        Enable or disable the automatic removal of the setup between consecutive runs.
+        When enabled, the run of an IntegratorSection directly following another run,
+        without any command declared or removed in between, is emitted with the keywords
+        "pre no post no" to skip the setup of Lammps. Only sections declaring nothing,
+        such as a bare RunZeroIntegrator, can skip it. See SetupTrackingWriter.
+
+        Args:
+            setup_free_runs (bool): True to skip the setup between consecutive runs
+
+        Returns:
+            None
+        """
+        self.setup_free_runs = setup_free_runs
+
+    def get_setup_free_runs(self) -> bool:
+        """
+        Check if the setup is skipped between consecutive runs.
+
+        Returns:
+            bool: True if the setup is skipped between consecutive runs
+        """
+        return self.setup_free_runs
+
+    def set_domain_decomposition(self, domain_decomposition: DomainDecomposition):
+        """
+        Set the decomposition of the simulation box between the MPI processes. The
+        processors grid, the communication style, and the initial balance of the box
+        are written in the header of the input script. Set to None to let Lammps
+        decide the decomposition.
+
+        Args:
+            domain_decomposition (DomainDecomposition): The domain decomposition settings
+
+        Returns:
+            None
+        """
+        self.domain_decomposition = domain_decomposition
+
+    def get_domain_decomposition(self) -> DomainDecomposition:
+        """
+        Get the decomposition of the simulation box between the MPI processes.
+
+        Returns:
+            DomainDecomposition: The domain decomposition settings, or None if not set
+        """
+        return self.domain_decomposition
+
+    def get_group_slot_tracker(self) -> GroupSlotTracker:
+        """
+        Get the tracker of the groups declared by the last call to generate_inputs().
+        The tracker reports the maximum number of groups existing at the same time in Lammps.
+
+        Returns:
+            GroupSlotTracker: The group slot tracker, or None if no input was generated yet
+        """
+        return self.group_slot_tracker
+
     def add_section(self, section: Section):
         """
         Add a section to the workflow.
@@ -111,8 +316,26 @@ class WorkflowBuilder:
         job_folder.mkdir(parents=True, exist_ok=True)
         logger.debug("WorkflowBuilder generated the job folder: %s", job_folder)
 
-        # Write the initial Lammps files
-        global_information = self.molecule.generate_lammps_data_file(job_folder)
+        # Write the initial Lammps files, reusing them from the cache if possible
+        global_information = None
+        if self.data_cache is not None:
+            cache_key = self.data_cache.compute_key(self.molecule)
+            global_information = self.data_cache.restore(cache_key, job_folder)
+            if global_information is not None:
+                # Only parse the model if a setting of the workflow reads the atoms
+                global_information.set_atoms(self.molecule.get_ase_model)
+
+        if global_information is None:
+            global_information = self.molecule.generate_lammps_data_file(job_folder)
+            if self.data_cache is not None:
+                self.data_cache.store(cache_key, job_folder, global_information)
+
+        workflow_context = global_information.get_workflow_context()
+        workflow_context.job_folder = job_folder
+        workflow_context.domain_decomposition = self.domain_decomposition
+        workflow_context.static_workflow = is_static_workflow(self.sections)
+        workflow_context.energy_decomposition_required = uses_thermo_variables(
+            self.sections, self.molecule.get_default_thermo_variables())
         input_path = self.molecule.generate_lammps_input_file(
             job_folder, global_information)
 
@@ -124,13 +347,37 @@ class WorkflowBuilder:
         workflow_input_path = job_folder / "workflow.input"
         shutil.copy(input_path, workflow_input_path)
 
-        # Now we can add the sections
-        section_content = ""
-        for section in self.sections:
-            section_content += section.add_all_commands(global_information)
-
+        # Count the groups declared to Lammps to detect workflows exceeding the group limit
+        slot_tracker = GroupSlotTracker()
+        self.group_slot_tracker = slot_tracker
+        workflow_context.group_slot_tracker = slot_tracker
+        if self.resolve_groups:
+            workflow_context.group_resolver = GroupResolver(
+                nb_atoms=len(global_information.get_atoms()),
+                used_group_names=collect_used_group_names(self.sections),
+                allow_empty_groups=self.allow_empty_groups,
+                slot_tracker=slot_tracker,
+                atom_id_map=global_information.get_atom_id_map())
+
+        # Now we can add the sections, streaming their commands directly to the file
         with open(workflow_input_path, "a", encoding="utf-8") as f:
-            f.write(section_content)
+            writer = SetupTrackingWriter(f) if self.setup_free_runs else f
+            for section in self.sections:
+                section.emit(writer, global_information)
+
+        if self.resolve_groups:
+            logger.info("WorkflowBuilder evaluated %d groups in Python.",
+                        len(workflow_context.group_resolver.get_group_sizes()))
+
+        logger.info("WorkflowBuilder peak group usage: %d/%d groups.",
+                    slot_tracker.get_peak(), slot_tracker.get_max_groups())
+        if slot_tracker.is_over_limit():
+            logger.warning(
+                ("The workflow declares up to %d groups at the same time, more than the %d groups "
+                 "supported by Lammps. Groups alive at the peak: %s. Consider enabling the group "
+                 "resolution with set_group_resolution() to defer the declaration of the groups."),
+                slot_tracker.get_peak(), slot_tracker.get_max_groups(),
+                ", ".join(slot_tracker.get_peak_groups()))
 
         return job_folder
 
@@ -7,7 +7,7 @@ import shutil
 import pytest
 
 from lammpsinputbuilder.types import BoundingBoxStyle, ElectrostaticMethod, \
-    Forcefield, MoleculeFileFormat
+    Forcefield, MoleculeFileFormat, AccelerationStyle
 from lammpsinputbuilder.typedmolecule import AireboTypedMolecularSystem
 from lammpsinputbuilder.types import LammpsUnitSystem
 
@@ -160,6 +160,54 @@ def test_moleculeToJobFolder():
     assert (job_folder / "molecule.XYZ").is_file()
     assert (job_folder / typed_molecule.get_lammps_data_filename()).is_file()
     assert (job_folder / "model.data").is_file()
-    assert (job_folder / "model.data.temp").is_file()
+
+    shutil.rmtree(job_folder, ignore_errors=True)
+
+def test_moleculeToJobFolderAccelerated():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path=Path(__file__).parent.parent / 'data' / 'potentials' / 'CH.airebo'
+
+    typed_molecule = AireboTypedMolecularSystem(
+        bbox_style=BoundingBoxStyle.PERIODIC,
+        electrostatic_method=ElectrostaticMethod.QEQ
+    )
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+    typed_molecule.set_acceleration(AccelerationStyle.INTEL, 2)
+
+    job_folder = Path(tempfile.gettempdir()) / str(uuid4())
+    os.makedirs(job_folder)
+
+    global_information = typed_molecule.generate_lammps_data_file(job_folder)
+    content = typed_molecule.generate_lammps_input_file(
+        job_folder, global_information).read_text(encoding="utf-8")
+    assert content.index("package        intel 0 omp 2\nsuffix         intel\n") \
+        < content.index("read_data")
+
+    shutil.rmtree(job_folder, ignore_errors=True)
+
+def test_accelerationBeforeLoading():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path=Path(__file__).parent.parent / 'data' / 'potentials' / 'CH.airebo'
+
+    # The pair style is only known once the forcefield is loaded
+    typed_molecule = AireboTypedMolecularSystem()
+    typed_molecule.set_acceleration(AccelerationStyle.OPENMP, 2)
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+
+    job_folder = Path(tempfile.gettempdir()) / str(uuid4())
+    os.makedirs(job_folder)
+
+    global_information = typed_molecule.generate_lammps_data_file(job_folder)
+    content = typed_molecule.generate_lammps_input_file(
+        job_folder, global_information).read_text(encoding="utf-8")
+    assert content.index("package        omp 2\nsuffix         omp\n") \
+        < content.index("read_data")
+
+    # The airebo pair style has no opt variant, which is reported when generating the input
+    typed_molecule = AireboTypedMolecularSystem()
+    typed_molecule.set_acceleration(AccelerationStyle.OPT)
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+    with pytest.raises(ValueError):
+        typed_molecule.generate_lammps_input_file(job_folder, global_information)
 
     shutil.rmtree(job_folder, ignore_errors=True)
@@ -0,0 +1,132 @@
+from pathlib import Path
+
+import pytest
+
+from lammpsinputbuilder.charge_equilibration import ChargeEquilibrationSettings, \
+    ChargeEquilibrationPolicy, get_electrostatic_fix_style, format_tolerance
+from lammpsinputbuilder.types import ElectrostaticMethod, AccelerationStyle
+from lammpsinputbuilder.quantities import LengthQuantity, LammpsUnitSystem
+from lammpsinputbuilder.typedmolecule import ReaxTypedMolecularSystem
+from lammpsinputbuilder.workflow_builder import WorkflowBuilder, is_static_workflow
+from lammpsinputbuilder.section import IntegratorSection, RecursiveSection
+from lammpsinputbuilder.integrator import NVEIntegrator, RunZeroIntegrator, MinimizeIntegrator
+from lammpsinputbuilder.templates.minimize_template import MinimizeTemplate
+from lammpsinputbuilder.model.typedmolecule_model import ChargeEquilibrationSettingsModel
+
+
+def test_fix_style():
+    assert get_electrostatic_fix_style(ElectrostaticMethod.QEQ) == "qeq/reaxff"
+    assert get_electrostatic_fix_style(ElectrostaticMethod.QEQ_SHIELDED) == "qeq/shielded"
+    assert get_electrostatic_fix_style(ElectrostaticMethod.ACKS2) == "acks2/reaxff"
+
+
+def test_format_tolerance():
+    assert format_tolerance(1e-8) == "1e-8"
+    assert format_tolerance(1.5e-6) == "1.5e-6"
+    assert format_tolerance(1e-10) == "1e-10"
+    assert format_tolerance(0.001) == "0.001"
+
+
+def test_fix_arguments():
+    # The FIXED policy is the default and ignores the workflow
+    fixed = ChargeEquilibrationSettings()
+    assert fixed.get_policy() == ChargeEquilibrationPolicy.FIXED
+    assert fixed.get_fix_arguments(ElectrostaticMethod.QEQ, True, False) == \
+        "qeq/reaxff 1 0.0 10.0 1e-8 reaxff"
+
+    settings = ChargeEquilibrationSettings(policy=ChargeEquilibrationPolicy.AUTO)
+    assert settings.get_fix_arguments(ElectrostaticMethod.QEQ, False, False) == \
+        "qeq/reaxff 1 0.0 10.0 1e-8 reaxff"
+    # Without dynamics, the charges don't need to be as tight
+    assert settings.get_fix_arguments(ElectrostaticMethod.QEQ, True, False) == \
+        "qeq/reaxff 1 0.0 10.0 1e-6 reaxff"
+    assert settings.get_fix_arguments(ElectrostaticMethod.ACKS2, True, False) == \
+        "acks2/reaxff 1 0.0 10.0 1e-6 reaxff"
+    assert settings.get_fix_arguments(ElectrostaticMethod.QEQ_SHIELDED, False, False) == \
+        "qeq/shielded 1 10.0 1e-8 200 reaxff"
+
+    # The settings given by the user are kept
+    custom = ChargeEquilibrationSettings(
+        nevery=2, cutoff=LengthQuantity(8.0, "lmp_real_length"), tolerance=1e-7, maxiter=50)
+    assert custom.get_fix_arguments(ElectrostaticMethod.QEQ, True, False) == \
+        "qeq/reaxff 2 0.0 8.0 1e-7 reaxff maxiter 50"
+    assert ChargeEquilibrationSettings(
+        cutoff=LengthQuantity(1.0, "nm")).get_cutoff_angstrom() == pytest.approx(10.0)
+
+    # The dual keyword is only written when the OPENMP package is used
+    dual = ChargeEquilibrationSettings(dual=True)
+    assert dual.get_fix_arguments(ElectrostaticMethod.QEQ, False, True).endswith(" dual")
+    assert not dual.get_fix_arguments(ElectrostaticMethod.QEQ, False, False).endswith(" dual")
+    assert not dual.get_fix_arguments(ElectrostaticMethod.ACKS2, False, True).endswith(" dual")
+
+    with pytest.raises(ValueError):
+        ChargeEquilibrationSettings(nevery=0)
+    with pytest.raises(ValueError):
+        ChargeEquilibrationSettings(tolerance=0.0)
+    with pytest.raises(ValueError):
+        ChargeEquilibrationSettings(maxiter=0)
+    with pytest.raises(ValueError):
+        ChargeEquilibrationSettings(cutoff=LengthQuantity(-1.0, "lmp_real_length"))
+
+
+def test_serialization():
+    settings = ChargeEquilibrationSettings(
+        cutoff=LengthQuantity(8.0, "lmp_real_length"), tolerance=1e-7, dual=True)
+    d = settings.to_dict()
+    assert d["class_name"] == "ChargeEquilibrationSettings"
+    assert "nevery" not in d
+    ChargeEquilibrationSettingsModel(**d)
+    settings2 = ChargeEquilibrationSettings()
+    settings2.from_dict(d, 0)
+    assert settings2.get_cutoff().convert_to(LammpsUnitSystem.REAL) == pytest.approx(8.0)
+    assert settings2.get_tolerance() == 1e-7
+    assert settings2.get_nevery() is None
+    assert settings2.get_dual()
+    assert settings2.get_policy() == ChargeEquilibrationPolicy.FIXED
+    with pytest.raises(ValueError):
+        settings2.from_dict({"class_name": "ReaxFFMemorySettings"}, 0)
+
+
+def test_static_workflow():
+    assert not is_static_workflow([])
+    assert is_static_workflow([IntegratorSection(integrator=RunZeroIntegrator())])
+    assert is_static_workflow([MinimizeTemplate()])
+    recursive = RecursiveSection()
+    recursive.add_section(IntegratorSection(integrator=MinimizeIntegrator()))
+    recursive.add_section(IntegratorSection(integrator=NVEIntegrator()))
+    assert not is_static_workflow([recursive])
+
+
+def test_workflow():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path = Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+    typed_molecule = ReaxTypedMolecularSystem()
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+    assert isinstance(typed_molecule.get_charge_equilibration(), ChargeEquilibrationSettings)
+
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(typed_molecule)
+    workflow.add_section(IntegratorSection(integrator=MinimizeIntegrator()))
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    assert "fix                                ReaxFFSpec all qeq/reaxff 1 0.0 10.0 1e-8 reaxff\n" \
+        in content
+
+    typed_molecule.set_charge_equilibration(
+        ChargeEquilibrationSettings(policy=ChargeEquilibrationPolicy.AUTO))
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    assert "fix                                ReaxFFSpec all qeq/reaxff 1 0.0 10.0 1e-6 reaxff\n" \
+        in content
+
+    workflow.add_section(IntegratorSection(integrator=NVEIntegrator()))
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    assert "fix                                ReaxFFSpec all qeq/reaxff 1 0.0 10.0 1e-8 reaxff\n" \
+        in content
+
+    typed_molecule.set_charge_equilibration(ChargeEquilibrationSettings(dual=True))
+    typed_molecule.set_acceleration(AccelerationStyle.OPENMP, 4)
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    assert "qeq/reaxff 1 0.0 10.0 1e-8 reaxff dual\n" in content
+
+    typed_molecule2 = ReaxTypedMolecularSystem()
+    typed_molecule2.from_dict(typed_molecule.to_dict(), 0)
+    assert typed_molecule2.get_charge_equilibration().get_dual()
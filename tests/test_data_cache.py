@@ -0,0 +1,191 @@
+from pathlib import Path
+import tempfile
+from uuid import uuid4
+import os
+import shutil
+
+import pytest
+
+from lammpsinputbuilder.types import BoundingBoxStyle, ElectrostaticMethod, GlobalInformation, \
+    AtomOrdering, AccelerationStyle, CompressionStyle
+from lammpsinputbuilder.neighbor import NeighborSettings
+from lammpsinputbuilder.reaxff_memory import ReaxFFMemorySettings
+from lammpsinputbuilder.data_file import DataFileSettings
+from lammpsinputbuilder.quantities import LammpsUnitSystem
+from lammpsinputbuilder.typedmolecule import ReaxTypedMolecularSystem
+from lammpsinputbuilder.workflow_builder import WorkflowBuilder
+from lammpsinputbuilder.utility.data_cache import DataFileCache
+
+
+def load_benzene(bbox_style: BoundingBoxStyle = BoundingBoxStyle.PERIODIC) -> ReaxTypedMolecularSystem:
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path = Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+
+    typed_molecule = ReaxTypedMolecularSystem(
+        bbox_style=bbox_style,
+        electrostatic_method=ElectrostaticMethod.QEQ
+    )
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+    return typed_molecule
+
+
+def test_data_cache_key():
+    cache_dir = Path(tempfile.gettempdir()) / str(uuid4())
+    cache = DataFileCache(cache_dir)
+
+    key1 = cache.compute_key(load_benzene())
+    key2 = cache.compute_key(load_benzene())
+    key3 = cache.compute_key(load_benzene(BoundingBoxStyle.SHRINK))
+
+    assert key1 == key2
+    assert key1 != key3
+
+    # The settings of the input script don't change the data file
+    typed_molecule = load_benzene()
+    typed_molecule.set_acceleration(AccelerationStyle.OPENMP, 4)
+    typed_molecule.set_neighbor_settings(NeighborSettings())
+    typed_molecule.set_memory_settings(ReaxFFMemorySettings())
+    typed_molecule.set_electrostatic_method(ElectrostaticMethod.ACKS2)
+    typed_molecule.set_data_file_settings(DataFileSettings(nb_workers=2, sort_frequency=0))
+    assert cache.compute_key(typed_molecule) == key1
+    typed_molecule.set_data_file_settings(DataFileSettings(compression=CompressionStyle.GZIP))
+    assert cache.compute_key(typed_molecule) != key1
+
+    with pytest.raises(ValueError):
+        DataFileCache(cache_dir, max_size_bytes=0)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_data_cache_store_restore():
+    cache_dir = Path(tempfile.gettempdir()) / str(uuid4())
+    cache = DataFileCache(cache_dir)
+    typed_molecule = load_benzene()
+    key = cache.compute_key(typed_molecule)
+
+    job_folder1 = Path(tempfile.gettempdir()) / str(uuid4())
+    job_folder2 = Path(tempfile.gettempdir()) / str(uuid4())
+    os.makedirs(job_folder1)
+    os.makedirs(job_folder2)
+
+    assert cache.restore(key, job_folder2) is None
+
+    global_information = typed_molecule.generate_lammps_data_file(job_folder1)
+    global_information.set_unit_style(LammpsUnitSystem.REAL)
+    cache.store(key, job_folder1, global_information)
+    assert len(cache.get_entries()) == 1
+
+    restored = cache.restore(key, job_folder2)
+    assert isinstance(restored, GlobalInformation)
+    assert restored.get_element_table() == global_information.get_element_table()
+    assert restored.get_bbox_coords() == global_information.get_bbox_coords()
+    assert restored.get_boundary() == global_information.get_boundary()
+    assert restored.get_unit_style() == LammpsUnitSystem.REAL
+    assert restored.get_atom_id_map() is None
+
+    for filename in ["model.data", "molecule.XYZ", "ffield.reax.Fe_O_C_H.reax"]:
+        with open(job_folder1 / filename, "r", encoding="utf-8") as f1, \
+             open(job_folder2 / filename, "r", encoding="utf-8") as f2:
+            assert f1.read() == f2.read()
+
+    shutil.rmtree(job_folder1, ignore_errors=True)
+    shutil.rmtree(job_folder2, ignore_errors=True)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_data_cache_eviction():
+    cache_dir = Path(tempfile.gettempdir()) / str(uuid4())
+    # Small enough to only hold a single entry
+    cache = DataFileCache(cache_dir, max_size_bytes=1)
+
+    job_folder = Path(tempfile.gettempdir()) / str(uuid4())
+    os.makedirs(job_folder)
+    with open(job_folder / "model.data", "w", encoding="utf-8") as f:
+        f.write("data")
+
+    cache.store("key1", job_folder, GlobalInformation())
+    cache.store("key2", job_folder, GlobalInformation())
+
+    entries = cache.get_entries()
+    assert [entry[0] for entry in entries] == ["key2"]
+
+    shutil.rmtree(job_folder, ignore_errors=True)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_workflow_builder_data_cache():
+    cache_dir = Path(tempfile.gettempdir()) / str(uuid4())
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(load_benzene())
+    workflow.set_data_cache(DataFileCache(cache_dir))
+    assert workflow.get_data_cache().get_cache_dir() == cache_dir
+
+    job_folder1 = workflow.generate_inputs()
+    job_folder2 = workflow.generate_inputs()
+
+    assert len(workflow.get_data_cache().get_entries()) == 1
+    with open(job_folder1 / "workflow.input", "r", encoding="utf-8") as f1, \
+         open(job_folder2 / "workflow.input", "r", encoding="utf-8") as f2:
+        assert f1.read() == f2.read()
+    with open(job_folder1 / "model.data", "r", encoding="utf-8") as f1, \
+         open(job_folder2 / "model.data", "r", encoding="utf-8") as f2:
+        assert f1.read() == f2.read()
+
+    shutil.rmtree(job_folder1, ignore_errors=True)
+    shutil.rmtree(job_folder2, ignore_errors=True)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_workflow_builder_data_cache_lazy_atoms(monkeypatch):
+    cache_dir = Path(tempfile.gettempdir()) / str(uuid4())
+    typed_molecule = load_benzene()
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(typed_molecule)
+    workflow.set_data_cache(DataFileCache(cache_dir))
+    job_folder1 = workflow.generate_inputs()
+
+    # A cache hit doesn't parse the model of a new molecular system
+    nb_parses = []
+    original_get_ase_model = ReaxTypedMolecularSystem.get_ase_model
+    def counting_get_ase_model(self):
+        nb_parses.append(1)
+        return original_get_ase_model(self)
+    monkeypatch.setattr(ReaxTypedMolecularSystem, "get_ase_model", counting_get_ase_model)
+    typed_molecule2 = ReaxTypedMolecularSystem()
+    typed_molecule2.from_dict(typed_molecule.to_dict(), 0)
+    workflow.set_typed_molecular_system(typed_molecule2)
+    job_folder2 = workflow.generate_inputs()
+    assert len(nb_parses) == 0
+
+    # The model is parsed once when a setting of the workflow reads the atoms
+    workflow.set_group_resolution(True)
+    job_folder3 = workflow.generate_inputs()
+    assert len(nb_parses) == 1
+    assert len(workflow.get_data_cache().get_entries()) == 1
+
+    for folder in [job_folder1, job_folder2, job_folder3, cache_dir]:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def test_data_cache_atom_ordering():
+    cache_dir = Path(tempfile.gettempdir()) / str(uuid4())
+    cache = DataFileCache(cache_dir)
+    typed_molecule = load_benzene()
+    key = cache.compute_key(typed_molecule)
+    typed_molecule.set_data_file_settings(DataFileSettings(atom_ordering=AtomOrdering.HILBERT))
+    assert cache.compute_key(typed_molecule) != key
+    key = cache.compute_key(typed_molecule)
+
+    job_folder1 = Path(tempfile.gettempdir()) / str(uuid4())
+    job_folder2 = Path(tempfile.gettempdir()) / str(uuid4())
+    os.makedirs(job_folder1)
+    os.makedirs(job_folder2)
+
+    global_information = typed_molecule.generate_lammps_data_file(job_folder1)
+    cache.store(key, job_folder1, global_information)
+    restored = cache.restore(key, job_folder2)
+    assert restored.get_atom_id_map().tolist() == global_information.get_atom_id_map().tolist()
+
+    shutil.rmtree(job_folder1, ignore_errors=True)
+    shutil.rmtree(job_folder2, ignore_errors=True)
+    shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,43 @@
+import pytest
+
+from lammpsinputbuilder.data_file import DataFileSettings, DEFAULT_ATOM_SORT_FREQUENCY
+from lammpsinputbuilder.types import CompressionStyle, AtomOrdering
+from lammpsinputbuilder.model.typedmolecule_model import DataFileSettingsModel
+
+
+def test_settings():
+    settings = DataFileSettings()
+    assert settings.get_nb_workers() == 1
+    assert settings.get_compression() == CompressionStyle.NONE
+    assert settings.get_atom_ordering() == AtomOrdering.NONE
+    assert settings.get_sort_frequency() == DEFAULT_ATOM_SORT_FREQUENCY
+
+    # A sort frequency of 0 disables the sort
+    assert DataFileSettings(sort_frequency=0).get_sort_frequency() == 0
+
+    with pytest.raises(ValueError):
+        DataFileSettings(nb_workers=0)
+    with pytest.raises(ValueError):
+        DataFileSettings(sort_frequency=-1)
+
+
+def test_serialization():
+    settings = DataFileSettings(
+        nb_workers=4, compression=CompressionStyle.GZIP,
+        atom_ordering=AtomOrdering.HILBERT, sort_frequency=500)
+    d = settings.to_dict()
+    assert d == {"class_name": "DataFileSettings", "nb_workers": 4,
+                 "compression": CompressionStyle.GZIP.value,
+                 "atom_ordering": AtomOrdering.HILBERT.value, "sort_frequency": 500}
+    DataFileSettingsModel(**d)
+    settings2 = DataFileSettings()
+    settings2.from_dict(d, 0)
+    assert settings2.get_nb_workers() == 4
+    assert settings2.get_compression() == CompressionStyle.GZIP
+    assert settings2.get_atom_ordering() == AtomOrdering.HILBERT
+    assert settings2.get_sort_frequency() == 500
+
+    with pytest.raises(ValueError):
+        settings2.from_dict({"class_name": "NeighborSettings"}, 0)
+    with pytest.raises(ValueError):
+        settings2.from_dict({"class_name": "DataFileSettings", "nb_workers": 0}, 0)
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from ase import Atoms
+
+from lammpsinputbuilder.decomposition import DomainDecomposition, BalanceStyle, \
+    compute_processors_grid
+from lammpsinputbuilder.types import GlobalInformation
+from lammpsinputbuilder.typedmolecule import ReaxTypedMolecularSystem
+from lammpsinputbuilder.workflow_builder import WorkflowBuilder
+
+
+def test_compute_processors_grid():
+    assert compute_processors_grid(8, [10.0, 10.0, 10.0]) == (2, 2, 2)
+    # A slab is only split along its surface
+    assert compute_processors_grid(16, [100.0, 100.0, 5.0]) == (4, 4, 1)
+    assert compute_processors_grid(4, [100.0, 10.0, 0.0]) == (4, 1, 1)
+    assert compute_processors_grid(1, [1.0, 2.0, 3.0]) == (1, 1, 1)
+    assert np.prod(compute_processors_grid(12, [30.0, 20.0, 10.0])) == 12
+
+
+def test_domain_decomposition():
+    global_information = GlobalInformation()
+    global_information.set_bbox_coords([0.0, 150.0, 0.0, 150.0, 0.0, 110.0])
+    # The atoms only occupy a thin layer of the box
+    grid = np.stack(np.meshgrid(np.arange(0.0, 50.0, 2.5), np.arange(0.0, 50.0, 2.5),
+                                [0.0, 2.5], indexing="ij"), axis=-1).reshape(-1, 3)
+    global_information.set_atoms(Atoms(symbols=["C"] * len(grid), positions=grid + 50.0))
+
+    decomposition = DomainDecomposition(nb_procs=4, balance_style=BalanceStyle.SHIFT,
+                                        shift_dims="xy")
+    assert decomposition.get_processors_grid(global_information) == (2, 2, 1)
+    assert decomposition.add_setup_commands(global_information) == "processors     2 2 1\n"
+    assert decomposition.add_balance_commands() == "balance        1.1 shift xy 10 1.1\n"
+
+    decomposition = DomainDecomposition(tiled=True, balance_style=BalanceStyle.RCB)
+    assert decomposition.get_processors_grid(global_information) is None
+    assert decomposition.add_setup_commands(global_information) == "comm_style     tiled\n"
+    assert decomposition.add_balance_commands() == "balance        1.1 rcb\n"
+    assert DomainDecomposition().add_balance_commands() == ""
+
+    with pytest.raises(ValueError):
+        DomainDecomposition(nb_procs=0)
+    with pytest.raises(ValueError):
+        DomainDecomposition(balance_style=BalanceStyle.RCB)
+    with pytest.raises(ValueError):
+        DomainDecomposition(balance_style=BalanceStyle.SHIFT, shift_dims="w")
+
+
+def test_workflow_domain_decomposition():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path = Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+
+    typed_molecule = ReaxTypedMolecularSystem()
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(typed_molecule)
+    decomposition = DomainDecomposition(nb_procs=4, tiled=True, balance_style=BalanceStyle.RCB)
+    workflow.set_domain_decomposition(decomposition)
+    assert workflow.get_domain_decomposition() is decomposition
+
+    job_folder = workflow.generate_inputs()
+    content = (job_folder / "workflow.input").read_text(encoding="utf-8")
+    # Benzene is flat, the z dimension is not split
+    assert content.index("processors     2 2 1\n") < content.index("comm_style     tiled\n") \
+        < content.index("read_data") < content.index("balance        1.1 rcb\n") \
+        < content.index("pair_style")
@@ -2,8 +2,9 @@ import pytest
 
 from lammpsinputbuilder.loader.extension_loader import ExtensionLoader
 from lammpsinputbuilder.extensions import LangevinExtension, SetForceExtension, \
-    MoveExtension, InstructionExtension, ManualExtension
+    MoveExtension, InstructionExtension, ManualExtension, BalanceExtension
 from lammpsinputbuilder.instructions import ResetTimestepInstruction
+from lammpsinputbuilder.decomposition import BalanceStyle
 from lammpsinputbuilder.group import AllGroup
 from lammpsinputbuilder.quantities import TemperatureQuantity, TimeQuantity, ForceQuantity, \
     VelocityQuantity
@@ -70,6 +71,17 @@ def test_load_move_extension():
     assert obj2.vz.get_magnitude() == 3.0
     assert obj2.vz.get_units() == "lmp_real_velocity"
 
+def test_load_balance_extension():
+
+    obj = BalanceExtension("myBalanceExtension", nevery=100, balance_style=BalanceStyle.RCB)
+
+    obj_dict = obj.to_dict()
+    loader = ExtensionLoader()
+    obj2 = loader.dict_to_extension(obj_dict, 0)
+    assert isinstance(obj2, BalanceExtension)
+    assert obj2.get_balance_style() == BalanceStyle.RCB
+    assert obj2.to_dict() == obj_dict
+
 def test_load_instruction_extension():
     instr = ResetTimestepInstruction(
             instruction_name="myInstruction", 
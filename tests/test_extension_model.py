@@ -1,12 +1,14 @@
 import json
 from lammpsinputbuilder.extensions import LangevinExtension, MoveExtension, SetForceExtension, \
-    InstructionExtension, ManualExtension
+    InstructionExtension, ManualExtension, BalanceExtension
 from lammpsinputbuilder.quantities import TemperatureQuantity, TimeQuantity, \
     VelocityQuantity, ForceQuantity
 from lammpsinputbuilder.instructions import ResetTimestepInstruction
 from lammpsinputbuilder.group import AllGroup
 from lammpsinputbuilder.model.extension_model import LangevinExtensionModel, \
-    MoveExtensionModel, SetForceExtensionModel, InstructionExtensionModel, ManualExtensionModel
+    MoveExtensionModel, SetForceExtensionModel, InstructionExtensionModel, ManualExtensionModel, \
+    BalanceExtensionModel
+from lammpsinputbuilder.decomposition import BalanceStyle
 
 def test_move_extension_model():
     obj  = MoveExtension(
@@ -183,4 +185,17 @@ def test_manual_extension_model():
     assert obj_model2.class_name == "ManualExtension"
     assert obj_model2.id_name == "myManualExtension"
     assert obj_model2.do_cmd == "my_do_cmd"
-    assert obj_model2.undo_cmd == "my_undo_cmd"
\ No newline at end of file
+    assert obj_model2.undo_cmd == "my_undo_cmd"
+def test_balance_extension_model():
+    obj = BalanceExtension("myBalanceExtension", nevery=100, shift_dims="z")
+
+    obj_dict = obj.to_dict()
+    obj_model1 = BalanceExtensionModel.model_validate_json(json.dumps(obj_dict))
+    assert obj_model1.nevery == 100
+    assert obj_model1.balance_style == BalanceStyle.SHIFT
+    assert obj_model1.shift_dims == "z"
+
+    obj_model2 = BalanceExtensionModel(**obj_dict)
+    obj2 = BalanceExtension()
+    obj2.from_dict(obj_model2.model_dump(), 0)
+    assert obj2.to_dict() == obj_dict
@@ -1,12 +1,13 @@
 import pytest
 
 from lammpsinputbuilder.extensions import MoveExtension, LangevinExtension, \
-    SetForceExtension, ManualExtension, InstructionExtension
+    SetForceExtension, ManualExtension, InstructionExtension, BalanceExtension
 from lammpsinputbuilder.group import AllGroup
 from lammpsinputbuilder.quantities import VelocityQuantity, LammpsUnitSystem, \
     TemperatureQuantity, TimeQuantity, ForceQuantity
 from lammpsinputbuilder.types import GlobalInformation
 from lammpsinputbuilder.instructions import ResetTimestepInstruction
+from lammpsinputbuilder.decomposition import BalanceStyle, DomainDecomposition
 
 def test_MoveExtension():
     obj  = MoveExtension("myMoveExtension", group=AllGroup(), vx=VelocityQuantity(1.0, "angstrom/ps"), vy=VelocityQuantity(2.0, "angstrom/ps"), vz=VelocityQuantity(3.0, "angstrom/ps"))
@@ -49,6 +50,34 @@ def test_MoveExtension():
     assert obj.add_do_commands(info_real) == "fix myMoveExtension all move linear 0.001 0.002 0.003\n"
     assert obj.add_undo_commands() == "unfix myMoveExtension\n"
 
+def test_BalanceExtension():
+    obj = BalanceExtension("myBalanceExtension", nevery=500, threshold=1.2, shift_dims="xy",
+                           nb_iterations=5, stop_threshold=1.05)
+    assert obj.get_balance_style() == BalanceStyle.SHIFT
+
+    dict_result = obj.to_dict()
+    assert dict_result["class_name"] == "BalanceExtension"
+    load_back_obj = BalanceExtension()
+    load_back_obj.from_dict(dict_result, version=0)
+    assert load_back_obj.to_dict() == dict_result
+
+    info = GlobalInformation()
+    assert obj.add_do_commands(info) == "fix myBalanceExtension all balance 500 1.2 shift xy 5 1.05\n"
+    assert obj.add_undo_commands() == "unfix myBalanceExtension\n"
+
+    rcb = BalanceExtension("myRcbExtension", balance_style=BalanceStyle.RCB)
+    with pytest.raises(ValueError):
+        rcb.add_do_commands(info)
+    info.get_workflow_context().domain_decomposition = DomainDecomposition(tiled=True)
+    assert rcb.add_do_commands(info) == "fix myRcbExtension all balance 1000 1.1 rcb\n"
+
+    with pytest.raises(ValueError):
+        BalanceExtension("wrongDims", shift_dims="xx")
+    with pytest.raises(ValueError):
+        BalanceExtension("wrongThreshold", threshold=0.5)
+    with pytest.raises(ValueError):
+        BalanceExtension("wrongNevery", nevery=0)
+
 def test_SetForceExtension():
     obj = SetForceExtension(
         "mySetForceExtension", 
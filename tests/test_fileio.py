@@ -3,7 +3,7 @@ from pathlib import Path
 import pytest
 
 from lammpsinputbuilder.fileio import DumpTrajectoryFileIO, ReaxBondFileIO, \
-    ThermoFileIO, ManualFileIO
+    ThermoFileIO, ManualFileIO, DumpStyle
 from lammpsinputbuilder.types import GlobalInformation
 from lammpsinputbuilder.group import AllGroup
 
@@ -43,6 +43,22 @@ def test_DumpTrajectoryFileIO():
     undo_cmd = obj.add_undo_commands()
     assert undo_cmd == "undump testFile\n"
 
+def test_DumpTrajectoryFileIOCompressed():
+    obj = DumpTrajectoryFileIO(fileio_name="testFile", style=DumpStyle.CUSTOM_GZ, interval=10, group=AllGroup())
+    assert obj.get_associated_file_path() == Path("dump.testFile.lammpstrj.gz")
+    cmds = obj.add_do_commands(GlobalInformation()).splitlines()
+    assert cmds[0] == "dump testFile all custom/gz 10 dump.testFile.lammpstrj.gz id type x y z"
+    assert cmds[1] == "dump_modify testFile sort id"
+
+    obj2 = DumpTrajectoryFileIO()
+    obj2.from_dict(obj.to_dict(), version=0)
+    assert obj2.to_dict()["style"] == DumpStyle.CUSTOM_GZ.value
+
+    obj = DumpTrajectoryFileIO(fileio_name="testFile", style=DumpStyle.CUSTOM_ZSTD, interval=10, group=AllGroup())
+    assert obj.get_associated_file_path() == Path("dump.testFile.lammpstrj.zst")
+    cmds = obj.add_do_commands(GlobalInformation()).splitlines()
+    assert cmds[0] == "dump testFile all custom/zstd 10 dump.testFile.lammpstrj.zst id type x y z"
+
 def test_ReaxBondFileIO():
     obj = ReaxBondFileIO(fileio_name="testFile", interval=10, group=AllGroup())
     assert obj.get_fileio_name() == "testFile"
@@ -1,4 +1,5 @@
 import pytest 
+import numpy as np
 
 from lammpsinputbuilder.group import *
 
@@ -38,25 +39,74 @@ def test_IndicesGroup():
     grp = IndicesGroup( group_name="myIndicesGroup", indices=[1, 2, 3])
     assert grp.get_group_name() == "myIndicesGroup"
     assert grp.get_indices() == [1, 2, 3]
-    assert grp.add_do_commands() == "group myIndicesGroup id 1 2 3\n"
+    assert grp.add_do_commands() == "group myIndicesGroup id 1:3\n"
     assert grp.add_undo_commands() == "group myIndicesGroup delete\n"
 
     obj_dict = grp.to_dict()
     assert obj_dict["id_name"] == "myIndicesGroup"
-    assert obj_dict["indices"] == [1, 2, 3]
+    assert obj_dict["indices"] == [[1, 3]]
     assert obj_dict["class_name"] == "IndicesGroup"
 
     grp2 = IndicesGroup()
     grp2.from_dict(obj_dict, version=0)
     assert grp2.get_group_name() == "myIndicesGroup"
     assert grp2.get_indices() == [1, 2, 3]
-    assert grp2.add_do_commands() == "group myIndicesGroup id 1 2 3\n"
+    assert grp2.add_do_commands() == "group myIndicesGroup id 1:3\n"
     assert grp2.add_undo_commands() == "group myIndicesGroup delete\n"
 
     grp3 = IndicesGroup( group_name="myEmptyGroup", indices=[])
     assert grp3.add_do_commands() == "group myEmptyGroup empty\n"
     assert grp3.add_undo_commands() == "group myEmptyGroup delete\n"
 
+def test_IndicesGroupRanges():
+    assert encode_index_ranges([]) == []
+    assert encode_index_ranges([5, 1, 2, 3, 3, 7, 8, 10, 11, 12, 13]) == ["1:3", "5", "7", "8", "10:13"]
+
+    grp = IndicesGroup(group_name="myIndicesGroup", indices=[9, 1, 2, 3, 4, 6])
+    assert grp.add_do_commands() == "group myIndicesGroup id 1:4 6 9\n"
+
+    # Long selections are split over several commands
+    indices = list(range(1, 4 * MAX_INDICES_TOKENS_PER_COMMAND, 2))
+    grp = IndicesGroup(group_name="myIndicesGroup", indices=indices)
+    cmds = grp.add_do_commands().splitlines()
+    assert len(cmds) == 2
+    assert all(cmd.startswith("group myIndicesGroup id ") for cmd in cmds)
+    declared = [int(token) for cmd in cmds for token in cmd.split()[3:]]
+    assert declared == indices
+
+def test_IndicesGroupStorage():
+    grp = IndicesGroup(group_name="myIndicesGroup", indices=np.array([7, 3, 4, 5, 3, 1]))
+    assert grp.get_indices_array().dtype == np.int32
+    assert grp.get_indices() == [7, 3, 4, 5, 3, 1]
+    assert grp.get_nb_indices() == 6
+
+    # Order and duplicates are preserved by the serialization
+    obj_dict = grp.to_dict()
+    assert obj_dict["indices"] == [7, [3, 5], 3, 1]
+    grp2 = IndicesGroup()
+    grp2.from_dict(obj_dict, version=0)
+    assert grp2.get_indices() == [7, 3, 4, 5, 3, 1]
+
+    # Plain lists of indices are still accepted
+    grp2.from_dict({"class_name": "IndicesGroup", "id_name": "myIndicesGroup",
+                    "indices": [1, 2, 3]}, version=0)
+    assert grp2.get_indices() == [1, 2, 3]
+
+    grp.sort_unique_indices()
+    assert grp.get_indices() == [1, 3, 4, 5, 7]
+    grp = IndicesGroup(group_name="myIndicesGroup", indices=[7, 3, 3, 1], sort_unique=True)
+    assert grp.get_indices() == [1, 3, 7]
+
+    assert compress_index_runs(np.arange(1, 1000001)) == [[1, 1000000]]
+    assert expand_index_runs([[1, 3], 10]).tolist() == [1, 2, 3, 10]
+
+    with pytest.raises(ValueError):
+        IndicesGroup(group_name="myIndicesGroup", indices=np.array([1, 2, 0]))
+    with pytest.raises(ValueError):
+        IndicesGroup(group_name="myIndicesGroup", indices=[[1, 2], [3, 4]])
+    with pytest.raises(ValueError):
+        expand_index_runs([[3, 1]])
+
 def test_OperationGroup():
     otherGrp1 = IndicesGroup( group_name="myOtherGroup1", indices=[1, 2, 3])
     otherGrp2 = IndicesGroup( group_name="myOtherGroup2", indices=[4, 5, 6])
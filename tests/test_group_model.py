@@ -48,13 +48,13 @@ def test_indices_group_model():
     obj_model1 = IndicesGroupModel.model_validate_json(obj_dict_str)
     assert obj_model1.class_name == "IndicesGroup"
     assert obj_model1.id_name == "defaultIndicesGroup"
-    assert obj_model1.indices == [1, 2, 3, 4, 5, 6, 7, 8, 9]
+    assert obj_model1.indices == [(1, 9)]
 
     # Populate the model from the dictionnary
     obj_model2 = IndicesGroupModel(**obj_dict)
     assert obj_model2.class_name == "IndicesGroup"
     assert obj_model2.id_name == "defaultIndicesGroup"
-    assert obj_model2.indices == [1, 2, 3, 4, 5, 6, 7, 8, 9]
+    assert obj_model2.indices == [(1, 9)]
 
 def test_operation_group_model():
     other_grp1 = IndicesGroup( group_name="myOtherGroup1", indices=[1, 2, 3])
@@ -0,0 +1,257 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from lammpsinputbuilder.types import BoundingBoxStyle, ElectrostaticMethod, GlobalInformation, \
+    AtomOrdering
+from lammpsinputbuilder.typedmolecule import ReaxTypedMolecularSystem
+from lammpsinputbuilder.data_file import DataFileSettings
+from lammpsinputbuilder.workflow_builder import WorkflowBuilder
+from lammpsinputbuilder.section import RecursiveSection, IntegratorSection
+from lammpsinputbuilder.integrator import NVEIntegrator, RunZeroIntegrator
+from lammpsinputbuilder.extensions import SetForceExtension
+from lammpsinputbuilder.group import IndicesGroup, OperationGroup, OperationGroupEnum, \
+    AllGroup, ReferenceGroup, ManualGroup
+from lammpsinputbuilder.group_resolver import GroupResolver, GroupSlotTracker, \
+    collect_used_group_names, get_group_do_commands, get_group_undo_commands, \
+    MAX_LAMMPS_GROUPS, RESERVED_GROUP_SLOTS
+
+
+def test_resolve_operations():
+    resolver = GroupResolver(nb_atoms=20, used_group_names={"both", "free"})
+
+    grp_a = IndicesGroup(group_name="groupA", indices=[1, 2, 3, 4, 5, 6])
+    grp_b = IndicesGroup(group_name="groupB", indices=list(range(4, 13)))
+    both = OperationGroup(group_name="both", op=OperationGroupEnum.UNION,
+                          other_groups=[grp_a, grp_b])
+    common = OperationGroup(group_name="common", op=OperationGroupEnum.INTERSECT,
+                            other_groups=[grp_a, grp_b])
+    free = OperationGroup(group_name="free", op=OperationGroupEnum.SUBTRACT,
+                          other_groups=[AllGroup(), both])
+
+    # Only the groups referenced by the workflow are declared
+    assert resolver.add_do_commands(grp_a) == ""
+    assert resolver.add_do_commands(grp_b) == ""
+    assert resolver.add_do_commands(both) == "group both id 1:12\n"
+    assert resolver.add_do_commands(common) == ""
+    assert resolver.add_do_commands(free) == "group free id 13:20\n"
+    assert resolver.get_group_sizes() == {
+        "groupA": 6, "groupB": 9, "both": 12, "common": 3, "free": 8}
+
+    assert resolver.add_undo_commands(free) == "group free delete\n"
+    assert resolver.add_undo_commands(common) == ""
+    assert resolver.add_undo_commands(both) == "group both delete\n"
+    assert resolver.add_undo_commands(grp_b) == ""
+    assert resolver.add_undo_commands(grp_a) == ""
+    assert resolver.get_mask("groupA") is None
+
+
+def test_resolve_errors_and_fallback():
+    resolver = GroupResolver(nb_atoms=10, used_group_names=set())
+    with pytest.raises(ValueError):
+        resolver.add_do_commands(IndicesGroup(group_name="tooFar", indices=[11]))
+
+    grp_a = IndicesGroup(group_name="groupA", indices=[1, 2])
+    grp_b = IndicesGroup(group_name="groupB", indices=[1, 2])
+    resolver.add_do_commands(grp_a)
+    resolver.add_do_commands(grp_b)
+    empty = OperationGroup(group_name="nothing", op=OperationGroupEnum.SUBTRACT,
+                           other_groups=[grp_a, grp_b])
+    with pytest.raises(ValueError):
+        resolver.add_do_commands(empty)
+    assert GroupResolver(nb_atoms=10, allow_empty_groups=True).add_do_commands(
+        IndicesGroup(group_name="nothing", indices=[])) == "group nothing empty\n"
+
+    # A group which cannot be evaluated forces the declaration of its operands
+    manual = ManualGroup(group_name="manual", do_cmd="group manual type 1",
+                         undo_cmd="group manual delete")
+    assert resolver.add_do_commands(manual) == "group manual type 1\n"
+    mixed = OperationGroup(group_name="mixed", op=OperationGroupEnum.UNION,
+                           other_groups=[grp_a, manual])
+    assert resolver.add_do_commands(mixed) == (
+        "group groupA id 1 2\n"
+        "group mixed union groupA manual\n")
+    assert resolver.add_undo_commands(mixed) == "group mixed delete\n"
+    assert resolver.add_undo_commands(manual) == "group manual delete\n"
+    assert resolver.add_undo_commands(grp_b) == ""
+    assert resolver.add_undo_commands(grp_a) == "group groupA delete\n"
+
+    # Without a resolver, the groups declare themselves
+    global_information = GlobalInformation()
+    assert get_group_do_commands(mixed, global_information) == "group mixed union groupA manual\n"
+    assert get_group_undo_commands(mixed, global_information) == "group mixed delete\n"
+
+
+def test_resolve_workflow():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path = Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+
+    typed_molecule = ReaxTypedMolecularSystem(
+        bbox_style=BoundingBoxStyle.PERIODIC,
+        electrostatic_method=ElectrostaticMethod.QEQ
+    )
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+
+    anchor_a = IndicesGroup(group_name="anchorA", indices=[1, 2])
+    anchor_b = IndicesGroup(group_name="anchorB", indices=[5, 6])
+    anchors = OperationGroup(group_name="anchors", op=OperationGroupEnum.UNION,
+                             other_groups=[anchor_a, anchor_b])
+    free = OperationGroup(group_name="free", op=OperationGroupEnum.SUBTRACT,
+                          other_groups=[AllGroup(), anchors])
+
+    global_section = RecursiveSection(section_name="globalSection")
+    for grp in [anchor_a, anchor_b, anchors, free]:
+        global_section.add_group(grp)
+
+    nve_section = IntegratorSection(section_name="nveSection",
+                                    integrator=NVEIntegrator(group=ReferenceGroup(reference=free)))
+    nve_section.add_extension(SetForceExtension(
+        extension_name="anchorForce", group=ReferenceGroup(reference=anchors)))
+    global_section.add_section(nve_section)
+    global_section.add_section(IntegratorSection(section_name="runSection",
+                                                 integrator=RunZeroIntegrator()))
+
+    assert collect_used_group_names([global_section]) >= {"free", "anchors"}
+    assert "anchorA" not in collect_used_group_names([global_section])
+
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(typed_molecule)
+    workflow.add_section(global_section)
+    workflow.set_group_resolution(True)
+    assert workflow.get_group_resolution() is True
+
+    job_folder = workflow.generate_inputs()
+    content = (job_folder / "workflow.input").read_text(encoding="utf-8")
+
+    assert "group anchors id 1 2 5 6\n" in content
+    assert "group free id 3 4 7:12\n" in content
+    assert "group anchorA" not in content
+    assert "group anchorB" not in content
+    assert "union" not in content
+    assert "subtract" not in content
+    assert content.count("group anchors delete\n") == 1
+    assert content.count("group free delete\n") == 1
+
+
+def test_resolve_atom_id_map():
+    # The atom i of the model is written with the id atom_id_map[i - 1]
+    atom_id_map = [4, 1, 5, 2, 3]
+    grp = IndicesGroup(group_name="groupA", indices=[1, 2, 3])
+    resolver = GroupResolver(nb_atoms=5, atom_id_map=np.array(atom_id_map))
+    assert resolver.add_do_commands(grp) == "group groupA id 1 4 5\n"
+    assert np.flatnonzero(resolver.get_mask("groupA")).tolist() == [0, 3, 4]
+
+    global_information = GlobalInformation()
+    global_information.set_atom_id_map(atom_id_map)
+    assert get_group_do_commands(grp, global_information) == "group groupA id 1 4 5\n"
+
+
+def test_resolve_workflow_ordered():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path = Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+
+    for resolve_groups in [False, True]:
+        typed_molecule = ReaxTypedMolecularSystem(
+            bbox_style=BoundingBoxStyle.PERIODIC,
+            electrostatic_method=ElectrostaticMethod.QEQ
+        )
+        typed_molecule.load_from_file(molecule_path, forcefield_path)
+        typed_molecule.set_data_file_settings(DataFileSettings(atom_ordering=AtomOrdering.MORTON))
+
+        anchor = IndicesGroup(group_name="anchor", indices=[1, 2])
+        global_section = RecursiveSection(section_name="globalSection")
+        global_section.add_group(anchor)
+        run_section = IntegratorSection(section_name="runSection", integrator=RunZeroIntegrator())
+        run_section.add_extension(SetForceExtension(
+            extension_name="anchorForce", group=ReferenceGroup(reference=anchor)))
+        global_section.add_section(run_section)
+
+        workflow = WorkflowBuilder()
+        workflow.set_typed_molecular_system(typed_molecule)
+        workflow.add_section(global_section)
+        workflow.set_group_resolution(resolve_groups)
+        job_folder = workflow.generate_inputs()
+        content = (job_folder / "workflow.input").read_text(encoding="utf-8")
+
+        # Find the ids given to the first two atoms of the model in the data file
+        positions = typed_molecule.get_ase_model().get_positions()
+        with open(job_folder / "model.data", "r", encoding="utf-8") as f:
+            lines = f.read().split("Atoms # full")[1].strip().splitlines()
+        ids = []
+        for line in lines:
+            values = line.split()
+            position = np.array([float(v) for v in values[4:7]])
+            if np.allclose(position, positions[0]) or np.allclose(position, positions[1]):
+                ids.append(int(values[0]))
+        assert f"group anchor id {' '.join(str(i) for i in sorted(ids))}\n" in content
+        assert "atom_modify    sort 1000 0.0\n" in content
+
+
+def test_group_slots():
+    tracker = GroupSlotTracker(max_groups=4)
+    assert tracker.get_nb_live_groups() == 1
+    tracker.declare("groupA")
+    tracker.declare("groupB")
+    tracker.declare("groupA")
+    assert tracker.get_nb_live_groups() == 3
+    tracker.remove("groupA")
+    tracker.declare("groupC")
+    tracker.declare("groupD")
+    assert tracker.get_peak() == 4
+    assert tracker.get_peak_groups() == ["groupB", "groupC", "groupD"]
+    assert not tracker.is_over_limit()
+
+
+def get_many_groups_workflow(nb_groups: int) -> WorkflowBuilder:
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path = Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+
+    typed_molecule = ReaxTypedMolecularSystem(
+        bbox_style=BoundingBoxStyle.PERIODIC,
+        electrostatic_method=ElectrostaticMethod.QEQ
+    )
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+
+    # Every group is declared for the whole workflow but each section only uses one of them
+    global_section = RecursiveSection(section_name="globalSection")
+    for i in range(nb_groups):
+        grp = IndicesGroup(group_name=f"group{i}", indices=[i % 12 + 1])
+        global_section.add_group(grp)
+        section = IntegratorSection(section_name=f"section{i}", integrator=RunZeroIntegrator())
+        section.add_extension(SetForceExtension(
+            extension_name=f"force{i}", group=ReferenceGroup(reference=grp)))
+        global_section.add_section(section)
+
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(typed_molecule)
+    workflow.add_section(global_section)
+    return workflow
+
+
+def test_group_slots_workflow():
+    nb_groups = 40
+
+    workflow = get_many_groups_workflow(nb_groups)
+    workflow.generate_inputs()
+    assert workflow.get_group_slot_tracker().get_peak() == nb_groups + 1
+    assert workflow.get_group_slot_tracker().is_over_limit()
+
+    # With the group resolution, the last groups are declared in the sections using them
+    workflow = get_many_groups_workflow(nb_groups)
+    workflow.set_group_resolution(True)
+    job_folder = workflow.generate_inputs()
+    tracker = workflow.get_group_slot_tracker()
+    assert tracker.get_peak() == MAX_LAMMPS_GROUPS - RESERVED_GROUP_SLOTS + 1
+    assert not tracker.is_over_limit()
+
+    content = (job_folder / "workflow.input").read_text(encoding="utf-8")
+    for i in range(nb_groups):
+        assert content.count(f"group group{i} id") == 1
+        assert content.count(f"group group{i} delete") == 1
+    # A deferred group is declared right before the fix using it and deleted after
+    last = nb_groups - 1
+    assert (content.index(f"group group{last} id")
+            < content.index(f"fix force{last} group{last}")
+            < content.index(f"group group{last} delete")
+            < content.index("END SECTION section39"))
@@ -1,6 +1,10 @@
 from lammpsinputbuilder.integrator import *
 from lammpsinputbuilder.types import GlobalInformation
 import pytest
+import numpy as np
+from lammpsinputbuilder.group import IndicesGroup
+from lammpsinputbuilder.quantities import LammpsUnitSystem
+from lammpsinputbuilder.quantities import LengthQuantity
 
 def test_NVEIntegrator():
     integrator = NVEIntegrator(integrator_name="myIntegrator", group=AllGroup(), nb_steps=1000)
@@ -141,6 +145,99 @@ def test_ManualIntegrator():
     assert integrator.add_run_commands() == "run\n"
     assert integrator.add_undo_commands() == "undo\n"
 
+def test_RunOptions():
+    options = RunOptions()
+    assert options.is_default()
+    assert options.get_run_arguments() == ""
+    assert options.get_run_arguments(skip_setup=True) == " pre no post no"
+
+    options = RunOptions(post=False, start=0, stop=5000, every=100, every_commands=["print $(step)"])
+    assert not options.is_default()
+    assert options.get_run_arguments() == ' start 0 stop 5000 post no every 100 "print $(step)"'
+    assert RunOptions(every=10).get_run_arguments(skip_setup=True) == " pre no post no every 10 NULL"
+
+    obj_dict = options.to_dict()
+    assert obj_dict == {"class_name": "RunOptions", "pre": True, "post": False, "start": 0,
+                        "stop": 5000, "every": 100, "every_commands": ["print $(step)"]}
+    options2 = RunOptions()
+    options2.from_dict(obj_dict, version=0)
+    assert options2.to_dict() == obj_dict
+
+    with pytest.raises(ValueError):
+        RunOptions(every=0)
+    with pytest.raises(ValueError):
+        RunOptions(every_commands=["print done"])
+
+    integrator = NVEIntegrator(integrator_name="myIntegrator", nb_steps=1000,
+                               run_options=RunOptions(start=0, stop=2000))
+    assert integrator.supports_run_options()
+    assert integrator.add_run_commands() == "run 1000 start 0 stop 2000\n"
+    assert integrator.add_run_commands(skip_setup=True) == "run 1000 start 0 stop 2000 pre no post no\n"
+    integrator2 = NVEIntegrator()
+    integrator2.from_dict(integrator.to_dict(), version=0)
+    assert integrator2.get_run_options().get_stop() == 2000
+
+    assert "run_options" not in RunZeroIntegrator().to_dict()
+    assert RunZeroIntegrator().add_run_commands(skip_setup=True) == "run 0 pre no post no\n"
+    assert not MinimizeIntegrator().supports_run_options()
+
+def test_RerunIntegrator(tmp_path):
+    displacements = LengthQuantity(np.array([[0.1, 0.0, 0.0], [0.0, 0.2, 0.0], [0.0, 0.0, 0.3]]), "nm")
+    integrator = RerunIntegrator(integrator_name="myIntegrator",
+                                 group=IndicesGroup(group_name="tip", indices=[2, 3]),
+                                 displacements=displacements)
+    assert integrator.get_integrator_name() == "myIntegrator"
+    assert integrator.get_group_name() == "tip"
+    assert integrator.get_nb_frames() == 3
+    assert integrator.get_associated_file_path() == "rerun.myIntegrator.lammpstrj"
+    assert integrator.get_frames_script_path() == "rerun.myIntegrator.lmp"
+
+    obj_dict = integrator.to_dict()
+    assert obj_dict["class_name"] == "RerunIntegrator"
+    assert obj_dict["group_name"] == "tip"
+    assert obj_dict["displacements"] == [[0.1, 0.0, 0.0], [0.0, 0.2, 0.0], [0.0, 0.0, 0.3]]
+    assert obj_dict["units"] == "nm"
+
+    integrator2 = RerunIntegrator()
+    integrator2.from_dict(obj_dict, version=0)
+    assert integrator2.to_dict() == obj_dict
+
+    info = GlobalInformation()
+    info.set_unit_style(LammpsUnitSystem.REAL)
+    with pytest.raises(ValueError):
+        integrator.add_do_commands(info)
+
+    info.get_workflow_context().job_folder = tmp_path
+    assert integrator.add_do_commands(info) == ""
+    assert integrator.add_run_commands() == """variable myIntegratorStep equal $(step)
+include rerun.myIntegrator.lmp
+rerun rerun.myIntegrator.lammpstrj last 2 dump x y z box no
+read_dump rerun.myIntegrator.lammpstrj 3 x y z box no
+reset_timestep ${myIntegratorStep}
+variable myIntegratorStep delete
+"""
+    assert integrator.add_undo_commands() == ""
+
+    # The configurations are built by Lammps from the current positions of the group,
+    # the last frame holds the positions before the rerun
+    dump_cmd = "write_dump tip custom rerun.myIntegrator.lammpstrj id x y z modify sort id format float %20.15g"
+    assert (tmp_path / "rerun.myIntegrator.lmp").read_text(encoding="utf-8").splitlines() == [
+        "reset_timestep 0",
+        "displace_atoms tip move 1.0000000000 0.0000000000 0.0000000000 units box",
+        dump_cmd,
+        "reset_timestep 1",
+        "displace_atoms tip move -1.0000000000 2.0000000000 0.0000000000 units box",
+        dump_cmd + " append yes",
+        "reset_timestep 2",
+        "displace_atoms tip move 0.0000000000 -2.0000000000 3.0000000000 units box",
+        dump_cmd + " append yes",
+        "reset_timestep 3",
+        "displace_atoms tip move 0.0000000000 0.0000000000 -3.0000000000 units box",
+        dump_cmd + " append yes"]
+
+    with pytest.raises(ValueError):
+        RerunIntegrator(displacements=LengthQuantity(np.zeros((2, 2)), "angstrom"))
+
 def test_wrong_name():
     with pytest.raises(ValueError):
         obj = ManualIntegrator(integrator_name="&&&", cmd_do="do", cmd_undo="undo", cmd_run="run")
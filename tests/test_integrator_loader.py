@@ -1,9 +1,10 @@
 import pytest
 
 from lammpsinputbuilder.integrator import RunZeroIntegrator, NVEIntegrator, \
-    MinimizeIntegrator, MinimizeStyle, MultipassMinimizeIntegrator
+    MinimizeIntegrator, MinimizeStyle, MultipassMinimizeIntegrator, RerunIntegrator
 from lammpsinputbuilder.loader.integrator_loader import IntegratorLoader
 from lammpsinputbuilder.group import AllGroup
+from lammpsinputbuilder.quantities import LengthQuantity
 
 def test_load_runzero_integrator():
     obj = RunZeroIntegrator(integrator_name="testIntegrator")
@@ -29,6 +30,20 @@ def test_load_nve_integrator():
     assert obj2.get_nb_steps() == 1000
 
 
+def test_load_rerun_integrator():
+    obj = RerunIntegrator(integrator_name="myIntegrator", group=AllGroup(),
+                          displacements=LengthQuantity([[1.0, 0.0, 0.0]], "angstrom"))
+
+    obj_dict = obj.to_dict()
+
+    loader = IntegratorLoader()
+    obj2 = loader.dict_to_integrator(obj_dict, version=0)
+    assert isinstance(obj2, RerunIntegrator)
+    assert obj2.get_integrator_name() == "myIntegrator"
+    assert obj2.get_group_name() == "all"
+    assert obj2.get_nb_frames() == 1
+
+
 def test_load_minimize_integrator():
     integrator = MinimizeIntegrator(
         integrator_name="myIntegrator",
@@ -1,11 +1,13 @@
 import json 
 
 from lammpsinputbuilder.integrator import RunZeroIntegrator, NVEIntegrator, \
-    MinimizeIntegrator, MultipassMinimizeIntegrator, ManualIntegrator, MinimizeStyle
+    MinimizeIntegrator, MultipassMinimizeIntegrator, ManualIntegrator, MinimizeStyle, \
+    RerunIntegrator, RunOptions
 from lammpsinputbuilder.model.integrator_model import RunZeroIntegratorModel, \
     NVEIntegratorModel, MinimizeIntegratorModel, MultiPassMinimizeIntegratorModel, \
-    ManualIntegratorModel
-from lammpsinputbuilder.group import AllGroup
+    ManualIntegratorModel, RerunIntegratorModel
+from lammpsinputbuilder.group import AllGroup, IndicesGroup
+from lammpsinputbuilder.quantities import LengthQuantity
 
 def test_run_zero_integrator_model():
     obj = RunZeroIntegrator(integrator_name="myIntegrator")
@@ -105,3 +107,35 @@ def test_manual_integrator_model():
     assert obj_model2.cmd_do == "do"
     assert obj_model2.cmd_undo == "undo"
     assert obj_model2.cmd_run == "run"
+
+def test_rerun_integrator_model():
+    obj = RerunIntegrator(integrator_name="myIntegrator",
+                          group=IndicesGroup(group_name="tip", indices=[1, 2, 3, 4]),
+                          displacements=LengthQuantity([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], "angstrom"))
+
+    obj_dict = obj.to_dict()
+    obj_dict_str = json.dumps(obj_dict)
+
+    # Check that the json produced by the object matches the model
+    obj_model1 = RerunIntegratorModel.model_validate_json(obj_dict_str)
+    assert obj_model1.class_name == "RerunIntegrator"
+    assert obj_model1.id_name == "myIntegrator"
+    assert obj_model1.group_name == "tip"
+    assert obj_model1.displacements == [(1.0, 0.0, 0.0), (0.0, 1.0, 0.0)]
+    assert obj_model1.units == "angstrom"
+
+    # Populate the model from the dictionnary
+    obj_model2 = RerunIntegratorModel(**obj_dict)
+    assert obj_model2.class_name == "RerunIntegrator"
+    assert obj_model2.group_name == "tip"
+
+def test_run_options_model():
+    obj = NVEIntegrator(integrator_name="myIntegrator", group=AllGroup(), nb_steps=1000,
+                        run_options=RunOptions(pre=False, every=100))
+
+    obj_dict = obj.to_dict()
+    obj_model = NVEIntegratorModel.model_validate_json(json.dumps(obj_dict))
+    assert obj_model.run_options.class_name == "RunOptions"
+    assert obj_model.run_options.pre is False
+    assert obj_model.run_options.every == 100
+    assert obj_model.run_options.stop is None
@@ -107,7 +107,7 @@ def test_integrator_section_dict():
         "groups": [{
             "class_name": "IndicesGroup",
             "id_name": "myIndicesGroup",
-            "indices": [1, 2, 3]
+            "indices": [[1, 3]]
         }],
         "instructions": [{
             "class_name": "SetTimestepInstruction",
@@ -209,7 +209,7 @@ def test_integrator_section_commands():
     #pylint: disable=line-too-long
     assert result == """#### START SECTION mySection ###################################################
 #### START Groups DECLARATION ##################################################
-group myIndicesGroup id 1 2 3
+group myIndicesGroup id 1:3
 #### END Groups DECLARATION ####################################################
 #### START Extensions DECLARATION ##############################################
 fix myExtension all move linear 0.0 0.0 0.0
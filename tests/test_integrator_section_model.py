@@ -63,7 +63,7 @@ def test_integrator_section_model():
     assert obj_model1.fileios[0].group_name == "all"
     assert obj_model1.fileios[0].style == DumpStyle.CUSTOM.value
     assert obj_model1.groups[0].id_name == "myIndicesGroup"
-    assert obj_model1.groups[0].indices == [1, 2, 3]
+    assert obj_model1.groups[0].indices == [(1, 3)]
     assert obj_model1.instructions[0].id_name == "myInstruction"
     assert obj_model1.instructions[0].timestep.magnitude == 20
     assert obj_model1.instructions[0].timestep.units == "fs"
@@ -96,7 +96,7 @@ def test_integrator_section_model():
     assert obj_model2.fileios[0].group_name == "all"
     assert obj_model2.fileios[0].style == DumpStyle.CUSTOM.value
     assert obj_model2.groups[0].id_name == "myIndicesGroup"
-    assert obj_model2.groups[0].indices == [1, 2, 3]
+    assert obj_model2.groups[0].indices == [(1, 3)]
     assert obj_model2.instructions[0].id_name == "myInstruction"
     assert obj_model2.instructions[0].timestep.magnitude == 20
     assert obj_model2.instructions[0].timestep.units == "fs"
@@ -0,0 +1,102 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from lammpsinputbuilder.section import LoopSection, LoopVariableStyle, InstructionsSection, \
+    IntegratorSection
+from lammpsinputbuilder.types import GlobalInformation, LammpsUnitSystem
+from lammpsinputbuilder.instructions import ManualInstruction
+from lammpsinputbuilder.integrator import RunZeroIntegrator
+from lammpsinputbuilder.quantities import LengthQuantity
+from lammpsinputbuilder.loader.section_loader import SectionLoader
+
+
+def get_loop_section(style: LoopVariableStyle) -> LoopSection:
+    section = LoopSection(section_name="scan", nb_iterations=3, style=style)
+    section.add_loop_variable("dx", LengthQuantity(np.array([1.0, 2.0, 0.5]), "nm"))
+    section.add_loop_variable("label", ["a", "b", "c"])
+
+    move = InstructionsSection(section_name="move")
+    move.add_instruction(ManualInstruction(instruction_name="move",
+                                           cmd="displace_atoms all move ${dx} 0 0"))
+    section.add_section(move)
+    section.add_section(IntegratorSection(section_name="spe", integrator=RunZeroIntegrator()))
+    return section
+
+
+def test_loop_section_accessors():
+    section = get_loop_section(LoopVariableStyle.INDEX)
+
+    assert section.get_section_name() == "scan"
+    assert section.get_nb_iterations() == 3
+    assert section.get_style() == LoopVariableStyle.INDEX
+    assert section.get_counter_variable_name() == "scanIter"
+    assert section.get_loop_variables() == ["dx", "label"]
+    assert len(section.get_sections()) == 2
+
+    with pytest.raises(ValueError):
+        LoopSection(section_name="scan", nb_iterations=0)
+    with pytest.raises(ValueError):
+        section.add_loop_variable("dy", [1.0, 2.0])
+    with pytest.raises(ValueError):
+        section.add_loop_variable("dx", [1.0, 2.0, 3.0])
+    with pytest.raises(ValueError):
+        section.add_loop_variable("name", ["a", "b c", "d"])
+
+
+def test_loop_section_dict():
+    section = get_loop_section(LoopVariableStyle.FILE)
+
+    d = section.to_dict()
+    print(json.dumps(d, indent=4))
+
+    assert d["class_name"] == "LoopSection"
+    assert d["nb_iterations"] == 3
+    assert d["style"] == LoopVariableStyle.FILE.value
+    assert d["loop_variables"] == [
+        {"variable_name": "dx", "values": [1.0, 2.0, 0.5],
+         "quantity_class": "LengthQuantity", "units": "nm"},
+        {"variable_name": "label", "values": ["a", "b", "c"]}
+    ]
+    assert len(d["sections"]) == 2
+
+    section2 = SectionLoader().dict_to_section(json.loads(json.dumps(d)))
+    assert isinstance(section2, LoopSection)
+    assert section2.to_dict() == d
+
+
+def test_loop_section_index_commands():
+    section = get_loop_section(LoopVariableStyle.INDEX)
+
+    global_info = GlobalInformation()
+    global_info.set_unit_style(LammpsUnitSystem.REAL)
+    result = section.add_all_commands(global_information=global_info)
+
+    lines = result.splitlines()
+    assert lines[1] == "variable scanIter loop 3"
+    assert lines[2] == "variable dx index 10 20 5"
+    assert lines[3] == "variable label index a b c"
+    assert lines[4] == "label scanStart"
+    assert "displace_atoms all move ${dx} 0 0" in lines
+    # The body is written only once
+    assert result.count("run 0") == 1
+    assert lines[-4:-1] == ["next dx label", "next scanIter", "jump SELF scanStart"]
+
+
+def test_loop_section_file_commands(tmp_path: Path):
+    section = get_loop_section(LoopVariableStyle.FILE)
+
+    global_info = GlobalInformation()
+    global_info.set_unit_style(LammpsUnitSystem.METAL)
+    with pytest.raises(ValueError):
+        section.add_all_commands(global_information=global_info)
+
+    global_info.get_workflow_context().job_folder = tmp_path
+    result = section.add_all_commands(global_information=global_info)
+
+    assert "variable dx file loop.scan.dx.txt\n" in result
+    assert "variable label file loop.scan.label.txt\n" in result
+    assert (tmp_path / "loop.scan.dx.txt").read_text(encoding="utf-8") == "10\n20\n5\n"
+    assert (tmp_path / "loop.scan.label.txt").read_text(encoding="utf-8") == "a\nb\nc\n"
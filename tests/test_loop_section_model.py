@@ -0,0 +1,34 @@
+import json
+
+from lammpsinputbuilder.section import LoopSection, LoopVariableStyle, IntegratorSection
+from lammpsinputbuilder.integrator import RunZeroIntegrator
+from lammpsinputbuilder.quantities import LengthQuantity
+
+from lammpsinputbuilder.model.template_model import LoopSectionModel
+
+def test_loop_section_model():
+    section = LoopSection(section_name="scan", nb_iterations=2, style=LoopVariableStyle.FILE)
+    section.add_loop_variable("dx", LengthQuantity([1.0, 2.0], "angstrom"))
+    section.add_loop_variable("step", [10, 20])
+    section.add_section(IntegratorSection(section_name="spe", integrator=RunZeroIntegrator()))
+
+    obj_dict = section.to_dict()
+    obj_dict_str = json.dumps(obj_dict)
+
+    # Check that the json produced by the object matches the model
+    obj_model1 = LoopSectionModel.model_validate_json(obj_dict_str)
+
+    assert obj_model1.class_name == "LoopSection"
+    assert obj_model1.id_name == "scan"
+    assert obj_model1.nb_iterations == 2
+    assert obj_model1.style == LoopVariableStyle.FILE
+    assert obj_model1.sections[0].class_name == "IntegratorSection"
+    assert obj_model1.loop_variables[0].quantity_class == "LengthQuantity"
+    assert obj_model1.loop_variables[0].values == [1.0, 2.0]
+    assert obj_model1.loop_variables[1].values == [10, 20]
+    assert obj_model1.loop_variables[1].units is None
+
+    # Populate the model from the dictionnary
+    obj_model2 = LoopSectionModel(**obj_dict)
+    assert obj_model2.class_name == "LoopSection"
+    assert obj_model2.loop_variables[0].variable_name == "dx"
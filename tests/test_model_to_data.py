@@ -0,0 +1,174 @@
+import gzip
+from pathlib import Path
+import tempfile
+from uuid import uuid4
+import os
+import shutil
+
+import numpy as np
+import pytest
+from ase import Atoms
+
+from lammpsinputbuilder.types import MoleculeFileFormat, CompressionStyle, BoundingBoxStyle
+from lammpsinputbuilder.utility.model_to_data import molecule_to_lammps_data_pbc, \
+    get_atom_types, format_atoms_full_lines, extract_elements_from_data, \
+    write_lammps_data_full, open_data_file, compute_bounding_box
+from lammpsinputbuilder.utility.molecule_reader import read_molecule_from_string
+
+
+def test_get_atom_types():
+    atoms = Atoms("HSiHC", positions=np.zeros((4, 3)))
+    types, element_table, masses = get_atom_types(atoms)
+
+    assert types.tolist() == [2, 3, 2, 1]
+    assert element_table == {1: "C", 2: "H", 3: "Si"}
+    assert len(masses) == 3
+    assert masses[1] == atoms.get_masses()[0]
+
+
+def test_format_atoms_full_lines():
+    positions = np.array([[0.0, 1.5, -2.25], [10.0, 0.1, 3.0]])
+    lines = format_atoms_full_lines(5, np.array([1, 2]), np.array([0.0, -0.5]), positions)
+
+    assert lines == (
+        f"{5:>6} {0:>3} {1:>3} {0.0:>5} {0.0:23.17g} {1.5:23.17g} {-2.25:23.17g}\n"
+        f"{6:>6} {0:>3} {2:>3} {-0.5:>5} {10.0:23.17g} {0.1:23.17g} {3.0:23.17g}\n")
+    assert format_atoms_full_lines(1, np.array([]), np.array([]), np.zeros((0, 3))) == ""
+
+
+def test_molecule_to_lammps_data_pbc():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    with open(molecule_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    job_folder = Path(tempfile.gettempdir()) / str(uuid4())
+    os.makedirs(job_folder)
+
+    global_information = molecule_to_lammps_data_pbc(
+        content, MoleculeFileFormat.XYZ, job_folder, "model.data")
+
+    data_path = job_folder / "model.data"
+    assert data_path.is_file()
+    assert not (job_folder / "model.data.temp").exists()
+    assert global_information.get_element_table() == {1: "C", 2: "H"}
+    assert extract_elements_from_data(data_path) == " C H"
+
+    positions = global_information.get_atoms().get_positions()
+    bbox = global_information.get_bbox_coords()
+    assert bbox[0] == positions[:, 0].min() - 50.0
+    assert bbox[5] == positions[:, 2].max() + 50.0
+
+    with open(data_path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    assert lines[0] == "# Generated by LammpsInputBuilder\n"
+    assert lines[1] == f"{len(positions)} atoms\n"
+    assert lines[2] == "2 atom types\n"
+    atoms_offset = lines.index("Atoms # full\n") + 2
+    atom_lines = lines[atoms_offset:]
+    assert len(atom_lines) == len(positions)
+    assert np.allclose(
+        np.array([line.split()[4:7] for line in atom_lines], dtype=float), positions)
+
+    shutil.rmtree(job_folder, ignore_errors=True)
+
+
+def test_compute_bounding_box():
+    positions = np.array([[1.0, 2.0, 3.0], [4.0, 6.0, 5.0]])
+    molecule = Atoms("CH", positions=positions)
+
+    assert compute_bounding_box(molecule) == (
+        [-49.0, 54.0, -48.0, 56.0, -47.0, 55.0], ["p", "p", "p"])
+    assert compute_bounding_box(molecule, BoundingBoxStyle.PERIODIC, padding=10.0) == (
+        [-9.0, 14.0, -8.0, 16.0, -7.0, 15.0], ["p", "p", "p"])
+    assert compute_bounding_box(molecule, BoundingBoxStyle.SHRINK) == (
+        [0.0, 5.0, 1.0, 7.0, 2.0, 6.0], ["s", "s", "s"])
+    with pytest.raises(ValueError):
+        compute_bounding_box(molecule, padding=-1.0)
+    with pytest.raises(ValueError):
+        compute_bounding_box(Atoms())
+
+    # A slab keeps its periodic lattice, only the normal direction is fitted
+    slab_content = ("2\nLattice=\"10.0 0.0 0.0 0.0 12.0 0.0 0.0 0.0 0.0\" "
+                    "Properties=species:S:1:pos:R:3 pbc=\"T T F\"\n"
+                    "C 1.0 2.0 3.0\nC 4.0 6.0 5.0\n")
+    slab = read_molecule_from_string(slab_content, MoleculeFileFormat.XYZ)
+    assert compute_bounding_box(slab, BoundingBoxStyle.SHRINK) == (
+        [0.0, 10.0, 0.0, 12.0, 2.0, 6.0], ["p", "p", "s"])
+    assert compute_bounding_box(slab, BoundingBoxStyle.PERIODIC, padding=5.0) == (
+        [0.0, 10.0, 0.0, 12.0, -2.0, 10.0], ["p", "p", "p"])
+
+    # The box of a Lammps dump is reused
+    dump_content = ("ITEM: TIMESTEP\n0\nITEM: NUMBER OF ATOMS\n2\n"
+                    "ITEM: BOX BOUNDS pp pp pp\n-5.0 15.0\n-5.0 15.0\n-5.0 15.0\n"
+                    "ITEM: ATOMS id element x y z\n1 C 1.0 2.0 3.0\n2 C 4.0 6.0 5.0\n")
+    dump = read_molecule_from_string(dump_content, MoleculeFileFormat.LAMMPS_DUMP_TEXT)
+    assert compute_bounding_box(dump, BoundingBoxStyle.SHRINK) == (
+        [-5.0, 15.0, -5.0, 15.0, -5.0, 15.0], ["p", "p", "p"])
+
+    # Triclinic cells are not supported and replaced by a fitted box
+    triclinic = Atoms("CH", positions=positions, cell=[[10, 0, 0], [2, 10, 0], [0, 0, 10]],
+                      pbc=True)
+    assert compute_bounding_box(triclinic, BoundingBoxStyle.SHRINK)[1] == ["s", "s", "s"]
+
+
+def test_write_lammps_data_full_parallel():
+    rng = np.random.default_rng(42)
+    nb_atoms = 1000
+    positions = rng.uniform(-100.0, 100.0, size=(nb_atoms, 3))
+    types = rng.integers(1, 4, size=nb_atoms)
+    charges = rng.uniform(-1.0, 1.0, size=nb_atoms)
+    element_table = {1: "C", 2: "H", 3: "O"}
+    masses = [12.011, 1.008, 15.999]
+    bbox_coords = [-150.0, 150.0, -150.0, 150.0, -150.0, 150.0]
+
+    job_folder = Path(tempfile.gettempdir()) / str(uuid4())
+    os.makedirs(job_folder)
+
+    write_lammps_data_full(job_folder / "serial.data", positions, types, charges,
+                           element_table, masses, bbox_coords)
+    write_lammps_data_full(job_folder / "parallel.data", positions, types, charges,
+                           element_table, masses, bbox_coords, nb_workers=3, chunk_size=77)
+
+    with open(job_folder / "serial.data", "r", encoding="utf-8") as f:
+        serial_content = f.read()
+    with open(job_folder / "parallel.data", "r", encoding="utf-8") as f:
+        parallel_content = f.read()
+    assert serial_content == parallel_content
+
+    with pytest.raises(ValueError):
+        write_lammps_data_full(job_folder / "invalid.data", positions, types, charges,
+                               element_table, masses, bbox_coords, nb_workers=0)
+
+    shutil.rmtree(job_folder, ignore_errors=True)
+
+
+def test_molecule_to_lammps_data_pbc_gzip():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    with open(molecule_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    job_folder = Path(tempfile.gettempdir()) / str(uuid4())
+    os.makedirs(job_folder)
+
+    molecule_to_lammps_data_pbc(content, MoleculeFileFormat.XYZ, job_folder, "model.data")
+    molecule_to_lammps_data_pbc(content, MoleculeFileFormat.XYZ, job_folder, "model.data.gz",
+                                compression=CompressionStyle.GZIP)
+
+    with open(job_folder / "model.data", "r", encoding="utf-8") as f:
+        plain_content = f.read()
+    with gzip.open(job_folder / "model.data.gz", "rt", encoding="utf-8") as f:
+        compressed_content = f.read()
+    assert plain_content == compressed_content
+
+    shutil.rmtree(job_folder, ignore_errors=True)
+
+
+def test_open_data_file_zstd_missing():
+    try:
+        import zstandard  # pylint: disable=import-outside-toplevel,unused-import
+        pytest.skip("zstandard is installed")
+    except ImportError:
+        pass
+
+    with pytest.raises(ImportError):
+        open_data_file(Path(tempfile.gettempdir()) / "model.data.zst", CompressionStyle.ZSTD)
@@ -0,0 +1,199 @@
+from io import StringIO
+from pathlib import Path
+from typing import List
+from uuid import uuid4
+import os
+import tempfile
+
+import numpy as np
+import pytest
+from ase.io import read as ase_read
+from ase.io.lammpsrun import read_lammps_dump_text as ase_read_lammps_dump_text
+
+from lammpsinputbuilder.types import MoleculeFileFormat
+from lammpsinputbuilder.typedmolecule import ReaxTypedMolecularSystem
+from lammpsinputbuilder.utility.molecule_reader import read_molecule_from_string, \
+    read_mol2_from_string, get_element_from_mol2_atom, read_xyz_from_string, \
+    read_lammps_dump_text_from_string, read_lammps_dump_frame_from_file, \
+    find_lammps_dump_frame_offsets
+
+MOL2_CONTENT = """@<TRIPOS>MOLECULE
+water
+ 3 2 0 0 0
+SMALL
+USER_CHARGES
+
+@<TRIPOS>ATOM
+      1 O1          0.0000    0.0000    0.1173 O.3     1  HOH1       -0.8340
+      2 H1          0.0000    0.7572   -0.4692 H       1  HOH1        0.4170
+      3 H2          0.0000   -0.7572   -0.4692 H       1  HOH1        0.4170
+@<TRIPOS>BOND
+     1     1     2    1
+     2     1     3    1
+"""
+
+LAMMPSTRJ_CONTENT = """ITEM: TIMESTEP
+0
+ITEM: NUMBER OF ATOMS
+2
+ITEM: BOX BOUNDS pp pp pp
+0.0 10.0
+0.0 10.0
+0.0 10.0
+ITEM: ATOMS id element x y z
+2 H 1.0 2.0 3.0
+1 C 4.0 5.0 6.0
+"""
+
+
+def test_read_xyz_from_string():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    with open(molecule_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    atoms = read_molecule_from_string(content, MoleculeFileFormat.XYZ)
+    reference = ase_read(molecule_path)
+
+    assert atoms.get_chemical_symbols() == reference.get_chemical_symbols()
+    assert np.allclose(atoms.get_positions(), reference.get_positions())
+
+
+def test_read_lammpstrj_from_string():
+    atoms = read_molecule_from_string(LAMMPSTRJ_CONTENT, MoleculeFileFormat.LAMMPS_DUMP_TEXT)
+
+    assert atoms.get_chemical_symbols() == ["C", "H"]
+    assert np.allclose(atoms.get_positions(), [[4.0, 5.0, 6.0], [1.0, 2.0, 3.0]])
+
+
+def test_read_mol2_from_string():
+    atoms = read_molecule_from_string(MOL2_CONTENT, MoleculeFileFormat.MOL2)
+
+    assert atoms.get_chemical_symbols() == ["O", "H", "H"]
+    assert np.allclose(atoms.get_positions()[1], [0.0, 0.7572, -0.4692])
+    assert np.allclose(atoms.get_initial_charges(), [-0.834, 0.417, 0.417])
+
+    assert get_element_from_mol2_atom("C.ar", "C1") == "C"
+    assert get_element_from_mol2_atom("Cl", "CL1") == "Cl"
+    assert get_element_from_mol2_atom("Du", "FE1") == "Fe"
+
+    with pytest.raises(ValueError):
+        read_mol2_from_string("@<TRIPOS>MOLECULE\nempty\n")
+    with pytest.raises(ValueError):
+        read_mol2_from_string("@<TRIPOS>ATOM\n1 C1 0.0 0.0\n")
+
+    with pytest.raises(NotImplementedError):
+        read_molecule_from_string(MOL2_CONTENT, None)
+
+
+def test_load_from_string_in_memory(monkeypatch):
+    def fail_mkdtemp(*args, **kwargs):
+        raise AssertionError("load_from_string must not create temporary folders")
+    monkeypatch.setattr(tempfile, "mkdtemp", fail_mkdtemp)
+
+    typed_molecule = ReaxTypedMolecularSystem()
+    typed_molecule.load_from_string(
+        MOL2_CONTENT, MoleculeFileFormat.MOL2, "", Path("ffield.reax"), Path("water.mol2"))
+
+    assert typed_molecule.is_model_loaded()
+    assert typed_molecule.get_ase_model().get_chemical_symbols() == ["O", "H", "H"]
+
+
+def test_native_xyz_reader():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'scan.fullmodel.xyz'
+    with open(molecule_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    atoms = read_xyz_from_string(content)
+    reference = ase_read(StringIO(content), format="extxyz")
+    assert atoms is not None
+    assert np.array_equal(atoms.get_atomic_numbers(), reference.get_atomic_numbers())
+    assert np.array_equal(atoms.get_positions(), reference.get_positions())
+
+    # Extended xyz and multi-frame files are delegated to ASE
+    extxyz = "1\nLattice=\"10 0 0 0 10 0 0 0 10\" Properties=species:S:1:pos:R:3 pbc=\"T T T\"\nC 1.0 2.0 3.0\n"
+    assert read_xyz_from_string(extxyz) is None
+    atoms = read_molecule_from_string(extxyz, MoleculeFileFormat.XYZ)
+    assert np.allclose(atoms.get_cell().lengths(), [10.0, 10.0, 10.0])
+    assert read_xyz_from_string("1\n\nC 0 0 0\n1\n\nH 0 0 0\n") is None
+    assert read_xyz_from_string("1\n\nC 0 0 0 1.0\n") is None
+
+
+def test_native_lammps_dump_reader():
+    content = LAMMPSTRJ_CONTENT.replace("0\n", "5\n", 1) + LAMMPSTRJ_CONTENT.replace(
+        "ITEM: ATOMS id element x y z\n2 H 1.0 2.0 3.0\n1 C 4.0 5.0 6.0\n",
+        "ITEM: ATOMS id type q xs ys zs\n2 1 0.5 0.1 0.2 0.3\n1 6 -0.5 0.4 0.5 0.6\n")
+
+    atoms = read_lammps_dump_text_from_string(content)
+    reference = ase_read_lammps_dump_text(StringIO(content))
+    assert atoms is not None
+    assert np.array_equal(atoms.get_atomic_numbers(), reference.get_atomic_numbers())
+    assert np.allclose(atoms.get_positions(), reference.get_positions())
+    assert np.array_equal(atoms.get_cell(), reference.get_cell())
+    assert np.array_equal(atoms.get_initial_charges(), reference.get_initial_charges())
+    assert np.array_equal(atoms.get_pbc(), reference.get_pbc())
+    assert atoms.info["timestep"] == 0
+
+    # Triclinic boxes and unknown columns are delegated to ASE
+    triclinic = LAMMPSTRJ_CONTENT.replace(
+        "ITEM: BOX BOUNDS pp pp pp\n0.0 10.0\n0.0 10.0\n0.0 10.0\n",
+        "ITEM: BOX BOUNDS xy xz yz pp pp pp\n0.0 10.0 1.0\n0.0 10.0 0.0\n0.0 10.0 0.0\n")
+    assert read_lammps_dump_text_from_string(triclinic) is None
+    assert len(read_molecule_from_string(triclinic, MoleculeFileFormat.LAMMPS_DUMP_TEXT)) == 2
+    forces = LAMMPSTRJ_CONTENT.replace("x y z\n2 H 1.0 2.0 3.0\n1 C 4.0 5.0 6.0\n",
+                                       "x y z fx\n2 H 1.0 2.0 3.0 0.0\n1 C 4.0 5.0 6.0 0.0\n")
+    assert read_lammps_dump_text_from_string(forces) is None
+
+
+def write_multi_frame_dump(path: Path, nb_frames: int) -> List[str]:
+    frames = []
+    for i in range(nb_frames):
+        frames.append(LAMMPSTRJ_CONTENT.replace("ITEM: TIMESTEP\n0\n", f"ITEM: TIMESTEP\n{i * 10}\n")
+                      .replace("1 C 4.0 5.0 6.0", f"1 C {i}.0 5.0 6.0"))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(frames))
+    return frames
+
+
+def test_read_lammps_dump_frame_from_file():
+    dump_path = Path(tempfile.gettempdir()) / f"{uuid4()}.lammpstrj"
+    frames = write_multi_frame_dump(dump_path, 4)
+
+    assert read_lammps_dump_frame_from_file(dump_path, 0) == frames[0]
+    assert read_lammps_dump_frame_from_file(dump_path, 2) == frames[2]
+    assert read_lammps_dump_frame_from_file(dump_path, 3) == frames[3]
+    assert read_lammps_dump_frame_from_file(dump_path, -1) == frames[3]
+    assert read_lammps_dump_frame_from_file(dump_path, -4) == frames[0]
+
+    # Small blocks to exercise markers spanning two blocks
+    offsets = [sum(len(frame) for frame in frames[:i]) for i in range(4)]
+    for block_size in [5, 7, 13, 1000]:
+        assert find_lammps_dump_frame_offsets(dump_path, 10, from_end=False, block_size=block_size) == offsets
+        assert find_lammps_dump_frame_offsets(dump_path, 10, from_end=True, block_size=block_size) == offsets[::-1]
+        assert find_lammps_dump_frame_offsets(dump_path, 2, from_end=True, block_size=block_size) == offsets[:1:-1]
+
+    with pytest.raises(ValueError):
+        read_lammps_dump_frame_from_file(dump_path, 4)
+    with pytest.raises(ValueError):
+        read_lammps_dump_frame_from_file(dump_path, -5)
+
+    os.remove(dump_path)
+
+
+def test_load_lammps_dump_frame():
+    dump_path = Path(tempfile.gettempdir()) / f"{uuid4()}.lammpstrj"
+    frames = write_multi_frame_dump(dump_path, 3)
+    forcefield_path = Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+
+    typed_molecule = ReaxTypedMolecularSystem()
+    typed_molecule.load_from_file(dump_path, forcefield_path, frame=-1)
+    assert typed_molecule.get_molecule_content() == frames[2]
+    assert np.allclose(typed_molecule.get_ase_model().get_positions()[0], [2.0, 5.0, 6.0])
+
+    typed_molecule.load_from_file(dump_path, forcefield_path, frame=1)
+    assert typed_molecule.get_molecule_content() == frames[1]
+
+    xyz_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    with pytest.raises(ValueError):
+        typed_molecule.load_from_file(xyz_path, forcefield_path, frame=0)
+
+    os.remove(dump_path)
@@ -0,0 +1,115 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from ase import Atoms
+
+from lammpsinputbuilder.neighbor import NeighborSettings, estimate_displacement_per_step, \
+    estimate_max_neighbors
+from lammpsinputbuilder.quantities import LengthQuantity, TimeQuantity, TemperatureQuantity
+from lammpsinputbuilder.types import GlobalInformation, Forcefield
+from lammpsinputbuilder.typedmolecule import ReaxTypedMolecularSystem
+from lammpsinputbuilder.workflow_builder import WorkflowBuilder
+from lammpsinputbuilder.utility.model_to_data import get_pair_cutoff
+from lammpsinputbuilder.model.typedmolecule_model import NeighborSettingsModel
+
+
+def get_grid_information(spacing: float) -> GlobalInformation:
+    grid = np.stack(np.meshgrid(*[np.arange(10) * spacing] * 3, indexing="ij"), axis=-1)
+    global_information = GlobalInformation()
+    global_information.set_atoms(Atoms(symbols=["C"] * 1000, positions=grid.reshape(-1, 3)))
+    global_information.set_bbox_coords([0.0, 100.0, 0.0, 100.0, 0.0, 100.0])
+    return global_information
+
+
+def test_estimators():
+    # Thermal speed of hydrogen at 300K is about 0.0272 Angstrom/fs
+    displacement = estimate_displacement_per_step(
+        np.array([12.011, 1.008]), TemperatureQuantity(300.0, "K"), TimeQuantity(1.0, "fs"))
+    assert displacement == pytest.approx(3 * 0.0272, rel=1e-2)
+    assert estimate_displacement_per_step(
+        np.array([1.008]), TemperatureQuantity(300.0, "K"),
+        TimeQuantity(0.0005, "ps")) == pytest.approx(displacement / 2)
+
+    positions = np.stack(np.meshgrid(*[np.arange(5.0)] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+    # The center of the grid has 6 neighbors at 1 Angstrom
+    assert estimate_max_neighbors(positions, 1.0) == 6
+    assert estimate_max_neighbors(np.zeros((0, 3)), 1.0) == 0
+
+
+def test_tune():
+    settings = NeighborSettings()
+    tuned = settings.tune(get_grid_information(1.0), pair_cutoff=2.0)
+    # Carbon atoms at 300K move about 0.024 Angstrom per fs, the skin is at its minimum
+    assert tuned["skin"] == 0.5
+    assert tuned["every"] == 10
+    assert tuned["delay"] == 0
+    assert tuned["check"] is True
+    assert tuned["page"] == 50 * tuned["one"]
+
+    # Denser systems need more neighbors per atom
+    assert NeighborSettings().tune(get_grid_information(0.5), 2.0)["one"] > tuned["one"]
+
+    # Hotter systems and larger timesteps need more frequent checks
+    hot = NeighborSettings(skin=LengthQuantity(0.5, "angstrom"),
+                           temperature=TemperatureQuantity(3000.0, "K"),
+                           timestep=TimeQuantity(0.5, "fs"))
+    hot_tuned = hot.tune(get_grid_information(1.0), 2.0)
+    assert hot_tuned["skin"] == 0.5
+    assert hot_tuned["every"] < tuned["every"]
+
+    # User settings are kept as is
+    fixed = NeighborSettings(every=1, delay=2, check=False, one=500, page=10000)
+    assert fixed.tune(get_grid_information(1.0), 2.0) == {
+        "skin": tuned["skin"], "every": 1, "delay": 2, "check": False, "one": 500, "page": 10000}
+    assert fixed.get_neighbor_commands(get_grid_information(1.0), 2.0).endswith(
+        "neigh_modify   every 1 delay 2 check no one 500 page 10000\n")
+
+    with pytest.raises(ValueError):
+        NeighborSettings(every=0)
+    with pytest.raises(ValueError):
+        NeighborSettings(one=500, page=1000)
+    with pytest.raises(ValueError):
+        NeighborSettings(page=10).tune(get_grid_information(1.0), 2.0)
+
+
+def test_neighbor_settings_dict_and_model():
+    settings = NeighborSettings(skin=LengthQuantity(1.5, "angstrom"), one=300)
+    settings_dict = settings.to_dict()
+    assert "every" not in settings_dict
+
+    settings2 = NeighborSettings()
+    settings2.from_dict(settings_dict, 0)
+    assert settings2.to_dict() == settings_dict
+
+    model = NeighborSettingsModel.model_validate_json(json.dumps(settings_dict))
+    assert model.one == 300
+    assert model.every is None
+    settings3 = NeighborSettings()
+    settings3.from_dict(model.model_dump(), 0)
+    assert settings3.to_dict() == settings_dict
+
+
+def test_workflow_neighbor_settings():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path = Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+
+    assert get_pair_cutoff(Forcefield.REAX, forcefield_path) == 10.0
+    assert get_pair_cutoff(Forcefield.REAX, Path("missing.reax")) == 10.0
+    assert get_pair_cutoff(Forcefield.REBO, forcefield_path) == 6.0
+
+    typed_molecule = ReaxTypedMolecularSystem()
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+    typed_molecule.set_neighbor_settings(NeighborSettings(one=200))
+
+    typed_molecule2 = ReaxTypedMolecularSystem()
+    typed_molecule2.from_dict(typed_molecule.to_dict(), 0)
+    assert typed_molecule2.get_neighbor_settings().get_one() == 200
+
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(typed_molecule)
+    job_folder = workflow.generate_inputs()
+    content = (job_folder / "workflow.input").read_text(encoding="utf-8")
+    assert "neighbor       1.635 bin\n" in content
+    assert "neigh_modify   every 10 delay 0 check yes one 200 page 10000\n" in content
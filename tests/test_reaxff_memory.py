@@ -0,0 +1,126 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from ase import Atoms
+
+from lammpsinputbuilder.reaxff_memory import ReaxFFMemorySettings, estimate_ghost_factor, \
+    DEFAULT_MINCAP, DEFAULT_SAFEZONE, DEFAULT_MINHBONDS, UNKNOWN_GRID_MINCAP
+from lammpsinputbuilder.decomposition import DomainDecomposition
+from lammpsinputbuilder.types import GlobalInformation
+from lammpsinputbuilder.typedmolecule import ReaxTypedMolecularSystem
+from lammpsinputbuilder.workflow_builder import WorkflowBuilder
+from lammpsinputbuilder.model.typedmolecule_model import ReaxFFMemorySettingsModel
+
+
+def get_grid_information(spacing: float, nb_per_dim: int = 10, symbol: str = "C") -> GlobalInformation:
+    grid = np.stack(np.meshgrid(*[np.arange(nb_per_dim) * spacing] * 3, indexing="ij"), axis=-1)
+    global_information = GlobalInformation()
+    global_information.set_atoms(
+        Atoms(symbols=[symbol] * nb_per_dim ** 3, positions=grid.reshape(-1, 3)))
+    global_information.set_bbox_coords([-50.0, 100.0, -50.0, 100.0, -50.0, 100.0])
+    return global_information
+
+
+def test_tune():
+    # Without the number of processes, the mincap can't be derived from the model
+    small_information = get_grid_information(1.5, nb_per_dim=2)
+    assert ReaxFFMemorySettings().tune(small_information, 10.0)["mincap"] == UNKNOWN_GRID_MINCAP
+
+    # Small systems only reserve the Lammps minimum
+    small_information.get_workflow_context().domain_decomposition = DomainDecomposition(nb_procs=1)
+    small = ReaxFFMemorySettings().tune(small_information, 10.0)
+    assert small["mincap"] == DEFAULT_MINCAP
+    assert small["safezone"] == DEFAULT_SAFEZONE
+    assert small["minhbonds"] == DEFAULT_MINHBONDS
+
+    # The grid is denser in its center than on its faces
+    global_information = get_grid_information(1.5)
+    global_information.get_workflow_context().domain_decomposition = DomainDecomposition(nb_procs=1)
+    tuned = ReaxFFMemorySettings().tune(global_information, 10.0)
+    assert DEFAULT_SAFEZONE < tuned["safezone"] < 2.0
+    assert tuned["mincap"] == int(np.ceil(1000 * tuned["safezone"]))
+    assert tuned["memory"] > small["memory"]
+
+    # The atoms are shared between the processes, each process also holds ghost atoms
+    single = ReaxFFMemorySettings().tune(global_information, 3.0)
+    global_information.get_workflow_context().domain_decomposition = DomainDecomposition(nb_procs=8)
+    split = ReaxFFMemorySettings().tune(global_information, 3.0)
+    assert split["mincap"] == int(np.ceil(125 * split["safezone"]))
+    assert split["memory"] < single["memory"]
+    # With a cutoff larger than the subdomains, every process holds all the atoms
+    assert ReaxFFMemorySettings().tune(global_information, 10.0)["memory"] == pytest.approx(
+        tuned["memory"], rel=0.01)
+
+    # A single crowded atom doesn't change the safezone of the whole system
+    crowded = get_grid_information(3.0)
+    uniform_safezone = ReaxFFMemorySettings().tune(crowded, 10.0)["safezone"]
+    atoms = crowded.get_atoms()
+    atoms.append(atoms[555])
+    atoms.positions[-1] += 0.5
+    assert ReaxFFMemorySettings().tune(crowded, 10.0)["safezone"] == uniform_safezone
+
+    # The settings given by the user are kept
+    fixed = ReaxFFMemorySettings(mincap=1000, safezone=1.5, minhbonds=40).tune(
+        global_information, 10.0)
+    assert (fixed["mincap"], fixed["safezone"], fixed["minhbonds"]) == (1000, 1.5, 40)
+
+    # Hydrogen atoms surrounded by oxygen atoms need more hydrogen bonds
+    positions = np.concatenate([np.zeros((1, 3)), np.random.default_rng(0).uniform(-4, 4, (60, 3))])
+    hbond_information = GlobalInformation()
+    hbond_information.set_atoms(Atoms(symbols=["H"] + ["O"] * 60, positions=positions))
+    hbond_information.set_bbox_coords([-50.0, 50.0, -50.0, 50.0, -50.0, 50.0])
+    assert ReaxFFMemorySettings().tune(hbond_information, 10.0)["minhbonds"] == 90
+
+    with pytest.raises(ValueError):
+        ReaxFFMemorySettings(mincap=0)
+    with pytest.raises(ValueError):
+        ReaxFFMemorySettings(safezone=0.5)
+    with pytest.raises(ValueError):
+        ReaxFFMemorySettings(minhbonds=0)
+
+
+def test_ghost_factor():
+    global_information = get_grid_information(1.0)
+    # The atoms are far from the periodic images and use a single process
+    assert estimate_ghost_factor(global_information, (1, 1, 1), 10.0) == 1.0
+    # Splitting x between two processes adds a shell of ghost atoms along x
+    assert estimate_ghost_factor(global_information, (2, 1, 1), 2.0) == pytest.approx(
+        (4.5 + 4.0) / 4.5)
+    # The atoms span the periodic cell
+    global_information.set_bbox_coords([0.0, 10.0, 0.0, 10.0, -50.0, 100.0])
+    assert estimate_ghost_factor(global_information, (1, 1, 1), 2.0) == pytest.approx(
+        ((9.0 + 4.0) / 9.0) ** 2)
+
+
+def test_serialization():
+    settings = ReaxFFMemorySettings(mincap=500)
+    d = settings.to_dict()
+    assert d == {"class_name": "ReaxFFMemorySettings", "mincap": 500}
+    ReaxFFMemorySettingsModel(**d)
+    settings2 = ReaxFFMemorySettings()
+    settings2.from_dict(d, 0)
+    assert settings2.get_mincap() == 500
+    assert settings2.get_safezone() is None
+    with pytest.raises(ValueError):
+        settings2.from_dict({"class_name": "NeighborSettings"}, 0)
+
+
+def test_workflow():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path = Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+    typed_molecule = ReaxTypedMolecularSystem()
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+    assert typed_molecule.get_memory_settings() is None
+
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(typed_molecule)
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    assert "pair_style     reaxff NULL mincap 1000\n" in content
+    assert "# Estimated memory" not in content
+
+    typed_molecule.set_memory_settings(ReaxFFMemorySettings())
+    workflow.set_domain_decomposition(DomainDecomposition(nb_procs=1))
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    assert "# Estimated memory of the ReaxFF lists per process:" in content
+    assert "pair_style     reaxff NULL mincap 50 safezone 1.2 minhbonds 25\n" in content
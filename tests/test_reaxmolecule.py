@@ -1,14 +1,20 @@
 from pathlib import Path
+from typing import List, Tuple
+import gzip
 import tempfile
 from uuid import uuid4
 import os
 import shutil
 
+import numpy as np
 import pytest
 
 from lammpsinputbuilder.types import BoundingBoxStyle, ElectrostaticMethod, \
-    Forcefield, MoleculeFileFormat
+    Forcefield, MoleculeFileFormat, CompressionStyle, AccelerationStyle, AtomOrdering, \
+    GlobalInformation
 from lammpsinputbuilder.typedmolecule import ReaxTypedMolecularSystem
+from lammpsinputbuilder.quantities import LengthQuantity
+from lammpsinputbuilder.data_file import DataFileSettings
 
 
 def test_emptyReaxMolecule():
@@ -156,6 +162,166 @@ def test_moleculeToJobFolder():
     assert (job_folder / "molecule.XYZ").is_file()
     assert (job_folder / typed_molecule.get_lammps_data_filename()).is_file()
     assert (job_folder / "model.data").is_file()
-    assert (job_folder / "model.data.temp").is_file()
 
     shutil.rmtree(job_folder, ignore_errors=True)
+
+def load_benzene(**kwargs) -> ReaxTypedMolecularSystem:
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path = Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+    typed_molecule = ReaxTypedMolecularSystem(**kwargs)
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+    return typed_molecule
+
+def generate_header(
+        typed_molecule: ReaxTypedMolecularSystem,
+        job_folder: Path) -> Tuple[GlobalInformation, List[str]]:
+    os.makedirs(job_folder, exist_ok=True)
+    global_information = typed_molecule.generate_lammps_data_file(job_folder)
+    input_path = typed_molecule.generate_lammps_input_file(job_folder, global_information)
+    return global_information, input_path.read_text(encoding="utf-8").splitlines()
+
+def read_atoms_section(data_path: Path) -> List[List[str]]:
+    with open(data_path, "r", encoding="utf-8") as f:
+        lines = f.read().split("Atoms # full")[1].strip().splitlines()
+    return [line.split() for line in lines]
+
+def test_moleculeToJobFolderParallelWriter(tmp_path):
+    typed_molecule = load_benzene()
+    assert typed_molecule.get_data_file_settings().get_nb_workers() == 1
+    generate_header(typed_molecule, tmp_path / "serial")
+    typed_molecule.set_data_file_settings(DataFileSettings(nb_workers=2))
+    generate_header(typed_molecule, tmp_path / "parallel")
+
+    serial_content = (tmp_path / "serial" / "model.data").read_text(encoding="utf-8")
+    parallel_content = (tmp_path / "parallel" / "model.data").read_text(encoding="utf-8")
+    assert serial_content == parallel_content
+    assert [values[0] for values in read_atoms_section(tmp_path / "parallel" / "model.data")] == \
+        [str(i) for i in range(1, 13)]
+
+def test_moleculeToJobFolderCompressed(tmp_path):
+    typed_molecule = load_benzene()
+    assert typed_molecule.get_data_file_settings().get_compression() == CompressionStyle.NONE
+    generate_header(typed_molecule, tmp_path / "plain")
+
+    typed_molecule.set_data_file_settings(DataFileSettings(compression=CompressionStyle.GZIP))
+    assert typed_molecule.get_lammps_data_filename() == "model.data.gz"
+    typed_molecule2 = ReaxTypedMolecularSystem()
+    typed_molecule2.from_dict(typed_molecule.to_dict(), 0)
+    assert typed_molecule2.get_data_file_settings().get_compression() == CompressionStyle.GZIP
+
+    _, lines = generate_header(typed_molecule, tmp_path / "gzip")
+    assert "read_data       model.data.gz" in lines
+    assert not (tmp_path / "gzip" / "model.data").exists()
+    with gzip.open(tmp_path / "gzip" / "model.data.gz", "rt", encoding="utf-8") as f:
+        assert f.read() == (tmp_path / "plain" / "model.data").read_text(encoding="utf-8")
+
+def test_moleculeToJobFolderAccelerated(tmp_path):
+    typed_molecule = load_benzene(electrostatic_method=ElectrostaticMethod.ACKS2)
+    assert typed_molecule.get_acceleration_style() == AccelerationStyle.NONE
+    with pytest.raises(ValueError):
+        typed_molecule.set_acceleration(AccelerationStyle.OPENMP, 0)
+
+    typed_molecule.set_acceleration(AccelerationStyle.OPENMP, 4)
+    typed_molecule2 = ReaxTypedMolecularSystem()
+    typed_molecule2.from_dict(typed_molecule.to_dict(), 0)
+    assert typed_molecule2.get_acceleration_style() == AccelerationStyle.OPENMP
+    assert typed_molecule2.get_acceleration_threads() == 4
+
+    _, lines = generate_header(typed_molecule, tmp_path)
+    read_data_index = lines.index("read_data       model.data")
+    assert lines[read_data_index - 2:read_data_index + 3] == [
+        "package        omp 4",
+        "suffix         omp",
+        "read_data       model.data",
+        "pair_style     reaxff NULL mincap 1000",
+        "pair_coeff     * * ffield.reax.Fe_O_C_H.reax C H"]
+    # acks2/reaxff has no omp variant, the suffix is suspended while declaring it
+    assert lines[read_data_index + 3:read_data_index + 6] == [
+        "suffix         off",
+        "fix                                ReaxFFSpec all acks2/reaxff 1 0.0 10.0 1e-8 reaxff",
+        "suffix         on"]
+
+    typed_molecule.set_electrostatic_method(ElectrostaticMethod.QEQ)
+    _, lines = generate_header(typed_molecule, tmp_path)
+    read_data_index = lines.index("read_data       model.data")
+    assert lines[read_data_index + 3] == \
+        "fix                                ReaxFFSpec all qeq/reaxff 1 0.0 10.0 1e-8 reaxff"
+    assert "suffix         off" not in lines
+
+    # The reaxff pair style has no opt or intel variant
+    with pytest.raises(ValueError):
+        typed_molecule.set_acceleration(AccelerationStyle.OPT)
+    with pytest.raises(ValueError):
+        typed_molecule.set_acceleration(AccelerationStyle.INTEL, 4)
+    assert typed_molecule.get_acceleration_style() == AccelerationStyle.OPENMP
+
+def test_moleculeToJobFolderShrink(tmp_path):
+    typed_molecule = load_benzene(bbox_style=BoundingBoxStyle.SHRINK)
+    typed_molecule.set_bbox_padding(LengthQuantity(2.0, "angstrom"))
+    with pytest.raises(ValueError):
+        typed_molecule.set_bbox_padding(LengthQuantity(-2.0, "angstrom"))
+
+    typed_molecule2 = ReaxTypedMolecularSystem()
+    typed_molecule2.from_dict(typed_molecule.to_dict(), 0)
+    assert typed_molecule2.get_bbox_padding().get_magnitude() == 2.0
+    assert typed_molecule2.get_boundingbox_style() == BoundingBoxStyle.SHRINK
+
+    global_information, lines = generate_header(typed_molecule, tmp_path)
+    assert global_information.get_boundary() == ["s", "s", "s"]
+    # The atoms span [50, 54.96] x [50, 54.3] x [50, 50]
+    data_lines = (tmp_path / "model.data").read_text(encoding="utf-8").splitlines()
+    assert data_lines[4:7] == ["48.0\t56.96 xlo xhi", "48.0\t56.3 ylo yhi", "48.0\t52.0 zlo zhi"]
+    assert "boundary       s s s" in lines
+    # Without periodic dimension, the skin is not limited by the box
+    assert "neighbor       2.5 bin" in lines
+
+def test_moleculeToJobFolderOrdered(tmp_path):
+    typed_molecule = load_benzene(bbox_style=BoundingBoxStyle.SHRINK)
+    assert typed_molecule.get_data_file_settings().get_atom_ordering() == AtomOrdering.NONE
+    typed_molecule.set_data_file_settings(
+        DataFileSettings(atom_ordering=AtomOrdering.HILBERT, sort_frequency=500))
+
+    typed_molecule2 = ReaxTypedMolecularSystem()
+    typed_molecule2.from_dict(typed_molecule.to_dict(), 0)
+    assert typed_molecule2.get_data_file_settings().get_atom_ordering() == AtomOrdering.HILBERT
+    assert typed_molecule2.get_data_file_settings().get_sort_frequency() == 500
+
+    global_information, lines = generate_header(typed_molecule, tmp_path)
+    # Indices in the model of the atoms written with the ids 1 to 12 along the Hilbert curve
+    expected_order = [11, 5, 10, 9, 4, 3, 2, 1, 8, 7, 6, 12]
+    assert global_information.get_model_indices(np.arange(1, 13)).tolist() == expected_order
+    assert global_information.get_atom_id_map().tolist() == [8, 7, 6, 5, 2, 11, 10, 9, 4, 3, 1, 12]
+
+    atoms = read_atoms_section(tmp_path / "model.data")
+    assert [values[0] for values in atoms] == [str(i) for i in range(1, 13)]
+    # The model lists the 6 carbons (type 1) before the 6 hydrogens (type 2)
+    assert [values[2] for values in atoms] == ["1" if i <= 6 else "2" for i in expected_order]
+    positions = typed_molecule.get_ase_model().get_positions()
+    assert np.array([[float(v) for v in values[4:7]] for values in atoms]) == \
+        pytest.approx(positions[np.array(expected_order) - 1])
+
+    map_index = lines.index("atom_modify    map hash")
+    assert lines[map_index + 1] == "atom_modify    sort 500 0.0"
+
+def test_lazyAseModel(monkeypatch, tmp_path):
+    import lammpsinputbuilder.typedmolecule
+    import lammpsinputbuilder.utility.model_to_data
+
+    nb_parses = []
+    original_reader = lammpsinputbuilder.typedmolecule.read_molecule_from_string
+    def counting_reader(*args, **kwargs):
+        nb_parses.append(1)
+        return original_reader(*args, **kwargs)
+    monkeypatch.setattr(lammpsinputbuilder.typedmolecule, "read_molecule_from_string", counting_reader)
+    monkeypatch.setattr(lammpsinputbuilder.utility.model_to_data, "read_molecule_from_string", counting_reader)
+
+    typed_molecule = load_benzene()
+    typed_molecule2 = ReaxTypedMolecularSystem()
+    typed_molecule2.from_dict(typed_molecule.to_dict(), 0)
+    assert len(nb_parses) == 0
+
+    typed_molecule.generate_lammps_data_file(tmp_path)
+    assert len(nb_parses) == 1
+
+    assert len(typed_molecule.get_ase_model()) == 12
+    assert len(nb_parses) == 1
@@ -1,6 +1,8 @@
+from io import StringIO
+
 import pytest
 
-from lammpsinputbuilder.section import IntegratorSection, RecursiveSection
+from lammpsinputbuilder.section import IntegratorSection, RecursiveSection, Section
 from lammpsinputbuilder.integrator import NVEIntegrator
 from lammpsinputbuilder.group import AllGroup, IndicesGroup
 from lammpsinputbuilder.fileio import DumpTrajectoryFileIO, DumpStyle
@@ -142,9 +144,10 @@ def test_recursive_section_dict():
             "class_name": "IndicesGroup",
             "id_name": "myIndicesGroup",
             "indices": [
-                1,
-                2,
-                3
+                [
+                    1,
+                    3
+                ]
             ]
         }
     ],
@@ -209,7 +212,7 @@ def test_integrator_section_commands():
     #pylint: disable=line-too-long
     assert result == """#### START Section recursive ###################################################
 #### START Groups DECLARATION ##################################################
-group myIndicesGroup id 1 2 3
+group myIndicesGroup id 1:3
 #### END Groups DECLARATION ####################################################
 #### START Extensions DECLARATION ##############################################
 fix myExtension all move linear 0.0 0.0 0.0
@@ -257,3 +260,27 @@ group myIndicesGroup delete
 #### END Groups DECLARATION ####################################################
 #### END Section recursive #####################################################
 """
+
+def test_recursive_section_emit():
+    integrator = NVEIntegrator(integrator_name="myIntegrator", group=AllGroup(), nb_steps=1000)
+    section = IntegratorSection(integrator=integrator, section_name="mySection")
+    section.add_group(IndicesGroup(group_name="myIndicesGroup", indices=[1, 2, 3]))
+
+    class LegacySection(Section):
+        def add_all_commands(self, global_information: GlobalInformation) -> str:
+            return "print legacy\n"
+
+    recursive_section = RecursiveSection(section_name="recursive")
+    recursive_section.add_section(section)
+    recursive_section.add_section(LegacySection(section_name="legacy"))
+
+    info = GlobalInformation()
+    info.set_unit_style(LammpsUnitSystem.REAL)
+
+    writer = StringIO()
+    recursive_section.emit(writer, info)
+    content = writer.getvalue()
+
+    assert content == recursive_section.add_all_commands(info)
+    assert "group myIndicesGroup id 1:3\n" in content
+    assert "print legacy\n" in content
@@ -62,7 +62,7 @@ def test_recursive_section_model():
 
     assert len(obj_model.groups) == 1
     assert obj_model.groups[0].id_name == "myIndicesGroup"
-    assert obj_model.groups[0].indices == [1, 2, 3]
+    assert obj_model.groups[0].indices == [(1, 3)]
 
     assert len(obj_model.instructions) == 1
     assert obj_model.instructions[0].id_name == "myInstruction"
@@ -92,7 +92,7 @@ def test_recursive_section_model():
 
     assert len(obj_model2.groups) == 1
     assert obj_model2.groups[0].id_name == "myIndicesGroup"
-    assert obj_model2.groups[0].indices == [1, 2, 3]
+    assert obj_model2.groups[0].indices == [(1, 3)]
 
     assert len(obj_model2.instructions) == 1
     assert obj_model2.instructions[0].id_name == "myInstruction"
@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from ase import Atoms
+
+from lammpsinputbuilder.selection import AllSelection, IndicesSelection, ElementSelection, \
+    BoxSelection, SphereSelection, PlaneSelection, PlaneSide, DistanceSelection
+from lammpsinputbuilder.typedmolecule import ReaxTypedMolecularSystem
+from lammpsinputbuilder.types import BoundingBoxStyle, ElectrostaticMethod
+from lammpsinputbuilder.group import IndicesGroup
+
+
+def get_test_atoms() -> Atoms:
+    # 4 layers of 3x3 atoms spaced by 1 Angstrom, the top layer being made of hydrogen
+    grid = np.stack(np.meshgrid(np.arange(3), np.arange(3), np.arange(4), indexing="ij"), axis=-1)
+    positions = grid.reshape(-1, 3).astype(float)
+    symbols = ["H" if z == 3 else "C" for z in positions[:, 2]]
+    return Atoms(symbols=symbols, positions=positions)
+
+
+def test_basic_selections():
+    atoms = get_test_atoms()
+
+    assert len(AllSelection().get_indices(atoms)) == 36
+    assert IndicesSelection([3, 1]).get_indices(atoms).tolist() == [1, 3]
+    assert np.all(atoms.positions[ElementSelection("H").get_indices(atoms) - 1, 2] == 3)
+    assert len(ElementSelection(["C", "H"]).get_indices(atoms)) == 36
+
+    top = PlaneSelection(point=[0, 0, 2.5], normal=[0, 0, 1], side=PlaneSide.ABOVE)
+    assert top.get_indices(atoms).tolist() == ElementSelection("H").get_indices(atoms).tolist()
+    bottom = PlaneSelection(point=[0, 0, 0.5], normal=[0, 0, 1], side=PlaneSide.BELOW)
+    assert len(bottom.get_indices(atoms)) == 9
+
+    column = BoxSelection(min_coords=[0, 0, None], max_coords=[0, 0, None])
+    assert atoms.positions[column.get_indices(atoms) - 1].tolist() == [
+        [0, 0, 0], [0, 0, 1], [0, 0, 2], [0, 0, 3]]
+
+    sphere = SphereSelection(center=[1, 1, 1], radius=1.0)
+    assert len(sphere.get_indices(atoms)) == 7
+
+    with pytest.raises(ValueError):
+        IndicesSelection([0, 1])
+    with pytest.raises(ValueError):
+        IndicesSelection([37]).get_indices(atoms)
+    with pytest.raises(ValueError):
+        SphereSelection(center=[0, 0, 0], radius=-1.0)
+    with pytest.raises(ValueError):
+        PlaneSelection(point=[0, 0, 0], normal=[0, 0, 0])
+    with pytest.raises(ValueError):
+        BoxSelection(min_coords=[0, 0])
+
+
+def test_distance_and_combined_selections():
+    atoms = get_test_atoms()
+    hydrogens = ElementSelection("H")
+
+    # The layer below the hydrogens is within 1 Angstrom of them
+    near = DistanceSelection(hydrogens, cutoff=1.0, include_reference=False)
+    assert len(near.get_indices(atoms)) == 9
+    assert np.all(atoms.positions[near.get_indices(atoms) - 1, 2] == 2)
+    assert len(DistanceSelection(hydrogens, cutoff=1.0).get_indices(atoms)) == 18
+    assert len(DistanceSelection(ElementSelection("O"), cutoff=10.0).get_indices(atoms)) == 0
+
+    carbons = ElementSelection("C")
+    assert len((carbons & hydrogens).get_indices(atoms)) == 0
+    assert len((carbons | hydrogens).get_indices(atoms)) == 36
+    assert (~hydrogens).get_indices(atoms).tolist() == carbons.get_indices(atoms).tolist()
+    assert len((carbons - PlaneSelection([0, 0, 0.5], [0, 0, -1])).get_indices(atoms)) == 18
+
+    group = (hydrogens | near).to_group("surface", atoms)
+    assert isinstance(group, IndicesGroup)
+    assert group.get_group_name() == "surface"
+    assert group.get_nb_indices() == 18
+
+
+def test_selection_on_typed_molecule():
+    model_path = Path(__file__).parent.parent / "data" / "models" / "benzene.xyz"
+    forcefield_path = Path(__file__).parent.parent / "data" / "potentials" / "ffield.reax.Fe_O_C_H.reax"
+
+    typed_molecule = ReaxTypedMolecularSystem(
+        bbox_style=BoundingBoxStyle.PERIODIC,
+        electrostatic_method=ElectrostaticMethod.QEQ)
+    with pytest.raises(ValueError):
+        ElementSelection("H").get_indices(typed_molecule)
+
+    typed_molecule.load_from_file(model_path, forcefield_path)
+    group = ElementSelection("H").to_group("hydrogens", typed_molecule)
+    symbols = typed_molecule.get_ase_model().get_chemical_symbols()
+    assert [symbols[i - 1] for i in group.get_indices()] == ["H"] * 6
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from lammpsinputbuilder.types import AtomOrdering, GlobalInformation
+from lammpsinputbuilder.utility.spatial_order import discretize_positions, \
+    compute_morton_keys, compute_hilbert_keys, compute_atom_order, get_atom_id_map
+
+
+def get_grid_cells(nb_bits: int) -> np.ndarray:
+    size = 1 << nb_bits
+    grid = np.meshgrid(np.arange(size), np.arange(size), np.arange(size), indexing="ij")
+    return np.stack([g.ravel() for g in grid], axis=1).astype(np.uint64)
+
+
+def test_discretize_positions():
+    positions = np.array([[0.0, 0.0, 0.0], [10.0, 5.0, 2.5], [-1.0, 11.0, 4.99]])
+    cells = discretize_positions(positions, [0.0, 10.0, 0.0, 10.0, 0.0, 5.0], nb_bits=2)
+    assert cells.tolist() == [[0, 0, 0], [3, 2, 2], [0, 3, 3]]
+
+
+def test_space_filling_keys():
+    cells = get_grid_cells(3)
+
+    morton = compute_morton_keys(cells, nb_bits=3)
+    assert sorted(morton.tolist()) == list(range(len(cells)))
+    assert morton[cells.tolist().index([1, 0, 0])] == 4
+    assert morton[cells.tolist().index([0, 0, 1])] == 1
+
+    # Every cell gets a different key and consecutive cells of the Hilbert curve are adjacent
+    hilbert = compute_hilbert_keys(cells, nb_bits=3)
+    assert sorted(hilbert.tolist()) == list(range(len(cells)))
+    path = cells[np.argsort(hilbert)].astype(np.int64)
+    assert np.all(np.abs(np.diff(path, axis=0)).sum(axis=1) == 1)
+
+
+def test_compute_atom_order():
+    positions = np.array([[9.0, 9.0, 9.0], [1.0, 1.0, 1.0], [9.0, 1.0, 1.0], [1.0, 1.2, 1.0]])
+    bbox = [0.0, 10.0, 0.0, 10.0, 0.0, 10.0]
+
+    assert compute_atom_order(positions, bbox, AtomOrdering.NONE).tolist() == [0, 1, 2, 3]
+    for ordering in [AtomOrdering.MORTON, AtomOrdering.HILBERT]:
+        order = compute_atom_order(positions, bbox, ordering)
+        assert sorted(order.tolist()) == [0, 1, 2, 3]
+        # The two close atoms are written next to each other
+        assert abs(order.tolist().index(1) - order.tolist().index(3)) == 1
+
+    order = np.array([2, 0, 3, 1])
+    atom_id_map = get_atom_id_map(order)
+    assert atom_id_map.tolist() == [2, 4, 1, 3]
+
+    info = GlobalInformation()
+    info.set_atom_id_map(atom_id_map)
+    assert info.get_lammps_ids([1, 3]).tolist() == [2, 1]
+    assert info.get_model_indices([2, 1]).tolist() == [1, 3]
+    with pytest.raises(ValueError):
+        info.set_atom_id_map([1, 1, 2])
+    info.set_atom_id_map(None)
+    assert info.get_lammps_ids([1, 3]).tolist() == [1, 3]
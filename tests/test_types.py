@@ -40,4 +40,14 @@ def test_get_extension_from_forcefield():
     assert lammpsinputbuilder.types.get_extension_from_forcefield(lammpsinputbuilder.types.Forcefield.AIREBOM) == ".airebo-m"
 
     with pytest.raises(NotImplementedError):
-        lammpsinputbuilder.types.get_extension_from_forcefield(None)
\ No newline at end of file
+        lammpsinputbuilder.types.get_extension_from_forcefield(None)
+
+
+def test_get_extension_from_compression_style():
+
+    assert lammpsinputbuilder.types.get_extension_from_compression_style(lammpsinputbuilder.types.CompressionStyle.NONE) == ""
+    assert lammpsinputbuilder.types.get_extension_from_compression_style(lammpsinputbuilder.types.CompressionStyle.GZIP) == ".gz"
+    assert lammpsinputbuilder.types.get_extension_from_compression_style(lammpsinputbuilder.types.CompressionStyle.ZSTD) == ".zst"
+
+    with pytest.raises(NotImplementedError):
+        lammpsinputbuilder.types.get_extension_from_compression_style(None)
@@ -4,10 +4,13 @@ import pytest
 
 from lammpsinputbuilder.types import BoundingBoxStyle, ElectrostaticMethod
 from lammpsinputbuilder.typedmolecule import ReaxTypedMolecularSystem
-from lammpsinputbuilder.workflow_builder import WorkflowBuilder
-from lammpsinputbuilder.section import IntegratorSection 
-from lammpsinputbuilder.integrator import NVEIntegrator
-from lammpsinputbuilder.fileio import DumpTrajectoryFileIO, ReaxBondFileIO, ThermoFileIO
+from lammpsinputbuilder.workflow_builder import WorkflowBuilder, uses_thermo_variables
+from lammpsinputbuilder.section import IntegratorSection, InstructionsSection
+from lammpsinputbuilder.integrator import NVEIntegrator, RunZeroIntegrator
+from lammpsinputbuilder.instructions import ResetTimestepInstruction, ManualInstruction
+from lammpsinputbuilder.fileio import DumpTrajectoryFileIO, ReaxBondFileIO, ThermoFileIO, \
+    ManualFileIO
+from lammpsinputbuilder.templates.minimize_template import MinimizeTemplate
 from lammpsinputbuilder.group import AllGroup
 
 def test_workflow_builder():
@@ -45,7 +48,6 @@ def test_workflow_builder():
     assert (job_folder / "molecule.XYZ").is_file()
     assert (job_folder / typed_molecule.get_lammps_data_filename()).is_file()
     assert (job_folder / "model.data").is_file()
-    assert (job_folder / "model.data.temp").is_file()
 
     print("Job folder: ", job_folder)
 
@@ -88,5 +90,114 @@ def test_workflow_builder_dict():
     workflow2.from_dict(dict_obj, version=0)
     assert workflow2.get_sections()[0].get_integrator().get_integrator_name() == "NVEID"
 
+
+def test_workflow_builder_setup_free_runs():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path=Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+
+    typed_molecule = ReaxTypedMolecularSystem(
+        bbox_style=BoundingBoxStyle.PERIODIC,
+        electrostatic_method=ElectrostaticMethod.QEQ
+    )
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(typed_molecule)
+    workflow.add_section(IntegratorSection(section_name="first", integrator=RunZeroIntegrator()))
+    workflow.add_section(IntegratorSection(section_name="second", integrator=RunZeroIntegrator()))
+    workflow.add_section(IntegratorSection(section_name="third",
+                                           integrator=NVEIntegrator(nb_steps=10)))
+    reset = InstructionsSection(section_name="reset")
+    reset.add_instruction(ResetTimestepInstruction(instruction_name="reset", new_timestep=0))
+    workflow.add_section(reset)
+    workflow.add_section(IntegratorSection(section_name="fourth", integrator=RunZeroIntegrator()))
+    thermo_section = IntegratorSection(section_name="fifth", integrator=RunZeroIntegrator())
+    thermo_section.add_fileio(ThermoFileIO(fileio_name="thermo", add_default_fields=True, interval=1))
+    workflow.add_section(thermo_section)
+
+    assert workflow.get_setup_free_runs() is False
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    assert "pre no" not in content
+
+    workflow.set_setup_free_runs(True)
+    assert workflow.get_setup_free_runs() is True
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    runs = [line for line in content.splitlines() if line.startswith("run ")]
+    # Only the second run directly follows another run without any declaration in between.
+    # The NVE fix, the instruction, and the thermo output require a new setup.
+    assert runs == ["run 0", "run 0 pre no post no", "run 10", "run 0", "run 0"]
+
+    # Each NVE section declares a new fix, which must be initialized by the setup
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(typed_molecule)
+    workflow.set_setup_free_runs(True)
+    workflow.add_section(IntegratorSection(section_name="first", integrator=NVEIntegrator(nb_steps=10)))
+    workflow.add_section(IntegratorSection(section_name="second", integrator=NVEIntegrator(nb_steps=10)))
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    runs = [line for line in content.splitlines() if line.startswith("run ")]
+    assert runs == ["run 10", "run 10"]
+
+
+def test_workflow_builder_energy_decomposition():
+    molecule_path = Path(__file__).parent.parent / 'data' / 'models' / 'benzene.xyz'
+    forcefield_path = Path(__file__).parent.parent / 'data' / 'potentials' / 'ffield.reax.Fe_O_C_H.reax'
+    typed_molecule = ReaxTypedMolecularSystem(
+        bbox_style=BoundingBoxStyle.PERIODIC,
+        electrostatic_method=ElectrostaticMethod.QEQ
+    )
+    typed_molecule.load_from_file(molecule_path, forcefield_path)
+    variables = typed_molecule.get_default_thermo_variables()
+
+    # The thermo keywords of the default list don't require the compute
+    section = IntegratorSection(integrator=RunZeroIntegrator())
+    section.add_fileio(ThermoFileIO(fileio_name="thermo", user_fields=["step"]))
+    assert not uses_thermo_variables([section], variables)
+
+    template = MinimizeTemplate()
+    template.add_fileio(ThermoFileIO(fileio_name="thermo", user_fields=variables))
+    assert uses_thermo_variables([template], variables)
+    manual = IntegratorSection(integrator=RunZeroIntegrator())
+    manual.add_fileio(ManualFileIO(fileio_name="manual", do_cmd="thermo_style custom step v_eb"))
+    assert uses_thermo_variables([section, manual], variables)
+
+    # The variables are also read through $() and ${} in any command
+    expression = IntegratorSection(integrator=RunZeroIntegrator())
+    expression.add_fileio(ManualFileIO(fileio_name="manual", do_cmd="print \"eb=$(v_eb:%.3f)\""))
+    assert uses_thermo_variables([expression], variables)
+    braces = InstructionsSection()
+    braces.add_instruction(ManualInstruction(cmd="print \"ea=${ea}\""))
+    assert uses_thermo_variables([braces], variables)
+    unrelated = InstructionsSection()
+    unrelated.add_instruction(ManualInstruction(cmd="variable nv_eb equal 1.0"))
+    assert not uses_thermo_variables([unrelated], variables)
+
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(typed_molecule)
+    workflow.add_section(section)
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    assert "compute reax" not in content
+    assert "variable eb" not in content
+
+    thermo_section = IntegratorSection(integrator=NVEIntegrator(nb_steps=10))
+    thermo_section.add_fileio(ThermoFileIO(fileio_name="energies", user_fields=variables))
+    workflow.add_section(thermo_section)
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    assert "compute reax   all pair reaxff\n" in content
+    assert "variable eqeq  equal c_reax[14]\n" in content
+
+    # A manual instruction reading a variable declares the compute as well
+    workflow = WorkflowBuilder()
+    workflow.set_typed_molecular_system(typed_molecule)
+    instructions = InstructionsSection()
+    instructions.add_instruction(ManualInstruction(cmd="variable ebond equal v_eb"))
+    workflow.add_section(instructions)
+    workflow.add_section(section)
+    content = (workflow.generate_inputs() / "workflow.input").read_text(encoding="utf-8")
+    assert "compute reax   all pair reaxff\n" in content
+    assert "variable eb    equal c_reax[1]\n" in content
+
+
 if __name__ == "__main__":
     test_workflow_builder()
+    test_workflow_builder_setup_free_runs()
+    test_workflow_builder_energy_decomposition()